@@ -29,6 +29,7 @@ from tenant_schemas.utils import tenant_context
 from api.provider.models import Provider
 from api.provider.models import Sources
 from cost_models.models import CostModelMap
+from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.processor.tasks import refresh_materialized_views
 from reporting.provider.aws.models import AWSCostEntryBill
 from reporting.provider.azure.models import AzureCostEntryBill
@@ -182,6 +183,11 @@ class ProviderManager:
             err_msg = f"Provider {self._uuid} must be deleted via Sources Integration Service"
             raise ProviderManagerError(err_msg)
 
+        # OCP-on-All summaries are tables, so the removed source's rows are deleted below
+        if self.model.type == Provider.PROVIDER_OCP:
+            ocp_on_all_filter = {"cluster_id": self.model.authentication.provider_resource_name}
+        else:
+            ocp_on_all_filter = {"source_uuid": self._uuid}
         if self.is_removable_by_user(current_user):
             self.model.delete()
             LOG.info(f"Provider: {self.model.name} removed by {current_user.username}")
@@ -190,6 +196,8 @@ class ProviderManager:
                 current_user.username, str(self.model)
             )
             raise ProviderManagerError(err_msg)
+        with OCPReportDBAccessor(self.model.customer.schema_name) as accessor:
+            accessor.delete_ocp_on_all_summary(**ocp_on_all_filter)
         refresh_materialized_views(self.model.customer.schema_name, self.model.type)
 
 
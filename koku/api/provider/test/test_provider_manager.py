@@ -301,6 +301,44 @@ class ProviderManagerTest(IamTestCase):
         provider_query = Provider.objects.all().filter(uuid=provider_uuid)
         self.assertFalse(provider_query)
 
+    @patch("api.provider.provider_manager.OCPReportDBAccessor.delete_ocp_on_all_summary")
+    def test_remove_ocp_deletes_ocp_on_all_summary(self, mock_delete):
+        """Test that removing an OCP provider deletes the OCP-on-All rows of its cluster."""
+        provider_authentication = ProviderAuthentication.objects.create(provider_resource_name="cluster_id_1002")
+        with patch("masu.celery.tasks.check_report_updates"):
+            provider = Provider.objects.create(
+                name="ocpprovidername",
+                type=Provider.PROVIDER_OCP,
+                created_by=self.user,
+                customer=self.customer,
+                authentication=provider_authentication,
+            )
+        with tenant_context(self.tenant):
+            manager = ProviderManager(provider.uuid)
+            manager.remove(self._create_delete_request(self.user))
+        mock_delete.assert_called_once_with(cluster_id="cluster_id_1002")
+
+    @patch("api.provider.provider_manager.OCPReportDBAccessor.delete_ocp_on_all_summary")
+    def test_remove_aws_deletes_ocp_on_all_summary(self, mock_delete):
+        """Test that removing a cloud provider deletes its OCP-on-All rows by source."""
+        provider_authentication = ProviderAuthentication.objects.create(
+            provider_resource_name="arn:aws:iam::2:role/mg"
+        )
+        provider_billing = ProviderBillingSource.objects.create(bucket="my_s3_bucket")
+        with patch("masu.celery.tasks.check_report_updates"):
+            provider = Provider.objects.create(
+                name="awsprovidername",
+                type=Provider.PROVIDER_AWS,
+                created_by=self.user,
+                customer=self.customer,
+                authentication=provider_authentication,
+                billing_source=provider_billing,
+            )
+        with tenant_context(self.tenant):
+            manager = ProviderManager(provider.uuid)
+            manager.remove(self._create_delete_request(self.user))
+        mock_delete.assert_called_once_with(source_uuid=provider.uuid)
+
     def test_remove_ocp_added_via_sources(self):
         """Remove ocp provider added via sources."""
         # Create Provider
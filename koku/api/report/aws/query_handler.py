@@ -19,9 +19,12 @@ import copy
 import logging
 
 from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Case
+from django.db.models import CharField
 from django.db.models import F
 from django.db.models import Q
 from django.db.models import Value
+from django.db.models import When
 from django.db.models import Window
 from django.db.models.expressions import Func
 from django.db.models.functions import Coalesce
@@ -92,6 +95,8 @@ class AWSReportQueryHandler(ReportQueryHandler):
 
         self.group_by_options = self._mapper.provider_map.get("group_by_options")
         self._limit = parameters.get_filter("limit")
+        # org unit paths keyed by sub_org name while the sub_org results are queried
+        self._sub_org_paths = None
 
         # super() needs to be called after _mapper and _limit is set
         super().__init__(parameters)
@@ -123,8 +128,21 @@ class AWSReportQueryHandler(ReportQueryHandler):
         for q_param, db_field in fields.items():
             if q_param in prefix_removed_parameters_list:
                 annotations[q_param] = F(db_field)
+        if self._sub_org_paths:
+            sub_org_cases = [
+                When(organizational_unit__org_unit_path__icontains=path, then=Value(name))
+                for name, path in self._sub_org_paths.items()
+            ]
+            annotations["sub_org_unit"] = Case(*sub_org_cases, output_field=CharField())
         return annotations
 
+    def _get_group_by(self):
+        """Create list for group_by parameters, led by the sub_org while it is queried."""
+        group_by = super()._get_group_by()
+        if self._sub_org_paths:
+            group_by = ["sub_org_unit"] + group_by
+        return group_by
+
     def format_sub_org_results(self, query_data_results, query_data, sub_orgs_dict):
         """
         Add the sub_orgs into the overall results if grouping by org unit.
@@ -151,11 +169,72 @@ class AWSReportQueryHandler(ReportQueryHandler):
                         )
         return query_data
 
+    def execute_sub_org_query(self, sub_orgs_dict):  # noqa: C901
+        """Execute the query for the sub_orgs of the grouped org unit.
+
+        The sub_orgs the user may read are filtered by their org unit path
+        and returned by one query grouped by sub_org. The sub_orgs without
+        RBAC access are not filtered by org unit, so they share the results
+        of one unfiltered query.
+
+        Args:
+            sub_orgs_dict: (dict) dictionary mapping the org_unit_names and ids
+
+        Returns:
+            (dict) the query data keyed by org_unit_name
+            (list) the sums to add to the query_sum
+        """
+        org_access = None
+        if self.access:
+            org_access = self.access.get("aws.organizational_unit", {}).get("read", [])
+        sub_org_paths = {}
+        unfiltered_sub_orgs = []
+        for sub_org_name, (sub_org_id, org_unit_path) in sub_orgs_dict.items():
+            # only add the org_unit to the filter if the user has access
+            # through RBAC so that we avoid returning a 403
+            if org_access is None or (sub_org_id in org_access or "*" in org_access):
+                sub_org_paths[sub_org_name] = org_unit_path
+            else:
+                unfiltered_sub_orgs.append(sub_org_name)
+
+        query_data_results = {}
+        query_sum_results = []
+        if sub_org_paths:
+            self.parameters.set_filter(org_unit_path=list(sub_org_paths.values()))
+            self.query_filter = self._get_filter()
+            # every sub_org has one row per date, so there is nothing to rank
+            limit = self._limit
+            self._limit = None
+            self._sub_org_paths = sub_org_paths
+            try:
+                sub_query_data, sub_query_sum = self.execute_individual_query()
+            finally:
+                self._limit = limit
+                self._sub_org_paths = None
+                self.parameters.parameters["filter"].pop("org_unit_path")
+            for day in sub_query_data:
+                if not isinstance(day, dict):
+                    continue
+                for sub_org in day.get("sub_org_units", []):
+                    sub_org_name = sub_org.pop("sub_org_unit")
+                    for value in sub_org.get("values", []):
+                        value.pop("sub_org_unit", None)
+                    query_data_results.setdefault(sub_org_name, []).append({"date": day.get("date"), **sub_org})
+            query_sum_results.append(sub_query_sum)
+
+        if unfiltered_sub_orgs:
+            self.query_filter = self._get_filter()
+            sub_query_data, sub_query_sum = self.execute_individual_query()
+            for sub_org_name in unfiltered_sub_orgs:
+                query_data_results[sub_org_name] = copy.deepcopy(sub_query_data)
+                query_sum_results.append(sub_query_sum)
+        return query_data_results, query_sum_results
+
     def execute_query(self):  # noqa: C901
         """Execute each query needed to return the results.
 
         If grouping by org_unit_id, a query will be executed to
-        obtain the account results, and each sub_org results.
+        obtain the account results, and another for the sub_org results.
         Else it will return the original query.
         """
         original_filters = copy.deepcopy(self.parameters.parameters.get("filter"))
@@ -194,24 +273,13 @@ class AWSReportQueryHandler(ReportQueryHandler):
         # grab the base query
         # (without org_units this is the only query - with org_units this is the query to find the accounts)
         query_data, query_sum = self.execute_individual_query()
-        # Next we want to loop through each sub_org and execute the query for it
-        for sub_org_name, value in sub_orgs_dict.items():
-            sub_org_id, org_unit_path = value
+        # Next we want the results of every sub_org, which come from a single query grouped by sub_org
+        if sub_orgs_dict:
             if self.parameters.get_filter("org_unit_id"):
                 self.parameters.parameters["filter"].pop("org_unit_id")
             if self.parameters.parameters["group_by"].get("account"):
                 self.parameters.parameters["group_by"].pop("account")
-            # only add the org_unit to the filter if the user has access
-            # through RBAC so that we avoid returning a 403
-            org_access = None
-            if self.access:
-                org_access = self.access.get("aws.organizational_unit", {}).get("read", [])
-            if org_access is None or (sub_org_id in org_access or "*" in org_access):
-                self.parameters.set_filter(org_unit_path=[org_unit_path])
-            self.query_filter = self._get_filter()
-            sub_query_data, sub_query_sum = self.execute_individual_query()
-            query_data_results[sub_org_name] = sub_query_data
-            query_sum_results.append(sub_query_sum)
+            query_data_results, query_sum_results = self.execute_sub_org_query(sub_orgs_dict)
         # Add the sub_org results to the query_data
         if org_unit_applied:
             for day in query_data:
@@ -27,7 +27,9 @@ from decimal import InvalidOperation
 from itertools import groupby
 from urllib.parse import quote_plus
 
+from django.db import connection
 from django.db.models import Q
+from django.db.models import QuerySet
 from django.db.models.expressions import OrderBy
 from django.db.models.expressions import RawSQL
 
@@ -682,10 +684,12 @@ class ReportQueryHandler(QueryHandler):
 
         """
         rank_limited_data = OrderedDict()
-        date_grouped_data = self.date_group_data(data_list)
-        if data_list:
-            self.max_rank = max(entry.get("rank") for entry in data_list)
         is_offset = "offset" in self.parameters.get("filter", {})
+        if is_offset and isinstance(data_list, QuerySet):
+            data_list = self._get_ranked_page(data_list)
+        elif data_list:
+            self.max_rank = max(entry.get("rank") for entry in data_list)
+        date_grouped_data = self.date_group_data(data_list)
 
         for date in date_grouped_data:
             ranked_list = self._perform_rank_summation(date_grouped_data[date], is_offset)
@@ -693,6 +697,42 @@ class ReportQueryHandler(QueryHandler):
 
         return self.unpack_date_grouped_data(rank_limited_data)
 
+    def _get_ranked_page(self, query_data):
+        """Fetch only the ranks on the requested page of a ranked query.
+
+        The offset and limit are applied to the ranked query in the database,
+        so rows outside the page are never fetched. The total number of ranks
+        comes from a window over the same query, and the rows of the last rank
+        are always returned so it is known when the page is empty.
+
+        Args:
+            query_data (QuerySet): A values query annotated with a rank
+        Returns:
+            List(Dict): The data points on the requested page
+
+        """
+        query = query_data.query
+        compiler = query.get_compiler(using=query_data.db)
+        sql, params = compiler.as_sql()
+        offset = int(self._offset)
+        page_end = offset + int(self._limit)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT * FROM (
+                    SELECT ranked.*, max(ranked."rank") OVER () AS "__max_rank" FROM ({sql}) AS ranked
+                ) AS page
+                WHERE (page."rank" > %s AND page."rank" <= %s) OR page."rank" = page."__max_rank"
+                """,
+                (*params, offset, page_end),
+            )
+            rows = cursor.fetchall()
+
+        self.max_rank = rows[0][-1] if rows else 0
+        names = [*query.extra_select, *query.values_select, *query.annotation_select]
+        page = [dict(zip(names, row)) for row in compiler.results_iter(results=[[row[:-1] for row in rows]])]
+        return [data for data in page if offset < data.get("rank") <= page_end]
+
     def _perform_rank_summation(self, entry, is_offset):  # noqa: C901
         """Do the actual rank limiting for rank_list."""
         other = None
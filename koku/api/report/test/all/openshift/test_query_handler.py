@@ -15,6 +15,9 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Test the OCP on All query handler."""
+from decimal import Decimal
+
+from django.db import connection
 from tenant_schemas.utils import tenant_context
 
 from api.iam.test.iam_test_case import IamTestCase
@@ -24,6 +27,8 @@ from api.urls import OCPAllInstanceTypeView
 from api.urls import OCPAllStorageView
 from reporting.models import AWSCostEntryBill
 from reporting.models import AzureCostEntryBill
+from reporting.models import OCPAllCostLineItemDailySummary
+from reporting.models import OCPAllCostLineItemProjectDailySummary
 from reporting.models import OCPAllComputeSummary
 from reporting.models import OCPAllCostSummary
 from reporting.models import OCPAllCostSummaryByAccount
@@ -38,6 +43,48 @@ STORAGE_SUMMARY = OCPAllStorageSummary
 NETWORK_SUMMARY = OCPAllNetworkSummary
 DATABASE_SUMMARY = OCPAllDatabaseSummary
 
+# The cost of a date range in the UNION the OCP-on-All materialized views were defined as
+MATVIEW_DAILY_COST_SQL = """
+    SELECT sum(coalesce(unblended_cost, 0) + coalesce(markup_cost, 0))
+    FROM (
+        SELECT 'AWS', cluster_id, cluster_alias, namespace, node::text, resource_id, usage_start, usage_end,
+            usage_account_id, product_code, product_family, instance_type, region, availability_zone, tags,
+            usage_amount, unit, unblended_cost, markup_cost, source_uuid
+        FROM reporting_ocpawscostlineitem_daily_summary
+        WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+        UNION
+        SELECT 'Azure', cluster_id, cluster_alias, namespace, node::text, resource_id, usage_start, usage_end,
+            subscription_guid, service_name, NULL, instance_type, resource_location, NULL, tags,
+            usage_quantity, unit_of_measure, pretax_cost, markup_cost, source_uuid
+        FROM reporting_ocpazurecostlineitem_daily_summary
+        WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+    ) AS matview (
+        source_type, cluster_id, cluster_alias, namespace, node, resource_id, usage_start, usage_end,
+        usage_account_id, product_code, product_family, instance_type, region, availability_zone, tags,
+        usage_amount, unit, unblended_cost, markup_cost, source_uuid
+    )
+"""
+MATVIEW_PROJECT_COST_SQL = """
+    SELECT sum(coalesce(pod_cost, 0) + coalesce(project_markup_cost, 0))
+    FROM (
+        SELECT 'AWS', cluster_id, cluster_alias, data_source, namespace::text, node::text, pod_labels, resource_id,
+            usage_start, usage_end, usage_account_id, product_code, product_family, instance_type, region,
+            availability_zone, usage_amount, unit, unblended_cost, project_markup_cost, pod_cost, source_uuid
+        FROM reporting_ocpawscostlineitem_project_daily_summary
+        WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+        UNION
+        SELECT 'Azure', cluster_id, cluster_alias, data_source, namespace::text, node::text, pod_labels, resource_id,
+            usage_start, usage_end, subscription_guid, service_name, NULL, instance_type, resource_location, NULL,
+            usage_quantity, unit_of_measure, pretax_cost, project_markup_cost, pod_cost, source_uuid
+        FROM reporting_ocpazurecostlineitem_project_daily_summary
+        WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+    ) AS matview (
+        source_type, cluster_id, cluster_alias, data_source, namespace, node, pod_labels, resource_id,
+        usage_start, usage_end, usage_account_id, product_code, product_family, instance_type, region,
+        availability_zone, usage_amount, unit, unblended_cost, project_markup_cost, pod_cost, source_uuid
+    )
+"""
+
 
 class OCPAllQueryHandlerTest(IamTestCase):
     """Tests for the OCP report query handler."""
@@ -187,3 +234,42 @@ class OCPAllQueryHandlerTest(IamTestCase):
                 query_params = self.mocked_query_params(url, view)
                 handler = OCPAllReportQueryHandler(query_params)
                 self.assertEqual(handler.query_table, table)
+
+    def _get_matview_cost(self, handler, sql):
+        """Return the cost the materialized view definition gives for the handler's date range."""
+        with tenant_context(self.tenant):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, {"start": handler.start_datetime, "end": handler.end_datetime})
+                return cursor.fetchone()[0] or Decimal(0)
+
+    def test_daily_summary_matches_matview(self):
+        """Test that the OCP-on-All daily summary table gives the cost the materialized view did."""
+        url = (
+            "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly"
+            "&group_by[cluster]=*"
+        )
+        query_params = self.mocked_query_params(url, OCPAllCostView)
+        handler = OCPAllReportQueryHandler(query_params)
+        self.assertEqual(handler.query_table, OCPAllCostLineItemDailySummary)
+        query_output = handler.execute_query()
+
+        expected = self._get_matview_cost(handler, MATVIEW_DAILY_COST_SQL)
+        self.assertNotEqual(expected, 0)
+        total = query_output.get("total").get("cost").get("total").get("value")
+        self.assertAlmostEqual(total, expected, places=6)
+
+    def test_project_daily_summary_matches_matview(self):
+        """Test that the OCP-on-All project daily summary table gives the cost the materialized view did."""
+        url = (
+            "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly"
+            "&group_by[project]=*"
+        )
+        query_params = self.mocked_query_params(url, OCPAllCostView)
+        handler = OCPAllReportQueryHandler(query_params)
+        self.assertEqual(handler.query_table, OCPAllCostLineItemProjectDailySummary)
+        query_output = handler.execute_query()
+
+        expected = self._get_matview_cost(handler, MATVIEW_PROJECT_COST_SQL)
+        self.assertNotEqual(expected, 0)
+        total = query_output.get("total").get("cost").get("total").get("value")
+        self.assertAlmostEqual(total, expected, places=6)
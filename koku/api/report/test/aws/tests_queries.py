@@ -24,6 +24,7 @@ from decimal import Decimal
 from unittest.mock import patch
 from unittest.mock import PropertyMock
 
+from django.db import connection
 from django.db.models import Count
 from django.db.models import DecimalField
 from django.db.models import F
@@ -31,6 +32,7 @@ from django.db.models import Func
 from django.db.models import Sum
 from django.db.models import Value
 from django.db.models.functions import Coalesce
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.exceptions import ValidationError
 from tenant_schemas.utils import tenant_context
@@ -57,6 +59,7 @@ from reporting.models import AWSCostSummaryByRegion
 from reporting.models import AWSCostSummaryByService
 from reporting.models import AWSDatabaseSummary
 from reporting.models import AWSNetworkSummary
+from reporting.models import AWSOrganizationalUnit
 from reporting.models import AWSStorageSummary
 from reporting.models import AWSStorageSummaryByAccount
 from reporting.models import AWSStorageSummaryByRegion
@@ -1067,6 +1070,37 @@ class AWSReportQueryTest(IamTestCase):
         ranked_list = handler._ranked_list(data_list)
         self.assertEqual(ranked_list, expected)
 
+    def test_rank_list_with_offset_in_database(self):
+        """Test that an offset ranked query only fetches the requested page."""
+        url = "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly&filter[limit]=100&filter[offset]=0&group_by[account]=*"  # noqa: E501
+        query_params = self.mocked_query_params(url, AWSCostView)
+        handler = AWSReportQueryHandler(query_params)
+        all_accounts = handler.execute_query().get("data")[0].get("accounts")
+
+        url = "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly&filter[limit]=1&filter[offset]=1&group_by[account]=*"  # noqa: E501
+        query_params = self.mocked_query_params(url, AWSCostView)
+        page_handler = AWSReportQueryHandler(query_params)
+        page_accounts = page_handler.execute_query().get("data")[0].get("accounts")
+
+        self.assertEqual(page_accounts, all_accounts[1:2])
+        self.assertEqual(page_handler.max_rank, handler.max_rank)
+        self.assertEqual(page_handler.max_rank, len(all_accounts))
+
+    def test_rank_list_with_offset_past_last_rank(self):
+        """Test that a page past the last rank is empty and still counts every rank."""
+        url = "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly&filter[limit]=100&filter[offset]=0&group_by[account]=*"  # noqa: E501
+        query_params = self.mocked_query_params(url, AWSCostView)
+        handler = AWSReportQueryHandler(query_params)
+        handler.execute_query()
+
+        url = "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly&filter[limit]=1&filter[offset]=100&group_by[account]=*"  # noqa: E501
+        query_params = self.mocked_query_params(url, AWSCostView)
+        page_handler = AWSReportQueryHandler(query_params)
+        page_data = page_handler.execute_query().get("data")
+
+        self.assertEqual([entry for day in page_data for entry in day.get("accounts", [])], [])
+        self.assertEqual(page_handler.max_rank, handler.max_rank)
+
     def test_query_costs_with_totals(self):
         """Test execute_query() - costs with totals.
 
@@ -1358,6 +1392,36 @@ class AWSReportQueryTest(IamTestCase):
             with self.subTest(org=org):
                 check_accounts_subous_totals(org)
 
+    def test_execute_query_org_unit_group_by_query_count(self):
+        """Test that the number of queries does not grow with the number of sub orgs."""
+
+        def execute_query():
+            """Execute the org unit group by and return the data and the number of queries."""
+            url = "?group_by[org_unit_id]=R_001"
+            query_params = self.mocked_query_params(url, AWSCostView, "costs")
+            handler = AWSReportQueryHandler(query_params)
+            with CaptureQueriesContext(connection) as captured:
+                data = handler.execute_query()
+            return data, len(captured.captured_queries)
+
+        with tenant_context(self.tenant):
+            data, query_count = execute_query()
+            for index in range(5):
+                AWSOrganizationalUnit.objects.create(
+                    org_unit_name=f"Extra Org Unit {index}",
+                    org_unit_id=f"OU_9{index:02d}",
+                    org_unit_path=f"R_001&OU_9{index:02d}",
+                    level=1,
+                )
+            more_data, more_query_count = execute_query()
+
+        self.assertEqual(more_query_count, query_count)
+        self.assertEqual(more_data.get("total"), data.get("total"))
+        _, sub_ous = _calculate_accounts_and_sub_ous(data.get("data"))
+        _, more_sub_ous = _calculate_accounts_and_sub_ous(more_data.get("data"))
+        self.assertIn("OU_001", sub_ous)
+        self.assertEqual(sorted(more_sub_ous), sorted(sub_ous))
+
     def test_group_by_org_unit_all(self):
         """Check that the total is correct when grouping by org_unit_id=*."""
         with tenant_context(self.tenant):
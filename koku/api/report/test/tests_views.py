@@ -16,6 +16,7 @@
 #
 """Test the Report views."""
 from django.test import RequestFactory
+from prometheus_client import REGISTRY
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -25,6 +26,7 @@ from api.common.pagination import ReportPagination
 from api.common.pagination import ReportRankedPagination
 from api.iam.test.iam_test_case import IamTestCase
 from api.iam.test.iam_test_case import RbacPermissions
+from api.models import Provider
 from api.report.view import _fill_in_missing_units
 from api.report.view import _find_unit
 from api.report.view import get_paginator
@@ -83,6 +85,17 @@ class ReportViewTest(IamTestCase):
                 self.assertIsInstance(json_result.get("data"), list)
                 self.assertTrue(len(json_result.get("data")) > 0)
 
+    def test_endpoint_view_observes_latency(self):
+        """Test that the report query is recorded in the latency histogram."""
+        labels = {"provider_type": Provider.PROVIDER_AWS, "report_type": "costs"}
+        before = REGISTRY.get_sample_value("report_query_seconds_count", labels) or 0
+
+        response = self.client.get(reverse("reports-aws-costs"), **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        after = REGISTRY.get_sample_value("report_query_seconds_count", labels)
+        self.assertEqual(after, before + 1)
+
     def test_endpoints_invalid_query_param(self):
         """Test endpoint runs with an invalid query param."""
         for endpoint in self.ENDPOINTS:
@@ -22,6 +22,7 @@ from django.utils.translation import ugettext as _
 from django.views.decorators.vary import vary_on_headers
 from pint.errors import DimensionalityError
 from pint.errors import UndefinedUnitError
+from prometheus_client import Histogram
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
@@ -34,6 +35,12 @@ from api.query_params import QueryParameters
 from api.utils import UnitConverter
 
 LOG = logging.getLogger(__name__)
+REPORT_QUERY_LATENCY = Histogram(
+    "report_query_seconds",
+    "Seconds spent running report API queries",
+    ["provider_type", "report_type"],
+    buckets=Histogram.DEFAULT_BUCKETS[:-1] + (30.0, 60.0, 90.0, float("inf")),
+)
 
 
 def get_paginator(filter_query_params, count):
@@ -156,22 +163,25 @@ class ReportView(APIView):
         except ValidationError as exc:
             return Response(data=exc.detail, status=status.HTTP_400_BAD_REQUEST)
         handler = self.query_handler(params)
-        output = handler.execute_query()
+        with REPORT_QUERY_LATENCY.labels(provider_type=handler.provider, report_type=params.report_type).time():
+            output = handler.execute_query()
         max_rank = handler.max_rank
 
+        paginator = get_paginator(params.parameters.get("filter", {}), max_rank)
+        paginated_result = paginator.paginate_queryset(output, request)
+
+        # Only the page being returned is converted
         if "units" in params.parameters:
-            from_unit = _find_unit()(output["data"])
+            from_unit = _find_unit()(paginated_result["data"]) or _find_unit()(paginated_result.get("total"))
             if from_unit:
                 try:
                     to_unit = params.parameters.get("units")
                     unit_converter = UnitConverter()
-                    output = _fill_in_missing_units(from_unit)(output)
-                    output = _convert_units(unit_converter, output, to_unit)
+                    paginated_result = _fill_in_missing_units(from_unit)(paginated_result)
+                    paginated_result = _convert_units(unit_converter, paginated_result, to_unit)
                 except (DimensionalityError, UndefinedUnitError):
                     error = {"details": _("Unit conversion failed.")}
                     raise ValidationError(error)
 
-        paginator = get_paginator(params.parameters.get("filter", {}), max_rank)
-        paginated_result = paginator.paginate_queryset(output, request)
-        LOG.debug(f"DATA: {output}")
+        LOG.debug(f"DATA: {paginated_result}")
         return paginator.get_paginated_response(paginated_result)
@@ -340,32 +340,63 @@ class TagQueryHandler(QueryHandler):
         return tag_map
 
     @staticmethod
-    def _get_dictionary_for_key(dictionary_list, key):
-        """Get dictionary matching key from list of dictionaries."""
-        for di in dictionary_list:
-            if key in di.get("key"):
-                return di
-        return None
+    def _get_final_data_index(final_data):
+        """Index the final data by key and type.
+
+        Args:
+            final_data (list): The list of tag dictionaries merged so far
+
+        Returns:
+            (dict): The first tag dictionary and the set of its values keyed by (key, type)
+
+        """
+        index = {}
+        for dikt in final_data:
+            index_key = (dikt.get("key"), dikt.get("type"))
+            if index_key not in index:
+                index[index_key] = (dikt, set(dikt.get("values")))
+        return index
+
+    @staticmethod
+    def _merge_values(indexed, values):
+        """Extend indexed tag values with the values not already present."""
+        dikt, seen = indexed
+        for value in values:
+            if value not in seen:
+                seen.add(value)
+                dikt["values"].append(value)
+
+    @staticmethod
+    def _append_to_index(final_data, index, tag, source_type=None):
+        """Append a copy of the tag with deduplicated values to the final data and its index."""
+        copy_value = {**tag, "values": list(dict.fromkeys(tag.get("values")))}
+        if source_type:
+            copy_value["type"] = source_type
+        final_data.append(copy_value)
+        index[(copy_value.get("key"), source_type)] = (copy_value, set(copy_value["values"]))
 
     def append_to_final_data_with_type(self, final_data, converted_data, source):
         """Convert data to final list with a source type."""
+        index = self._get_final_data_index(final_data)
+        source_type = source.get("type")
         for k, v in converted_data.items():
-            dikt = self._get_dictionary_for_key(final_data, k)
-            if dikt and dikt.get("type") == source.get("type"):
-                dikt["values"].extend(v.get("values"))
+            indexed = index.get((k, source_type))
+            if indexed:
+                self._merge_values(indexed, v.get("values"))
             else:
-                copy_value = copy.deepcopy(v)
-                copy_value["type"] = source.get("type")
-                final_data.append(copy_value)
+                self._append_to_index(final_data, index, v, source_type)
 
     def append_to_final_data_without_type(self, final_data, converted_data):
         """Convert data to final list without a source type."""
+        index = self._get_final_data_index(final_data)
+        keys = {key for key, _ in index}
         for k, v in converted_data.items():
-            dikt = self._get_dictionary_for_key(final_data, k)
-            if dikt and dikt.get("type") is None:
-                dikt["values"].extend(v.get("values"))
-            elif not dikt:
-                final_data.append(copy.deepcopy(v))
+            indexed = index.get((k, None))
+            if indexed:
+                self._merge_values(indexed, v.get("values"))
+            elif k not in keys:
+                self._append_to_index(final_data, index, v)
+                keys.add(k)
 
     def execute_query(self):
         """Execute query and return provided data.
@@ -88,7 +88,7 @@ class AzureTagQueryHandlerTest(IamTestCase):
         tagHandler.append_to_final_data_without_type(final, tag_keys2)
         expected_4 = [
             {"key": "ms-resource-usage", "values": ["azure-cloud-shell", "azure-cloud-shell2"]},
-            {"key": "project", "values": ["p1", "p2", "p1", "p3"]},
+            {"key": "project", "values": ["p1", "p2", "p3"]},
             {"key": "cost", "values": ["management"]},
             {"key": "ms-resource-usage", "values": ["azure-cloud-shell"], "type": "storage"},
             {"key": "project", "values": ["p1", "p2"], "type": "storage"},
@@ -108,3 +108,17 @@ class AzureTagQueryHandlerTest(IamTestCase):
         ]
 
         self.assertEqual(final, expected_5)
+
+    def test_merge_tags_exact_key(self):
+        """Test that tags are merged on the exact key and their values are deduplicated."""
+        url = "?filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=monthly"
+        query_params = self.mocked_query_params(url, AzureTagView)
+        tagHandler = AzureTagQueryHandler(query_params)
+
+        final = []
+        tagHandler.append_to_final_data_without_type(final, tagHandler._convert_to_dict([("application", ["a1"])]))
+        tagHandler.append_to_final_data_without_type(
+            final, tagHandler._convert_to_dict([("app", ["a1", "a2", "a1"]), ("application", ["a1", "a3"])])
+        )
+        expected = [{"key": "application", "values": ["a1", "a3"]}, {"key": "app", "values": ["a1", "a2"]}]
+        self.assertEqual(final, expected)
@@ -16,13 +16,17 @@
 #
 """Cache functions."""
 import logging
+import time
 
-from django.conf import settings
 from django.core.cache import caches
-from django.core.cache.backends import locmem
 from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.middleware.cache import CacheMiddleware
+from django.utils.cache import get_cache_key
+from django.utils.decorators import decorator_from_middleware_with_args
 from django_redis.cache import RedisCache
-from redis import Redis
+from prometheus_client import Counter
+from redis.exceptions import RedisError
 
 from api.provider.models import Provider
 
@@ -41,37 +45,128 @@ OPENSHIFT_CACHE_PREFIX = "openshift-view"
 OPENSHIFT_AWS_CACHE_PREFIX = "openshift-aws-view"
 OPENSHIFT_AZURE_CACHE_PREFIX = "openshift-azure-view"
 OPENSHIFT_ALL_CACHE_PREFIX = "openshift-all-view"
+CACHE_PREFIXES = (
+    AWS_CACHE_PREFIX,
+    AZURE_CACHE_PREFIX,
+    OPENSHIFT_CACHE_PREFIX,
+    OPENSHIFT_AWS_CACHE_PREFIX,
+    OPENSHIFT_AZURE_CACHE_PREFIX,
+    OPENSHIFT_ALL_CACHE_PREFIX,
+)
+VIEW_CACHE_TAG_PREFIX = "view-cache-keys"
+
+# Delete the keys in each tag set and the tag itself in one step, so a key
+# tagged while invalidating is either deleted or stays tagged. KEYS: tags.
+# Returns the number of tagged keys.
+INVALIDATE_TAGS_SCRIPT = """
+local count = 0
+for _, tag in ipairs(KEYS) do
+    local keys = redis.call("SMEMBERS", tag)
+    for i = 1, #keys, 1000 do
+        redis.call("DEL", unpack(keys, i, math.min(i + 999, #keys)))
+    end
+    redis.call("DEL", tag)
+    count = count + #keys
+end
+return count
+"""
+
+VIEW_CACHE_KEYS_INVALIDATED_COUNTER = Counter(
+    "view_cache_keys_invalidated", "Number of cached view responses invalidated"
+)
+VIEW_CACHE_INVALIDATION_SECONDS_COUNTER = Counter(
+    "view_cache_invalidation_seconds", "Time spent invalidating cached view responses"
+)
+
+
+def get_view_cache_tag(schema_name, cache_key_prefix):
+    """Return the name of the set holding a tenant's cached view keys for a prefix."""
+    return f"{VIEW_CACHE_TAG_PREFIX}:{schema_name}:{cache_key_prefix}"
+
+
+def tag_view_cache_keys(schema_name, cache_key_prefix, keys, timeout, cache=None):
+    """Register cache keys in the tenant's view cache tag for a prefix.
+
+    The tag set expires with the newest key registered in it so it never
+    outlives the responses it points to by more than one timeout.
+
+    Args:
+        schema_name (str): The tenant schema the keys were cached for
+        cache_key_prefix (str): The view cache prefix, e.g. AWS_CACHE_PREFIX
+        keys (list): The cache keys, as passed to the cache backend
+        timeout (int): The number of seconds the keys are cached for
+        cache (BaseCache): The cache holding the keys, defaults to the default cache
+
+    Returns:
+        (None)
+
+    """
+    cache = cache if cache is not None else caches["default"]
+    tag = get_view_cache_tag(schema_name, cache_key_prefix)
+    if isinstance(cache, RedisCache):
+        try:
+            pipeline = cache.client.get_client(write=True).pipeline()
+            pipeline.sadd(tag, *[cache.make_key(key) for key in keys])
+            pipeline.expire(tag, timeout)
+            pipeline.execute()
+        except RedisError as err:
+            LOG.warning("Unable to tag view cache keys for %s: %s", tag, err)
+    elif isinstance(cache, LocMemCache):
+        tagged_keys = cache.get(tag, set())
+        tagged_keys.update(keys)
+        cache.set(tag, tagged_keys, timeout)
+
+
+class TaggedCacheMiddleware(CacheMiddleware):
+    """Cache middleware that tags each cached response with its tenant and prefix."""
+
+    def process_response(self, request, response):
+        """Cache the response and register its key in the tenant's tag."""
+        response = super().process_response(request, response)
+        if self.key_prefix and self._should_update_cache(request, response) and response.status_code == 200:
+            cache_key = get_cache_key(request, self.key_prefix, request.method, cache=self.cache)
+            if cache_key:
+                schema_name = connection.schema_name
+                tag_view_cache_keys(schema_name, self.key_prefix, [cache_key], self.cache_timeout, self.cache)
+        return response
+
+
+def tagged_cache_page(timeout, *, cache=None, key_prefix=None):
+    """Cache a view like django's cache_page, registering the keys for invalidation."""
+    return decorator_from_middleware_with_args(TaggedCacheMiddleware)(
+        cache_timeout=timeout, cache_alias=cache, key_prefix=key_prefix
+    )
 
 
 def invalidate_view_cache_for_tenant_and_cache_key(schema_name, cache_key_prefix=None):
     """Invalidate our view cache for a specific tenant and source type.
 
+    Only the keys registered in the tenant's tags are deleted, so the cost
+    scales with the tenant's cached responses instead of the whole cache.
     If cache_key_prefix is None, all views will be invalidated.
     """
+    start = time.time()
     cache = caches["default"]
+    cache_key_prefixes = (cache_key_prefix,) if cache_key_prefix else CACHE_PREFIXES
+    tags = [get_view_cache_tag(schema_name, prefix) for prefix in cache_key_prefixes]
     if isinstance(cache, RedisCache):
-        cache = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB)
-        all_keys = cache.keys("*")
-        all_keys = [key.decode("utf-8") for key in all_keys]
+        client = cache.client.get_client(write=True)
+        invalidate_tags = client.register_script(INVALIDATE_TAGS_SCRIPT)
+        invalidated_count = invalidate_tags(keys=tags)
     elif isinstance(cache, LocMemCache):
-        all_keys = list(locmem._caches.get(settings.TEST_CACHE_LOCATION).keys())
-        all_keys = [key.split(":", 2)[-1] for key in all_keys]
+        keys_to_invalidate = set().union(*cache.get_many(tags).values())
+        cache.delete_many(list(keys_to_invalidate) + tags)
+        invalidated_count = len(keys_to_invalidate)
     else:
         msg = "Using an unsupported caching backend!"
         raise KokuCacheError(msg)
 
-    all_keys = all_keys if all_keys is not None else []
-
-    if cache_key_prefix:
-        keys_to_invalidate = [key for key in all_keys if (schema_name in key and cache_key_prefix in key)]
-    else:
-        # Invalidate all cached views for the tenant
-        keys_to_invalidate = [key for key in all_keys if schema_name in key]
-
-    for key in keys_to_invalidate:
-        cache.delete(key)
-
-    msg = f"Invalidated request cache for\n\ttenant: {schema_name}\n\tcache_key_prefix: {cache_key_prefix}"
+    VIEW_CACHE_KEYS_INVALIDATED_COUNTER.inc(invalidated_count)
+    VIEW_CACHE_INVALIDATION_SECONDS_COUNTER.inc(time.time() - start)
+    msg = (
+        f"Invalidated {invalidated_count} cached views for\n\ttenant: {schema_name}"
+        f"\n\tcache_key_prefix: {cache_key_prefix}"
+    )
     LOG.info(msg)
 
 
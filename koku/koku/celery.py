@@ -117,6 +117,13 @@ app.conf.beat_schedule["autovacuum-tune-schemas"] = {
     "args": [],
 }
 
+# Create the line item partitions for the upcoming month ahead of ingest
+app.conf.beat_schedule["create-monthly-partitions"] = {
+    "task": "masu.celery.tasks.create_monthly_partitions",
+    "schedule": crontab(hour=0, minute=30),
+    "args": [],
+}
+
 
 # Collect prometheus metrics.
 app.conf.beat_schedule["db_metrics"] = {"task": "koku.metrics.collect_metrics", "schedule": crontab(minute="*/15")}
@@ -31,7 +31,7 @@ from .env import ENVIRONMENT
 
 engines = {
     "sqlite": "django.db.backends.sqlite3",
-    "postgresql": "tenant_schemas.postgresql_backend",
+    "postgresql": "koku.postgresql_backend",
     "mysql": "django.db.backends.mysql",
 }
 
@@ -45,6 +45,13 @@ def _cert_config(db_config, database_cert):
     return db_config
 
 
+def _conn_max_age(value):
+    """Convert the connection max age setting, where "None" keeps connections open forever."""
+    if str(value).lower() == "none":
+        return None
+    return int(value)
+
+
 def config():
     """Database config."""
     service_name = ENVIRONMENT.get_value("DATABASE_SERVICE_NAME", default="").upper().replace("-", "_")
@@ -65,6 +72,11 @@ def config():
         "PASSWORD": ENVIRONMENT.get_value("DATABASE_PASSWORD", default="postgres"),
         "HOST": ENVIRONMENT.get_value(f"{service_name}_SERVICE_HOST", default="localhost"),
         "PORT": ENVIRONMENT.get_value(f"{service_name}_SERVICE_PORT", default=15432),
+        # Seconds to keep a connection open across requests and tasks, None for unlimited
+        "CONN_MAX_AGE": _conn_max_age(ENVIRONMENT.get_value("DATABASE_CONN_MAX_AGE", default="0")),
+        "CONN_HEALTH_CHECKS": ENVIRONMENT.bool("DATABASE_CONN_HEALTH_CHECKS", default=False),
+        "POOL_SIZE": ENVIRONMENT.int("DATABASE_POOL_SIZE", default=0),
+        "POOL_TIMEOUT": ENVIRONMENT.int("DATABASE_POOL_TIMEOUT", default=30),
     }
 
     database_cert = ENVIRONMENT.get_value("DATABASE_SERVICE_CERT", default=None)
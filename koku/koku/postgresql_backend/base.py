@@ -0,0 +1,186 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Tenant aware PostgreSQL database wrapper with health checks and an optional pool.
+
+Settings, in addition to Django's:
+
+    CONN_HEALTH_CHECKS (bool): Check a persistent connection with ``SELECT 1``
+        before its first use in each request or task, and reconnect if it fails.
+    POOL_SIZE (int): Keep up to this many connections per process in a pool
+        that connections are returned to instead of being closed. 0 disables it.
+    POOL_TIMEOUT (int): Seconds to wait for a free pooled connection.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.db import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from tenant_schemas.postgresql_backend import base
+
+from koku.postgresql_backend.metrics import DB_POOL_CONNECTIONS_IDLE_GAUGE
+from koku.postgresql_backend.metrics import DB_POOL_CONNECTIONS_IN_USE_GAUGE
+from koku.postgresql_backend.metrics import DB_POOL_WAIT_LATENCY
+from koku.postgresql_backend.metrics import DB_POOL_WAITING_GAUGE
+
+LOG = logging.getLogger(__name__)
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class ConnectionPool:
+    """A per-process pool of psycopg2 connections."""
+
+    def __init__(self, size, timeout):
+        """Create an empty pool.
+
+        Args:
+            size (int): The most connections checked out at once
+            timeout (int): Seconds to wait for a free connection
+
+        """
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def getconn(self, connect):
+        """Check out an idle connection or open a new one.
+
+        Args:
+            connect (callable): Opens a new connection
+
+        Returns:
+            (psycopg2.extensions.connection): The checked out connection
+
+        """
+        started = time.monotonic()
+        DB_POOL_WAITING_GAUGE.inc()
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            DB_POOL_WAITING_GAUGE.dec()
+        DB_POOL_WAIT_LATENCY.observe(time.monotonic() - started)
+        if not acquired:
+            raise OperationalError(f"Timed out after {self.timeout}s waiting for one of {self.size} DB connections.")
+
+        try:
+            connection = None
+            while connection is None:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    connection = connect()
+                    break
+                DB_POOL_CONNECTIONS_IDLE_GAUGE.dec()
+                if connection.closed:
+                    connection = None
+        except Exception:
+            self._slots.release()
+            raise
+        DB_POOL_CONNECTIONS_IN_USE_GAUGE.inc()
+        return connection
+
+    def putconn(self, connection):
+        """Return a connection to the pool, rolling back any open transaction.
+
+        Args:
+            connection (psycopg2.extensions.connection): The checked out connection
+
+        """
+        try:
+            if not connection.closed and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception as error:
+            LOG.warning("Closing pooled DB connection that could not be reset: %s", error)
+            connection.close()
+        finally:
+            if not connection.closed:
+                self._idle.put(connection)
+                DB_POOL_CONNECTIONS_IDLE_GAUGE.inc()
+            DB_POOL_CONNECTIONS_IN_USE_GAUGE.dec()
+            self._slots.release()
+
+
+def get_pool(alias, size, timeout):
+    """Return this process's pool for a database alias.
+
+    Pools are keyed by process id so forked workers never share sockets.
+    """
+    key = (os.getpid(), alias)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ConnectionPool(size, timeout)
+        return _POOLS[key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Tenant aware database wrapper with connection health checks and pooling."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the wrapper."""
+        super().__init__(*args, **kwargs)
+        self.health_check_pending = False
+
+    @property
+    def pool(self):
+        """Return the connection pool, if pooling is enabled."""
+        size = self.settings_dict.get("POOL_SIZE") or 0
+        if size <= 0:
+            return None
+        return get_pool(self.alias, size, self.settings_dict.get("POOL_TIMEOUT", 30))
+
+    def get_new_connection(self, conn_params):
+        """Check out a pooled connection or open a new one."""
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        """Return the connection to the pool instead of closing it when pooling is enabled.
+
+        The tenant wrapper resets its search path on close, so the next user
+        of the connection sets its own schema before running a query.
+        """
+        pool = self.pool
+        if pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        """Close a broken or expired connection and schedule a health check for a kept one."""
+        super().close_if_unusable_or_obsolete()
+        if self.connection is not None and self.settings_dict.get("CONN_HEALTH_CHECKS"):
+            self.health_check_pending = True
+
+    def ensure_connection(self):
+        """Reconnect before first use if a kept connection fails its health check."""
+        if self.health_check_pending:
+            self.health_check_pending = False
+            if self.connection is not None and not self.in_atomic_block and not self.is_usable():
+                LOG.warning("Persistent DB connection failed its health check. Reconnecting.")
+                # Close the socket first so a broken connection is not returned to the pool
+                self.connection.close()
+                self.close()
+        super().ensure_connection()
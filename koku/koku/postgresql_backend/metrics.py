@@ -0,0 +1,38 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Prometheus metrics for the DB connection pool.
+
+These are registered on the default registry so the API exports them; in
+multiprocess mode the worker registry collects them from every process too.
+"""
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+DB_POOL_CONNECTIONS_IN_USE_GAUGE = Gauge(
+    "db_pool_connections_in_use", "Number of pooled DB connections checked out", multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTIONS_IDLE_GAUGE = Gauge(
+    "db_pool_connections_idle", "Number of idle pooled DB connections", multiprocess_mode="livesum"
+)
+DB_POOL_WAITING_GAUGE = Gauge(
+    "db_pool_waiting", "Number of threads waiting for a pooled DB connection", multiprocess_mode="livesum"
+)
+DB_POOL_WAIT_LATENCY = Histogram(
+    "db_pool_wait_seconds",
+    "Seconds a checkout waited for a pooled DB connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, float("inf")),
+)
@@ -207,9 +207,10 @@ else:
             },
         },
         "worker": {
-            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
-            "LOCATION": "worker_cache_table",
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/2",
             "TIMEOUT": 86400,  # 24 hours
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
         },
     }
 
@@ -399,6 +400,8 @@ RABBITMQ_HOST = os.getenv("RABBITMQ_HOST", "localhost")
 RABBITMQ_PORT = os.getenv("RABBITMQ_PORT", "5672")
 
 CELERY_BROKER_URL = f"amqp://{RABBITMQ_HOST}:{RABBITMQ_PORT}"
+# Required for chords, e.g. when REPORT_PROCESSING_FAN_OUT is enabled
+CELERY_RESULT_BACKEND = ENVIRONMENT.get_value("CELERY_RESULT_BACKEND", default=None)
 CELERY_IMPORTS = ("masu.processor.tasks", "masu.celery.tasks", "koku.metrics")
 CELERY_BROKER_POOL_LIMIT = None
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
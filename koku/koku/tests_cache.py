@@ -17,13 +17,22 @@
 """Test view caching functions."""
 import logging
 import random
+from unittest.mock import Mock
+from unittest.mock import patch
 
 from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory
 from django.test.utils import override_settings
+from django_redis.cache import RedisCache
+from tenant_schemas.utils import schema_context
 
 from api.iam.test.iam_test_case import IamTestCase
 from koku.cache import AWS_CACHE_PREFIX
 from koku.cache import AZURE_CACHE_PREFIX
+from koku.cache import CACHE_PREFIXES
+from koku.cache import get_view_cache_tag
+from koku.cache import INVALIDATE_TAGS_SCRIPT
 from koku.cache import invalidate_view_cache_for_tenant_and_cache_key
 from koku.cache import invalidate_view_cache_for_tenant_and_source_type
 from koku.cache import KokuCacheError
@@ -31,19 +40,12 @@ from koku.cache import OPENSHIFT_ALL_CACHE_PREFIX
 from koku.cache import OPENSHIFT_AWS_CACHE_PREFIX
 from koku.cache import OPENSHIFT_AZURE_CACHE_PREFIX
 from koku.cache import OPENSHIFT_CACHE_PREFIX
+from koku.cache import tag_view_cache_keys
+from koku.cache import tagged_cache_page
 
 
 LOG = logging.getLogger(__name__)
 
-CACHE_PREFIXES = (
-    AWS_CACHE_PREFIX,
-    AZURE_CACHE_PREFIX,
-    OPENSHIFT_CACHE_PREFIX,
-    OPENSHIFT_AWS_CACHE_PREFIX,
-    OPENSHIFT_AZURE_CACHE_PREFIX,
-    OPENSHIFT_ALL_CACHE_PREFIX,
-)
-
 
 class KokuCacheTest(IamTestCase):
     """Test the cache functionality."""
@@ -60,12 +62,17 @@ class KokuCacheTest(IamTestCase):
         super().tearDown()
         self.cache.clear()
 
+    def _set_tagged(self, schema_name, cache_key_prefix, key):
+        """Cache a value and tag it for the tenant and prefix."""
+        self.cache.set(key, "value")
+        tag_view_cache_keys(schema_name, cache_key_prefix, [key], 60)
+
     def test_invalidate_view_cache_for_tenant_and_cache_key(self):
         """Test that specific cache data is deleted."""
         key_to_clear = f"{self.schema_name}:{self.cache_key_prefix}"
         remaining_key = f"keeper:{self.cache_key_prefix}"
-        cache_data = {key_to_clear: "value", remaining_key: "value"}
-        self.cache.set_many(cache_data)
+        self._set_tagged(self.schema_name, self.cache_key_prefix, key_to_clear)
+        self._set_tagged("keeper", self.cache_key_prefix, remaining_key)
 
         self.assertIsNotNone(self.cache.get(key_to_clear))
         self.assertIsNotNone(self.cache.get(remaining_key))
@@ -74,6 +81,64 @@ class KokuCacheTest(IamTestCase):
 
         self.assertIsNone(self.cache.get(key_to_clear))
         self.assertIsNotNone(self.cache.get(remaining_key))
+        self.assertIsNone(self.cache.get(get_view_cache_tag(self.schema_name, self.cache_key_prefix)))
+
+    def test_invalidate_view_cache_for_tenant_only_deletes_tagged_keys(self):
+        """Test that untagged keys containing the tenant name are left alone."""
+        untagged_key = f"{self.schema_name}:{self.cache_key_prefix}:untagged"
+        self.cache.set(untagged_key, "value")
+
+        invalidate_view_cache_for_tenant_and_cache_key(self.schema_name, self.cache_key_prefix)
+
+        self.assertIsNotNone(self.cache.get(untagged_key))
+
+    def test_invalidate_view_cache_for_tenant_all_prefixes(self):
+        """Test that all of a tenant's views are invalidated without a prefix."""
+        keys = [f"{self.schema_name}:{prefix}" for prefix in CACHE_PREFIXES]
+        for prefix, key in zip(CACHE_PREFIXES, keys):
+            self._set_tagged(self.schema_name, prefix, key)
+
+        invalidate_view_cache_for_tenant_and_cache_key(self.schema_name)
+
+        for key in keys:
+            self.assertIsNone(self.cache.get(key))
+
+    def test_tagged_cache_page_registers_key(self):
+        """Test that a cached view response is tagged and can be invalidated."""
+        calls = []
+
+        def view(request):
+            calls.append(request)
+            return HttpResponse("cached")
+
+        cached_view = tagged_cache_page(60, key_prefix=self.cache_key_prefix)(view)
+        request = RequestFactory().get("/cached/")
+        with schema_context(self.schema_name):
+            cached_view(request)
+            cached_view(request)
+            self.assertEqual(len(calls), 1)
+            tagged_keys = self.cache.get(get_view_cache_tag(self.schema_name, self.cache_key_prefix))
+            self.assertEqual(len(tagged_keys), 1)
+
+            invalidate_view_cache_for_tenant_and_cache_key(self.schema_name, self.cache_key_prefix)
+            cached_view(request)
+            self.assertEqual(len(calls), 2)
+
+    def test_invalidate_view_cache_for_tenant_redis(self):
+        """Test that the Redis tag sets are read and deleted with their keys in one script."""
+        redis_cache = Mock(spec=RedisCache)
+        client = redis_cache.client.get_client.return_value
+        client.register_script.return_value.return_value = 2
+
+        with patch("koku.cache.caches", {"default": redis_cache}):
+            invalidate_view_cache_for_tenant_and_cache_key(self.schema_name, self.cache_key_prefix)
+
+        client.register_script.assert_called_once_with(INVALIDATE_TAGS_SCRIPT)
+        client.register_script.return_value.assert_called_once_with(
+            keys=[get_view_cache_tag(self.schema_name, self.cache_key_prefix)]
+        )
+        client.smembers.assert_not_called()
+        client.pipeline.assert_not_called()
 
     @override_settings(
         CACHES={
@@ -90,8 +155,9 @@ class KokuCacheTest(IamTestCase):
         aws_cache_key_prefixes = (AWS_CACHE_PREFIX, OPENSHIFT_AWS_CACHE_PREFIX, OPENSHIFT_ALL_CACHE_PREFIX)
         aws_cache_data = {}
         for prefix in aws_cache_key_prefixes:
-            aws_cache_data.update({f"{self.schema_name}:{prefix}": "value"})
-        self.cache.set_many(aws_cache_data)
+            aws_cache_data.update({f"{self.schema_name}:{prefix}": prefix})
+        for key, prefix in aws_cache_data.items():
+            self._set_tagged(self.schema_name, prefix, key)
 
         invalidate_view_cache_for_tenant_and_source_type(self.schema_name, "AWS")
 
@@ -107,8 +173,9 @@ class KokuCacheTest(IamTestCase):
 
         openshift_cache_data = {}
         for prefix in openshift_cache_key_prefixes:
-            openshift_cache_data.update({f"{self.schema_name}:{prefix}": "value"})
-        self.cache.set_many(openshift_cache_data)
+            openshift_cache_data.update({f"{self.schema_name}:{prefix}": prefix})
+        for key, prefix in openshift_cache_data.items():
+            self._set_tagged(self.schema_name, prefix, key)
 
         invalidate_view_cache_for_tenant_and_source_type(self.schema_name, "OCP")
 
@@ -119,8 +186,9 @@ class KokuCacheTest(IamTestCase):
 
         azure_cache_data = {}
         for prefix in azure_cache_key_prefixes:
-            azure_cache_data.update({f"{self.schema_name}:{prefix}": "value"})
-        self.cache.set_many(azure_cache_data)
+            azure_cache_data.update({f"{self.schema_name}:{prefix}": prefix})
+        for key, prefix in azure_cache_data.items():
+            self._set_tagged(self.schema_name, prefix, key)
 
         invalidate_view_cache_for_tenant_and_source_type(self.schema_name, "Azure")
 
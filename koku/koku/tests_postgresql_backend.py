@@ -0,0 +1,112 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the tenant aware PostgreSQL backend."""
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from django.db import connection
+from django.db import OperationalError
+from django.test import TestCase
+from prometheus_client import REGISTRY
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extensions import TRANSACTION_STATUS_INTRANS
+
+from koku.postgresql_backend.base import ConnectionPool
+from koku.postgresql_backend.base import DatabaseWrapper
+
+
+def _fake_connection(status=TRANSACTION_STATUS_IDLE):
+    """Return a mock psycopg2 connection."""
+    fake = Mock(closed=0)
+    fake.info.transaction_status = status
+    return fake
+
+
+class ConnectionPoolTest(TestCase):
+    """Test cases for the ConnectionPool."""
+
+    def test_connection_is_reused(self):
+        """Test that a returned connection is handed out again."""
+        pool = ConnectionPool(2, 1)
+        connect = Mock(side_effect=[_fake_connection(), _fake_connection()])
+
+        first = pool.getconn(connect)
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(connect), first)
+        self.assertEqual(connect.call_count, 1)
+
+    def test_open_transaction_is_rolled_back(self):
+        """Test that a connection is returned without an open transaction."""
+        pool = ConnectionPool(1, 1)
+        fake = _fake_connection(TRANSACTION_STATUS_INTRANS)
+
+        pool.putconn(pool.getconn(lambda: fake))
+
+        fake.rollback.assert_called_once()
+
+    def test_closed_connection_is_replaced(self):
+        """Test that a connection closed while idle is not handed out."""
+        pool = ConnectionPool(1, 1)
+        first = pool.getconn(_fake_connection)
+        pool.putconn(first)
+        first.closed = 1
+
+        self.assertIsNot(pool.getconn(_fake_connection), first)
+
+    def test_exhausted_pool_times_out(self):
+        """Test that checking out more connections than the pool size fails after the timeout."""
+        pool = ConnectionPool(1, 0.01)
+        pool.getconn(_fake_connection)
+
+        with self.assertRaises(OperationalError):
+            pool.getconn(_fake_connection)
+
+    def test_checkout_wait_is_observed(self):
+        """Test that every checkout wait is recorded in the wait histogram."""
+        before = REGISTRY.get_sample_value("db_pool_wait_seconds_count") or 0
+        pool = ConnectionPool(1, 0.01)
+
+        pool.getconn(_fake_connection)
+        with self.assertRaises(OperationalError):
+            pool.getconn(_fake_connection)
+
+        self.assertEqual(REGISTRY.get_sample_value("db_pool_wait_seconds_count"), before + 2)
+
+
+class DatabaseWrapperTest(TestCase):
+    """Test cases for the DatabaseWrapper."""
+
+    def test_backend_is_used(self):
+        """Test that the default connection uses the backend."""
+        self.assertIsInstance(connection, DatabaseWrapper)
+
+    def test_failed_health_check_reconnects(self):
+        """Test that a kept connection failing its health check is replaced before use."""
+        settings_dict = {**connection.settings_dict, "CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True}
+        wrapper = DatabaseWrapper(settings_dict, alias="health_check")
+        wrapper.ensure_connection()
+        broken = wrapper.connection
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertTrue(wrapper.health_check_pending)
+
+        with patch.object(DatabaseWrapper, "is_usable", return_value=False):
+            wrapper.ensure_connection()
+
+        self.assertIsNot(wrapper.connection, broken)
+        self.assertFalse(wrapper.health_check_pending)
+        wrapper.close()
@@ -34,6 +34,7 @@ from api.models import Provider
 from api.utils import DateHelper
 from koku.celery import app
 from masu.config import Config
+from masu.database.partition_manager import PartitionManager
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.external.accounts.hierarchy.aws.aws_org_unit_crawler import AWSOrgUnitCrawler
 from masu.external.date_accessor import DateAccessor
@@ -202,6 +203,21 @@ def vacuum_schemas():
         vacuum_schema.delay(schema_name)
 
 
+@app.task(name="masu.celery.tasks.create_monthly_partitions", queue_name="reporting")
+def create_monthly_partitions():
+    """Create this and next month's line item partitions for all schemas."""
+    tenants = Tenant.objects.values("schema_name")
+    schema_names = [
+        tenant.get("schema_name")
+        for tenant in tenants
+        if (tenant.get("schema_name") and tenant.get("schema_name") != "public")
+    ]
+
+    for schema_name in schema_names:
+        created = PartitionManager(schema_name).create_upcoming_partitions()
+        LOG.info("Created partitions for %s: %s", schema_name, created)
+
+
 # This task will process the autovacuum tuning as a background process
 @app.task(name="masu.celery.tasks.autovacuum_tune_schemas", queue_name="reporting")
 def autovacuum_tune_schemas():
@@ -94,6 +94,12 @@ class Config:
     WAREHOUSE_PATH = "data"
     CSV_DATA_TYPE = "csv"
     PARQUET_DATA_TYPE = "parquet"
+    # Rows held in memory and written per Parquet row group when converting reports
+    PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", default=100000))
+    # Part size of multipart uploads to S3 in bytes
+    S3_MULTIPART_CHUNK_SIZE = int(os.getenv("S3_MULTIPART_CHUNK_SIZE", default=(16 * 1024 * 1024)))
+    # How many ranges of an Azure cost export are read at once
+    AZURE_DOWNLOAD_MAX_CONCURRENCY = int(os.getenv("AZURE_DOWNLOAD_MAX_CONCURRENCY", default=4))
 
     # Celery settings
     CELERY_BROKER_URL = f"amqp://{RABBITMQ_HOST}:{RABBITMQ_PORT}"
@@ -102,6 +108,34 @@ class Config:
     REPORT_PROCESSING_BATCH_SIZE = int(os.getenv("REPORT_PROCESSING_BATCH_SIZE", default=100000))
     REPORT_PROCESSING_TIMEOUT_HOURS = int(os.getenv("REPORT_PROCESSING_TIMEOUT_HOURS", default=2))
 
+    # Provider types whose report files are processed a DataFrame chunk at a time
+    # instead of row by row. e.g. "AWS,AWS-local,Azure,Azure-local"
+    COLUMNAR_PROCESSING_PROVIDERS = [
+        provider_type.strip()
+        for provider_type in os.getenv("COLUMNAR_PROCESSING_PROVIDERS", default="").split(",")
+        if provider_type.strip()
+    ]
+
+    # Process the files of a manifest in parallel Celery tasks, which needs a
+    # Celery result backend, with at most this many processing at once per customer schema.
+    # A file task that finds every slot of its schema taken retries after the delay in seconds,
+    # by default for up to REPORT_PROCESSING_TIMEOUT_HOURS, which is also when a slot held by
+    # a crashed worker expires.
+    REPORT_PROCESSING_FAN_OUT = os.getenv("REPORT_PROCESSING_FAN_OUT", "False").lower() in ("t", "true")
+    REPORT_PROCESSING_TENANT_CONCURRENCY = int(os.getenv("REPORT_PROCESSING_TENANT_CONCURRENCY", default=4))
+    REPORT_PROCESSING_TENANT_RETRY_SECONDS = max(
+        int(os.getenv("REPORT_PROCESSING_TENANT_RETRY_SECONDS", default=30)), 1
+    )
+    REPORT_PROCESSING_TENANT_MAX_RETRIES = int(
+        os.getenv(
+            "REPORT_PROCESSING_TENANT_MAX_RETRIES",
+            default=REPORT_PROCESSING_TIMEOUT_HOURS * 3600 // REPORT_PROCESSING_TENANT_RETRY_SECONDS,
+        )
+    )
+
+    # Materialized views of a tenant refreshed at the same time, each on its own connection
+    MATERIALIZED_VIEW_REFRESH_PARALLELISM = int(os.getenv("MATERIALIZED_VIEW_REFRESH_PARALLELISM", default=4))
+
     AWS_DATETIME_STR_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
     OCP_DATETIME_STR_FORMAT = "%Y-%m-%d %H:%M:%S +0000 UTC"
     AZURE_DATETIME_STR_FORMAT = "%Y-%m-%d"
@@ -138,4 +172,15 @@ class Config:
     # Flag to signal whether or not to connect to upload service
     KAFKA_CONNECT = False if os.getenv("KAFKA_CONNECT", "False") == "False" else True
 
+    # Largest OCP payload to download from the upload service and the size of the chunks it is streamed in
+    KAFKA_PAYLOAD_MAX_SIZE = int(os.getenv("KAFKA_PAYLOAD_MAX_SIZE", default=(1024 * 1024 * 1024)))
+    KAFKA_PAYLOAD_CHUNK_SIZE = int(os.getenv("KAFKA_PAYLOAD_CHUNK_SIZE", default=(1024 * 1024)))
+
+    # Number of OCP payloads to process at once, 1 processes them on the polling thread
+    KAFKA_PROCESSING_WORKERS = int(os.getenv("KAFKA_PROCESSING_WORKERS", default=1))
+
     RETRY_SECONDS = int(os.getenv("RETRY_SECONDS", "10"))
+
+    # Retries of an OCP payload on a processing pool thread, each waiting twice as long up to the maximum
+    KAFKA_MAX_RETRIES = int(os.getenv("KAFKA_MAX_RETRIES", default=10))
+    KAFKA_RETRY_MAX_SECONDS = int(os.getenv("KAFKA_RETRY_MAX_SECONDS", default=300))
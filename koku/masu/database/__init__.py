@@ -46,6 +46,8 @@ OCP_REPORT_TABLE_MAP = {
     "cost_summary": "reporting_ocpcosts_summary",
     "node_label_line_item": "reporting_ocpnodelabellineitem",
     "node_label_line_item_daily": "reporting_ocpnodelabellineitem_daily",
+    "ocp_on_all_daily_summary": "reporting_ocpallcostlineitem_daily_summary",
+    "ocp_on_all_project_daily_summary": "reporting_ocpallcostlineitem_project_daily_summary",
 }
 
 AZURE_REPORT_TABLE_MAP = {
@@ -132,15 +132,28 @@ class AzureReportDBAccessor(ReportDBAccessorBase):
             table_name, summary_sql, start_date, end_date, bind_params=list(summary_sql_params)
         )
 
-    def populate_tags_summary_table(self, bill_ids):
-        """Populate the line item aggregated totals data table."""
+    def populate_tags_summary_table(self, bill_ids, start_date=None, end_date=None):
+        """Populate the tag summary for the days of the bills that were summarized.
+
+        Tag keys and values are collected per day for the date range, then
+        rolled up into the summary of each bill.
+
+        Args:
+            bill_ids (list): The bills to summarize tags for, or all bills if empty
+            start_date (datetime.date) The first day to collect tags for, or every day if not given
+            end_date (datetime.date) The last day to collect tags for
+
+        Returns
+            (None)
+
+        """
         table_name = AZURE_REPORT_TABLE_MAP["tags_summary"]
 
         agg_sql = pkgutil.get_data("masu.database", "sql/reporting_azuretags_summary.sql")
         agg_sql = agg_sql.decode("utf-8")
-        agg_sql_params = {"schema": self.schema, "bill_ids": bill_ids}
+        agg_sql_params = {"schema": self.schema, "bill_ids": bill_ids, "start_date": start_date, "end_date": end_date}
         agg_sql, agg_sql_params = self.jinja_sql.prepare_query(agg_sql, agg_sql_params)
-        self._execute_raw_sql_query(table_name, agg_sql, bind_params=list(agg_sql_params))
+        self._execute_raw_sql_query(table_name, agg_sql, start_date, end_date, bind_params=list(agg_sql_params))
 
     def get_cost_entry_bills_by_date(self, start_date):
         """Return a cost entry bill for the specified start date."""
@@ -220,12 +233,25 @@ class AzureReportDBAccessor(ReportDBAccessorBase):
             table_name, summary_sql, start_date, end_date, bind_params=list(summary_sql_params)
         )
 
-    def populate_ocp_on_azure_tags_summary_table(self):
-        """Populate the line item aggregated totals data table."""
+    def populate_ocp_on_azure_tags_summary_table(self, bill_ids=None, start_date=None, end_date=None):
+        """Populate the tag summary for the days of the bills that were summarized.
+
+        Tag keys and values are collected per day for the date range, then
+        rolled up into the summary of each bill.
+
+        Args:
+            bill_ids (list): The bills to summarize tags for, or all bills if empty
+            start_date (datetime.date) The first day to collect tags for, or every day if not given
+            end_date (datetime.date) The last day to collect tags for
+
+        Returns
+            (None)
+
+        """
         table_name = AZURE_REPORT_TABLE_MAP["ocp_on_azure_tags_summary"]
 
         agg_sql = pkgutil.get_data("masu.database", "sql/reporting_ocpazuretags_summary.sql")
         agg_sql = agg_sql.decode("utf-8")
-        agg_sql_params = {"schema": self.schema}
+        agg_sql_params = {"schema": self.schema, "bill_ids": bill_ids, "start_date": start_date, "end_date": end_date}
         agg_sql, agg_sql_params = self.jinja_sql.prepare_query(agg_sql, agg_sql_params)
-        self._execute_raw_sql_query(table_name, agg_sql, bind_params=list(agg_sql_params))
+        self._execute_raw_sql_query(table_name, agg_sql, start_date, end_date, bind_params=list(agg_sql_params))
@@ -79,6 +79,24 @@ class CostModelDBAccessor(KokuDBAccess):
             if value.get("cost_type") == "Supplementary"
         }
 
+    @property
+    def tiered_infrastructure_rates(self):
+        """Return the infrastructure rates that have more than one tier."""
+        return {
+            key: value.get("tiered_rates")
+            for key, value in self.price_list.items()
+            if value.get("cost_type") == "Infrastructure" and len(value.get("tiered_rates", [])) > 1
+        }
+
+    @property
+    def tiered_supplementary_rates(self):
+        """Return the supplementary rates that have more than one tier."""
+        return {
+            key: value.get("tiered_rates")
+            for key, value in self.price_list.items()
+            if value.get("cost_type") == "Supplementary" and len(value.get("tiered_rates", [])) > 1
+        }
+
     @property
     def markup(self):
         if self.cost_model:
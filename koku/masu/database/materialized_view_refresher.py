@@ -0,0 +1,161 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Refresh a tenant's materialized views in dependency order and in parallel."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from tenant_schemas.utils import schema_context
+
+from masu.config import Config
+from masu.prometheus_stats import MATERIALIZED_VIEW_REFRESH_LATENCY
+
+LOG = logging.getLogger(__name__)
+
+
+class MaterializedViewRefresher:
+    """Refresh materialized views, running views that do not depend on each other concurrently.
+
+    Views are refreshed in levels. A view is only refreshed after every view
+    it reads from, and the views of a level are refreshed on separate
+    connections by at most ``parallelism`` threads.
+    """
+
+    def __init__(self, schema, parallelism=None, provider_type=""):
+        """Establish the refresher.
+
+        Args:
+            schema (str): The customer schema to refresh views in
+            parallelism (int): The most views refreshed at once
+            provider_type (str): The provider type the refresh is for, used to label metrics
+
+        """
+        self._schema = schema
+        self._provider_type = provider_type
+        if parallelism is None:
+            parallelism = Config.MATERIALIZED_VIEW_REFRESH_PARALLELISM
+        self._parallelism = max(parallelism, 1)
+
+    def get_dependencies(self, view_names):
+        """Return the views each view reads from.
+
+        Args:
+            view_names (list): The materialized view names
+
+        Returns:
+            (dict): The set of source view names keyed by dependent view name
+
+        """
+        sql = """
+            SELECT DISTINCT dependent.relname,
+                source.relname
+              FROM pg_depend AS d
+              JOIN pg_rewrite AS r
+                ON r.oid = d.objid
+              JOIN pg_class AS dependent
+                ON dependent.oid = r.ev_class
+              JOIN pg_class AS source
+                ON source.oid = d.refobjid
+              JOIN pg_namespace AS n
+                ON n.oid = dependent.relnamespace
+             WHERE n.nspname = %s
+               AND dependent.relkind = 'm'
+               AND source.relkind = 'm'
+               AND dependent.oid <> source.oid
+               AND dependent.relname = ANY(%s)
+               AND source.relname = ANY(%s)
+        """
+        dependencies = {name: set() for name in view_names}
+        with schema_context(self._schema):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [self._schema, list(view_names), list(view_names)])
+                for dependent, source in cursor.fetchall():
+                    dependencies[dependent].add(source)
+        return dependencies
+
+    @staticmethod
+    def get_refresh_levels(dependencies):
+        """Group views into levels that only read from views in earlier levels.
+
+        Args:
+            dependencies (dict): The set of source view names keyed by dependent view name
+
+        Returns:
+            (list): Lists of view names, in refresh order
+
+        """
+        remaining = {view: set(sources) for view, sources in dependencies.items()}
+        levels = []
+        while remaining:
+            level = sorted(view for view, sources in remaining.items() if not sources)
+            if not level:
+                # A cycle cannot be created between views, but never loop forever
+                level = sorted(remaining)
+            levels.append(level)
+            for view in level:
+                del remaining[view]
+            for sources in remaining.values():
+                sources.difference_update(level)
+        return levels
+
+    def _refresh_view(self, view_name, close_connection):
+        """Refresh one view and return how long it took in seconds."""
+        started = time.monotonic()
+        try:
+            with schema_context(self._schema):
+                with connection.cursor() as cursor:
+                    cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}")
+        finally:
+            if close_connection:
+                # Each worker thread has its own connection
+                connection.close()
+        duration = time.monotonic() - started
+        MATERIALIZED_VIEW_REFRESH_LATENCY.labels(provider_type=self._provider_type, view=view_name).observe(duration)
+        LOG.info("Refreshed %s.%s in %.2f seconds.", self._schema, view_name, duration)
+        return duration
+
+    def refresh(self, view_names):
+        """Refresh materialized views.
+
+        When called inside a transaction, the views are refreshed one at a
+        time on the caller's connection so they see its uncommitted rows.
+
+        Args:
+            view_names (list): The materialized view names
+
+        Returns:
+            (dict): The refresh duration in seconds keyed by view name
+
+        """
+        view_names = list(dict.fromkeys(view_names))
+        if not view_names:
+            return {}
+
+        levels = self.get_refresh_levels(self.get_dependencies(view_names))
+        durations = {}
+        if self._parallelism == 1 or connection.in_atomic_block:
+            for level in levels:
+                for view_name in level:
+                    durations[view_name] = self._refresh_view(view_name, close_connection=False)
+            return durations
+
+        with ThreadPoolExecutor(max_workers=self._parallelism) as executor:
+            for level in levels:
+                results = executor.map(lambda view_name: self._refresh_view(view_name, True), level)
+                durations.update(zip(level, results))
+        return durations
@@ -27,6 +27,7 @@ from dateutil.rrule import rrule
 from django.db import connection
 from django.db.models import DecimalField
 from django.db.models import F
+from django.db.models import Q
 from django.db.models import Value
 from django.db.models.functions import Coalesce
 from jinjasql import JinjaSql
@@ -45,6 +46,16 @@ from reporting.provider.ocp.models import OCPUsageReportPeriod
 
 LOG = logging.getLogger(__name__)
 
+# The usage cost key and daily summary usage column of each usage rate
+USAGE_RATE_COLUMNS = {
+    "cpu_core_usage_per_hour": ("cpu", "pod_usage_cpu_core_hours"),
+    "cpu_core_request_per_hour": ("cpu", "pod_request_cpu_core_hours"),
+    "memory_gb_usage_per_hour": ("memory", "pod_usage_memory_gigabyte_hours"),
+    "memory_gb_request_per_hour": ("memory", "pod_request_memory_gigabyte_hours"),
+    "storage_gb_usage_per_month": ("storage", "persistentvolumeclaim_usage_gigabyte_months"),
+    "storage_gb_request_per_month": ("storage", "volume_request_storage_gigabyte_months"),
+}
+
 
 def create_filter(data_source, start_date, end_date, cluster_id):
     """Create filter with data source, start and end dates."""
@@ -212,6 +223,34 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
             summary_item_query = base_query.filter(cluster_id=cluster_identifier)
             return summary_item_query
 
+    def delete_ocp_on_all_summary(self, source_uuid=None, cluster_id=None):
+        """Delete the OCP-on-All summary rows of a cloud source or a cluster.
+
+        Args:
+            source_uuid (str): The AWS or Azure provider UUID
+            cluster_id (str): The OpenShift cluster identifier
+
+        Returns:
+            (int): The number of rows deleted
+
+        """
+        filters = {}
+        if source_uuid:
+            filters["source_uuid"] = source_uuid
+        if cluster_id:
+            filters["cluster_id"] = cluster_id
+        if not filters:
+            return 0
+        deleted = 0
+        with schema_context(self.schema):
+            for table_name in (
+                OCP_REPORT_TABLE_MAP["ocp_on_all_daily_summary"],
+                OCP_REPORT_TABLE_MAP["ocp_on_all_project_daily_summary"],
+            ):
+                count, _ = self._get_db_obj_query(table_name).filter(**filters).delete()
+                deleted += count
+        return deleted
+
     def get_report_query_report_period_id(self, report_period_id):
         """Get the usage report line item for a report id query."""
         table_name = OCP_REPORT_TABLE_MAP["report"]
@@ -562,6 +601,44 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
                 table_name, summary_sql, start_date, end_date, bind_params=list(summary_sql_params)
             )
 
+    def populate_ocp_on_all_daily_summary(self, source_type, source_uuid, start_date, end_date, cluster_id=None):
+        """Replace the OCP-on-All summary rows of one cloud source.
+
+        Only rows of the source, cluster and date range are deleted and
+        inserted again, so the ids of all other rows are unchanged.
+
+        Args:
+            source_type (str): The OCP-on-All source type, AWS or Azure
+            source_uuid (str): The AWS or Azure provider UUID
+            start_date (datetime.date) The date to start populating the table.
+            end_date (datetime.date) The date to end on.
+            cluster_id (String) Cluster Identifier
+
+        Returns
+            (None)
+
+        """
+        if isinstance(start_date, datetime.datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime.datetime):
+            end_date = end_date.date()
+        table_name = OCP_REPORT_TABLE_MAP["ocp_on_all_daily_summary"]
+
+        summary_sql = pkgutil.get_data("masu.database", "sql/reporting_ocpallcostlineitem_daily_summary.sql")
+        summary_sql = summary_sql.decode("utf-8")
+        summary_sql_params = {
+            "source_type": source_type,
+            "source_uuid": str(source_uuid),
+            "start_date": start_date,
+            "end_date": end_date,
+            "cluster_id": cluster_id,
+            "schema": self.schema,
+        }
+        summary_sql, summary_sql_params = self.jinja_sql.prepare_query(summary_sql, summary_sql_params)
+        self._execute_raw_sql_query(
+            table_name, summary_sql, start_date, end_date, bind_params=list(summary_sql_params)
+        )
+
     def get_cost_summary_for_clusterid(self, cluster_identifier):
         """Get the cost summary for a cluster id query."""
         table_name = OCP_REPORT_TABLE_MAP["cost_summary"]
@@ -603,18 +680,6 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
                 ),
             )
 
-    def get_distinct_nodes(self, start_date, end_date, cluster_id):
-        """Return a list of nodes for a cluster between given dates."""
-        with schema_context(self.schema):
-            unique_nodes = (
-                OCPUsageLineItemDailySummary.objects.filter(
-                    usage_start__gte=start_date, usage_start__lt=end_date, cluster_id=cluster_id, node__isnull=False
-                )
-                .values_list("node")
-                .distinct()
-            )
-            return [node[0] for node in unique_nodes]
-
     def populate_monthly_cost(self, cost_type, rate_type, rate, start_date, end_date, cluster_id, cluster_alias):
         """
         Populate the monthly cost of a customer.
@@ -659,96 +724,89 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
     def upsert_monthly_node_cost_line_item(
         self, start_date, end_date, cluster_id, cluster_alias, rate_type, node_cost
     ):
-        """Update or insert daily summary line item for node cost."""
-        unique_nodes = self.get_distinct_nodes(start_date, end_date, cluster_id)
-        report_period = self.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
-        with schema_context(self.schema):
-            for node in unique_nodes:
-                line_item = OCPUsageLineItemDailySummary.objects.filter(
-                    usage_start=start_date,
-                    usage_end=start_date,
-                    report_period=report_period,
-                    cluster_id=cluster_id,
-                    cluster_alias=cluster_alias,
-                    monthly_cost_type="Node",
-                    node=node,
-                ).first()
-                if not line_item:
-                    line_item = OCPUsageLineItemDailySummary(
-                        usage_start=start_date,
-                        usage_end=start_date,
-                        report_period=report_period,
-                        cluster_id=cluster_id,
-                        cluster_alias=cluster_alias,
-                        monthly_cost_type="Node",
-                        node=node,
-                    )
-                if rate_type == metric_constants.INFRASTRUCTURE_COST_TYPE:
-                    LOG.info("Node (%s) has a monthly infrastructure cost of %s.", node, node_cost)
-                    line_item.infrastructure_monthly_cost = node_cost
-                elif rate_type == metric_constants.SUPPLEMENTARY_COST_TYPE:
-                    LOG.info("Node (%s) has a monthly supplemenarty cost of %s.", node, node_cost)
-                    line_item.supplementary_monthly_cost = node_cost
-                line_item.save()
+        """Update or insert daily summary line items for node cost."""
+        self._upsert_monthly_cost_line_items(
+            "Node", start_date, end_date, cluster_id, cluster_alias, rate_type, node_cost
+        )
 
     def upsert_monthly_cluster_cost_line_item(
         self, start_date, end_date, cluster_id, cluster_alias, rate_type, cluster_cost
     ):
         """Update or insert a daily summary line item for cluster cost."""
-        report_period = self.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
-        if report_period:
-            with schema_context(self.schema):
-                line_item = OCPUsageLineItemDailySummary.objects.filter(
-                    usage_start=start_date,
-                    usage_end=start_date,
-                    report_period=report_period,
-                    cluster_id=cluster_id,
-                    cluster_alias=cluster_alias,
-                    monthly_cost_type="Cluster",
-                ).first()
-                if not line_item:
-                    line_item = OCPUsageLineItemDailySummary(
-                        usage_start=start_date,
-                        usage_end=start_date,
-                        report_period=report_period,
-                        cluster_id=cluster_id,
-                        cluster_alias=cluster_alias,
-                        monthly_cost_type="Cluster",
-                    )
-                if rate_type == metric_constants.INFRASTRUCTURE_COST_TYPE:
-                    LOG.info("Cluster (%s) has a monthly infrastructure cost of %s.", cluster_id, cluster_cost)
-                    line_item.infrastructure_monthly_cost = cluster_cost
-                elif rate_type == metric_constants.SUPPLEMENTARY_COST_TYPE:
-                    LOG.info("Cluster (%s) has a monthly supplemenarty cost of %s.", cluster_id, cluster_cost)
-                    line_item.supplementary_monthly_cost = cluster_cost
-                line_item.save()
+        self._upsert_monthly_cost_line_items(
+            "Cluster", start_date, end_date, cluster_id, cluster_alias, rate_type, cluster_cost
+        )
 
-    def remove_monthly_cost(self, start_date, end_date, cluster_id, cost_type):
-        """Delete all monthly costs of a specific type over a date range."""
-        report_period = self.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
+    def _upsert_monthly_cost_line_items(
+        self, cost_type, start_date, end_date, cluster_id, cluster_alias, rate_type, rate
+    ):
+        """Set a monthly cost for one month with a single upsert.
 
-        filters = {
-            "usage_start": start_date.date(),
-            "usage_end": start_date.date(),
-            "report_period": report_period,
-            "cluster_id": cluster_id,
-            "monthly_cost_type": cost_type,
-        }
+        Args:
+            cost_type (str): Node or Cluster
+            start_date (datetime.date): The first day of the month
+            end_date (datetime.date): The first day of the next month
+            cluster_id (str): The cluster to set the cost of
+            cluster_alias (str): The cluster alias
+            rate_type (str): Infrastructure or Supplementary
+            rate (Decimal): The monthly cost of each node or of the cluster
 
-        for rate_type, __ in metric_constants.COST_TYPE_CHOICES:
-            cost_filter = f"{rate_type.lower()}_monthly_cost__isnull"
-            filters.update({cost_filter: False})
+        """
+        report_period = self.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
+        if not report_period:
             LOG.info(
-                "Removing %s %s monthly costs \n\tfor %s \n\tfrom %s - %s.",
-                cost_type,
-                rate_type,
+                "No report period for %s from %s to %s, skipping %s monthly cost.",
                 cluster_id,
                 start_date,
                 end_date,
+                cost_type,
             )
-            with schema_context(self.schema):
-                OCPUsageLineItemDailySummary.objects.filter(**filters).all().delete()
-            filters.pop(cost_filter)
+            return
+
+        if rate_type == metric_constants.INFRASTRUCTURE_COST_TYPE:
+            cost_column = "infrastructure_monthly_cost"
+        elif rate_type == metric_constants.SUPPLEMENTARY_COST_TYPE:
+            cost_column = "supplementary_monthly_cost"
+        else:
+            return
+        LOG.info("%s (%s) has a monthly %s cost of %s.", cost_type, cluster_id, rate_type.lower(), rate)
+
+        table_name = OCP_REPORT_TABLE_MAP["line_item_daily_summary"]
+        monthly_sql = pkgutil.get_data("masu.database", "sql/reporting_ocpusagelineitem_daily_summary_monthly_cost.sql")
+        monthly_sql = monthly_sql.decode("utf-8")
+        monthly_sql_params = {
+            "schema": self.schema,
+            "cost_type": cost_type,
+            "cost_column": cost_column,
+            "start_date": start_date,
+            "end_date": end_date,
+            "report_period_id": report_period.id,
+            "cluster_id": cluster_id,
+            "cluster_alias": cluster_alias,
+            "rate": rate,
+        }
+        monthly_sql, monthly_sql_params = self.jinja_sql.prepare_query(monthly_sql, monthly_sql_params)
+        self._execute_raw_sql_query(table_name, monthly_sql, start_date, end_date, bind_params=list(monthly_sql_params))
+
+    def remove_monthly_cost(self, start_date, end_date, cluster_id, cost_type):
+        """Delete all monthly costs of a specific type over a date range."""
+        report_period = self.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
+
+        LOG.info(
+            "Removing %s monthly costs \n\tfor %s \n\tfrom %s - %s.", cost_type, cluster_id, start_date, end_date
+        )
+        cost_filter = Q()
+        for rate_type, __ in metric_constants.COST_TYPE_CHOICES:
+            cost_filter |= Q(**{f"{rate_type.lower()}_monthly_cost__isnull": False})
+        with schema_context(self.schema):
+            OCPUsageLineItemDailySummary.objects.filter(
+                cost_filter,
+                usage_start=start_date.date(),
+                usage_end=start_date.date(),
+                report_period=report_period,
+                cluster_id=cluster_id,
+                monthly_cost_type=cost_type,
+            ).delete()
 
     def populate_node_label_line_item_daily_table(self, start_date, end_date, cluster_id):
         """Populate the daily node label aggregate of line items table.
@@ -783,6 +841,51 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         daily_sql, daily_sql_params = self.jinja_sql.prepare_query(daily_sql, daily_sql_params)
         self._execute_raw_sql_query(table_name, daily_sql, start_date, end_date, bind_params=list(daily_sql_params))
 
+    def populate_tiered_usage_cost(self, rate_type, metric, tiers, start_date, end_date, cluster_id):
+        """Add the cost of a tiered usage rate to the usage costs of the daily summary table.
+
+        Usage costs are reset by populate_usage_costs, which has to run first.
+
+        Args:
+            rate_type (str): Infrastructure or Supplementary
+            metric (str): The usage rate metric name, e.g. cpu_core_usage_per_hour
+            tiers (list): Dicts of usage_start, usage_end and value in ascending order
+            start_date (datetime.date): The first usage day to update
+            end_date (datetime.date): The last usage day to update
+            cluster_id (str): The cluster to update
+
+        """
+        if isinstance(start_date, str):
+            start_date = parse(start_date)
+        if isinstance(end_date, str):
+            end_date = parse(end_date)
+        if isinstance(start_date, datetime.datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime.datetime):
+            end_date = end_date.date()
+
+        if rate_type == metric_constants.INFRASTRUCTURE_COST_TYPE:
+            cost_column = "infrastructure_usage_cost"
+        else:
+            cost_column = "supplementary_usage_cost"
+        cost_key, usage_column = USAGE_RATE_COLUMNS[metric]
+
+        table_name = OCP_REPORT_TABLE_MAP["line_item_daily_summary"]
+        tiered_sql = pkgutil.get_data("masu.database", "sql/reporting_ocpusagelineitem_daily_summary_tiered_cost.sql")
+        tiered_sql = tiered_sql.decode("utf-8")
+        tiered_sql_params = {
+            "schema": self.schema,
+            "cluster_id": cluster_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "usage_column": usage_column,
+            "cost_column": cost_column,
+            "cost_key": cost_key,
+            "tiers": tiers,
+        }
+        tiered_sql, tiered_sql_params = self.jinja_sql.prepare_query(tiered_sql, tiered_sql_params)
+        self._execute_raw_sql_query(table_name, tiered_sql, start_date, end_date, bind_params=list(tiered_sql_params))
+
     def populate_usage_costs(self, infrastructure_rates, supplementary_rates, start_date, end_date, cluster_id):
         """Update the reporting_ocpusagelineitem_daily_summary table with usage costs."""
         # Cast start_date and end_date to date object, if they aren't already
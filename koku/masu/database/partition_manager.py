@@ -0,0 +1,230 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Manage the monthly range partitions of line item tables."""
+import datetime
+import logging
+import re
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.db import transaction
+from tenant_schemas.utils import schema_context
+
+LOG = logging.getLogger(__name__)
+
+# The partitioned line item tables and the column they are partitioned on.
+PARTITIONED_TABLES = {
+    "reporting_awscostentrylineitem": "usage_start",
+    "reporting_awscostentrylineitem_daily": "usage_start",
+    "reporting_azurecostentrylineitem_daily": "usage_date",
+    "reporting_ocpusagelineitem_daily": "usage_start",
+    "reporting_ocpstoragelineitem_daily": "usage_start",
+}
+DEFAULT_PARTITION_SUFFIX = "default"
+
+
+class PartitionManager:
+    """Create, truncate and drop the monthly partitions of line item tables.
+
+    Rows for months without a partition land in the table's default
+    partition. Creating a month's partition moves those rows out of it.
+    """
+
+    def __init__(self, schema):
+        """Establish the partition manager.
+
+        Args:
+            schema (str): The customer schema to associate with
+
+        """
+        self._schema = schema
+
+    @staticmethod
+    def get_month_start(date):
+        """Return the first day of the month of a date or datetime."""
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        return date.replace(day=1)
+
+    @staticmethod
+    def get_partition_name(table, month_start):
+        """Return the name of a table's partition for a month."""
+        return f"{table}_{month_start:%Y_%m}"
+
+    def get_partitions(self, table):
+        """Return the monthly partitions of a table.
+
+        Args:
+            table (str): The partitioned table name
+
+        Returns:
+            (dict): The first day of the month keyed by partition name
+
+        """
+        sql = """
+            SELECT c.relname
+              FROM pg_inherits AS i
+              JOIN pg_class AS c
+                ON c.oid = i.inhrelid
+              JOIN pg_class AS p
+                ON p.oid = i.inhparent
+              JOIN pg_namespace AS n
+                ON n.oid = p.relnamespace
+             WHERE n.nspname = %s
+               AND p.relname = %s
+        """
+        pattern = re.compile(rf"^{table}_(\d{{4}})_(\d{{2}})$")
+        partitions = {}
+        with schema_context(self._schema):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [self._schema, table])
+                for (name,) in cursor.fetchall():
+                    match = pattern.match(name)
+                    if match:
+                        partitions[name] = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+        return partitions
+
+    def create_partition(self, table, date):
+        """Create the partition of a table for the month of a date.
+
+        Any rows for that month are moved out of the default partition. Attaching
+        partitions locks the whole table, so this runs from the
+        create_monthly_partitions task and not while report files are processed.
+
+        Args:
+            table (str): The partitioned table name
+            date (datetime.date): A date in the month
+
+        Returns:
+            (bool): Whether a partition was created
+
+        """
+        month_start = self.get_month_start(date)
+        month_end = month_start + relativedelta(months=1)
+        name = self.get_partition_name(table, month_start)
+        if name in self.get_partitions(table):
+            return False
+
+        column = PARTITIONED_TABLES[table]
+        default = f"{table}_{DEFAULT_PARTITION_SUFFIX}"
+        with schema_context(self._schema):
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {column} >= %s AND {column} < %s)",
+                        [month_start, month_end],
+                    )
+                    has_default_rows = cursor.fetchone()[0]
+                    cursor.execute(f"CREATE TABLE {name} (LIKE {default} INCLUDING DEFAULTS INCLUDING INDEXES)")
+                    if has_default_rows:
+                        # The default partition may not hold rows of an attached partition's range
+                        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+                        cursor.execute(
+                            f"""
+                            WITH moved AS (
+                                DELETE FROM {default} WHERE {column} >= %s AND {column} < %s RETURNING *
+                            )
+                            INSERT INTO {name} SELECT * FROM moved
+                            """,
+                            [month_start, month_end],
+                        )
+                    cursor.execute(
+                        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                        [month_start, month_end],
+                    )
+                    if has_default_rows:
+                        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+        LOG.info("Created partition %s.%s", self._schema, name)
+        return True
+
+    def create_upcoming_partitions(self, date=None, months=1):
+        """Create the partitions of every partitioned table ahead of ingest.
+
+        Args:
+            date (datetime.date): The first month to create, defaults to this month
+            months (int): The number of months after the first to create
+
+        Returns:
+            (list): The names of the created partitions
+
+        """
+        month_start = self.get_month_start(date or datetime.date.today())
+        created = []
+        for table in PARTITIONED_TABLES:
+            for month in range(months + 1):
+                partition_month = month_start + relativedelta(months=month)
+                if self.create_partition(table, partition_month):
+                    created.append(self.get_partition_name(table, partition_month))
+        return created
+
+    def truncate_partition(self, table, date, bill_column=None, bill_id=None):
+        """Empty the partition of a table for the month of a date.
+
+        If a bill is given, the partition is only truncated when every row
+        in it belongs to that bill.
+
+        Args:
+            table (str): The partitioned table name
+            date (datetime.date): A date in the month
+            bill_column (str): The bill foreign key column
+            bill_id (int): The bill whose rows may be removed
+
+        Returns:
+            (bool): Whether the partition was truncated
+
+        """
+        name = self.get_partition_name(table, self.get_month_start(date))
+        if name not in self.get_partitions(table):
+            return False
+
+        with schema_context(self._schema):
+            with connection.cursor() as cursor:
+                if bill_column is not None:
+                    cursor.execute(
+                        f"SELECT EXISTS (SELECT 1 FROM {name} WHERE {bill_column} IS DISTINCT FROM %s)", [bill_id]
+                    )
+                    if cursor.fetchone()[0]:
+                        return False
+                cursor.execute(f"TRUNCATE TABLE {name}")
+        LOG.info("Truncated partition %s.%s", self._schema, name)
+        return True
+
+    def drop_partitions_before(self, table, date):
+        """Detach and drop the partitions of a table that end on or before a date.
+
+        Args:
+            table (str): The partitioned table name
+            date (datetime.date): The cutoff date for removing partitions
+
+        Returns:
+            (list): The names of the dropped partitions
+
+        """
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        dropped = []
+        for name, month_start in sorted(self.get_partitions(table).items(), key=lambda item: item[1]):
+            if month_start + relativedelta(months=1) > date:
+                continue
+            with schema_context(self._schema):
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                        cursor.execute(f"DROP TABLE {name}")
+            LOG.info("Dropped partition %s.%s", self._schema, name)
+            dropped.append(name)
+        return dropped
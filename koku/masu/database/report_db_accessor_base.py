@@ -19,6 +19,8 @@ import logging
 import uuid
 from decimal import Decimal
 from decimal import InvalidOperation
+from functools import lru_cache
+from types import MappingProxyType
 
 import django.apps
 from django.db import connection
@@ -54,7 +56,22 @@ class ReportSchema:
             columns = REPORT_COLUMN_MAP[model._meta.db_table].values()
             types = {column: model._meta.get_field(column).get_internal_type() for column in columns}
             column_types.update({model._meta.db_table: types})
-            self.column_types = column_types
+        self.column_types = MappingProxyType(column_types)
+
+
+@lru_cache(maxsize=None)
+def get_report_schema():
+    """Return the report schema shared by every accessor in this process.
+
+    The reporting models are the same in every tenant, so the schema is built
+    once. Each accessor still reaches its own tenant's tables through the
+    schema it sets on the connection.
+
+    Returns:
+        (ReportSchema): The report schema of all installed models
+
+    """
+    return ReportSchema(django.apps.apps.get_models())
 
 
 class ReportDBAccessorBase(KokuDBAccess):
@@ -67,7 +84,7 @@ class ReportDBAccessorBase(KokuDBAccess):
             schema (str): The customer schema to associate with
         """
         super().__init__(schema)
-        self.report_schema = ReportSchema(django.apps.apps.get_models())
+        self.report_schema = get_report_schema()
 
     @property
     def decimal_precision(self):
@@ -263,6 +280,98 @@ class ReportDBAccessorBase(KokuDBAccess):
 
         return self._get_primary_key(table_name, data)
 
+    def bulk_insert_on_conflict_do_nothing(self, table, rows, conflict_columns=None):
+        """Insert many rows with an ON CONFLICT clause and return their ids.
+
+        This is the multi-row equivalent of insert_on_conflict_do_nothing.
+        Rows that already exist are matched on the conflict columns (or on
+        every column when no conflict columns are given), the rest are
+        inserted, and the ids of both are returned from a single statement.
+
+        Args:
+            table (DjangoModel): The table to insert into
+            rows (list): A list of dictionaries of data to insert
+            conflict_columns (list): A list of columns to check conflict on
+
+        Returns:
+            (list): The ids of the rows, in the same order as rows
+
+        """
+        if not rows:
+            return []
+
+        table_name = table._meta.db_table
+        rows = [self.clean_data(row, table_name) for row in rows]
+        columns = []
+        for row in rows:
+            columns.extend(column for column in row if column not in columns)
+        key_columns = conflict_columns or columns
+
+        column_types = {column: table._meta.get_field(column).db_type(connection) for column in columns}
+        row_str = ",".join(["%s"] + [f"%s::{column_types[column]}" for column in columns])
+        values_str = ",".join([f"({row_str})" for _ in rows])
+        values = []
+        for ordinal, row in enumerate(rows):
+            values.append(ordinal)
+            values.extend(row.get(column) for column in columns)
+
+        def match(left, right):
+            """Match key columns, treating NULLs as equal like the ORM lookup does."""
+            clauses = []
+            for column in key_columns:
+                operator = "IS NOT DISTINCT FROM" if table._meta.get_field(column).null else "="
+                clauses.append(f"{left}.{column} {operator} {right}.{column}")
+            return " AND ".join(clauses)
+
+        column_str = ", ".join(columns)
+        key_str = ", ".join(key_columns)
+        conflict_str = f"({', '.join(conflict_columns)})" if conflict_columns else ""
+        insert_sql = f"""
+            WITH input_rows (ordinal, {column_str}) AS (
+                VALUES {values_str}
+            ),
+            existing AS (
+                SELECT DISTINCT ON (i.ordinal) i.ordinal, t.id
+                  FROM input_rows AS i
+                  JOIN {self.schema}.{table_name} AS t
+                    ON {match("t", "i")}
+                 ORDER BY i.ordinal, t.id
+            ),
+            inserted AS (
+                INSERT INTO {self.schema}.{table_name} ({column_str})
+                SELECT {column_str}
+                  FROM input_rows AS i
+                 WHERE NOT EXISTS (SELECT 1 FROM existing AS e WHERE e.ordinal = i.ordinal)
+                 ORDER BY i.ordinal
+                ON CONFLICT {conflict_str} DO NOTHING
+                RETURNING id, {key_str}
+            )
+            SELECT i.ordinal, coalesce(e.id, n.id)
+              FROM input_rows AS i
+              LEFT JOIN existing AS e
+                ON e.ordinal = i.ordinal
+              LEFT JOIN inserted AS n
+                ON {match("n", "i")}
+        """
+        with connection.cursor() as cursor:
+            cursor.db.set_schema(self.schema)
+            cursor.execute(insert_sql, values)
+            results = cursor.fetchall()
+
+        ids = [None] * len(rows)
+        for ordinal, row_id in results:
+            if row_id is not None:
+                ids[ordinal] = row_id
+
+        # A concurrent writer can insert a conflicting row after our snapshot
+        # was taken, in which case neither CTE sees it. Fall back to a lookup.
+        for ordinal, row_id in enumerate(ids):
+            if row_id is None:
+                data = {key: value for key, value in rows[ordinal].items() if key in key_columns}
+                ids[ordinal] = self._get_primary_key(table, data)
+
+        return ids
+
     def _get_primary_key(self, table_name, data):
         """Return the row id for a specific object."""
         with schema_context(self.schema):
@@ -54,13 +54,22 @@ class ReportManifestDBAccessor(KokuDBAccess):
         """Update the updated timestamp."""
         if manifest:
             manifest.manifest_updated_datetime = self.date_accessor.today_with_timezone("UTC")
-            manifest.save()
+            manifest.save(update_fields=["manifest_updated_datetime"])
 
     def mark_manifest_as_completed(self, manifest):
         """Update the updated timestamp."""
         if manifest:
             manifest.manifest_completed_datetime = self.date_accessor.today_with_timezone("UTC")
-            manifest.save()
+            manifest.save(update_fields=["manifest_completed_datetime"])
+
+    def increment_processed_files(self, manifest_id):
+        """Count one more processed file of a manifest.
+
+        The count is incremented in the database, so files processed at the
+        same time do not overwrite each other's counts.
+        """
+        with schema_context(self._schema):
+            self._get_db_obj_query().filter(id=manifest_id).update(num_processed_files=F("num_processed_files") + 1)
 
     def add(self, **kwargs):
         """
@@ -1,31 +1,112 @@
+-- Tag keys and values are kept per day, so only the days being summarized
+-- are read from the line items. Values of re-processed days are replaced.
+DELETE FROM {{schema | sqlsafe}}.reporting_awstags_daily_summary
+WHERE TRUE
+    {% if bill_ids %}
+    AND cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND usage_start >= {{start_date}}
+    AND usage_start <= {{end_date}}
+    {% endif %}
+;
+
+INSERT INTO {{schema | sqlsafe}}.reporting_awstags_daily_summary (
+    usage_start,
+    key,
+    values,
+    cost_entry_bill_id,
+    usage_account_ids
+)
+SELECT li.usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value) as values,
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.usage_account_id) as usage_account_ids
+FROM {{schema | sqlsafe}}.reporting_awscostentrylineitem_daily AS li,
+    jsonb_each_text(li.tags) labels
+WHERE TRUE
+    {% if bill_ids %}
+    AND li.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND li.usage_start >= {{start_date}}
+    AND li.usage_start <= {{end_date}}
+    {% endif %}
+GROUP BY li.usage_start, labels.key, li.cost_entry_bill_id
+;
+
+-- Roll the days of each bill up into the bill's tag summary
 INSERT INTO {{schema | sqlsafe}}.reporting_awstags_summary (
     key,
     values,
     cost_entry_bill_id,
     accounts
 )
-SELECT l.key,
-    array_agg(DISTINCT l.value) as values,
-    l.cost_entry_bill_id,
-    array_cat(array_agg(DISTINCT l.usage_account_id), array_agg(DISTINCT aa.account_alias )) as accounts
+SELECT v.key,
+    v.values,
+    v.cost_entry_bill_id,
+    a.accounts
 FROM (
-    SELECT key,
-        value,
-        li.cost_entry_bill_id,
-        li.usage_account_id
-    FROM {{schema | sqlsafe}}.reporting_awscostentrylineitem_daily AS li,
-        jsonb_each_text(li.tags) labels
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_agg(DISTINCT tag.value) as values
+    FROM {{schema | sqlsafe}}.reporting_awstags_daily_summary AS ds,
+        unnest(ds.values) AS tag(value)
+    {% if bill_ids %}
+    WHERE ds.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS v
+JOIN (
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_cat(array_agg(DISTINCT account.usage_account_id), array_agg(DISTINCT aa.account_alias)) as accounts
+    FROM {{schema | sqlsafe}}.reporting_awstags_daily_summary AS ds
+    CROSS JOIN unnest(ds.usage_account_ids) AS account(usage_account_id)
+    LEFT JOIN {{schema | sqlsafe}}.reporting_awsaccountalias AS aa
+        ON account.usage_account_id = aa.account_id
     {% if bill_ids %}
-    WHERE li.cost_entry_bill_id IN (
+    WHERE ds.cost_entry_bill_id IN (
         {%- for bill_id in bill_ids -%}
         {{bill_id}}{% if not loop.last %},{% endif %}
         {%- endfor -%}
     )
     {% endif %}
-) l
-LEFT JOIN {{schema | sqlsafe}}.reporting_awsaccountalias AS aa
-        ON l.usage_account_id = aa.account_id
-GROUP BY l.key, l.cost_entry_bill_id
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS a
+    ON a.key = v.key
+        AND a.cost_entry_bill_id = v.cost_entry_bill_id
 ON CONFLICT (key, cost_entry_bill_id) DO UPDATE
-SET values = EXCLUDED.values
+SET values = EXCLUDED.values,
+    accounts = EXCLUDED.accounts
+;
+
+-- Keys no longer seen on any day of the bill are removed
+DELETE FROM {{schema | sqlsafe}}.reporting_awstags_summary AS ts
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM {{schema | sqlsafe}}.reporting_awstags_daily_summary AS ds
+        WHERE ds.key = ts.key
+            AND ds.cost_entry_bill_id = ts.cost_entry_bill_id
+    )
+    {% if bill_ids %}
+    AND ts.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
 ;
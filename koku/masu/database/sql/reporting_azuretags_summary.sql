@@ -1,29 +1,110 @@
+-- Tag keys and values are kept per day, so only the days being summarized
+-- are read from the line items. Values of re-processed days are replaced.
+DELETE FROM {{schema | sqlsafe}}.reporting_azuretags_daily_summary
+WHERE TRUE
+    {% if bill_ids %}
+    AND cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND usage_start >= {{start_date}}
+    AND usage_start <= {{end_date}}
+    {% endif %}
+;
+
+INSERT INTO {{schema | sqlsafe}}.reporting_azuretags_daily_summary (
+    usage_start,
+    key,
+    values,
+    cost_entry_bill_id,
+    subscription_guid
+)
+SELECT li.usage_date as usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value) as values,
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.subscription_guid) as subscription_guid
+FROM {{schema | sqlsafe}}.reporting_azurecostentrylineitem_daily AS li,
+    jsonb_each_text(li.tags) labels
+WHERE TRUE
+    {% if bill_ids %}
+    AND li.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND li.usage_date >= {{start_date}}
+    AND li.usage_date <= {{end_date}}
+    {% endif %}
+GROUP BY li.usage_date, labels.key, li.cost_entry_bill_id
+;
+
+-- Roll the days of each bill up into the bill's tag summary
 INSERT INTO {{schema | sqlsafe}}.reporting_azuretags_summary (
     key,
     values,
     cost_entry_bill_id,
     subscription_guid
 )
-SELECT l.key,
-    array_agg(DISTINCT l.value) as values,
-    l.cost_entry_bill_id,
-    array_agg(DISTINCT l.subscription_guid) as subscription_guid
+SELECT v.key,
+    v.values,
+    v.cost_entry_bill_id,
+    s.subscription_guid
 FROM (
-    SELECT key,
-        value,
-        li.cost_entry_bill_id,
-        li.subscription_guid
-    FROM {{schema | sqlsafe}}.reporting_azurecostentrylineitem_daily AS li,
-        jsonb_each_text(li.tags) labels
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_agg(DISTINCT tag.value) as values
+    FROM {{schema | sqlsafe}}.reporting_azuretags_daily_summary AS ds,
+        unnest(ds.values) AS tag(value)
+    {% if bill_ids %}
+    WHERE ds.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS v
+JOIN (
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_agg(DISTINCT item.value) as subscription_guid
+    FROM {{schema | sqlsafe}}.reporting_azuretags_daily_summary AS ds,
+        unnest(ds.subscription_guid) AS item(value)
     {% if bill_ids %}
-    WHERE li.cost_entry_bill_id IN (
+    WHERE ds.cost_entry_bill_id IN (
         {%- for bill_id in bill_ids -%}
         {{bill_id}}{% if not loop.last %},{% endif %}
         {%- endfor -%}
     )
     {% endif %}
-) l
-GROUP BY l.key, l.cost_entry_bill_id
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS s
+    ON s.key = v.key
+        AND s.cost_entry_bill_id = v.cost_entry_bill_id
 ON CONFLICT (key, cost_entry_bill_id) DO UPDATE
-SET values = EXCLUDED.values
+SET values = EXCLUDED.values,
+    subscription_guid = EXCLUDED.subscription_guid
+;
+
+-- Keys no longer seen on any day of the bill are removed
+DELETE FROM {{schema | sqlsafe}}.reporting_azuretags_summary AS ts
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM {{schema | sqlsafe}}.reporting_azuretags_daily_summary AS ds
+        WHERE ds.key = ts.key
+            AND ds.cost_entry_bill_id = ts.cost_entry_bill_id
+    )
+    {% if bill_ids %}
+    AND ts.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
 ;
@@ -0,0 +1,221 @@
+-- Replace one cloud source's OpenShift on All rows for a cluster and date range.
+-- Rows of other sources and dates keep their ids.
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpallcostlineitem_daily_summary
+WHERE source_type = {{source_type}}
+    AND source_uuid = {{source_uuid}}
+    AND usage_start >= {{start_date}}
+    AND usage_start <= {{end_date}}
+    {% if cluster_id %}
+    AND cluster_id = {{cluster_id}}
+    {% endif %}
+;
+
+-- Only this month and last month are reported on
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpallcostlineitem_daily_summary
+WHERE usage_start < DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+;
+
+INSERT INTO {{schema | sqlsafe}}.reporting_ocpallcostlineitem_daily_summary (
+    source_type,
+    cluster_id,
+    cluster_alias,
+    namespace,
+    node,
+    resource_id,
+    usage_start,
+    usage_end,
+    usage_account_id,
+    account_alias_id,
+    product_code,
+    product_family,
+    instance_type,
+    region,
+    availability_zone,
+    tags,
+    usage_amount,
+    unit,
+    unblended_cost,
+    markup_cost,
+    currency_code,
+    shared_projects,
+    project_costs,
+    source_uuid
+)
+{% if source_type == 'AWS' %}
+    SELECT DISTINCT 'AWS' as source_type,
+        cluster_id,
+        cluster_alias,
+        namespace,
+        node::text as node,
+        resource_id,
+        usage_start,
+        usage_end,
+        usage_account_id,
+        account_alias_id,
+        product_code,
+        product_family,
+        instance_type,
+        region,
+        availability_zone,
+        tags,
+        usage_amount,
+        unit,
+        unblended_cost,
+        markup_cost,
+        currency_code,
+        shared_projects,
+        project_costs,
+        source_uuid
+    FROM {{schema | sqlsafe}}.reporting_ocpawscostlineitem_daily_summary
+{% else %}
+    SELECT DISTINCT 'Azure' as source_type,
+        cluster_id,
+        cluster_alias,
+        namespace,
+        node::text as node,
+        resource_id,
+        usage_start,
+        usage_end,
+        subscription_guid as usage_account_id,
+        NULL::int as account_alias_id,
+        service_name as product_code,
+        NULL as product_family,
+        instance_type,
+        resource_location as region,
+        NULL as availability_zone,
+        tags,
+        usage_quantity as usage_amount,
+        unit_of_measure as unit,
+        pretax_cost as unblended_cost,
+        markup_cost,
+        currency as currency_code,
+        shared_projects,
+        project_costs,
+        source_uuid
+    FROM {{schema | sqlsafe}}.reporting_ocpazurecostlineitem_daily_summary
+{% endif %}
+    WHERE source_uuid = {{source_uuid}}
+        AND usage_start >= {{start_date}}
+        AND usage_start <= {{end_date}}
+        AND usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        {% if cluster_id %}
+        AND cluster_id = {{cluster_id}}
+        {% endif %}
+;
+
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpallcostlineitem_project_daily_summary
+WHERE source_type = {{source_type}}
+    AND source_uuid = {{source_uuid}}
+    AND usage_start >= {{start_date}}
+    AND usage_start <= {{end_date}}
+    {% if cluster_id %}
+    AND cluster_id = {{cluster_id}}
+    {% endif %}
+;
+
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpallcostlineitem_project_daily_summary
+WHERE usage_start < DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+;
+
+INSERT INTO {{schema | sqlsafe}}.reporting_ocpallcostlineitem_project_daily_summary (
+    source_type,
+    cluster_id,
+    cluster_alias,
+    data_source,
+    namespace,
+    node,
+    pod_labels,
+    resource_id,
+    usage_start,
+    usage_end,
+    usage_account_id,
+    account_alias_id,
+    product_code,
+    product_family,
+    instance_type,
+    region,
+    availability_zone,
+    usage_amount,
+    unit,
+    unblended_cost,
+    project_markup_cost,
+    pod_cost,
+    currency_code,
+    source_uuid
+)
+{% if source_type == 'AWS' %}
+    SELECT 'AWS' as source_type,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        data_source,
+        namespace::text as namespace,
+        node::text as node,
+        pod_labels,
+        resource_id,
+        usage_start,
+        usage_end,
+        usage_account_id,
+        max(account_alias_id) as account_alias_id,
+        product_code,
+        product_family,
+        instance_type,
+        region,
+        availability_zone,
+        sum(usage_amount) as usage_amount,
+        max(unit) as unit,
+        sum(unblended_cost) as unblended_cost,
+        sum(project_markup_cost) as project_markup_cost,
+        sum(pod_cost) as pod_cost,
+        max(currency_code) as currency_code,
+        source_uuid
+    FROM {{schema | sqlsafe}}.reporting_ocpawscostlineitem_project_daily_summary
+{% else %}
+    SELECT 'Azure' as source_type,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        data_source,
+        namespace::text as namespace,
+        node::text as node,
+        pod_labels,
+        resource_id,
+        usage_start,
+        usage_end,
+        subscription_guid as usage_account_id,
+        NULL::int as account_alias_id,
+        service_name as product_code,
+        NULL as product_family,
+        instance_type,
+        resource_location as region,
+        NULL as availability_zone,
+        sum(usage_quantity) as usage_amount,
+        max(unit_of_measure) as unit,
+        sum(pretax_cost) as unblended_cost,
+        sum(project_markup_cost) as project_markup_cost,
+        sum(pod_cost) as pod_cost,
+        max(currency) as currency_code,
+        source_uuid
+    FROM {{schema | sqlsafe}}.reporting_ocpazurecostlineitem_project_daily_summary
+{% endif %}
+    WHERE source_uuid = {{source_uuid}}
+        AND usage_start >= {{start_date}}
+        AND usage_start <= {{end_date}}
+        AND usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        {% if cluster_id %}
+        AND cluster_id = {{cluster_id}}
+        {% endif %}
+    GROUP BY usage_start,
+        usage_end,
+        cluster_id,
+        data_source,
+        namespace,
+        node,
+        usage_account_id,
+        resource_id,
+        product_code,
+        product_family,
+        instance_type,
+        region,
+        availability_zone,
+        pod_labels,
+        source_uuid
+;
@@ -1,3 +1,53 @@
+-- Tag keys and values are kept per day, so only the days being summarized
+-- are read from the line items. Values of re-processed days are replaced.
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary
+WHERE TRUE
+    {% if bill_ids %}
+    AND cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND usage_start >= {{start_date}}
+    AND usage_start <= {{end_date}}
+    {% endif %}
+;
+
+INSERT INTO {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary (
+    usage_start,
+    key,
+    values,
+    cost_entry_bill_id,
+    usage_account_ids,
+    namespace
+)
+SELECT li.usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value) as values,
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.usage_account_id) as usage_account_ids,
+    array_agg(DISTINCT ns.namespace) as namespace
+FROM {{schema | sqlsafe}}.reporting_ocpawscostlineitem_daily_summary AS li,
+    jsonb_each_text(li.tags) labels,
+    unnest(li.namespace) AS ns(namespace)
+WHERE TRUE
+    {% if bill_ids %}
+    AND li.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    {% if start_date and end_date %}
+    AND li.usage_start >= {{start_date}}
+    AND li.usage_start <= {{end_date}}
+    {% endif %}
+GROUP BY li.usage_start, labels.key, li.cost_entry_bill_id
+;
+
+-- Roll the days of each bill up into the bill's tag summary
 INSERT INTO {{schema | sqlsafe}}.reporting_ocpawstags_summary (
     key,
     values,
@@ -5,23 +55,81 @@ INSERT INTO {{schema | sqlsafe}}.reporting_ocpawstags_summary (
     accounts,
     namespace
 )
-SELECT l.key,
-    array_agg(DISTINCT l.value) as values,
-    l.cost_entry_bill_id,
-    array_cat(array_agg(DISTINCT l.usage_account_id), array_agg(DISTINCT aa.account_alias )) as accounts,
-    array_agg(DISTINCT l.namespace) as namespace
+SELECT v.key,
+    v.values,
+    v.cost_entry_bill_id,
+    a.accounts,
+    n.namespace
 FROM (
-    SELECT key,
-        value,
-        li.cost_entry_bill_id,
-        li.usage_account_id,
-        UNNEST(li.namespace) as namespace
-    FROM {{schema | sqlsafe}}.reporting_ocpawscostlineitem_daily_summary AS li,
-        jsonb_each_text(li.tags) labels
-) l
-LEFT JOIN {{schema | sqlsafe}}.reporting_awsaccountalias AS aa
-        ON l.usage_account_id = aa.account_id
-GROUP BY l.key, l.cost_entry_bill_id
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_agg(DISTINCT tag.value) as values
+    FROM {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary AS ds,
+        unnest(ds.values) AS tag(value)
+    {% if bill_ids %}
+    WHERE ds.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS v
+JOIN (
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_cat(array_agg(DISTINCT account.usage_account_id), array_agg(DISTINCT aa.account_alias)) as accounts
+    FROM {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary AS ds
+    CROSS JOIN unnest(ds.usage_account_ids) AS account(usage_account_id)
+    LEFT JOIN {{schema | sqlsafe}}.reporting_awsaccountalias AS aa
+        ON account.usage_account_id = aa.account_id
+    {% if bill_ids %}
+    WHERE ds.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS a
+    ON a.key = v.key
+        AND a.cost_entry_bill_id = v.cost_entry_bill_id
+JOIN (
+    SELECT ds.key,
+        ds.cost_entry_bill_id,
+        array_agg(DISTINCT item.value) as namespace
+    FROM {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary AS ds,
+        unnest(ds.namespace) AS item(value)
+    {% if bill_ids %}
+    WHERE ds.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
+    GROUP BY ds.key, ds.cost_entry_bill_id
+) AS n
+    ON n.key = v.key
+        AND n.cost_entry_bill_id = v.cost_entry_bill_id
 ON CONFLICT (key, cost_entry_bill_id) DO UPDATE
-SET values = EXCLUDED.values
+SET values = EXCLUDED.values,
+    accounts = EXCLUDED.accounts,
+    namespace = EXCLUDED.namespace
+;
+
+-- Keys no longer seen on any day of the bill are removed
+DELETE FROM {{schema | sqlsafe}}.reporting_ocpawstags_summary AS ts
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM {{schema | sqlsafe}}.reporting_ocpawstags_daily_summary AS ds
+        WHERE ds.key = ts.key
+            AND ds.cost_entry_bill_id = ts.cost_entry_bill_id
+    )
+    {% if bill_ids %}
+    AND ts.cost_entry_bill_id IN (
+        {%- for bill_id in bill_ids -%}
+        {{bill_id}}{% if not loop.last %},{% endif %}
+        {%- endfor -%}
+    )
+    {% endif %}
 ;
@@ -0,0 +1,39 @@
+-- Set the monthly node or cluster cost of a cluster for one month.
+-- Node costs get a row for every node with usage in the month and cluster
+-- costs a single row. Rows that already exist only have their cost updated.
+INSERT INTO {{schema | sqlsafe}}.reporting_ocpusagelineitem_daily_summary (
+    usage_start,
+    usage_end,
+    report_period_id,
+    cluster_id,
+    cluster_alias,
+    monthly_cost_type,
+    node,
+    {{cost_column | sqlsafe}}
+)
+SELECT {{start_date}}::date,
+    {{start_date}}::date,
+    {{report_period_id}},
+    {{cluster_id}},
+    {{cluster_alias}},
+    {{cost_type}},
+    nodes.node,
+    {{rate}}::numeric
+FROM (
+{%- if cost_type == "Node" %}
+    SELECT DISTINCT li.node
+    FROM {{schema | sqlsafe}}.reporting_ocpusagelineitem_daily_summary AS li
+    WHERE li.cluster_id = {{cluster_id}}
+        AND li.usage_start >= {{start_date}}::date
+        AND li.usage_start < {{end_date}}::date
+        AND li.node IS NOT NULL
+{%- else %}
+    SELECT NULL::varchar AS node
+{%- endif %}
+) AS nodes
+ON CONFLICT (usage_start, report_period_id, cluster_id, monthly_cost_type, (coalesce(node, '')))
+    WHERE monthly_cost_type IS NOT NULL
+DO UPDATE SET
+    cluster_alias = EXCLUDED.cluster_alias,
+    {{cost_column | sqlsafe}} = EXCLUDED.{{cost_column | sqlsafe}}
+;
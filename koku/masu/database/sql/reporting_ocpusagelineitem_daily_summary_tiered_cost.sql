@@ -0,0 +1,49 @@
+-- Add the cost of one tiered rate to the daily summary usage costs.
+-- A row's usage is charged at the tiers it falls into once the cluster's
+-- usage earlier in the month is counted, so each tier is applied to the
+-- cumulative monthly usage rather than to each row on its own.
+WITH cte_usage AS (
+    SELECT li.id,
+        li.usage_start,
+        li.{{usage_column | sqlsafe}} AS usage,
+        sum(li.{{usage_column | sqlsafe}}) OVER (
+            PARTITION BY date_trunc('month', li.usage_start)
+            ORDER BY li.usage_start, li.id
+        ) AS cumulative_usage
+    FROM {{schema | sqlsafe}}.reporting_ocpusagelineitem_daily_summary AS li
+    WHERE li.cluster_id = {{cluster_id}}
+        AND li.usage_start >= date_trunc('month', {{start_date}}::date)::date
+        AND li.usage_start <= {{end_date}}::date
+        AND li.{{usage_column | sqlsafe}} > 0
+),
+cte_tiers (tier_start, tier_end, rate) AS (
+    VALUES
+    {%- for tier in tiers %}
+        ({{tier.usage_start}}::numeric, {{tier.usage_end}}::numeric, {{tier.value}}::numeric){% if not loop.last %},{% endif %}
+    {%- endfor %}
+),
+cte_tiered_cost AS (
+    SELECT u.id,
+        sum(
+            t.rate * greatest(
+                least(u.cumulative_usage, coalesce(t.tier_end, u.cumulative_usage))
+                    - greatest(u.cumulative_usage - u.usage, t.tier_start),
+                0
+            )
+        ) AS tiered_cost
+    FROM cte_usage AS u
+    CROSS JOIN cte_tiers AS t
+    WHERE u.usage_start >= {{start_date}}::date
+    GROUP BY u.id
+)
+UPDATE {{schema | sqlsafe}}.reporting_ocpusagelineitem_daily_summary AS li
+    SET {{cost_column | sqlsafe}} = jsonb_set(
+        coalesce(li.{{cost_column | sqlsafe}}, '{}'::jsonb),
+        ARRAY[{{cost_key}}]::text[],
+        to_jsonb(coalesce((li.{{cost_column | sqlsafe}}->>{{cost_key}})::numeric, 0) + tc.tiered_cost)
+    )
+FROM cte_tiered_cost AS tc
+WHERE li.id = tc.id
+    AND li.usage_start >= {{start_date}}::date
+    AND li.usage_start <= {{end_date}}::date
+;
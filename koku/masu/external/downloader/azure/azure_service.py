@@ -20,9 +20,11 @@ from tempfile import NamedTemporaryFile
 
 from adal.adal_error import AdalError
 from azure.common import AzureException
+from azure.core import MatchConditions
 from azure.core.exceptions import HttpResponseError
 from msrest.exceptions import ClientException
 
+from masu.config import Config
 from providers.azure.client import AzureClientFactory
 
 LOG = logging.getLogger(__name__)
@@ -66,12 +68,37 @@ class AzureService:
         if not self._factory.credentials:
             raise AzureServiceError("Azure Service credentials are not configured.")
 
+        # Blob listings keyed by (container name, prefix), so a manifest's prefix is listed once
+        self._blob_listings = {}
+
+    def _list_blobs(self, container_name, prefix):
+        """Return the blobs under a prefix of a container.
+
+        A listing under a prefix that covers this one is reused instead of
+        listing the container again.
+
+        Args:
+            container_name (str): The storage account container
+            prefix (str): The blob name prefix
+
+        Returns:
+            (list): The blob properties under the prefix
+
+        """
+        for (listed_container, listed_prefix), blobs in self._blob_listings.items():
+            if listed_container == container_name and prefix.startswith(listed_prefix):
+                return [blob for blob in blobs if blob.name.startswith(prefix)]
+
+        container_client = self._cloud_storage_account.get_container_client(container_name)
+        blobs = list(container_client.list_blobs(name_starts_with=prefix))
+        self._blob_listings[(container_name, prefix)] = blobs
+        return blobs
+
     def get_cost_export_for_key(self, key, container_name):
         """Get the latest cost export file from given storage account container."""
         report = None
         try:
-            container_client = self._cloud_storage_account.get_container_client(container_name)
-            blob_list = container_client.list_blobs(name_starts_with=key)
+            blob_list = self._list_blobs(container_name, key)
         except (AdalError, AzureException, ClientException) as error:
             raise AzureServiceError("Failed to download cost export. Error: ", str(error))
 
@@ -94,13 +121,36 @@ class AzureService:
             file_path = temp_file.name
         try:
             blob_client = self._cloud_storage_account.get_blob_client(container_name, cost_export.name)
-
-            with open(file_path, "wb") as blob_download:
-                blob_download.write(blob_client.download_blob().readall())
-        except (AdalError, AzureException, ClientException, IOError) as error:
+            self._download_blob(blob_client, cost_export, file_path)
+        except (AdalError, AzureException, ClientException, HttpResponseError, IOError) as error:
             raise AzureServiceError("Failed to download cost export. Error: ", str(error))
         return file_path
 
+    @staticmethod
+    def _download_blob(blob_client, blob, file_path):
+        """Stream a blob to a file, without holding the whole blob in memory.
+
+        The SDK reads large blobs as ranges in parallel. Every read is
+        conditioned on the listed etag, so a blob rewritten during the download
+        fails the download instead of mixing two versions.
+
+        Args:
+            blob_client (BlobClient): The client of the blob to download
+            blob (BlobProperties): The listed properties of the blob
+            file_path (str): Where to write the blob
+
+        Returns:
+            (None)
+
+        """
+        downloader = blob_client.download_blob(
+            max_concurrency=Config.AZURE_DOWNLOAD_MAX_CONCURRENCY,
+            etag=blob.etag,
+            match_condition=MatchConditions.IfNotModified,
+        )
+        with open(file_path, "wb") as blob_download:
+            downloader.readinto(blob_download)
+
     def get_latest_cost_export_for_path(self, report_path, container_name):
         """Get the latest cost export file from given storage account container."""
         latest_report = None
@@ -110,8 +160,7 @@ class AzureService:
             raise AzureCostReportNotFound(message)
 
         try:
-            container_client = self._cloud_storage_account.get_container_client(container_name)
-            blob_list = container_client.list_blobs(name_starts_with=report_path)
+            blob_list = self._list_blobs(container_name, report_path)
             for blob in blob_list:
                 if report_path in blob.name and not latest_report:
                     latest_report = blob
@@ -15,13 +15,14 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """OCP Report Downloader."""
+import csv
 import datetime
+import gzip
 import hashlib
 import logging
 import os
 import shutil
 
-import pandas as pd
 from django.conf import settings
 
 from api.common import log_json
@@ -30,6 +31,7 @@ from masu.external import UNCOMPRESSED
 from masu.external.downloader.downloader_interface import DownloaderInterface
 from masu.external.downloader.report_downloader_base import ReportDownloaderBase
 from masu.util.aws.common import copy_local_report_file_to_s3_bucket
+from masu.util.aws.common import CSV_GZIP_EXT
 from masu.util.common import get_path_prefix
 from masu.util.ocp import common as utils
 
@@ -43,37 +45,93 @@ REPORT_TYPES = {
 LOG = logging.getLogger(__name__)
 
 
-def divide_csv_daily(file_path, filename):
+def divide_csv_daily(file_path, filename, on_daily_file=None):
     """
-    Split local file into daily content.
+    Split local file into daily gzipped content.
+
+    The report is read once and each row is written to the file of the day
+    in its interval_start, so memory use does not grow with the report size.
+
+    Reports are normally ordered by interval_start, so a day's file is closed
+    and passed to on_daily_file as soon as a row of a later day is read. If
+    rows of a closed day come back, the report is unordered: the day's file is
+    reopened and appended to, and every file still open at the end of the pass
+    is passed to on_daily_file then, including a reopened one again.
+
+    Args:
+        file_path (str): The local report file
+        filename (str): The report file name
+        on_daily_file (function): Called with each daily file once it is complete
+
+    Returns:
+        (list): The daily files, each a dict of its filename and filepath
+
     """
-    daily_files = []
+    daily_files = {}
     directory = os.path.dirname(file_path)
-
-    data_frame = pd.read_csv(file_path)
     report_type, _ = utils.detect_type(file_path)
-    unique_times = data_frame.interval_start.unique()
-    days = list({cur_dt[:10] for cur_dt in unique_times})
-    daily_data_frames = [
-        {"data_frame": data_frame[data_frame.interval_start.str.contains(cur_day)], "date": cur_day}
-        for cur_day in days
+    ordered = True
+    previous_day = None
+    open_days = []
+
+    try:
+        with open(file_path, newline="") as report:
+            reader = csv.reader(report)
+            header = next(reader, None)
+            if not header:
+                return []
+            interval_start = header.index("interval_start")
+            for row in reader:
+                day = row[interval_start][:10]
+                daily_file = daily_files.get(day)
+                if daily_file is None:
+                    day_file = f"{report_type}.{day}{CSV_GZIP_EXT}"
+                    day_filepath = f"{directory}/{day_file}"
+                    day_out = gzip.open(day_filepath, "wt", newline="")
+                    daily_file = {
+                        "filename": day_file,
+                        "filepath": day_filepath,
+                        "file": day_out,
+                        "writer": csv.writer(day_out),
+                    }
+                    daily_file["writer"].writerow(header)
+                    daily_files[day] = daily_file
+                elif daily_file["file"] is None:
+                    # The report is unordered, so keep every file open until the end of the pass
+                    ordered = False
+                    daily_file["file"] = gzip.open(daily_file["filepath"], "at", newline="")
+                    daily_file["writer"] = csv.writer(daily_file["file"])
+                if ordered and previous_day is not None and day != previous_day:
+                    previous_file = daily_files[previous_day]
+                    previous_file["file"].close()
+                    previous_file["file"] = None
+                    if on_daily_file:
+                        on_daily_file({"filename": previous_file["filename"], "filepath": previous_file["filepath"]})
+                previous_day = day
+                daily_file["writer"].writerow(row)
+    finally:
+        for day, daily_file in daily_files.items():
+            if daily_file["file"] is not None:
+                daily_file["file"].close()
+                open_days.append(day)
+
+    if on_daily_file:
+        for day in sorted(open_days):
+            on_daily_file({"filename": daily_files[day]["filename"], "filepath": daily_files[day]["filepath"]})
+
+    return [
+        {"filename": daily_file["filename"], "filepath": daily_file["filepath"]}
+        for _, daily_file in sorted(daily_files.items())
     ]
 
-    for daily_data in daily_data_frames:
-        day = daily_data.get("date")
-        df = daily_data.get("data_frame")
-        day_file = f"{report_type}.{day}.csv"
-        day_filepath = f"{directory}/{day_file}"
-        df.to_csv(day_filepath, index=False, header=True)
-        daily_files.append({"filename": day_file, "filepath": day_filepath})
-
-    return daily_files
-
 
 def create_daily_archives(request_id, account, provider_uuid, filename, filepath, manifest_id, start_date, context={}):
     """
     Create daily CSVs from incoming report and archive to S3.
 
+    Each daily file is uploaded as soon as it is complete, while the rest of
+    the report is still being split.
+
     Args:
         request_id (str): The request id
         account (str): The account number
@@ -85,10 +143,10 @@ def create_daily_archives(request_id, account, provider_uuid, filename, filepath
         context (Dict): Logging context dictionary
     """
     if settings.ENABLE_S3_ARCHIVING:
-        daily_files = divide_csv_daily(filepath, filename)
-        for daily_file in daily_files:
-            # Push to S3
-            s3_csv_path = get_path_prefix(account, provider_uuid, start_date, Config.CSV_DATA_TYPE)
+        s3_csv_path = get_path_prefix(account, provider_uuid, start_date, Config.CSV_DATA_TYPE)
+
+        def upload_daily_file(daily_file):
+            """Push a complete daily file to S3."""
             copy_local_report_file_to_s3_bucket(
                 request_id,
                 s3_csv_path,
@@ -98,6 +156,10 @@ def create_daily_archives(request_id, account, provider_uuid, filename, filepath
                 start_date,
                 context,
             )
+
+        daily_files = divide_csv_daily(filepath, filename, on_daily_file=upload_daily_file)
+        # A day's file may be reopened after it was uploaded, so files are removed at the end
+        for daily_file in daily_files:
             os.remove(daily_file.get("filepath"))
 
 
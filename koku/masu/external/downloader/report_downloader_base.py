@@ -95,13 +95,15 @@ class ReportDownloaderBase:
                 # check if `last_completed_datetime` is null for any report in the manifest.
                 # if nulls exist, report processing is not complete and reports should be downloaded.
                 need_to_download = manifest_accessor.is_last_completed_datetime_null(manifest_id)
-                if need_to_download:
-                    self.worker_cache.add_task_to_cache(self._cache_key)
+                if need_to_download and self._cache_key:
+                    # Another worker may have claimed the task since it was checked
+                    return self.worker_cache.add_task_to_cache(self._cache_key)
                 return need_to_download
 
         # The manifest does not exist, this is the first time we are
         # downloading and processing it.
-        self.worker_cache.add_task_to_cache(self._cache_key)
+        if self._cache_key:
+            return self.worker_cache.add_task_to_cache(self._cache_key)
         return True
 
     def _process_manifest_db_record(self, assembly_id, billing_start, num_of_files):
@@ -26,11 +26,16 @@ import threading
 import time
 import traceback
 import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from tarfile import ReadError
 from tarfile import TarFile
 
 import requests
 from confluent_kafka import Consumer
+from confluent_kafka import KafkaException
 from confluent_kafka import Producer
 from django.db import connection
 from django.db import InterfaceError
@@ -68,6 +73,14 @@ class KafkaMsgHandlerError(Exception):
     """Kafka msg handler error."""
 
 
+class KafkaMsgHandlerPayloadError(KafkaMsgHandlerError):
+    """Kafka payload can not be downloaded or extracted, so retrying will not help."""
+
+
+class PayloadTooLargeError(KafkaMsgHandlerPayloadError):
+    """Kafka payload is larger than the download limit."""
+
+
 def delivery_callback(err, msg):
     """Acknowledge message success or failure."""
     if err is not None:
@@ -186,23 +199,33 @@ def download_payload(request_id, url, context={}):
     os.makedirs(Config.PVC_DIR, exist_ok=True)
     temp_dir = tempfile.mkdtemp(dir=Config.PVC_DIR)
 
-    # Download file from quarantine bucket as tar.gz
+    sanitized_request_id = re.sub("[^A-Za-z0-9]+", "", request_id)
+    gzip_filename = f"{sanitized_request_id}.tar.gz"
+    temp_file = f"{temp_dir}/{gzip_filename}"
+
+    # Stream file from quarantine bucket as tar.gz
     try:
-        download_response = requests.get(url)
-        download_response.raise_for_status()
+        with requests.get(url, stream=True) as download_response:
+            download_response.raise_for_status()
+            content_length = int(download_response.headers.get("Content-Length") or 0)
+            if content_length > Config.KAFKA_PAYLOAD_MAX_SIZE:
+                raise PayloadTooLargeError(f"Payload of {content_length} bytes exceeds the download limit.")
+            payload_size = 0
+            with open(temp_file, "wb") as temp_file_hdl:
+                for chunk in download_response.iter_content(chunk_size=Config.KAFKA_PAYLOAD_CHUNK_SIZE):
+                    payload_size += len(chunk)
+                    if payload_size > Config.KAFKA_PAYLOAD_MAX_SIZE:
+                        raise PayloadTooLargeError(f"Payload exceeds the {Config.KAFKA_PAYLOAD_MAX_SIZE} byte limit.")
+                    temp_file_hdl.write(chunk)
     except requests.exceptions.HTTPError as err:
         shutil.rmtree(temp_dir)
         msg = f"Unable to download file. Error: {str(err)}"
         LOG.warning(log_json(request_id, msg))
-        raise KafkaMsgHandlerError(msg)
-
-    sanitized_request_id = re.sub("[^A-Za-z0-9]+", "", request_id)
-    gzip_filename = f"{sanitized_request_id}.tar.gz"
-    temp_file = f"{temp_dir}/{gzip_filename}"
-    try:
-        temp_file_hdl = open(temp_file, "wb")
-        temp_file_hdl.write(download_response.content)
-        temp_file_hdl.close()
+        raise KafkaMsgHandlerPayloadError(msg)
+    except PayloadTooLargeError as error:
+        shutil.rmtree(temp_dir)
+        LOG.warning(log_json(request_id, str(error), context))
+        raise
     except (OSError, IOError) as error:
         shutil.rmtree(temp_dir)
         msg = f"Unable to write file. Error: {str(error)}"
@@ -212,9 +235,17 @@ def download_payload(request_id, url, context={}):
     return (temp_dir, temp_file, gzip_filename)
 
 
+def is_safe_member_name(name):
+    """Return whether a payload member name stays inside the extraction directory."""
+    return bool(name) and not os.path.isabs(name) and ".." not in name.replace("\\", "/").split("/")
+
+
 def extract_payload_contents(request_id, out_dir, tarball_path, tarball, context={}):
     """
-    Extract the payload contents into a temporary location.
+    Extract the payload manifest into a temporary location.
+
+    The report files are left in the payload, to be streamed into place
+    by extract_payload_report_files once the manifest has been read.
 
         Args:
         request_id (String): Identifier associated with the payload
@@ -226,32 +257,91 @@ def extract_payload_contents(request_id, out_dir, tarball_path, tarball, context
         Returns:
             (String): path to manifest file
     """
-    # Extract tarball into temp directory
+    # Extract manifest into temp directory
 
     if not os.path.isfile(tarball_path):
         msg = f"Unable to find tar file {tarball_path}."
         LOG.warning(log_json(request_id, msg, context))
-        raise KafkaMsgHandlerError("Extraction failure, file not found.")
+        raise KafkaMsgHandlerPayloadError("Extraction failure, file not found.")
 
+    manifest_path = []
     try:
-        mytar = TarFile.open(tarball_path, mode="r:gz")
-        mytar.extractall(path=out_dir)
-        files = mytar.getnames()
-        manifest_path = [manifest for manifest in files if "manifest.json" in manifest]
+        with TarFile.open(tarball_path, mode="r:gz") as mytar:
+            for member in mytar:
+                if os.path.basename(member.name) != "manifest.json" or not member.isfile():
+                    continue
+                if not is_safe_member_name(member.name):
+                    msg = f"Rejected manifest {member.name} outside of the payload."
+                    LOG.warning(log_json(request_id, msg, context))
+                    continue
+                destination = os.path.join(out_dir, member.name)
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                with mytar.extractfile(member) as source, open(destination, "wb") as manifest_file:
+                    shutil.copyfileobj(source, manifest_file)
+                manifest_path.append(member.name)
     except (ReadError, EOFError, OSError) as error:
         msg = f"Unable to untar file {tarball_path}. Reason: {str(error)}"
         LOG.warning(log_json(request_id, msg, context))
         shutil.rmtree(out_dir)
-        raise KafkaMsgHandlerError("Extraction failure.")
+        raise KafkaMsgHandlerPayloadError("Extraction failure.")
 
     if not manifest_path:
         msg = "No manifest found in payload."
         LOG.warning(log_json(request_id, msg, context))
-        raise KafkaMsgHandlerError("No manifest found in payload.")
+        raise KafkaMsgHandlerPayloadError("No manifest found in payload.")
 
     return manifest_path
 
 
+def extract_payload_report_files(request_id, tarball_path, manifest_path, report_files, destination_dir, context={}):
+    """
+    Stream the report files listed in the manifest from the payload into place.
+
+    Members that are not listed in the manifest are rejected, as are
+    listed files with a directory in their name.
+
+        Args:
+        request_id (String): Identifier associated with the payload
+        tarball_path (String): the path to the payload file to extract
+        manifest_path (String): the path of the manifest in the payload
+        report_files ([String]): the report file names listed in the manifest
+        destination_dir (String): the report directory to write the files to
+        context (Dict): Context for logging (account, etc)
+
+        Returns:
+            (set): the report file names written to the destination directory
+    """
+    manifest_dir = os.path.dirname(manifest_path)
+    expected_members = {}
+    for report_file in report_files:
+        if os.path.basename(report_file) != report_file or not is_safe_member_name(report_file):
+            msg = f"Rejected manifest file entry {report_file}."
+            LOG.warning(log_json(request_id, msg, context))
+            continue
+        expected_members[os.path.join(manifest_dir, report_file)] = report_file
+
+    extracted_files = set()
+    try:
+        with TarFile.open(tarball_path, mode="r:gz") as mytar:
+            for member in mytar:
+                if not member.isfile() or member.name == manifest_path:
+                    continue
+                report_file = expected_members.get(member.name)
+                if report_file is None:
+                    msg = f"Rejected payload member {member.name} not listed in the manifest."
+                    LOG.warning(log_json(request_id, msg, context))
+                    continue
+                with mytar.extractfile(member) as source, open(f"{destination_dir}/{report_file}", "wb") as report:
+                    shutil.copyfileobj(source, report, Config.KAFKA_PAYLOAD_CHUNK_SIZE)
+                extracted_files.add(report_file)
+    except (ReadError, EOFError, OSError) as error:
+        msg = f"Unable to untar file {tarball_path}. Reason: {str(error)}"
+        LOG.warning(log_json(request_id, msg, context))
+        raise KafkaMsgHandlerPayloadError("Extraction failure.")
+
+    return extracted_files
+
+
 # pylint: disable=too-many-locals
 def extract_payload(url, request_id, context={}):  # noqa: C901
     """
@@ -340,36 +430,37 @@ def extract_payload(url, request_id, context={}):  # noqa: C901
     # Save Manifest
     report_meta["manifest_id"] = create_manifest_entries(report_meta, request_id, context)
 
-    # Copy report payload
+    # Stream report payload
+    try:
+        extracted_files = extract_payload_report_files(
+            request_id, temp_file_path, manifest_path[0], report_meta.get("files"), destination_dir, context
+        )
+    except KafkaMsgHandlerError:
+        shutil.rmtree(temp_dir)
+        raise
     report_metas = []
     for report_file in report_meta.get("files"):
         current_meta = report_meta.copy()
-        subdirectory = os.path.dirname(full_manifest_path)
-        payload_source_path = f"{subdirectory}/{report_file}"
         payload_destination_path = f"{destination_dir}/{report_file}"
-        try:
-            shutil.copy(payload_source_path, payload_destination_path)
-            current_meta["current_file"] = payload_destination_path
-            if not record_report_status(report_meta["manifest_id"], report_file, request_id, context):
-                msg = f"Successfully extracted OCP for {report_meta.get('cluster_id')}/{usage_month}"
-                LOG.info(log_json(request_id, msg, context))
-                create_daily_archives(
-                    request_id,
-                    report_meta["account"],
-                    report_meta["provider_uuid"],
-                    report_file,
-                    payload_destination_path,
-                    report_meta["manifest_id"],
-                    report_meta["date"],
-                    context,
-                )
-                report_metas.append(current_meta)
-            else:
-                # Report already processed
-                pass
-        except FileNotFoundError:
+        if report_file not in extracted_files:
             msg = f"File {str(report_file)} has not downloaded yet."
             LOG.debug(log_json(request_id, msg, context))
+            continue
+        current_meta["current_file"] = payload_destination_path
+        if not record_report_status(report_meta["manifest_id"], report_file, request_id, context):
+            msg = f"Successfully extracted OCP for {report_meta.get('cluster_id')}/{usage_month}"
+            LOG.info(log_json(request_id, msg, context))
+            create_daily_archives(
+                request_id,
+                report_meta["account"],
+                report_meta["provider_uuid"],
+                report_file,
+                payload_destination_path,
+                report_meta["manifest_id"],
+                report_meta["date"],
+                context,
+            )
+            report_metas.append(current_meta)
 
     # Remove temporary directory and files
     shutil.rmtree(temp_dir)
@@ -506,6 +597,7 @@ def summarize_manifest(report_meta):
                         manifest_id: Integer,
                         provider_uuid: String,
                         provider_type: String,
+                        usage_dates: List of YYYY-MM-DD strings
 
     Returns:
         Celery Async UUID.
@@ -517,6 +609,7 @@ def summarize_manifest(report_meta):
     provider_uuid = report_meta.get("provider_uuid")
     schema_name = report_meta.get("schema_name")
     provider_type = report_meta.get("provider_type")
+    usage_dates = report_meta.get("usage_dates", [])
 
     with ReportManifestDBAccessor() as manifest_accesor:
         manifest = manifest_accesor.get_manifest_by_id(manifest_id)
@@ -526,6 +619,7 @@ def summarize_manifest(report_meta):
                 "provider_type": provider_type,
                 "provider_uuid": provider_uuid,
                 "manifest_id": manifest_id,
+                "usage_dates": usage_dates,
             }
             async_id = summarize_reports.delay([report_meta])
     return async_id
@@ -601,6 +695,7 @@ def process_report(request_id, report):
 
     Returns:
         True if line item report processing is complete.
+        The usage days written by the file are added to report as usage_dates.
 
     """
     schema_name = report.get("schema_name")
@@ -614,7 +709,9 @@ def process_report(request_id, report):
         "manifest_id": manifest_id,
         "provider_uuid": provider_uuid,
     }
-    return _process_report_file(schema_name, provider_type, provider_uuid, report_dict)
+    process_complete = _process_report_file(schema_name, provider_type, provider_uuid, report_dict)
+    report["usage_dates"] = report_dict.get("usage_dates", [])
+    return process_complete
 
 
 def report_metas_complete(report_metas):
@@ -671,6 +768,7 @@ def process_messages(msg):
             report_meta["process_complete"] = process_report(request_id, report_meta)
             LOG.info(f"Processing: {report_meta.get('current_file')} complete.")
         process_complete = report_metas_complete(report_metas)
+        report_meta["usage_dates"] = sorted({date for meta in report_metas for date in meta.get("usage_dates", [])})
         summary_task_id = summarize_manifest(report_meta)
         if summary_task_id:
             LOG.info(f"Summarization celery uuid: {summary_task_id}")
@@ -698,28 +796,131 @@ def get_consumer():  # pragma: no cover
             "queued.max.messages.kbytes": 1024,
             "enable.auto.commit": False,
             "enable.auto.offset.store": False,
-            "max.poll.interval.ms": 1080000,  # 18 minutes
+            # 18 minutes when messages are processed on the polling thread, 5 minutes when a pool processes them
+            "max.poll.interval.ms": 1080000 if Config.KAFKA_PROCESSING_WORKERS == 1 else 300000,
         }
     )
     consumer.subscribe([HCCM_TOPIC])
     return consumer
 
 
+class KafkaMessagePool:
+    """
+    Process Kafka messages concurrently on a bounded pool of threads.
+
+    Offsets are tracked per partition in the order the messages were polled.
+    A partition is only committed up to the last message before its oldest
+    message still in progress, so every message is processed at least once.
+    The consumer's partitions are paused while every worker is busy.
+    """
+
+    def __init__(self, consumer, workers):
+        """
+        Establish the message pool.
+
+        Args:
+            consumer (Consumer): kafka consumer the messages were polled from
+            workers (int): the number of messages to process at once
+
+        """
+        self._consumer = consumer
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kafka-message")
+        self._in_progress = {}
+        self._partitions = {}
+        self._paused = []
+
+    @property
+    def is_full(self):
+        """Return whether every worker is busy."""
+        return len(self._in_progress) >= self._workers
+
+    def submit(self, msg):
+        """Start processing a message, pausing the consumer if the pool is now full."""
+        partition_key = (msg.topic(), msg.partition())
+        self._partitions.setdefault(partition_key, OrderedDict())[msg.offset()] = [msg, False]
+        future = self._executor.submit(process_message_until_handled, msg)
+        self._in_progress[future] = msg
+        if self.is_full and not self._paused:
+            self._paused = self._consumer.assignment()
+            self._consumer.pause(self._paused)
+            LOG.info(f"Pausing consumption, {len(self._in_progress)} messages in progress.")
+
+    def collect(self, timeout=0):
+        """
+        Commit the messages that finished, resuming the consumer once a worker is free.
+
+        Args:
+            timeout (float): seconds to wait for a message to finish, None to wait for one
+
+        """
+        if not self._in_progress:
+            return
+        done, _ = wait(self._in_progress, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            msg = self._in_progress.pop(future)
+            partition_key = (msg.topic(), msg.partition())
+            self._partitions[partition_key][msg.offset()][1] = True
+            self._commit_partition(partition_key)
+        if self._paused and not self.is_full:
+            self._consumer.resume(self._paused)
+            self._paused = []
+            LOG.info("Resuming consumption.")
+
+    def _commit_partition(self, partition_key):
+        """Commit a partition up to its oldest message still in progress."""
+        offsets = self._partitions[partition_key]
+        commit_msg = None
+        while offsets:
+            offset, (msg, handled) = next(iter(offsets.items()))
+            if not handled:
+                break
+            commit_msg = msg
+            del offsets[offset]
+        if commit_msg is None:
+            return
+        LOG.debug(f"COMMITTING: message offset: {commit_msg.offset()} partition: {commit_msg.partition()}")
+        try:
+            self._consumer.store_offsets(commit_msg)
+            self._consumer.commit()
+        except KafkaException as error:
+            # The partition was revoked, so its messages will be delivered again
+            LOG.warning(f"[KafkaMessagePool] Unable to commit offset {commit_msg.offset()}. Error: {error}")
+
+    def close(self):
+        """Wait for the messages in progress and commit them."""
+        while self._in_progress:
+            self.collect(timeout=None)
+        self._executor.shutdown()
+
+
 def listen_for_messages_loop():
     """Wrap listen_for_messages in while true."""
     consumer = get_consumer()
+    pool = None
+    if Config.KAFKA_PROCESSING_WORKERS > 1:
+        pool = KafkaMessagePool(consumer, Config.KAFKA_PROCESSING_WORKERS)
     LOG.info("Consumer is listening for messages...")
-    for _ in itertools.count():  # equivalent to while True, but mockable
-        msg = consumer.poll(timeout=1.0)
-        if msg is None:
-            continue
-
-        if msg.error():
-            KAFKA_CONNECTION_ERRORS_COUNTER.inc()
-            LOG.error(f"[listen_for_messages_loop] consumer.poll message: {msg}. Error: {msg.error()}")
-            continue
-
-        listen_for_messages(msg, consumer)
+    try:
+        for _ in itertools.count():  # equivalent to while True, but mockable
+            if pool:
+                pool.collect()
+            msg = consumer.poll(timeout=1.0)
+            if msg is None:
+                continue
+
+            if msg.error():
+                KAFKA_CONNECTION_ERRORS_COUNTER.inc()
+                LOG.error(f"[listen_for_messages_loop] consumer.poll message: {msg}. Error: {msg.error()}")
+                continue
+
+            if pool:
+                pool.submit(msg)
+            else:
+                listen_for_messages(msg, consumer)
+    finally:
+        if pool:
+            pool.close()
 
 
 def listen_for_messages(msg, consumer):
@@ -750,28 +951,82 @@ def listen_for_messages(msg, consumer):
         None
 
     """
-    try:
-        offset = msg.offset()
-        partition = msg.partition()
-        LOG.info(f"Processing message offset: {offset} partition: {partition}")
-        process_messages(msg)
-        LOG.debug(f"COMMITTING: message offset: {offset} partition: {partition}")
+    if process_kafka_message(msg):
+        LOG.debug(f"COMMITTING: message offset: {msg.offset()} partition: {msg.partition()}")
         consumer.store_offsets(msg)
         consumer.commit()
+
+
+def process_kafka_message(msg, retry_seconds=None):
+    """
+    Process a message from the hccm topic, handling processing errors.
+
+    Args:
+        msg (ConsumerRecord) - Message from kafka hccm topic.
+        retry_seconds (int) - seconds to wait before a retry, defaults to Config.RETRY_SECONDS
+
+    Returns:
+        True if the message may be committed, None if it should be retried
+        and False if it failed with an unexpected error.
+
+    """
+    if retry_seconds is None:
+        retry_seconds = Config.RETRY_SECONDS
+    try:
+        LOG.info(f"Processing message offset: {msg.offset()} partition: {msg.partition()}")
+        process_messages(msg)
+        return True
     except (InterfaceError, OperationalError, ReportProcessorDBError) as error:
         connection.close()
         LOG.error(f"[listen_for_messages] Database error. Error: {type(error).__name__}: {error}. Retrying...")
-        time.sleep(Config.RETRY_SECONDS)
+        time.sleep(retry_seconds)
+    except KafkaMsgHandlerPayloadError as error:
+        LOG.error(f"[listen_for_messages] Payload error: {type(error).__name__}: {error}")
+        return True
     except (KafkaMsgHandlerError, RabbitOperationalError) as error:
         LOG.error(f"[listen_for_messages] Internal error. {type(error).__name__}: {error}. Retrying...")
-        time.sleep(Config.RETRY_SECONDS)
+        time.sleep(retry_seconds)
     except ReportProcessorError as error:
         LOG.error(f"[listen_for_messages] Report processing error: {str(error)}")
-        LOG.debug(f"COMMITTING: message offset: {offset} partition: {partition}")
-        consumer.store_offsets(msg)
-        consumer.commit()
+        return True
     except Exception as error:
         LOG.error(f"[listen_for_messages] UNKNOWN error encountered: {type(error).__name__}: {error}", exc_info=True)
+        return False
+    return None
+
+
+def process_message_until_handled(msg):
+    """
+    Process a message on a pool thread until it succeeds or fails for good.
+
+    Database and internal errors are retried, waiting twice as long before
+    each retry up to Config.KAFKA_RETRY_MAX_SECONDS. A message that fails with
+    an unexpected error, or is still failing after Config.KAFKA_MAX_RETRIES
+    retries, is committed along with the messages after it, as when the
+    polling thread moves on from it.
+
+    Args:
+        msg (ConsumerRecord) - Message from kafka hccm topic.
+
+    Returns:
+        None
+
+    """
+    try:
+        for retries in itertools.count():
+            retry_seconds = min(Config.RETRY_SECONDS * 2 ** retries, Config.KAFKA_RETRY_MAX_SECONDS)
+            if process_kafka_message(msg, retry_seconds) is not None:
+                break
+            if retries >= Config.KAFKA_MAX_RETRIES:
+                LOG.error(
+                    f"Giving up on message offset: {msg.offset()} partition: {msg.partition()} "
+                    f"after {retries} retries."
+                )
+                break
+            LOG.info(f"Retrying message offset: {msg.offset()} partition: {msg.partition()}")
+    finally:
+        # Each pool thread has its own database connection
+        connection.close()
 
 
 def koku_listener_thread():  # pragma: no cover
@@ -0,0 +1,127 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark flat and tiered OCP usage cost updates on a generated month of data."""
+import json
+import logging
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from tenant_schemas.utils import schema_context
+
+from api.metrics import constants as metric_constants
+from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.ocp_report_db_accessor import USAGE_RATE_COLUMNS
+
+LOG = logging.getLogger(__name__)
+
+GENERATE_SQL = """
+    INSERT INTO reporting_ocpusagelineitem_daily_summary (
+        cluster_id, data_source, namespace, node, pod_labels, usage_start, usage_end,
+        pod_usage_cpu_core_hours, pod_request_cpu_core_hours,
+        pod_usage_memory_gigabyte_hours, pod_request_memory_gigabyte_hours,
+        persistentvolumeclaim_usage_gigabyte_months, volume_request_storage_gigabyte_months
+    )
+    SELECT %(cluster_id)s,
+        'Pod',
+        'namespace_' || (pod %% 100),
+        'node_' || (pod %% %(nodes)s),
+        '{}'::jsonb,
+        day::date,
+        day::date,
+        random() * 24,
+        random() * 24,
+        random() * 96,
+        random() * 96,
+        random(),
+        random()
+    FROM generate_series(%(start)s::date, %(end)s::date, '1 day') AS day
+    CROSS JOIN generate_series(1, %(pods)s) AS pod
+"""
+
+
+def get_tiers(rate):
+    """Return three volume discount tiers starting at a rate."""
+    return [
+        {"usage_start": Decimal(0), "usage_end": Decimal(10000), "value": Decimal(rate)},
+        {"usage_start": Decimal(10000), "usage_end": Decimal(100000), "value": Decimal(rate) * Decimal("0.8")},
+        {"usage_start": Decimal(100000), "usage_end": None, "value": Decimal(rate) * Decimal("0.6")},
+    ]
+
+
+class Command(BaseCommand):
+    """Django command to compare flat and tiered usage cost updates."""
+
+    help = (
+        "Generate a month of daily summary rows for a synthetic cluster and time the flat rate usage cost "
+        "update against the tiered one. The generated rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--schema", required=True, help="Tenant schema to generate rows in")
+        parser.add_argument("--pods", type=int, default=20000, help="Number of pod rows per day")
+        parser.add_argument("--nodes", type=int, default=200, help="Number of distinct nodes")
+        parser.add_argument("--runs", type=int, default=3, help="Number of timed runs of each update")
+
+    def handle(self, *args, **options):
+        """Time both updates and print the results."""
+        schema = options["schema"]
+        cluster_id = f"benchmark-{uuid.uuid4()}"
+        start = date.today().replace(day=1)
+        end = start + relativedelta(months=1, days=-1)
+        rates = {metric: 0.01 for metric in USAGE_RATE_COLUMNS}
+        tiered_rates = {metric: get_tiers(rate) for metric, rate in rates.items()}
+
+        params = {"cluster_id": cluster_id, "start": start, "end": end}
+        params.update(nodes=options["nodes"], pods=options["pods"])
+        with schema_context(schema):
+            with connection.cursor() as cursor:
+                cursor.execute(GENERATE_SQL, params)
+                rows = cursor.rowcount
+        try:
+            with OCPReportDBAccessor(schema) as accessor:
+                timings = {"flat": [], "tiered": []}
+                for _ in range(options["runs"]):
+                    started = time.perf_counter()
+                    accessor.populate_usage_costs(rates, {}, start, end, cluster_id)
+                    timings["flat"].append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    accessor.populate_usage_costs({}, {}, start, end, cluster_id)
+                    for metric, tiers in tiered_rates.items():
+                        accessor.populate_tiered_usage_cost(
+                            metric_constants.INFRASTRUCTURE_COST_TYPE, metric, tiers, start, end, cluster_id
+                        )
+                    timings["tiered"].append(time.perf_counter() - started)
+        finally:
+            with schema_context(schema):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "DELETE FROM reporting_ocpusagelineitem_daily_summary WHERE cluster_id = %s", [cluster_id]
+                    )
+
+        results = {"rows": rows, "runs": options["runs"], "updates": {}}
+        for name, seconds in timings.items():
+            best = min(seconds)
+            results["updates"][name] = {"best_seconds": best, "rows_per_second": rows / best if best else None}
+            LOG.info("%s usage cost update: %d rows in %.2f seconds", name, rows, best)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,169 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark the GCP report processor on a generated billing export."""
+import csv
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.models import Provider
+from masu.external import UNCOMPRESSED
+from masu.management.commands.benchmark_suite import compare_results
+from masu.management.commands.benchmark_suite import get_commit
+from masu.management.commands.benchmark_suite import get_month_bounds
+from masu.management.commands.benchmark_suite import StageTimer
+from masu.processor.gcp.gcp_report_processor import GCPReportProcessor
+
+LOG = logging.getLogger(__name__)
+
+GCP_COLUMNS = [
+    "Account ID",
+    "Line Item",
+    "Start Time",
+    "End Time",
+    "Project",
+    "Measurement1",
+    "Measurement1 Total Consumption",
+    "Measurement1 Units",
+    "Credit1",
+    "Credit1 Amount",
+    "Credit1 Currency",
+    "Cost",
+    "Currency",
+    "Project Number",
+    "Project ID",
+    "Project Name",
+    "Project Labels",
+    "Description",
+]
+
+
+def generate_gcp_report(file_path, rows, projects=100, line_item_types=200, duplicates=0.1, start=None):
+    """Write a synthetic GCP billing export.
+
+    Args:
+        file_path (str): Where to write the report
+        rows (int): The number of rows to write
+        projects (int): The number of distinct projects
+        line_item_types (int): The number of distinct line item types per project
+        duplicates (float): The fraction of rows that repeat the key of the previous row
+        start (datetime): The start of the billing period
+
+    Returns:
+        (int): The size of the written file in bytes
+
+    """
+    start, end = get_month_bounds(start)
+    days = (end - start).days
+    line = 0
+    with open(file_path, "w") as report:
+        writer = csv.writer(report)
+        writer.writerow(GCP_COLUMNS)
+        for row in range(rows):
+            if not (row and random.random() < duplicates):
+                line += 1
+            project = line % projects
+            line_item_type = (line // projects) % line_item_types
+            day = start + timedelta(days=(line // (projects * line_item_types)) % days)
+            service = f"com.google.cloud/services/compute-engine/Sku{line_item_type:05d}"
+            writer.writerow(
+                [
+                    "01C2AB-2F30E0-1EF054",
+                    service,
+                    day.strftime("%Y-%m-%dT%H:%M:%S-00:00"),
+                    (day + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S-00:00"),
+                    f"{project:012d}",
+                    service,
+                    random.randrange(100000),
+                    "seconds",
+                    "",
+                    "",
+                    "",
+                    round(random.random(), 6),
+                    "USD",
+                    f"{project:012d}",
+                    f"benchmark-project-{project}",
+                    f"Benchmark Project {project}",
+                    "",
+                    f"Benchmark SKU {line_item_type}",
+                ]
+            )
+    return os.path.getsize(file_path)
+
+
+class Command(BaseCommand):
+    """Django command to measure GCP report processing throughput."""
+
+    help = (
+        "Generate a synthetic GCP billing export and time the GCP report processor on it. "
+        "The line items are written into the given schema, so use a scratch tenant. Save the results of a run "
+        "on an earlier commit with --output and pass them to --compare to see the change."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--schema", required=True, help="Tenant schema to process into")
+        parser.add_argument("--provider-uuid", required=True, help="UUID of an existing GCP provider")
+        parser.add_argument("--rows", type=int, default=1000000, help="Number of rows to generate")
+        parser.add_argument("--projects", type=int, default=100, help="Number of distinct projects")
+        parser.add_argument("--line-item-types", type=int, default=200, help="Number of line item types")
+        parser.add_argument("--duplicates", type=float, default=0.1, help="Fraction of rows with a repeated key")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the generated report")
+        parser.add_argument("--output", help="Write the JSON results to this file")
+        parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+
+    def handle(self, *args, **options):
+        """Process the generated report and print its throughput."""
+        random.seed(options["seed"])
+        timer = StageTimer()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            report = os.path.join(temp_dir, "benchmark_gcp.csv")
+            rows = options["rows"]
+            generator_options = {
+                "projects": options["projects"],
+                "line_item_types": options["line_item_types"],
+                "duplicates": options["duplicates"],
+            }
+            timer.run(Provider.PROVIDER_GCP, "generate", rows, generate_gcp_report, report, rows, **generator_options)
+            processor = GCPReportProcessor(
+                schema_name=options["schema"],
+                report_path=report,
+                compression=UNCOMPRESSED,
+                provider_uuid=options["provider_uuid"],
+            )
+            timer.run(Provider.PROVIDER_GCP, "process", rows, processor.process)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        parameters = {
+            name: options[name] for name in ("schema", "rows", "projects", "line_item_types", "duplicates", "seed")
+        }
+        results = {"commit": get_commit(), "parameters": parameters, "stages": timer.stages}
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                results["comparison"] = compare_results(json.load(baseline_file), results)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                json.dump(results, output_file, indent=2)
+        self.stdout.write(json.dumps(results, indent=2))
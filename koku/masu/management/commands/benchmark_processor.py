@@ -0,0 +1,214 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark the row and columnar report processors on a generated CUR."""
+import csv
+import gzip
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from masu.external import GZIP_COMPRESSED
+from masu.processor.aws.aws_columnar_report_processor import AWSColumnarReportProcessor
+from masu.processor.aws.aws_report_processor import AWSReportProcessor
+
+LOG = logging.getLogger(__name__)
+
+CUR_COLUMNS = [
+    "identity/LineItemId",
+    "identity/TimeInterval",
+    "bill/InvoiceId",
+    "bill/BillingEntity",
+    "bill/BillType",
+    "bill/PayerAccountId",
+    "bill/BillingPeriodStartDate",
+    "bill/BillingPeriodEndDate",
+    "lineItem/UsageAccountId",
+    "lineItem/LineItemType",
+    "lineItem/UsageStartDate",
+    "lineItem/UsageEndDate",
+    "lineItem/ProductCode",
+    "lineItem/UsageType",
+    "lineItem/Operation",
+    "lineItem/AvailabilityZone",
+    "lineItem/ResourceId",
+    "lineItem/UsageAmount",
+    "lineItem/NormalizationFactor",
+    "lineItem/NormalizedUsageAmount",
+    "lineItem/CurrencyCode",
+    "lineItem/UnblendedRate",
+    "lineItem/UnblendedCost",
+    "lineItem/BlendedRate",
+    "lineItem/BlendedCost",
+    "lineItem/TaxType",
+    "product/ProductName",
+    "product/instanceType",
+    "product/memory",
+    "product/productFamily",
+    "product/region",
+    "product/servicecode",
+    "product/sku",
+    "product/vcpu",
+    "pricing/publicOnDemandCost",
+    "pricing/publicOnDemandRate",
+    "pricing/term",
+    "pricing/unit",
+    "reservation/ReservationARN",
+]
+
+
+def generate_aws_cur(file_path, rows, resources=1000, tag_keys=10, tag_values=20, start=None):
+    """Write a gzipped synthetic AWS Cost and Usage Report.
+
+    Args:
+        file_path (str): Where to write the report
+        rows (int): The number of line items to write
+        resources (int): The number of distinct resources, each with its own product
+        tag_keys (int): The number of distinct resource tag keys
+        tag_values (int): The number of distinct values per tag key
+        start (datetime): The start of the billing period
+
+    Returns:
+        (int): The size of the written file in bytes
+
+    """
+    start = start or datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    hours = int((end - start).total_seconds() // 3600)
+    tag_columns = [f"resourceTags/user:key_{key}" for key in range(tag_keys)]
+    bill_start = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    bill_end = end.strftime("%Y-%m-%dT%H:%M:%SZ")
+    regions = ["us-east-1", "us-west-2", "eu-west-1"]
+
+    with gzip.open(file_path, "wt") as report:
+        writer = csv.writer(report)
+        writer.writerow(CUR_COLUMNS + tag_columns)
+        for line in range(rows):
+            resource = line % resources
+            hour = start + timedelta(hours=(line // resources) % hours)
+            interval_start = hour.strftime("%Y-%m-%dT%H:%M:%SZ")
+            interval_end = (hour + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            amount = random.random()
+            rate = round(random.uniform(0.01, 2.0), 4)
+            tags = [f"value_{random.randrange(tag_values)}" if random.random() < 0.5 else "" for _ in tag_columns]
+            writer.writerow(
+                [
+                    f"{line:040x}",
+                    f"{interval_start}/{interval_end}",
+                    "",
+                    "AWS",
+                    "Anniversary",
+                    "111111111111",
+                    bill_start,
+                    bill_end,
+                    f"{resource % 10:012d}",
+                    "Usage",
+                    interval_start,
+                    interval_end,
+                    "AmazonEC2",
+                    "BoxUsage:m5.large",
+                    "RunInstances",
+                    f"{regions[resource % 3]}a",
+                    f"i-{resource:08x}",
+                    amount,
+                    4,
+                    amount * 4,
+                    "USD",
+                    rate,
+                    amount * rate,
+                    rate,
+                    amount * rate,
+                    "",
+                    "Amazon Elastic Compute Cloud",
+                    "m5.large",
+                    "8 GiB",
+                    "Compute Instance",
+                    regions[resource % 3],
+                    "AmazonEC2",
+                    f"SKU{resource % 50:05d}",
+                    2,
+                    amount * rate,
+                    rate,
+                    "OnDemand",
+                    "Hrs",
+                    "",
+                ]
+                + tags
+            )
+    return os.path.getsize(file_path)
+
+
+class Command(BaseCommand):
+    """Django command to compare report processing throughput."""
+
+    help = (
+        "Generate a synthetic AWS CUR and time the row and columnar report processors on it. "
+        "Both runs write their line items into the given schema, so use a scratch tenant."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--schema", required=True, help="Tenant schema to process into")
+        parser.add_argument("--provider-uuid", required=True, help="UUID of an existing AWS provider")
+        parser.add_argument("--rows", type=int, default=1000000, help="Number of line items to generate")
+        parser.add_argument("--resources", type=int, default=1000, help="Number of distinct resources")
+        parser.add_argument("--tag-keys", type=int, default=10, help="Number of distinct tag keys")
+        parser.add_argument("--tag-values", type=int, default=20, help="Number of distinct values per tag key")
+        parser.add_argument("--report", help="Reuse an existing gzipped CUR instead of generating one")
+
+    def handle(self, *args, **options):
+        """Run both processors on the same report and print their throughput."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            report = options.get("report")
+            if report:
+                with gzip.open(report, "rt") as report_file:
+                    options["rows"] = sum(1 for _ in report_file) - 1
+            else:
+                report = os.path.join(temp_dir, "benchmark_cur.csv.gz")
+                generate_aws_cur(
+                    report,
+                    options["rows"],
+                    resources=options["resources"],
+                    tag_keys=options["tag_keys"],
+                    tag_values=options["tag_values"],
+                )
+            results = {"report_bytes": os.path.getsize(report), "rows": options["rows"], "engines": {}}
+            for name, processor_class in (("row", AWSReportProcessor), ("columnar", AWSColumnarReportProcessor)):
+                report_copy = os.path.join(temp_dir, f"{name}.csv.gz")
+                shutil.copy2(report, report_copy)
+                processor = processor_class(
+                    schema_name=options["schema"],
+                    report_path=report_copy,
+                    compression=GZIP_COMPRESSED,
+                    provider_uuid=options["provider_uuid"],
+                )
+                started = time.perf_counter()
+                processor.process()
+                elapsed = time.perf_counter() - started
+                results["engines"][name] = {"seconds": elapsed, "rows_per_second": options["rows"] / elapsed}
+                LOG.info("%s processor: %d rows in %.2f seconds", name, options["rows"], elapsed)
+            self.stdout.write(json.dumps(results, indent=2))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
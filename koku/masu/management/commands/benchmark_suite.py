@@ -0,0 +1,457 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark ingest, summary and report API throughput on generated AWS, Azure and OCP reports."""
+import csv
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.test import RequestFactory
+
+from api.models import Provider
+from api.query_params import QueryParameters
+from api.report.aws.view import AWSCostView
+from api.report.aws.view import AWSInstanceTypeView
+from api.report.azure.view import AzureCostView
+from api.report.azure.view import AzureStorageView
+from api.report.ocp.view import OCPCostView
+from api.report.ocp.view import OCPCpuView
+from masu.external import GZIP_COMPRESSED
+from masu.external import UNCOMPRESSED
+from masu.management.commands.benchmark_processor import generate_aws_cur
+from masu.processor.report_processor import ReportProcessor
+from masu.processor.report_summary_updater import ReportSummaryUpdater
+from masu.util.ocp.common import CPU_MEM_USAGE_COLUMNS
+from masu.util.ocp.common import NODE_LABEL_COLUMNS
+from masu.util.ocp.common import STORAGE_COLUMNS
+
+LOG = logging.getLogger(__name__)
+
+AZURE_COLUMNS = [
+    "SubscriptionGuid",
+    "ResourceGroup",
+    "ResourceLocation",
+    "UsageDateTime",
+    "MeterCategory",
+    "MeterSubcategory",
+    "MeterId",
+    "MeterName",
+    "MeterRegion",
+    "UsageQuantity",
+    "ResourceRate",
+    "PreTaxCost",
+    "ConsumedService",
+    "ResourceType",
+    "InstanceId",
+    "Tags",
+    "OfferId",
+    "AdditionalInfo",
+    "ServiceInfo1",
+    "ServiceInfo2",
+    "ServiceName",
+    "ServiceTier",
+    "Currency",
+]
+OCP_TIME_FORMAT = "%Y-%m-%d %H:%M:%S +0000 UTC"
+BYTES_PER_GIGABYTE = 1024 ** 3
+
+# The report API queries timed for each provider type: (view, query string)
+REPORT_QUERIES = {
+    Provider.PROVIDER_AWS: [
+        (AWSCostView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&group_by[service]=*"),
+        (AWSCostView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&filter[resolution]=daily"),
+        (AWSInstanceTypeView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&group_by[account]=*"),
+    ],
+    Provider.PROVIDER_AZURE: [
+        (AzureCostView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&group_by[service_name]=*"),
+        (AzureStorageView, "filter[time_scope_units]=month&filter[time_scope_value]=-1"),
+    ],
+    Provider.PROVIDER_OCP: [
+        (OCPCostView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&group_by[project]=*"),
+        (OCPCpuView, "filter[time_scope_units]=month&filter[time_scope_value]=-1&group_by[node]=*"),
+    ],
+}
+
+
+def get_month_bounds(start=None):
+    """Return the start of a month and the start of the next month."""
+    start = start or datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def generate_tags(tag_keys, tag_values):
+    """Return random tag values for about half of the tag keys."""
+    return {
+        f"key_{key}": f"value_{random.randrange(tag_values)}" for key in range(tag_keys) if random.random() < 0.5
+    }
+
+
+def generate_azure_report(file_path, rows, resources=1000, tag_keys=10, tag_values=20, start=None):
+    """Write a synthetic Azure cost export.
+
+    Args:
+        file_path (str): Where to write the report
+        rows (int): The number of line items to write
+        resources (int): The number of distinct resource instances
+        tag_keys (int): The number of distinct resource tag keys
+        tag_values (int): The number of distinct values per tag key
+        start (datetime): The start of the billing period
+
+    Returns:
+        (int): The size of the written file in bytes
+
+    """
+    start, end = get_month_bounds(start)
+    days = (end - start).days
+    subscription = "11111111-1111-1111-1111-111111111111"
+    locations = ["US East", "US West 2", "West Europe"]
+
+    with open(file_path, "w") as report:
+        writer = csv.writer(report)
+        writer.writerow(AZURE_COLUMNS)
+        for line in range(rows):
+            resource = line % resources
+            usage_date = start + timedelta(days=(line // resources) % days)
+            amount = random.random()
+            rate = round(random.uniform(0.01, 2.0), 4)
+            group = f"group_{resource % 20}"
+            writer.writerow(
+                [
+                    subscription,
+                    group,
+                    locations[resource % 3],
+                    usage_date.strftime("%Y-%m-%d"),
+                    "Virtual Machines",
+                    "Dv3 Series",
+                    f"{resource % 50:08d}-0000-0000-0000-000000000000",
+                    "D2 v3",
+                    "",
+                    amount,
+                    rate,
+                    amount * rate,
+                    "Microsoft.Compute",
+                    "Microsoft.Compute/virtualMachines",
+                    f"/subscriptions/{subscription}/resourceGroups/{group}/providers/"
+                    f"Microsoft.Compute/virtualMachines/vm-{resource}",
+                    json.dumps(generate_tags(tag_keys, tag_values)),
+                    "",
+                    json.dumps({"ServiceType": "Standard_D2_v3", "VCPUs": 2}),
+                    "",
+                    "",
+                    "Virtual Machines",
+                    "Dv3 Series",
+                    "USD",
+                ]
+            )
+    return os.path.getsize(file_path)
+
+
+def generate_ocp_reports(directory, rows, resources=1000, tag_keys=10, tag_values=20, start=None):
+    """Write synthetic OCP pod usage, storage and node label reports.
+
+    ``resources`` pods are spread over one node per ten pods, and every
+    tenth pod has a persistent volume claim.
+
+    Args:
+        directory (str): Where to write the reports
+        rows (int): The number of pod usage line items to write
+        resources (int): The number of distinct pods
+        tag_keys (int): The number of distinct label keys
+        tag_values (int): The number of distinct values per label key
+        start (datetime): The start of the report period
+
+    Returns:
+        (dict): The size of each written file in bytes keyed by file path
+
+    """
+    start, end = get_month_bounds(start)
+    hours = int((end - start).total_seconds() // 3600)
+    nodes = max(resources // 10, 1)
+    period = [start.strftime(OCP_TIME_FORMAT), end.strftime(OCP_TIME_FORMAT)]
+    paths = {
+        "pod_usage": os.path.join(directory, "benchmark_pod_usage.csv"),
+        "storage_usage": os.path.join(directory, "benchmark_storage_usage.csv"),
+        "node_labels": os.path.join(directory, "benchmark_node_labels.csv"),
+    }
+
+    def get_labels():
+        return "|".join(f"label_{key}:{value}" for key, value in generate_tags(tag_keys, tag_values).items())
+
+    with open(paths["pod_usage"], "w") as pod_file, open(paths["storage_usage"], "w") as storage_file:
+        pod_writer = csv.writer(pod_file)
+        pod_writer.writerow(CPU_MEM_USAGE_COLUMNS)
+        storage_writer = csv.writer(storage_file)
+        storage_writer.writerow(STORAGE_COLUMNS)
+        for line in range(rows):
+            pod = line % resources
+            hour = start + timedelta(hours=(line // resources) % hours)
+            interval = [hour.strftime(OCP_TIME_FORMAT), (hour + timedelta(hours=1)).strftime(OCP_TIME_FORMAT)]
+            cpu = random.uniform(0, 3600)
+            memory = random.uniform(0, 3600 * BYTES_PER_GIGABYTE)
+            pod_writer.writerow(
+                period
+                + [f"pod_{pod}", f"namespace_{pod % 100}", f"node_{pod % nodes}", f"i-{pod % nodes:08x}"]
+                + interval
+                + [cpu, 3600, 7200, memory, 3600 * BYTES_PER_GIGABYTE, 7200 * BYTES_PER_GIGABYTE]
+                + [4, 4 * 3600, 16 * BYTES_PER_GIGABYTE, 16 * 3600 * BYTES_PER_GIGABYTE, get_labels()]
+            )
+            if pod % 10 == 0:
+                storage_writer.writerow(
+                    period
+                    + interval
+                    + [f"namespace_{pod % 100}", f"pod_{pod}", f"claim_{pod}", f"pv_{pod}", "gp2"]
+                    + [10 * BYTES_PER_GIGABYTE, 10 * 3600 * BYTES_PER_GIGABYTE, 10 * 3600 * BYTES_PER_GIGABYTE]
+                    + [random.uniform(0, 10 * 3600 * BYTES_PER_GIGABYTE), get_labels(), get_labels()]
+                )
+
+    with open(paths["node_labels"], "w") as node_file:
+        node_writer = csv.writer(node_file)
+        node_writer.writerow(NODE_LABEL_COLUMNS)
+        for hour in range(min(hours, max(rows // resources, 1))):
+            interval_start = start + timedelta(hours=hour)
+            interval_end = interval_start + timedelta(hours=1)
+            interval = [interval_start.strftime(OCP_TIME_FORMAT), interval_end.strftime(OCP_TIME_FORMAT)]
+            for node in range(nodes):
+                node_writer.writerow(period + [f"node_{node}"] + interval + [get_labels()])
+
+    return {path: os.path.getsize(path) for path in paths.values()}
+
+
+def get_commit():
+    """Return the git commit of the running code, if it can be found."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class StageTimer:
+    """Record the wall time and peak process memory of benchmark stages.
+
+    Memory is read from the process's maximum resident set size, which does
+    not slow the stage down the way tracing every allocation would. The peak
+    never goes down, so a stage also records how much it raised the peak.
+    """
+
+    def __init__(self):
+        """Start with no recorded stages."""
+        self.stages = []
+
+    @staticmethod
+    def get_peak_memory():
+        """Return the peak resident set size of the process in bytes."""
+        # Linux reports the maximum resident set size in kilobytes
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def run(self, provider_type, stage, rows, function, *args, **kwargs):
+        """Run a stage and record its measurements.
+
+        Args:
+            provider_type (str): The provider type the stage ran for
+            stage (str): The stage name
+            rows (int): The number of rows the stage handled, used for throughput
+            function (callable): The stage to run
+
+        Returns:
+            (object): What the stage returned
+
+        """
+        peak_before = self.get_peak_memory()
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            peak_memory = self.get_peak_memory()
+        self.stages.append(
+            {
+                "provider_type": provider_type,
+                "stage": stage,
+                "rows": rows,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if rows and seconds else None,
+                "peak_memory_bytes": peak_memory,
+                "peak_memory_increase_bytes": peak_memory - peak_before,
+            }
+        )
+        LOG.info(
+            "%s %s: %s rows in %.2f seconds, peak memory %d bytes", provider_type, stage, rows, seconds, peak_memory
+        )
+        return result
+
+
+def compare_results(baseline, current):
+    """Compare the stage timings of two benchmark runs.
+
+    Args:
+        baseline (dict): The results of the earlier run
+        current (dict): The results of the later run
+
+    Returns:
+        (list): One dict per stage in both runs with the relative change in seconds and peak memory
+
+    """
+    baseline_stages = {(stage["provider_type"], stage["stage"]): stage for stage in baseline.get("stages", [])}
+    comparison = []
+    for stage in current.get("stages", []):
+        before = baseline_stages.get((stage["provider_type"], stage["stage"]))
+        if not before:
+            continue
+        comparison.append(
+            {
+                "provider_type": stage["provider_type"],
+                "stage": stage["stage"],
+                "baseline_seconds": before["seconds"],
+                "seconds": stage["seconds"],
+                "seconds_change": (stage["seconds"] - before["seconds"]) / before["seconds"]
+                if before["seconds"]
+                else None,
+                "baseline_peak_memory_bytes": before["peak_memory_bytes"],
+                "peak_memory_bytes": stage["peak_memory_bytes"],
+                "peak_memory_change": (stage["peak_memory_bytes"] - before["peak_memory_bytes"])
+                / before["peak_memory_bytes"]
+                if before["peak_memory_bytes"]
+                else None,
+            }
+        )
+    return comparison
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the ingest pipeline and report API."""
+
+    help = (
+        "Generate synthetic AWS, Azure and OCP reports and time processing them, summarizing them and "
+        "querying the report API, recording rows per second, wall time and peak process memory per stage. "
+        "Reports are processed into the given schema, so use a scratch tenant with one provider per type."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--schema", required=True, help="Tenant schema to process into")
+        parser.add_argument("--aws-provider-uuid", help="UUID of an existing AWS provider")
+        parser.add_argument("--azure-provider-uuid", help="UUID of an existing Azure provider")
+        parser.add_argument("--ocp-provider-uuid", help="UUID of an existing OCP provider")
+        parser.add_argument("--rows", type=int, default=100000, help="Number of line items to generate per report")
+        parser.add_argument("--resources", type=int, default=1000, help="Number of distinct resources")
+        parser.add_argument("--tag-keys", type=int, default=10, help="Number of distinct tag keys")
+        parser.add_argument("--tag-values", type=int, default=20, help="Number of distinct values per tag key")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, so runs generate the same reports")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+        parser.add_argument("--compare", help="Compare the results against an earlier JSON results file")
+
+    def handle(self, *args, **options):
+        """Run every stage for each given provider and print the results."""
+        providers = {
+            Provider.PROVIDER_AWS: options["aws_provider_uuid"],
+            Provider.PROVIDER_AZURE: options["azure_provider_uuid"],
+            Provider.PROVIDER_OCP: options["ocp_provider_uuid"],
+        }
+        providers = {provider_type: uuid for provider_type, uuid in providers.items() if uuid}
+        if not providers:
+            raise CommandError("At least one provider UUID is required.")
+
+        random.seed(options["seed"])
+        parameters = {
+            name: options[name] for name in ("schema", "rows", "resources", "tag_keys", "tag_values", "seed")
+        }
+        timer = StageTimer()
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for provider_type, provider_uuid in providers.items():
+                self.run_provider(timer, temp_dir, provider_type, provider_uuid, options)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        results = {"commit": get_commit(), "parameters": parameters, "stages": timer.stages}
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                results["comparison"] = compare_results(json.load(baseline_file), results)
+        if options["output"]:
+            with open(options["output"], "w") as output_file:
+                json.dump(results, output_file, indent=2)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_provider(self, timer, temp_dir, provider_type, provider_uuid, options):
+        """Generate, process, summarize and query the reports of one provider."""
+        schema = options["schema"]
+        rows = options["rows"]
+        generator_options = {
+            "resources": options["resources"],
+            "tag_keys": options["tag_keys"],
+            "tag_values": options["tag_values"],
+        }
+        start, end = get_month_bounds()
+
+        if provider_type == Provider.PROVIDER_AWS:
+            report = os.path.join(temp_dir, "benchmark_cur.csv.gz")
+            timer.run(provider_type, "generate", rows, generate_aws_cur, report, rows, **generator_options)
+            reports = [(report, GZIP_COMPRESSED, rows)]
+        elif provider_type == Provider.PROVIDER_AZURE:
+            report = os.path.join(temp_dir, "benchmark_azure.csv")
+            timer.run(provider_type, "generate", rows, generate_azure_report, report, rows, **generator_options)
+            reports = [(report, UNCOMPRESSED, rows)]
+        else:
+            sizes = timer.run(
+                provider_type, "generate", rows, generate_ocp_reports, temp_dir, rows, **generator_options
+            )
+            reports = []
+            for report in sizes:
+                with open(report) as report_file:
+                    reports.append((report, UNCOMPRESSED, sum(1 for _ in report_file) - 1))
+
+        for report, compression, report_rows in reports:
+            processor = ReportProcessor(
+                schema_name=schema,
+                report_path=report,
+                compression=compression,
+                provider=provider_type,
+                provider_uuid=provider_uuid,
+                manifest_id=None,
+            )
+            stage = "process"
+            if provider_type == Provider.PROVIDER_OCP:
+                stage = f"process_{os.path.basename(report)[len('benchmark_'):-len('.csv')]}"
+            timer.run(provider_type, stage, report_rows, processor.process)
+
+        updater = ReportSummaryUpdater(schema, provider_uuid)
+        timer.run(provider_type, "update_daily_tables", rows, updater.update_daily_tables, start, end)
+        timer.run(provider_type, "update_summary_tables", rows, updater.update_summary_tables, start, end)
+
+        factory = RequestFactory()
+        user = SimpleNamespace(access=None, customer=SimpleNamespace(schema_name=schema))
+        for view, query_string in REPORT_QUERIES[provider_type]:
+            request = factory.get(f"/{view.report}/?{query_string}")
+            request.user = user
+            params = QueryParameters(request=request, caller=view)
+            handler = view.query_handler(params)
+            timer.run(provider_type, f"query_{view.report}?{query_string}", None, handler.execute_query)
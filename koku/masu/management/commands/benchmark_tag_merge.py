@@ -0,0 +1,87 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark merging the tag keys and values of several sources in the tag API."""
+import json
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.tags.queries import TagQueryHandler
+
+LOG = logging.getLogger(__name__)
+
+
+class BenchmarkTagQueryHandler(TagQueryHandler):
+    """A tag query handler that only merges the rows it is given."""
+
+    def __init__(self):
+        """Skip the query parameters, which merging does not use."""
+        self.parameters = {"order_by": {"key": "asc"}}
+
+
+def generate_tag_rows(keys, values, offset=0):
+    """Return tag summary rows of keys with their values.
+
+    Args:
+        keys (int): The number of distinct tag keys
+        values (int): The number of values per tag key
+        offset (int): The first value of each key, so sources overlap partially
+
+    Returns:
+        (list): (key, values) tuples as returned by the tag summary query
+
+    """
+    return [(f"key_{key}", [f"value_{value}" for value in range(offset, offset + values)]) for key in range(keys)]
+
+
+class Command(BaseCommand):
+    """Django command to time the tag API merge."""
+
+    help = (
+        "Generate tag summary rows for several sources and time merging them into the tag API response. "
+        "No database access is needed."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--keys", type=int, default=50000, help="Number of distinct tag keys per source")
+        parser.add_argument("--values", type=int, default=20, help="Number of values per tag key")
+        parser.add_argument("--sources", type=int, default=3, help="Number of sources to merge")
+
+    def handle(self, *args, **options):
+        """Merge the generated sources, with and without a type, and print the timings."""
+        handler = BenchmarkTagQueryHandler()
+        sources = [
+            generate_tag_rows(options["keys"], options["values"], offset=source * options["values"] // 2)
+            for source in range(options["sources"])
+        ]
+        results = {"keys": options["keys"], "values": options["values"], "sources": options["sources"]}
+        for name, source_types in (("without_type", [None] * len(sources)), ("with_type", ["pod", "storage"])):
+            final_data = []
+            started = time.perf_counter()
+            for source, source_type in zip(sources, source_types * len(sources)):
+                converted = handler._convert_to_dict(source)
+                if source_type:
+                    handler.append_to_final_data_with_type(final_data, converted, {"type": source_type})
+                else:
+                    handler.append_to_final_data_without_type(final_data, converted)
+            handler.deduplicate_and_sort(final_data)
+            elapsed = time.perf_counter() - started
+            results[name] = {"seconds": elapsed, "tags": len(final_data)}
+            LOG.info("Merged %d tags %s in %.2f seconds", len(final_data), name, elapsed)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,128 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark full and single day AWS tag summaries on a generated month of high-cardinality tags."""
+import json
+import logging
+import time
+import uuid
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from tenant_schemas.utils import schema_context
+
+from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.management.commands.benchmark_suite import get_month_bounds
+from reporting.provider.aws.models import AWSCostEntryBill
+
+LOG = logging.getLogger(__name__)
+
+GENERATE_SQL = """
+    INSERT INTO reporting_awscostentrylineitem_daily (
+        cost_entry_bill_id, line_item_type, usage_account_id, usage_start, usage_end,
+        product_code, resource_id, currency_code, unblended_cost, tags
+    )
+    SELECT %(bill_id)s,
+        'Usage',
+        %(account)s,
+        day::date,
+        day::date,
+        'AmazonEC2',
+        'i-' || resource,
+        'USD',
+        random(),
+        (
+            SELECT jsonb_object_agg('key_' || key, 'value_' || floor(random() * %(tag_values)s)::int)
+            FROM generate_series(1, %(tag_keys)s) AS key
+            WHERE (key + resource) %% 2 = 0
+        )
+    FROM generate_series(%(start)s::date, %(end)s::date, '1 day') AS day
+    CROSS JOIN generate_series(1, %(resources)s) AS resource
+"""
+
+
+class Command(BaseCommand):
+    """Django command to compare full and single day tag summaries."""
+
+    help = (
+        "Generate a month of tagged AWS daily line items for a synthetic bill and time summarizing the tags of "
+        "the whole month against summarizing the tags of one day. The generated bill is removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        """Add the benchmark arguments."""
+        parser.add_argument("--schema", required=True, help="Tenant schema to generate rows in")
+        parser.add_argument("--provider-uuid", required=True, help="AWS provider to attach the generated bill to")
+        parser.add_argument("--resources", type=int, default=2000, help="Number of line item rows per day")
+        parser.add_argument("--tag-keys", type=int, default=2000, help="Number of distinct tag keys")
+        parser.add_argument("--tag-values", type=int, default=500, help="Number of distinct values per tag key")
+        parser.add_argument("--runs", type=int, default=3, help="Number of timed runs of each summary")
+
+    def handle(self, *args, **options):
+        """Time both summaries and print the results."""
+        schema = options["schema"]
+        start, end = get_month_bounds()
+        start, end = start.date(), (end - relativedelta(days=1)).date()
+        day = start + relativedelta(days=(end - start).days // 2)
+
+        with schema_context(schema):
+            bill = AWSCostEntryBill.objects.create(
+                bill_type="Anniversary",
+                payer_account_id=f"benchmark-{uuid.uuid4().hex[:30]}",
+                billing_period_start=start,
+                billing_period_end=end,
+                provider_id=options["provider_uuid"],
+            )
+            params = {
+                "bill_id": bill.id,
+                "account": bill.payer_account_id,
+                "start": start,
+                "end": end,
+                "resources": options["resources"],
+                "tag_keys": options["tag_keys"],
+                "tag_values": options["tag_values"],
+            }
+            with connection.cursor() as cursor:
+                cursor.execute(GENERATE_SQL, params)
+                rows = cursor.rowcount
+        try:
+            with AWSReportDBAccessor(schema) as accessor:
+                timings = {"full": [], "single_day": []}
+                for _ in range(options["runs"]):
+                    started = time.perf_counter()
+                    accessor.populate_tags_summary_table([bill.id])
+                    timings["full"].append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    accessor.populate_tags_summary_table([bill.id], day, day)
+                    timings["single_day"].append(time.perf_counter() - started)
+        finally:
+            with schema_context(schema):
+                bill.delete()
+
+        results = {
+            "rows": rows,
+            "tag_keys": options["tag_keys"],
+            "tag_values": options["tag_values"],
+            "runs": options["runs"],
+            "summaries": {},
+        }
+        for name, seconds in timings.items():
+            best = min(seconds)
+            results["summaries"][name] = {"best_seconds": best}
+            LOG.info("%s tag summary: %d rows in %.2f seconds", name, rows, best)
+        self.stdout.write(json.dumps(results, indent=2))
@@ -24,11 +24,12 @@ from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from masu.processor.report_processor import ReportProcessor
+from masu.prometheus_stats import REPORT_FILE_PROCESSING_LATENCY
 
 LOG = get_task_logger(__name__)
 
 
-def _process_report_file(schema_name, provider, provider_uuid, report_dict):
+def _process_report_file(schema_name, provider, provider_uuid, report_dict, line_items_deleted=False):
     """
     Task to process a Report.
 
@@ -36,7 +37,9 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
         schema_name   (String) db schema name
         provider      (String) provider type
         provider_uuid (String) provider uuid
-        report_dict   (dict) The report data dict from previous task
+        report_dict   (dict) The report data dict from previous task,
+                      the usage days written by the file are added as usage_dates
+        line_items_deleted (Boolean) The stale line items of the manifest were already deleted
 
     Returns:
         None
@@ -72,17 +75,19 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
         provider=provider,
         provider_uuid=provider_uuid,
         manifest_id=manifest_id,
+        line_items_deleted=line_items_deleted,
     )
 
-    processor.process()
+    with REPORT_FILE_PROCESSING_LATENCY.labels(provider_type=provider).time():
+        processor.process()
+    report_dict["usage_dates"] = processor.processed_usage_dates
     with ReportStatsDBAccessor(file_name, manifest_id) as stats_recorder:
         stats_recorder.log_last_completed_datetime()
 
     with ReportManifestDBAccessor() as manifest_accesor:
         manifest = manifest_accesor.get_manifest_by_id(manifest_id)
         if manifest:
-            manifest.num_processed_files += 1
-            manifest.save()
+            manifest_accesor.increment_processed_files(manifest_id)
             manifest_accesor.mark_manifest_as_updated(manifest)
         else:
             LOG.error("Unable to find manifest for ID: %s, file %s", manifest_id, file_name)
@@ -94,3 +99,28 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
         provider_accessor.setup_complete()
 
     return True
+
+
+def _delete_report_line_items(schema_name, provider, provider_uuid, report_dict):
+    """
+    Delete the stale line items of a report's manifest before its files are processed.
+
+    Args:
+        schema_name   (String) db schema name
+        provider      (String) provider type
+        provider_uuid (String) provider uuid
+        report_dict   (dict) A downloaded report file of the manifest
+
+    Returns:
+        (Boolean) Whether stale line items were deleted
+
+    """
+    processor = ReportProcessor(
+        schema_name=schema_name,
+        report_path=report_dict.get("file"),
+        compression=report_dict.get("compression"),
+        provider=provider,
+        provider_uuid=report_dict.get("provider_uuid", provider_uuid),
+        manifest_id=report_dict.get("manifest_id"),
+    )
+    return processor.delete_line_items()
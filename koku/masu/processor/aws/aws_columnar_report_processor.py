@@ -0,0 +1,187 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Columnar processor for Cost Usage Reports."""
+import json
+import logging
+from os import path
+from os import remove
+
+import pandas
+from django.conf import settings
+
+from masu.database import AWS_CUR_TABLE_MAP
+from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.processor.aws.aws_report_processor import AWSReportProcessor
+
+LOG = logging.getLogger(__name__)
+
+BILL_KEY_COLUMNS = ["bill/BillType", "bill/PayerAccountId", "bill/BillingPeriodStartDate"]
+COST_ENTRY_KEY_COLUMNS = BILL_KEY_COLUMNS + ["identity/TimeInterval"]
+PRODUCT_KEY_COLUMNS = ["product/sku", "product/ProductName", "product/region"]
+PRICING_KEY_COLUMNS = ["pricing/term", "pricing/unit"]
+RESERVATION_KEY_COLUMNS = ["reservation/ReservationARN", "lineItem/LineItemType"]
+DIMENSION_KEY_COLUMNS = (
+    COST_ENTRY_KEY_COLUMNS + PRODUCT_KEY_COLUMNS + PRICING_KEY_COLUMNS + RESERVATION_KEY_COLUMNS
+)
+
+
+class AWSColumnarReportProcessor(AWSReportProcessor):
+    """Cost Usage Report processor working on whole columns of a report chunk.
+
+    Each chunk of the file is read into a DataFrame. Dimension rows are
+    resolved once per distinct key and joined back onto the chunk, and the
+    line item columns are mapped, cleaned and copied to the database without
+    building a dictionary per row.
+    """
+
+    def process(self):
+        """Process CUR file.
+
+        Returns:
+            (None)
+
+        """
+        if not path.exists(self._report_path):
+            LOG.info(
+                "Skip processing for file: %s and schema: %s as it was not found on disk.",
+                self._report_name,
+                self._schema,
+            )
+            return False
+
+        row_count = 0
+        bill_id = None
+        is_finalized_data = self._check_for_finalized_bill()
+        is_full_month = self._should_process_full_month()
+        self._delete_line_items(AWSReportDBAccessor, is_finalized=is_finalized_data)
+        with AWSReportDBAccessor(self._schema) as report_db:
+            LOG.info("File %s opened for columnar processing", self._report_path)
+            for chunk in self._get_frame_reader():
+                # If this isn't an initial load and it isn't finalized data
+                # we should only process recent data.
+                if not (is_finalized_data or is_full_month):
+                    chunk = chunk[self._get_frame_date_mask(chunk["lineItem/UsageStartDate"], self.data_cutoff_date)]
+                if chunk.empty:
+                    continue
+                self._usage_date_values.update(chunk["lineItem/UsageStartDate"].str[:10].unique())
+
+                line_items = self._create_line_item_frame(chunk, report_db)
+                bill_id = line_items["cost_entry_bill_id"].iloc[-1]
+                LOG.debug(
+                    "Saving report rows %d to %d for %s", row_count, row_count + len(line_items), self._report_name
+                )
+                self._save_frame_to_db(line_items, AWS_CUR_TABLE_MAP["line_item"], report_db)
+                row_count += len(line_items)
+                self._update_mappings()
+
+            if is_finalized_data and bill_id is not None:
+                report_db.mark_bill_as_finalized(int(bill_id))
+
+        LOG.info("Completed report processing for file: %s and schema: %s", self._report_name, self._schema)
+
+        if not settings.DEVELOPMENT:
+            LOG.info("Removing processed file: %s", self._report_path)
+            remove(self._report_path)
+
+        return is_finalized_data
+
+    def _create_line_item_frame(self, chunk, report_db_accessor):
+        """Build the line item table rows for a chunk of the report.
+
+        Args:
+            chunk (DataFrame): A chunk of the report file
+            report_db_accessor (AWSReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (DataFrame): The line item rows keyed on the DB table's column names
+
+        """
+        key_columns = [column for column in DIMENSION_KEY_COLUMNS if column in chunk.columns]
+        self._create_dimension_objects(chunk.drop_duplicates(subset=key_columns).to_dict("records"), report_db_accessor)
+
+        def get_bill_id(row):
+            return self._create_cost_entry_bill(row, report_db_accessor)
+
+        def get_cost_entry_id(row):
+            return self._create_cost_entry(row, get_bill_id(row), report_db_accessor)
+
+        chunk = self._merge_dimension_ids(chunk, BILL_KEY_COLUMNS, "cost_entry_bill_id", get_bill_id)
+        chunk = self._merge_dimension_ids(chunk, COST_ENTRY_KEY_COLUMNS, "cost_entry_id", get_cost_entry_id)
+        chunk = self._merge_dimension_ids(
+            chunk,
+            PRODUCT_KEY_COLUMNS,
+            "cost_entry_product_id",
+            lambda row: self._create_cost_entry_product(row, report_db_accessor),
+        )
+        chunk = self._merge_dimension_ids(
+            chunk,
+            PRICING_KEY_COLUMNS,
+            "cost_entry_pricing_id",
+            lambda row: self._create_cost_entry_pricing(row, report_db_accessor),
+        )
+        chunk = self._merge_dimension_ids(
+            chunk,
+            RESERVATION_KEY_COLUMNS,
+            "cost_entry_reservation_id",
+            lambda row: self._create_cost_entry_reservation(row, report_db_accessor),
+        )
+
+        table_name = AWS_CUR_TABLE_MAP["line_item"]
+        line_items = self._get_frame_for_table(chunk, table_name)
+        line_items = self._clean_frame(line_items, self.report_schema.column_types[table_name])
+        line_items["tags"] = self._process_tags_frame(chunk)
+        for id_column in (
+            "cost_entry_id",
+            "cost_entry_bill_id",
+            "cost_entry_product_id",
+            "cost_entry_pricing_id",
+            "cost_entry_reservation_id",
+        ):
+            line_items[id_column] = chunk[id_column]
+
+        return line_items
+
+    @staticmethod
+    def _process_tags_frame(frame, tag_prefix="resourceTags"):
+        """Return a Series of JSON strings of AWS resource tags.
+
+        This is the columnar counterpart of _process_tags and produces the
+        same JSON text for every row.
+
+        Args:
+            frame (DataFrame): A chunk of the report file
+            tag_prefix (str): A specifier used to identify a value as a tag
+
+        Returns:
+            (Series): A JSON string of AWS resource tags for each row
+
+        """
+        key_columns = {}
+        for column in frame.columns:
+            key_value = column.split(":")
+            if tag_prefix in column and len(key_value) > 1:
+                key_columns.setdefault(key_value[-1], []).append(column)
+
+        tags = pandas.Series("", index=frame.index)
+        for key, columns in key_columns.items():
+            # Like the dict in _process_tags, a later non-empty column of the same key wins
+            values = frame[columns[0]]
+            for column in columns[1:]:
+                values = frame[column].where(frame[column] != "", values)
+            encoded = json.dumps(key) + ": " + values.map(json.dumps) + ", "
+            tags += encoded.where(values != "", "")
+        return "{" + tags.str[:-2] + "}"
@@ -37,6 +37,10 @@ from reporting_common import REPORT_COLUMN_MAP
 
 LOG = logging.getLogger(__name__)
 
+BILL_CONFLICT_COLUMNS = ["bill_type", "payer_account_id", "billing_period_start", "provider_id"]
+PRODUCT_CONFLICT_COLUMNS = ["sku", "product_name", "region"]
+RESERVATION_CONFLICT_COLUMNS = ["reservation_arn"]
+
 
 class ProcessedReport:
     """Cost usage report transcribed to our database models.
@@ -136,6 +140,8 @@ class AWSReportProcessor(ReportProcessorBase):
             with AWSReportDBAccessor(self._schema) as report_db:
                 LOG.info("File %s opened for processing", str(f))
                 reader = csv.DictReader(f)
+                bill_id = None
+                batch = []
                 for row in reader:
                     # If this isn't an initial load and it isn't finalized data
                     # we should only process recent data.
@@ -143,8 +149,11 @@ class AWSReportProcessor(ReportProcessorBase):
                         row, "lineItem/UsageStartDate", is_full_month, is_finalized=is_finalized_data
                     ):
                         continue
-                    bill_id = self.create_cost_entry_objects(row, report_db)
-                    if len(self.processed_report.line_items) >= self._batch_size:
+                    self._usage_date_values.add(row["lineItem/UsageStartDate"][:10])
+                    batch.append(row)
+                    if len(batch) >= self._batch_size:
+                        bill_id = self.create_cost_entry_objects_for_batch(batch, report_db)
+                        batch = []
                         LOG.debug(
                             "Saving report rows %d to %d for %s",
                             row_count,
@@ -156,6 +165,9 @@ class AWSReportProcessor(ReportProcessorBase):
                         row_count += len(self.processed_report.line_items)
                         self._update_mappings()
 
+                if batch:
+                    bill_id = self.create_cost_entry_objects_for_batch(batch, report_db)
+
                 if self.processed_report.line_items:
                     LOG.debug(
                         "Saving report rows %d to %d for %s",
@@ -178,6 +190,15 @@ class AWSReportProcessor(ReportProcessorBase):
 
         return is_finalized_data
 
+    def delete_line_items(self):
+        """Delete the stale line items of the manifest's bill before its report files are processed.
+
+        Returns:
+            (Boolean): Whether stale line items were deleted
+
+        """
+        return self._delete_line_items(AWSReportDBAccessor, is_finalized=self._check_for_finalized_bill())
+
     def _check_for_finalized_bill(self):
         """Read one line of the report file to check for finalization.
 
@@ -195,6 +216,7 @@ class AWSReportProcessor(ReportProcessorBase):
 
     def _update_mappings(self):
         """Update cache of database objects for reference."""
+        self.existing_bill_map.update(self.processed_report.bills)
         self.existing_cost_entry_map.update(self.processed_report.cost_entries)
         self.existing_product_map.update(self.processed_report.products)
         self.existing_pricing_map.update(self.processed_report.pricing)
@@ -261,6 +283,49 @@ class AWSReportProcessor(ReportProcessorBase):
         start, end = interval.split("/")
         return start, end
 
+    def _get_cost_entry_bill_key(self, row):
+        """Return the cache key for the bill of a row."""
+        start_date = row.get("bill/BillingPeriodStartDate")
+        bill_type = row.get("bill/BillType")
+        payer_account_id = row.get("bill/PayerAccountId")
+        return (bill_type, payer_account_id, start_date, self._provider_uuid)
+
+    def _get_cost_entry_bill_data(self, row):
+        """Return the bill table data for a row."""
+        data = self._get_data_for_table(row, AWSCostEntryBill._meta.db_table)
+        data["provider_id"] = self._provider_uuid
+        return data
+
+    def _get_cost_entry_key(self, row, bill_id):
+        """Return the cache key for the cost entry of a row."""
+        start, __ = self._get_cost_entry_time_interval(row.get("identity/TimeInterval"))
+        return (bill_id, start)
+
+    def _get_cost_entry_data(self, row, bill_id):
+        """Return the cost entry table data for a row."""
+        start, end = self._get_cost_entry_time_interval(row.get("identity/TimeInterval"))
+        return {"bill_id": bill_id, "interval_start": start, "interval_end": end}
+
+    @staticmethod
+    def _get_cost_entry_product_key(row):
+        """Return the cache key for the product of a row."""
+        return (row.get("product/sku"), row.get("product/ProductName"), row.get("product/region"))
+
+    @staticmethod
+    def _get_cost_entry_pricing_key(row):
+        """Return the cache key for the pricing of a row."""
+        term = row.get("pricing/term") if row.get("pricing/term") else "None"
+        unit = row.get("pricing/unit") if row.get("pricing/unit") else "None"
+        return f"{term}-{unit}"
+
+    def _get_dimension_data(self, row, table_name):
+        """Return the data for a dimension table or None if the row has none."""
+        data = self._get_data_for_table(row, table_name._meta.db_table)
+        value_set = set(data.values())
+        if value_set == {""}:
+            return None
+        return data
+
     def _create_cost_entry_bill(self, row, report_db_accessor):
         """Create a cost entry bill object.
 
@@ -272,23 +337,17 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWSCostEntryBill
-        start_date = row.get("bill/BillingPeriodStartDate")
-        bill_type = row.get("bill/BillType")
-        payer_account_id = row.get("bill/PayerAccountId")
-
-        key = (bill_type, payer_account_id, start_date, self._provider_uuid)
+        key = self._get_cost_entry_bill_key(row)
         if key in self.processed_report.bills:
             return self.processed_report.bills[key]
 
         if key in self.existing_bill_map:
             return self.existing_bill_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-
-        data["provider_id"] = self._provider_uuid
+        data = self._get_cost_entry_bill_data(row)
 
         bill_id = report_db_accessor.insert_on_conflict_do_nothing(
-            table_name, data, conflict_columns=["bill_type", "payer_account_id", "billing_period_start", "provider_id"]
+            table_name, data, conflict_columns=BILL_CONFLICT_COLUMNS
         )
 
         self.processed_report.bills[key] = bill_id
@@ -307,17 +366,14 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWSCostEntry
-        interval = row.get("identity/TimeInterval")
-        start, end = self._get_cost_entry_time_interval(interval)
-
-        key = (bill_id, start)
+        key = self._get_cost_entry_key(row, bill_id)
         if key in self.processed_report.cost_entries:
             return self.processed_report.cost_entries[key]
 
         if key in self.existing_cost_entry_map:
             return self.existing_cost_entry_map[key]
 
-        data = {"bill_id": bill_id, "interval_start": start, "interval_end": end}
+        data = self._get_cost_entry_data(row, bill_id)
 
         cost_entry_id = report_db_accessor.insert_on_conflict_do_nothing(table_name, data)
         self.processed_report.cost_entries[key] = cost_entry_id
@@ -368,20 +424,15 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWSCostEntryPricing
-
-        term = row.get("pricing/term") if row.get("pricing/term") else "None"
-        unit = row.get("pricing/unit") if row.get("pricing/unit") else "None"
-
-        key = f"{term}-{unit}"
+        key = self._get_cost_entry_pricing_key(row)
         if key in self.processed_report.pricing:
             return self.processed_report.pricing[key]
 
         if key in self.existing_pricing_map:
             return self.existing_pricing_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-        value_set = set(data.values())
-        if value_set == {""}:
+        data = self._get_dimension_data(row, table_name)
+        if data is None:
             return
 
         pricing_id = report_db_accessor.insert_on_conflict_do_nothing(table_name, data)
@@ -400,10 +451,7 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWSCostEntryProduct
-        sku = row.get("product/sku")
-        product_name = row.get("product/ProductName")
-        region = row.get("product/region")
-        key = (sku, product_name, region)
+        key = self._get_cost_entry_product_key(row)
 
         if key in self.processed_report.products:
             return self.processed_report.products[key]
@@ -411,12 +459,11 @@ class AWSReportProcessor(ReportProcessorBase):
         if key in self.existing_product_map:
             return self.existing_product_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-        value_set = set(data.values())
-        if value_set == {""}:
+        data = self._get_dimension_data(row, table_name)
+        if data is None:
             return
         product_id = report_db_accessor.insert_on_conflict_do_nothing(
-            table_name, data, conflict_columns=["sku", "product_name", "region"]
+            table_name, data, conflict_columns=PRODUCT_CONFLICT_COLUMNS
         )
         self.processed_report.products[key] = product_id
         return product_id
@@ -442,9 +489,8 @@ class AWSReportProcessor(ReportProcessorBase):
             reservation_id = self.existing_reservation_map[arn]
 
         if reservation_id is None or line_item_type == "rifee":
-            data = self._get_data_for_table(row, table_name._meta.db_table)
-            value_set = set(data.values())
-            if value_set == {""}:
+            data = self._get_dimension_data(row, table_name)
+            if data is None:
                 return
         else:
             return reservation_id
@@ -452,16 +498,104 @@ class AWSReportProcessor(ReportProcessorBase):
         # Special rows with additional reservation information
         if line_item_type == "rifee":
             reservation_id = report_db_accessor.insert_on_conflict_do_update(
-                table_name, data, conflict_columns=["reservation_arn"], set_columns=list(data.keys())
+                table_name, data, conflict_columns=RESERVATION_CONFLICT_COLUMNS, set_columns=list(data.keys())
             )
         else:
             reservation_id = report_db_accessor.insert_on_conflict_do_nothing(
-                table_name, data, conflict_columns=["reservation_arn"]
+                table_name, data, conflict_columns=RESERVATION_CONFLICT_COLUMNS
             )
         self.processed_report.reservations[arn] = reservation_id
 
         return reservation_id
 
+    def _create_dimension_objects(self, rows, report_db_accessor):
+        """Bulk create the bills, cost entries, products, pricing and reservations for a batch.
+
+        Args:
+            rows (list): The report rows in the current batch
+            report_db_accessor (AWSReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (None)
+
+        """
+        bills = self.processed_report.bills
+        self._create_dimension_rows(
+            rows,
+            AWSCostEntryBill,
+            self._get_cost_entry_bill_key,
+            self._get_cost_entry_bill_data,
+            bills,
+            self.existing_bill_map,
+            report_db_accessor,
+            conflict_columns=BILL_CONFLICT_COLUMNS,
+        )
+
+        def get_bill_id(row):
+            key = self._get_cost_entry_bill_key(row)
+            return bills[key] if key in bills else self.existing_bill_map[key]
+
+        self._create_dimension_rows(
+            rows,
+            AWSCostEntry,
+            lambda row: self._get_cost_entry_key(row, get_bill_id(row)),
+            lambda row: self._get_cost_entry_data(row, get_bill_id(row)),
+            self.processed_report.cost_entries,
+            self.existing_cost_entry_map,
+            report_db_accessor,
+        )
+        self._create_dimension_rows(
+            rows,
+            AWSCostEntryProduct,
+            self._get_cost_entry_product_key,
+            lambda row: self._get_dimension_data(row, AWSCostEntryProduct),
+            self.processed_report.products,
+            self.existing_product_map,
+            report_db_accessor,
+            conflict_columns=PRODUCT_CONFLICT_COLUMNS,
+        )
+        self._create_dimension_rows(
+            rows,
+            AWSCostEntryPricing,
+            self._get_cost_entry_pricing_key,
+            lambda row: self._get_dimension_data(row, AWSCostEntryPricing),
+            self.processed_report.pricing,
+            self.existing_pricing_map,
+            report_db_accessor,
+        )
+        # RIFee rows update the reservation they reference, so they are left
+        # to the per-row upsert in _create_cost_entry_reservation.
+        self._create_dimension_rows(
+            [row for row in rows if row.get("lineItem/LineItemType", "").lower() != "rifee"],
+            AWSCostEntryReservation,
+            lambda row: row.get("reservation/ReservationARN"),
+            lambda row: self._get_dimension_data(row, AWSCostEntryReservation),
+            self.processed_report.reservations,
+            self.existing_reservation_map,
+            report_db_accessor,
+            conflict_columns=RESERVATION_CONFLICT_COLUMNS,
+        )
+
+    def create_cost_entry_objects_for_batch(self, rows, report_db_accesor):
+        """Create the set of objects required for a batch of rows.
+
+        Dimension rows are created in bulk first, so the per-row object
+        creation only has to build the line items.
+
+        Args:
+            rows (list): The report rows in the current batch
+            report_db_accesor (AWSReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (str): The bill id of the last row in the batch
+
+        """
+        self._create_dimension_objects(rows, report_db_accesor)
+        bill_id = None
+        for row in rows:
+            bill_id = self.create_cost_entry_objects(row, report_db_accesor)
+        return bill_id
+
     def create_cost_entry_objects(self, row, report_db_accesor):
         """Create the set of objects required for a row of data."""
         bill_id = self._create_cost_entry_bill(row, report_db_accesor)
@@ -23,6 +23,7 @@ from tenant_schemas.utils import schema_context
 
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.external.date_accessor import DateAccessor
+from masu.prometheus_stats import run_summary_step
 from masu.util.aws.common import get_bills_from_provider
 from masu.util.common import date_range_pair
 
@@ -75,7 +76,7 @@ class AWSReportSummaryUpdater:
                     start,
                     end,
                 )
-                accessor.populate_line_item_daily_table(start, end, bill_ids)
+                run_summary_step(self._provider.type, accessor, "populate_line_item_daily_table", start, end, bill_ids)
 
         return start_date, end_date
 
@@ -112,8 +113,12 @@ class AWSReportSummaryUpdater:
                     start,
                     end,
                 )
-                accessor.populate_line_item_daily_summary_table(start, end, bill_ids)
-            accessor.populate_tags_summary_table(bill_ids)
+                run_summary_step(
+                    self._provider.type, accessor, "populate_line_item_daily_summary_table", start, end, bill_ids
+                )
+            run_summary_step(
+                self._provider.type, accessor, "populate_tags_summary_table", bill_ids, start_date, end_date
+            )
             for bill in bills:
                 if bill.summary_data_creation_datetime is None:
                     bill.summary_data_creation_datetime = self._date_accessor.today_with_timezone("UTC")
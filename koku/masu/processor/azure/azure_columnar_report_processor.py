@@ -0,0 +1,116 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Columnar processor for Azure Cost Usage Reports."""
+import logging
+from os import remove
+
+from django.conf import settings
+
+from masu.database import AZURE_REPORT_TABLE_MAP
+from masu.database.azure_report_db_accessor import AzureReportDBAccessor
+from masu.processor.azure.azure_report_processor import AzureReportProcessor
+
+LOG = logging.getLogger(__name__)
+
+BILL_KEY_COLUMNS = ["UsageDateTime"]
+PRODUCT_KEY_COLUMNS = ["InstanceId", "AdditionalInfo", "ServiceName", "ServiceTier"]
+METER_KEY_COLUMNS = ["MeterId"]
+DIMENSION_KEY_COLUMNS = BILL_KEY_COLUMNS + PRODUCT_KEY_COLUMNS + METER_KEY_COLUMNS
+
+
+class AzureColumnarReportProcessor(AzureReportProcessor):
+    """Azure cost report processor working on whole columns of a report chunk.
+
+    Each chunk of the file is read into a DataFrame. Bills, products and
+    meters are resolved once per distinct key and joined back onto the chunk,
+    and the line item columns are mapped, cleaned and copied to the database
+    without building a dictionary per row.
+    """
+
+    def process(self):
+        """Process cost/usage file.
+
+        Returns:
+            (None)
+
+        """
+        row_count = 0
+        is_full_month = self._should_process_full_month()
+        self._delete_line_items(AzureReportDBAccessor)
+        with AzureReportDBAccessor(self._schema) as report_db:
+            LOG.info("File %s opened for columnar processing", self._report_path)
+            for chunk in self._get_frame_reader(encoding="utf-8-sig"):
+                if not is_full_month:
+                    chunk = chunk[self._get_frame_date_mask(chunk["UsageDateTime"], self.data_cutoff_date)]
+                if chunk.empty:
+                    continue
+                self._usage_date_values.update(chunk["UsageDateTime"].unique())
+
+                line_items = self._create_line_item_frame(chunk, report_db)
+                LOG.info(
+                    "Saving report rows %d to %d for %s", row_count, row_count + len(line_items), self._report_name
+                )
+                self._save_frame_to_db(line_items, AZURE_REPORT_TABLE_MAP["line_item"], report_db)
+                row_count += len(line_items)
+                self._update_mappings()
+
+            LOG.info("Completed report processing for file: %s and schema: %s", self._report_name, self._schema)
+        if not settings.DEVELOPMENT:
+            LOG.info("Removing processed file: %s", self._report_path)
+            remove(self._report_path)
+
+        return True
+
+    def _create_line_item_frame(self, chunk, report_db_accessor):
+        """Build the line item table rows for a chunk of the report.
+
+        Args:
+            chunk (DataFrame): A chunk of the report file
+            report_db_accessor (AzureReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (DataFrame): The line item rows keyed on the DB table's column names
+
+        """
+        key_columns = [column for column in DIMENSION_KEY_COLUMNS if column in chunk.columns]
+        self._create_dimension_objects(chunk.drop_duplicates(subset=key_columns).to_dict("records"), report_db_accessor)
+
+        chunk = self._merge_dimension_ids(
+            chunk,
+            BILL_KEY_COLUMNS,
+            "cost_entry_bill_id",
+            lambda row: self._create_cost_entry_bill(row, report_db_accessor),
+        )
+        chunk = self._merge_dimension_ids(
+            chunk,
+            PRODUCT_KEY_COLUMNS,
+            "cost_entry_product_id",
+            lambda row: self._create_cost_entry_product(row, report_db_accessor),
+        )
+        chunk = self._merge_dimension_ids(
+            chunk, METER_KEY_COLUMNS, "meter_id", lambda row: self._create_meter(row, report_db_accessor)
+        )
+
+        table_name = self.table_name._meta.db_table
+        line_items = self._get_frame_for_table(chunk, table_name)
+        tags = line_items.pop("tags") if "tags" in line_items else ""
+        line_items = self._clean_frame(line_items, self.report_schema.column_types[table_name])
+        line_items["tags"] = tags
+        for id_column in ("cost_entry_bill_id", "cost_entry_product_id", "meter_id"):
+            line_items[id_column] = chunk[id_column]
+
+        return line_items
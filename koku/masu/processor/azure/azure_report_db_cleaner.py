@@ -19,7 +19,10 @@ import logging
 
 from tenant_schemas.utils import schema_context
 
+from masu.database import AZURE_REPORT_TABLE_MAP
 from masu.database.azure_report_db_accessor import AzureReportDBAccessor
+from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.partition_manager import PartitionManager
 
 LOG = logging.getLogger(__name__)
 
@@ -64,6 +67,12 @@ class AzureReportDBCleaner:
 
             if expired_date is not None:
                 bill_objects = accessor.get_bill_query_before_date(expired_date)
+                if not simulate:
+                    # Every provider's data before the expiration date is removed,
+                    # so whole expired months are dropped instead of deleted.
+                    table = AZURE_REPORT_TABLE_MAP["line_item"]
+                    dropped = PartitionManager(self._schema).drop_partitions_before(table, expired_date)
+                    LOG.info("Dropped expired partitions of %s: %s", table, dropped)
             else:
                 bill_objects = accessor.get_cost_entry_bills_query_by_provider(provider_uuid)
             with schema_context(self._schema):
@@ -95,4 +104,9 @@ class AzureReportDBCleaner:
                 if not simulate:
                     bill_objects.delete()
 
+        if provider_uuid is not None and not simulate:
+            with OCPReportDBAccessor(self._schema) as ocp_accessor:
+                del_count = ocp_accessor.delete_ocp_on_all_summary(source_uuid=provider_uuid)
+                LOG.info("Removing %s OCP-on-All summary items for provider uuid %s", del_count, provider_uuid)
+
         return removed_items
@@ -37,6 +37,10 @@ from reporting.provider.azure.models import AzureMeter
 
 LOG = logging.getLogger(__name__)
 
+BILL_CONFLICT_COLUMNS = ["billing_period_start", "provider_id"]
+PRODUCT_CONFLICT_COLUMNS = ["instance_id", "instance_type", "service_tier", "service_name"]
+METER_CONFLICT_COLUMNS = ["meter_id"]
+
 
 class ProcessedAzureReport:
     """Cost usage report transcribed to our database models.
@@ -105,6 +109,75 @@ class AzureReportProcessor(ReportProcessorBase):
         )
         LOG.info(stmt)
 
+    def _get_bill_dates(self, row):
+        """Return the UTC start and end of the billing period of a row."""
+        row_date = row.get("UsageDateTime")
+
+        report_date_range = utils.month_date_range(parser.parse(row_date))
+        start_date, end_date = report_date_range.split("-")
+
+        start_date_utc = parser.parse(start_date).replace(hour=0, minute=0, tzinfo=pytz.UTC)
+        end_date_utc = parser.parse(end_date).replace(hour=0, minute=0, tzinfo=pytz.UTC)
+        return start_date_utc, end_date_utc
+
+    def _get_cost_entry_bill_key(self, row):
+        """Return the cache key for the bill of a row."""
+        start_date_utc, __ = self._get_bill_dates(row)
+        return (start_date_utc, self._provider_uuid)
+
+    def _get_cost_entry_bill_data(self, row):
+        """Return the bill table data for a row."""
+        start_date_utc, end_date_utc = self._get_bill_dates(row)
+        data = self._get_data_for_table(row, AzureCostEntryBill._meta.db_table)
+
+        data["provider_id"] = self._provider_uuid
+        data["billing_period_start"] = datetime.strftime(start_date_utc, "%Y-%m-%d %H:%M%z")
+        data["billing_period_end"] = datetime.strftime(end_date_utc, "%Y-%m-%d %H:%M%z")
+        return data
+
+    @staticmethod
+    def _get_instance_type(row):
+        """Return the service type from the additional info of a row."""
+        additional_info = row.get("AdditionalInfo")
+        decoded_info = None
+        if additional_info:
+            decoded_info = json.loads(additional_info)
+        instance_type = None
+        if decoded_info:
+            instance_type = decoded_info.get("ServiceType", None)
+        return instance_type
+
+    def _get_cost_entry_product_key(self, row):
+        """Return the cache key for the product of a row."""
+        instance_id = row.get("InstanceId")
+        service_name = row.get("ServiceName")
+        service_tier = row.get("ServiceTier")
+        return (instance_id, self._get_instance_type(row), service_tier, service_name)
+
+    def _get_cost_entry_product_data(self, row):
+        """Return the product table data for a row or None if the row has none."""
+        data = self._get_data_for_table(row, AzureCostEntryProductService._meta.db_table)
+        value_set = set(data.values())
+        if value_set == {""}:
+            return None
+        data["instance_type"] = self._get_instance_type(row)
+        data["provider_id"] = self._provider_uuid
+        return data
+
+    @staticmethod
+    def _get_meter_key(row):
+        """Return the cache key for the meter of a row."""
+        return (row.get("MeterId"),)
+
+    def _get_meter_data(self, row):
+        """Return the meter table data for a row or None if the row has none."""
+        data = self._get_data_for_table(row, AzureMeter._meta.db_table)
+        value_set = set(data.values())
+        if value_set == {""}:
+            return None
+        data["provider_id"] = self._provider_uuid
+        return data
+
     def _create_cost_entry_bill(self, row, report_db_accessor):
         """Create a cost entry bill object.
 
@@ -116,29 +189,17 @@ class AzureReportProcessor(ReportProcessorBase):
 
         """
         table_name = AzureCostEntryBill
-        row_date = row.get("UsageDateTime")
-
-        report_date_range = utils.month_date_range(parser.parse(row_date))
-        start_date, end_date = report_date_range.split("-")
-
-        start_date_utc = parser.parse(start_date).replace(hour=0, minute=0, tzinfo=pytz.UTC)
-        end_date_utc = parser.parse(end_date).replace(hour=0, minute=0, tzinfo=pytz.UTC)
-
-        key = (start_date_utc, self._provider_uuid)
+        key = self._get_cost_entry_bill_key(row)
         if key in self.processed_report.bills:
             return self.processed_report.bills[key]
 
         if key in self.existing_bill_map:
             return self.existing_bill_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-
-        data["provider_id"] = self._provider_uuid
-        data["billing_period_start"] = datetime.strftime(start_date_utc, "%Y-%m-%d %H:%M%z")
-        data["billing_period_end"] = datetime.strftime(end_date_utc, "%Y-%m-%d %H:%M%z")
+        data = self._get_cost_entry_bill_data(row)
 
         bill_id = report_db_accessor.insert_on_conflict_do_nothing(
-            table_name, data, conflict_columns=["billing_period_start", "provider_id"]
+            table_name, data, conflict_columns=BILL_CONFLICT_COLUMNS
         )
 
         self.processed_report.bills[key] = bill_id
@@ -156,19 +217,7 @@ class AzureReportProcessor(ReportProcessorBase):
 
         """
         table_name = AzureCostEntryProductService
-        instance_id = row.get("InstanceId")
-        additional_info = row.get("AdditionalInfo")
-        service_name = row.get("ServiceName")
-        service_tier = row.get("ServiceTier")
-
-        decoded_info = None
-        if additional_info:
-            decoded_info = json.loads(additional_info)
-        instance_type = None
-        if decoded_info:
-            instance_type = decoded_info.get("ServiceType", None)
-
-        key = (instance_id, instance_type, service_tier, service_name)
+        key = self._get_cost_entry_product_key(row)
 
         if key in self.processed_report.products:
             return self.processed_report.products[key]
@@ -176,14 +225,11 @@ class AzureReportProcessor(ReportProcessorBase):
         if key in self.existing_product_map:
             return self.existing_product_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-        value_set = set(data.values())
-        if value_set == {""}:
+        data = self._get_cost_entry_product_data(row)
+        if data is None:
             return
-        data["instance_type"] = instance_type
-        data["provider_id"] = self._provider_uuid
         product_id = report_db_accessor.insert_on_conflict_do_nothing(
-            table_name, data, conflict_columns=["instance_id", "instance_type", "service_tier", "service_name"]
+            table_name, data, conflict_columns=PRODUCT_CONFLICT_COLUMNS
         )
         self.processed_report.products[key] = product_id
         return product_id
@@ -199,9 +245,7 @@ class AzureReportProcessor(ReportProcessorBase):
 
         """
         table_name = AzureMeter
-        meter_id = row.get("MeterId")
-
-        key = (meter_id,)
+        key = self._get_meter_key(row)
 
         if key in self.processed_report.meters:
             return self.processed_report.meters[key]
@@ -209,12 +253,12 @@ class AzureReportProcessor(ReportProcessorBase):
         if key in self.existing_meter_map:
             return self.existing_meter_map[key]
 
-        data = self._get_data_for_table(row, table_name._meta.db_table)
-        value_set = set(data.values())
-        if value_set == {""}:
+        data = self._get_meter_data(row)
+        if data is None:
             return
-        data["provider_id"] = self._provider_uuid
-        meter_id = report_db_accessor.insert_on_conflict_do_nothing(table_name, data, conflict_columns=["meter_id"])
+        meter_id = report_db_accessor.insert_on_conflict_do_nothing(
+            table_name, data, conflict_columns=METER_CONFLICT_COLUMNS
+        )
         self.processed_report.meters[key] = meter_id
         return meter_id
 
@@ -249,6 +293,68 @@ class AzureReportProcessor(ReportProcessorBase):
         if self.line_item_columns is None:
             self.line_item_columns = list(data.keys())
 
+    def _create_dimension_objects(self, rows, report_db_accessor):
+        """Bulk create the bills, products and meters for a batch.
+
+        Args:
+            rows (list): The report rows in the current batch
+            report_db_accessor (AzureReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (None)
+
+        """
+        self._create_dimension_rows(
+            rows,
+            AzureCostEntryBill,
+            self._get_cost_entry_bill_key,
+            self._get_cost_entry_bill_data,
+            self.processed_report.bills,
+            self.existing_bill_map,
+            report_db_accessor,
+            conflict_columns=BILL_CONFLICT_COLUMNS,
+        )
+        self._create_dimension_rows(
+            rows,
+            AzureCostEntryProductService,
+            self._get_cost_entry_product_key,
+            self._get_cost_entry_product_data,
+            self.processed_report.products,
+            self.existing_product_map,
+            report_db_accessor,
+            conflict_columns=PRODUCT_CONFLICT_COLUMNS,
+        )
+        self._create_dimension_rows(
+            rows,
+            AzureMeter,
+            self._get_meter_key,
+            self._get_meter_data,
+            self.processed_report.meters,
+            self.existing_meter_map,
+            report_db_accessor,
+            conflict_columns=METER_CONFLICT_COLUMNS,
+        )
+
+    def create_cost_entry_objects_for_batch(self, rows, report_db_accesor):
+        """Create the set of objects required for a batch of rows.
+
+        Dimension rows are created in bulk first, so the per-row object
+        creation only has to build the line items.
+
+        Args:
+            rows (list): The report rows in the current batch
+            report_db_accesor (AzureReportDBAccessor): The accessor used to insert
+
+        Returns:
+            (str): The bill id of the last row in the batch
+
+        """
+        self._create_dimension_objects(rows, report_db_accesor)
+        bill_id = None
+        for row in rows:
+            bill_id = self.create_cost_entry_objects(row, report_db_accesor)
+        return bill_id
+
     def create_cost_entry_objects(self, row, report_db_accesor):
         """Create the set of objects required for a row of data."""
         bill_id = self._create_cost_entry_bill(row, report_db_accesor)
@@ -259,6 +365,15 @@ class AzureReportProcessor(ReportProcessorBase):
 
         return bill_id
 
+    def delete_line_items(self):
+        """Delete the stale line items of the manifest's bill before its report files are processed.
+
+        Returns:
+            (Boolean): Whether stale line items were deleted
+
+        """
+        return self._delete_line_items(AzureReportDBAccessor)
+
     def process(self):
         """Process cost/usage file.
 
@@ -274,11 +389,15 @@ class AzureReportProcessor(ReportProcessorBase):
             with AzureReportDBAccessor(self._schema) as report_db:
                 LOG.info("File %s opened for processing", str(f))
                 reader = csv.DictReader(f)
+                batch = []
                 for row in reader:
                     if not self._should_process_row(row, "UsageDateTime", is_full_month):
                         continue
-                    self.create_cost_entry_objects(row, report_db)
-                    if len(self.processed_report.line_items) >= self._batch_size:
+                    self._usage_date_values.add(row["UsageDateTime"])
+                    batch.append(row)
+                    if len(batch) >= self._batch_size:
+                        self.create_cost_entry_objects_for_batch(batch, report_db)
+                        batch = []
                         LOG.info(
                             "Saving report rows %d to %d for %s",
                             row_count,
@@ -289,6 +408,9 @@ class AzureReportProcessor(ReportProcessorBase):
                         row_count += len(self.processed_report.line_items)
                         self._update_mappings()
 
+                if batch:
+                    self.create_cost_entry_objects_for_batch(batch, report_db)
+
                 if self.processed_report.line_items:
                     LOG.info(
                         "Saving report rows %d to %d for %s",
@@ -308,6 +430,7 @@ class AzureReportProcessor(ReportProcessorBase):
 
     def _update_mappings(self):
         """Update cache of database objects for reference."""
+        self.existing_bill_map.update(self.processed_report.bills)
         self.existing_product_map.update(self.processed_report.products)
         self.existing_meter_map.update(self.processed_report.meters)
 
@@ -23,6 +23,7 @@ from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.processor.aws.aws_cost_model_cost_updater import AWSCostModelCostUpdater
 from masu.processor.azure.azure_cost_model_cost_updater import AzureCostModelCostUpdater
 from masu.processor.ocp.ocp_cost_model_cost_updater import OCPCostModelCostUpdater
+from masu.prometheus_stats import COST_MODEL_COST_UPDATE_LATENCY
 
 LOG = logging.getLogger(__name__)
 
@@ -90,5 +91,6 @@ class CostModelCostUpdater:
 
         """
         if self._updater:
-            self._updater.update_summary_cost_model_costs(start_date, end_date)
+            with COST_MODEL_COST_UPDATE_LATENCY.labels(provider_type=self._provider.type).time():
+                self._updater.update_summary_cost_model_costs(start_date, end_date)
             invalidate_view_cache_for_tenant_and_source_type(self._schema, self._provider.type)
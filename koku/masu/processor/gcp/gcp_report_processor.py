@@ -1,8 +1,6 @@
 """Processor for GCP Cost Usage Reports."""
 import logging
-from collections import OrderedDict
 from datetime import datetime
-from numbers import Number
 from os import remove
 
 import pandas
@@ -18,9 +16,11 @@ from reporting.provider.gcp.models import GCPCostEntryBill
 from reporting.provider.gcp.models import GCPCostEntryLineItemDaily
 from reporting.provider.gcp.models import GCPProject
 
-
 LOG = logging.getLogger(__name__)
 
+# The line item fields that are added together when line items are consolidated
+NUMERIC_FIELDS = ("BigIntegerField", "IntegerField", "DecimalField", "FloatField")
+
 
 class ProcessedGCPReport:
     """Kept in memory object of report items."""
@@ -28,14 +28,12 @@ class ProcessedGCPReport:
     def __init__(self):
         """Initialize new cost entry containers."""
         self.line_items = []
-        self.unique_line_items = {}
         self.bills = {}
         self.projects = {}
 
     def remove_processed_rows(self):
         """Clear a batch of rows after they've been saved."""
         self.line_items = []
-        self.unique_line_items = {}
 
 
 class GCPReportProcessor(ReportProcessorBase):
@@ -69,8 +67,6 @@ class GCPReportProcessor(ReportProcessorBase):
 
         LOG.info("Initialized report processor for file: %s and schema: %s", report_path, self._schema)
 
-        self.line_item_columns = None
-
     def _get_or_create_cost_entry_bill(self, row, report_db_accessor):
         """Get or Create a GCP cost entry bill object.
 
@@ -132,45 +128,69 @@ class GCPReportProcessor(ReportProcessorBase):
         self.processed_report.projects[key] = project_id
         return project_id
 
-    def _create_cost_entry_line_item(self, row, bill_id, project_id, report_db_accessor):
-        """Create a cost entry line item object.
+    def _consolidate_line_items(self, line_items, numeric_columns):
+        """Consolidate the line items of a chunk that share a line item key.
+
+        Numeric columns of duplicate line items are added together and the
+        remaining columns keep their first value. Rows with a unique key, or
+        with a null key column, are left untouched, as they do not conflict
+        in the line item table either.
 
         Args:
-            row (OrderedDict): A dictionary representation of a CSV file row
-            bill_id (string): A monthly GCPCostEntryBill
-            project_id (string): A GCP Project
+            line_items (DataFrame): The line item rows of a report chunk
+            numeric_columns (list): The columns to add together
+
+        Returns:
+            (DataFrame): One line item row per key
 
         """
-        data = self._get_data_for_table(row, self.line_item_table_name)
-        data = report_db_accessor.clean_data(data, self.line_item_table_name)
+        key_columns = self.line_item_conflict_columns
+        duplicated = line_items.duplicated(subset=key_columns, keep=False)
+        # duplicated() matches null keys but groupby() drops them
+        duplicated &= line_items[key_columns].notna().all(axis=1)
+        if not duplicated.any():
+            return line_items
+
+        duplicates = line_items[duplicated].copy()
+        for column in numeric_columns:
+            duplicates[column] = pandas.to_numeric(duplicates[column], errors="coerce")
+        aggregations = {
+            column: "sum" if column in numeric_columns else "first"
+            for column in line_items.columns
+            if column not in key_columns
+        }
+        consolidated = duplicates.groupby(key_columns, sort=False, as_index=False).agg(aggregations)
+        return pandas.concat([line_items[~duplicated], consolidated[line_items.columns]], ignore_index=True)
 
-        data["cost_entry_bill_id"] = bill_id
-        data["project_id"] = project_id
+    def _create_line_item_frame(self, chunk, report_db_accessor):
+        """Build the line item table rows for a chunk of the report.
 
-        key = (project_id, data["start_time"], data["line_item_type"])
+        Args:
+            chunk (DataFrame): A chunk of the report file
+            report_db_accessor (GCPReportDBAccessor): The accessor used to insert
 
-        # If we've already seen the key in this report, we have a duplicate line item
-        # and should consolidate the two lines into one.
-        if key in self.processed_report.unique_line_items:
-            data = self._consolidate_line_items(self.processed_report.unique_line_items[key], data)
+        Returns:
+            (DataFrame): The line item rows keyed on the DB table's column names
 
-        self.processed_report.unique_line_items[key] = data
-        if self.line_item_columns is None:
-            self.line_item_columns = list(data.keys())
+        """
+        chunk = self._merge_dimension_ids(
+            chunk,
+            ["Start Time"],
+            "cost_entry_bill_id",
+            lambda row: self._get_or_create_cost_entry_bill(row, report_db_accessor),
+        )
+        chunk = self._merge_dimension_ids(
+            chunk, ["Project ID"], "project_id", lambda row: self._get_or_create_gcp_project(row, report_db_accessor)
+        )
 
-    def _consolidate_line_items(self, line1, line2):
-        """Given 2 line items consolidate them into one, by adding all numerical values together."""
-        ignored_keys = ["cost_entry_bill_id", "project_id"]
-        consolidated_line_item = {}
-        for key, value in line1.items():
-            consolidated_line_item[key] = value
+        column_types = report_db_accessor.report_schema.column_types[self.line_item_table_name]
+        line_items = self._get_frame_for_table(chunk, self.line_item_table_name)
+        line_items = self._clean_frame(line_items, column_types)
+        line_items["cost_entry_bill_id"] = chunk["cost_entry_bill_id"]
+        line_items["project_id"] = chunk["project_id"]
 
-            # If key is an id, ignore it during consolidation
-            if key in ignored_keys:
-                continue
-            if isinstance(value, Number):
-                consolidated_line_item[key] += line2[key]
-        return consolidated_line_item
+        numeric_columns = [column for column in line_items.columns if column_types.get(column) in NUMERIC_FIELDS]
+        return self._consolidate_line_items(line_items, numeric_columns)
 
     @property
     def line_item_conflict_columns(self):
@@ -181,49 +201,26 @@ class GCPReportProcessor(ReportProcessorBase):
         """Process GCP billing file."""
         row_count = 0
 
-        # Read the csv in batched chunks.
-        report_csv = pandas.read_csv(self._report_path, chunksize=self._batch_size, compression="infer")
-
         with GCPReportDBAccessor(self._schema) as report_db:
+            # Create a temp table for the line items, and merge each chunk from it into the line item table.
+            # This is faster than django's bulk_create.
+            temp_table = report_db.create_temp_table(self.line_item_table_name, drop_column="id")
 
-            for chunk in report_csv:
-
-                # Group the information in the csv by the start time and the project id
-                report_groups = chunk.groupby(by=["Start Time", "Project ID"])
-                for group, rows in report_groups:
-
-                    # Each row in the group contains information that we'll need to create the bill
-                    # and the project. Just get the first row to pull this information.
-                    first_row = OrderedDict(zip(rows.columns.tolist(), rows.iloc[0].tolist()))
-
-                    bill_id = self._get_or_create_cost_entry_bill(first_row, report_db)
-
-                    project_id = self._get_or_create_gcp_project(first_row, report_db)
-
-                    for row in rows.values:
-                        processed_row = OrderedDict(zip(rows.columns.tolist(), row.tolist()))
-                        self._create_cost_entry_line_item(processed_row, bill_id, project_id, report_db)
+            # Read the csv in batched chunks.
+            for chunk in self._get_frame_reader():
+                if chunk.empty:
+                    continue
+                self._usage_date_values.update(chunk["Start Time"].unique())
 
+                line_items = self._create_line_item_frame(chunk, report_db)
                 LOG.info(
-                    "Saving report rows %d to %d for %s",
-                    row_count,
-                    row_count + len(self.processed_report.unique_line_items),
-                    self._report_name,
+                    "Saving report rows %d to %d for %s", row_count, row_count + len(line_items), self._report_name
                 )
-
-                # Create a temp table with all the line items, and merge the temp table to the line item table.
-                # This is faster than django's bulk_create.
-                temp_table = report_db.create_temp_table(self.line_item_table_name, drop_column="id")
-
-                # Have to put values into line_items because the parent class needs it to _save_to_db
-                self.processed_report.line_items = list(self.processed_report.unique_line_items.values())
-                self._save_to_db(temp_table, report_db)
+                self._save_frame_to_db(line_items, temp_table, report_db)
                 report_db.merge_temp_table(
-                    self.line_item_table_name, temp_table, self.line_item_columns, self.line_item_conflict_columns
+                    self.line_item_table_name, temp_table, list(line_items.columns), self.line_item_conflict_columns
                 )
-
-                row_count += len(self.processed_report.line_items)
-                self.processed_report.remove_processed_rows()
+                row_count += len(line_items)
 
             LOG.info("Completed report processing for file: %s and schema: %s", self._report_name, self._schema)
 
@@ -29,6 +29,7 @@ from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.processor.ocp.ocp_cloud_updater_base import OCPCloudUpdaterBase
 from masu.processor.ocp.ocp_cost_model_cost_updater import OCPCostModelCostUpdater
+from masu.prometheus_stats import run_summary_step
 from masu.util.aws.common import get_bills_from_provider as aws_get_bills_from_provider
 from masu.util.azure.common import get_bills_from_provider as azure_get_bills_from_provider
 from masu.util.common import date_range_pair
@@ -109,13 +110,41 @@ class OCPCloudReportSummaryUpdater(OCPCloudUpdaterBase):
                     cluster_id,
                     str(aws_bill_ids),
                 )
-                accessor.populate_ocp_on_aws_cost_daily_summary(start, end, cluster_id, aws_bill_ids, markup_value)
-            accessor.populate_ocp_on_aws_tags_summary_table()
+                run_summary_step(
+                    Provider.OCP_AWS,
+                    accessor,
+                    "populate_ocp_on_aws_cost_daily_summary",
+                    start,
+                    end,
+                    cluster_id,
+                    aws_bill_ids,
+                    markup_value,
+                )
+            run_summary_step(
+                Provider.OCP_AWS,
+                accessor,
+                "populate_ocp_on_aws_tags_summary_table",
+                aws_bill_ids,
+                start_date,
+                end_date,
+            )
 
         with OCPReportDBAccessor(self._schema) as accessor:
+            run_summary_step(
+                Provider.OCP_AWS,
+                accessor,
+                "populate_ocp_on_all_daily_summary",
+                Provider.PROVIDER_AWS,
+                aws_provider_uuid,
+                start_date,
+                end_date,
+                cluster_id,
+            )
             # This call just sends the infrastructure cost to the
             # OCP usage daily summary table
-            accessor.update_summary_infrastructure_cost(cluster_id, start_date, end_date)
+            run_summary_step(
+                Provider.OCP_AWS, accessor, "update_summary_infrastructure_cost", cluster_id, start_date, end_date
+            )
 
     def update_azure_summary_tables(self, openshift_provider_uuid, azure_provider_uuid, start_date, end_date):
         """Update operations specifically for OpenShift on Azure."""
@@ -148,10 +177,38 @@ class OCPCloudReportSummaryUpdater(OCPCloudUpdaterBase):
                     cluster_id,
                     str(azure_bill_ids),
                 )
-                accessor.populate_ocp_on_azure_cost_daily_summary(start, end, cluster_id, azure_bill_ids, markup_value)
-            accessor.populate_ocp_on_azure_tags_summary_table()
+                run_summary_step(
+                    Provider.OCP_AZURE,
+                    accessor,
+                    "populate_ocp_on_azure_cost_daily_summary",
+                    start,
+                    end,
+                    cluster_id,
+                    azure_bill_ids,
+                    markup_value,
+                )
+            run_summary_step(
+                Provider.OCP_AZURE,
+                accessor,
+                "populate_ocp_on_azure_tags_summary_table",
+                azure_bill_ids,
+                start_date,
+                end_date,
+            )
 
         with OCPReportDBAccessor(self._schema) as accessor:
+            run_summary_step(
+                Provider.OCP_AZURE,
+                accessor,
+                "populate_ocp_on_all_daily_summary",
+                Provider.PROVIDER_AZURE,
+                azure_provider_uuid,
+                start_date,
+                end_date,
+                cluster_id,
+            )
             # This call just sends the infrastructure cost to the
             # OCP usage daily summary table
-            accessor.update_summary_infrastructure_cost(cluster_id, start_date, end_date)
+            run_summary_step(
+                Provider.OCP_AZURE, accessor, "update_summary_infrastructure_cost", cluster_id, start_date, end_date
+            )
@@ -15,6 +15,7 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Updates report summary tables in the database with charge information."""
+import copy
 import logging
 from decimal import Decimal
 
@@ -24,6 +25,7 @@ from tenant_schemas.utils import schema_context
 from api.metrics import constants as metric_constants
 from masu.database.cost_model_db_accessor import CostModelDBAccessor
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.ocp_report_db_accessor import USAGE_RATE_COLUMNS
 from masu.external.date_accessor import DateAccessor
 from masu.processor.ocp.ocp_cloud_updater_base import OCPCloudUpdaterBase
 from masu.util.ocp.common import get_cluster_alias_from_cluster_id
@@ -53,13 +55,12 @@ class OCPCostModelCostUpdater(OCPCloudUpdaterBase):
         with CostModelDBAccessor(self._schema, self._provider_uuid) as cost_model_accessor:
             self._infra_rates = cost_model_accessor.infrastructure_rates
             self._supplementary_rates = cost_model_accessor.supplementary_rates
+            self._tiered_infra_rates = cost_model_accessor.tiered_infrastructure_rates
+            self._tiered_supplementary_rates = cost_model_accessor.tiered_supplementary_rates
 
     @staticmethod
     def _normalize_tier(input_tier):
-        """Normalize a tier for tiered rate calculations.
-
-        NOTE: Tiered rates are not currently supported.
-        """
+        """Normalize a tier for tiered rate calculations."""
         # Pull out the parts for beginning, middle, and end for validation and ordering correction.
         first_tier = [t for t in input_tier if not t.get("usage", {}).get("usage_start")]
         last_tier = [t for t in input_tier if not t.get("usage", {}).get("usage_end")]
@@ -211,12 +212,60 @@ class OCPCostModelCostUpdater(OCPCloudUpdaterBase):
         except OCPCostModelCostUpdaterError as error:
             LOG.error("Unable to update monthly costs. Error: %s", str(error))
 
+    def _get_tiers(self, tiered_rates):
+        """Return the tiers of a rate in ascending order with decimal bounds and values."""
+        tiers = []
+        for tier in self._normalize_tier(copy.deepcopy(tiered_rates)):
+            usage = tier.get("usage", {})
+            tiers.append(
+                {
+                    "usage_start": Decimal(usage.get("usage_start") or 0),
+                    "usage_end": Decimal(usage.get("usage_end")) if usage.get("usage_end") else None,
+                    "value": Decimal(tier.get("value")),
+                }
+            )
+        return tiers
+
     def _update_usage_costs(self, start_date, end_date):
-        """Update infrastructure and supplementary usage costs."""
+        """Update infrastructure and supplementary usage costs.
+
+        Flat rates are applied row by row in a single update. Tiered usage
+        rates are then added on top, with the tier of each row decided by
+        the cluster's cumulative usage in the month.
+        """
+        usage_tiers = {}
+        for rate_type, rates in (
+            (metric_constants.INFRASTRUCTURE_COST_TYPE, self._tiered_infra_rates),
+            (metric_constants.SUPPLEMENTARY_COST_TYPE, self._tiered_supplementary_rates),
+        ):
+            for metric, tiers in rates.items():
+                if metric not in USAGE_RATE_COLUMNS:
+                    continue
+                try:
+                    usage_tiers[(rate_type, metric)] = self._get_tiers(tiers)
+                except OCPCostModelCostUpdaterError as error:
+                    LOG.error("Using the first tier of %s rate %s. Error: %s", rate_type, metric, str(error))
+
+        infra_rates = {
+            metric: rate
+            for metric, rate in self._infra_rates.items()
+            if (metric_constants.INFRASTRUCTURE_COST_TYPE, metric) not in usage_tiers
+        }
+        supplementary_rates = {
+            metric: rate
+            for metric, rate in self._supplementary_rates.items()
+            if (metric_constants.SUPPLEMENTARY_COST_TYPE, metric) not in usage_tiers
+        }
+
         with OCPReportDBAccessor(self._schema) as report_accessor:
             report_accessor.populate_usage_costs(
-                self._infra_rates, self._supplementary_rates, start_date, end_date, self._cluster_id
+                infra_rates, supplementary_rates, start_date, end_date, self._cluster_id
             )
+            for (rate_type, metric), tiers in usage_tiers.items():
+                LOG.info("Updating tiered %s %s usage cost for cluster %s.", rate_type, metric, self._cluster_id)
+                report_accessor.populate_tiered_usage_cost(
+                    rate_type, metric, tiers, start_date, end_date, self._cluster_id
+                )
 
     def update_summary_cost_model_costs(self, start_date, end_date):
         """Update the OCP summary table with the charge information.
@@ -20,7 +20,9 @@ from datetime import datetime
 
 from tenant_schemas.utils import schema_context
 
+from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.partition_manager import PartitionManager
 
 LOG = logging.getLogger(__name__)
 
@@ -107,6 +109,16 @@ class OCPReportDBCleaner:
 
             if expired_date is not None:
                 usage_period_objs = accessor.get_usage_period_on_or_before_date(expired_date)
+                if not simulate:
+                    # Every provider's data before the expiration date is removed,
+                    # so whole expired months are dropped instead of deleted.
+                    partition_manager = PartitionManager(self._schema)
+                    for table in (
+                        OCP_REPORT_TABLE_MAP["line_item_daily"],
+                        OCP_REPORT_TABLE_MAP["storage_line_item_daily"],
+                    ):
+                        dropped = partition_manager.drop_partitions_before(table, expired_date)
+                        LOG.info("Dropped expired partitions of %s: %s", table, dropped)
             else:
                 usage_period_objs = accessor.get_usage_period_query_by_provider(provider_uuid)
             with schema_context(self._schema):
@@ -149,6 +161,9 @@ class OCPReportDBCleaner:
                         qty = accessor.get_ocp_aws_project_summary_query_for_cluster_id(cluster_id).delete()
                         LOG.info("Removing %s OCP-on-AWS project summary items for cluster id %s", qty, cluster_id)
 
+                        qty = accessor.delete_ocp_on_all_summary(cluster_id=cluster_id)
+                        LOG.info("Removing %s OCP-on-All summary items for cluster id %s", qty, cluster_id)
+
                     LOG.info(
                         "Report data removed for usage period ID: %s with interval start: %s",
                         report_period_id,
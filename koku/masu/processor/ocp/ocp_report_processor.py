@@ -90,6 +90,15 @@ class OCPReportProcessor:
         """Process report file."""
         return self._processor.process()
 
+    @property
+    def processed_usage_dates(self):
+        """Return the usage days of the rows written by the report type processor."""
+        return self._processor.processed_usage_dates
+
+    def delete_line_items(self):
+        """Delete the stale line items of the report type processor."""
+        return self._processor.delete_line_items()
+
     def remove_temp_cur_files(self, report_path):
         """Process temporary files."""
         return self._processor.remove_temp_cur_files(report_path)
@@ -236,6 +245,7 @@ class OCPReportProcessorBase(ReportProcessorBase):
                 LOG.info(f"File '{self._report_path}' opened for processing")
                 reader = csv.DictReader(f)
                 for row in reader:
+                    self._usage_date_values.add(row["interval_start"][:10])
                     report_period_id = self._create_report_period(row, self._cluster_id, report_db)
                     report_id = self._create_report(row, report_period_id, report_db)
 
@@ -22,6 +22,7 @@ from tenant_schemas.utils import schema_context
 
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.external.date_accessor import DateAccessor
+from masu.prometheus_stats import run_summary_step
 from masu.util.common import date_range_pair
 from masu.util.ocp.common import get_cluster_id_from_provider
 
@@ -67,9 +68,25 @@ class OCPReportSummaryUpdater:
                 end,
             )
             with OCPReportDBAccessor(self._schema) as accessor:
-                accessor.populate_node_label_line_item_daily_table(start, end, self._cluster_id)
-                accessor.populate_line_item_daily_table(start, end, self._cluster_id)
-                accessor.populate_storage_line_item_daily_table(start, end, self._cluster_id)
+                run_summary_step(
+                    self._provider.type,
+                    accessor,
+                    "populate_node_label_line_item_daily_table",
+                    start,
+                    end,
+                    self._cluster_id,
+                )
+                run_summary_step(
+                    self._provider.type, accessor, "populate_line_item_daily_table", start, end, self._cluster_id
+                )
+                run_summary_step(
+                    self._provider.type,
+                    accessor,
+                    "populate_storage_line_item_daily_table",
+                    start,
+                    end,
+                    self._cluster_id,
+                )
 
         return start_date, end_date
 
@@ -101,10 +118,24 @@ class OCPReportSummaryUpdater:
                     start,
                     end,
                 )
-                accessor.populate_line_item_daily_summary_table(start, end, self._cluster_id)
-                accessor.populate_storage_line_item_daily_summary_table(start, end, self._cluster_id)
-            accessor.populate_pod_label_summary_table(report_period_ids)
-            accessor.populate_volume_label_summary_table(report_period_ids)
+                run_summary_step(
+                    self._provider.type,
+                    accessor,
+                    "populate_line_item_daily_summary_table",
+                    start,
+                    end,
+                    self._cluster_id,
+                )
+                run_summary_step(
+                    self._provider.type,
+                    accessor,
+                    "populate_storage_line_item_daily_summary_table",
+                    start,
+                    end,
+                    self._cluster_id,
+                )
+            run_summary_step(self._provider.type, accessor, "populate_pod_label_summary_table", report_period_ids)
+            run_summary_step(self._provider.type, accessor, "populate_volume_label_summary_table", report_period_ids)
 
             for period in report_periods:
                 if period.summary_data_creation_datetime is None:
@@ -22,7 +22,10 @@ from django.db import OperationalError
 from psycopg2 import InterfaceError
 
 from api.models import Provider
+from masu.config import Config
+from masu.processor.aws.aws_columnar_report_processor import AWSColumnarReportProcessor
 from masu.processor.aws.aws_report_processor import AWSReportProcessor
+from masu.processor.azure.azure_columnar_report_processor import AzureColumnarReportProcessor
 from masu.processor.azure.azure_report_processor import AzureReportProcessor
 from masu.processor.gcp.gcp_report_processor import GCPReportProcessor
 from masu.processor.ocp.ocp_report_processor import OCPReportProcessor
@@ -42,14 +45,22 @@ class ReportProcessorDBError(Exception):
 class ReportProcessor:
     """Interface for masu to use to processor CUR."""
 
-    def __init__(self, schema_name, report_path, compression, provider, provider_uuid, manifest_id):
-        """Set the processor based on the data provider."""
+    def __init__(
+        self, schema_name, report_path, compression, provider, provider_uuid, manifest_id, line_items_deleted=False
+    ):
+        """Set the processor based on the data provider.
+
+        Args:
+            line_items_deleted (Boolean): The stale line items of the manifest were already deleted
+
+        """
         self.schema_name = schema_name
         self.report_path = report_path
         self.compression = compression
         self.provider_type = provider
         self.provider_uuid = provider_uuid
         self.manifest_id = manifest_id
+        self.line_items_deleted = line_items_deleted
         try:
             self._processor = self._set_processor()
         except Exception as err:
@@ -71,23 +82,30 @@ class ReportProcessor:
             (Object) : Provider-specific report processor
 
         """
+        columnar = self.provider_type in Config.COLUMNAR_PROCESSING_PROVIDERS
         if self.provider_type in (Provider.PROVIDER_AWS, Provider.PROVIDER_AWS_LOCAL):
-            return AWSReportProcessor(
+            processor_class = AWSColumnarReportProcessor if columnar else AWSReportProcessor
+            processor = processor_class(
                 schema_name=self.schema_name,
                 report_path=self.report_path,
                 compression=self.compression,
                 provider_uuid=self.provider_uuid,
                 manifest_id=self.manifest_id,
             )
+            processor.line_items_deleted = self.line_items_deleted
+            return processor
 
         if self.provider_type in (Provider.PROVIDER_AZURE, Provider.PROVIDER_AZURE_LOCAL):
-            return AzureReportProcessor(
+            processor_class = AzureColumnarReportProcessor if columnar else AzureReportProcessor
+            processor = processor_class(
                 schema_name=self.schema_name,
                 report_path=self.report_path,
                 compression=self.compression,
                 provider_uuid=self.provider_uuid,
                 manifest_id=self.manifest_id,
             )
+            processor.line_items_deleted = self.line_items_deleted
+            return processor
 
         if self.provider_type in (Provider.PROVIDER_OCP,):
             return OCPReportProcessor(
@@ -123,6 +141,29 @@ class ReportProcessor:
         except Exception as err:
             raise ReportProcessorError(str(err))
 
+    def delete_line_items(self):
+        """
+        Delete the stale line items of the report's manifest before its files are processed.
+
+        Args:
+            None
+
+        Returns:
+            (Boolean) Whether stale line items were deleted.
+
+        """
+        try:
+            return self._processor.delete_line_items()
+        except (InterfaceError, DjangoInterfaceError, OperationalError) as err:
+            raise ReportProcessorDBError(str(err))
+        except Exception as err:
+            raise ReportProcessorError(str(err))
+
+    @property
+    def processed_usage_dates(self):
+        """Return the usage days, as YYYY-MM-DD strings, written by the last processed report."""
+        return self._processor.processed_usage_dates
+
     def remove_processed_files(self, path):
         """
         Remove temporary cost usage report files..
@@ -21,10 +21,14 @@ import io
 import logging
 
 import ciso8601
+import pandas
+from dateutil import parser
 from dateutil.relativedelta import relativedelta
 from tenant_schemas.utils import schema_context
 
 from api.models import Provider
+from masu.database.partition_manager import PARTITIONED_TABLES
+from masu.database.partition_manager import PartitionManager
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.exceptions import MasuProcessingError
@@ -64,6 +68,14 @@ class ReportProcessorBase:
         self._manifest_id = manifest_id
         self.processed_report = processed_report
         self.date_accessor = DateAccessor()
+        self._usage_date_values = set()
+        # Set when the stale line items of the manifest were deleted before its files were processed
+        self.line_items_deleted = False
+
+    @property
+    def processed_usage_dates(self):
+        """Return the usage days, as sorted YYYY-MM-DD strings, of the rows written to the database."""
+        return sorted({parser.parse(value).date().isoformat() for value in self._usage_date_values})
 
     @property
     def data_cutoff_date(self):
@@ -90,6 +102,48 @@ class ReportProcessorBase:
         result = {column_map[key]: value for key, value in row.items() if key in column_map}
         return result
 
+    @staticmethod
+    def _create_dimension_rows(
+        rows, table, key_func, data_func, processed_map, existing_map, report_db_accessor, conflict_columns=None
+    ):
+        """Bulk insert the dimension rows referenced by a batch of report rows.
+
+        The distinct keys that are not already cached are inserted with a
+        single statement and their ids are stored in processed_map, so the
+        per-row object creation for the batch never has to hit the database.
+
+        Args:
+            rows (list): The report rows in the current batch
+            table (DjangoModel): The dimension table to insert into
+            key_func (function): Returns the cache key for a row
+            data_func (function): Returns the table data for a row or None to skip it
+            processed_map (dict): The batch cache of key to id
+            existing_map (dict): The cache of key to id for rows already in the database
+            report_db_accessor (ReportDBAccessorBase): The accessor used to insert
+            conflict_columns (list): A list of columns to check conflict on
+
+        Returns:
+            (None)
+
+        """
+        new_rows = {}
+        for row in rows:
+            key = key_func(row)
+            if key in new_rows or key in processed_map or key in existing_map:
+                continue
+            data = data_func(row)
+            if data is None:
+                continue
+            new_rows[key] = data
+
+        if not new_rows:
+            return
+
+        ids = report_db_accessor.bulk_insert_on_conflict_do_nothing(
+            table, list(new_rows.values()), conflict_columns=conflict_columns
+        )
+        processed_map.update(zip(new_rows.keys(), ids))
+
     @staticmethod
     def _get_file_opener(compression):
         """Get the file opener for the file's compression.
@@ -124,6 +178,129 @@ class ReportProcessorBase:
 
         report_db_accessor.bulk_insert_rows(csv_file, temp_table, columns)
 
+    def _get_frame_reader(self, **kwargs):
+        """Return an iterator of DataFrame chunks of the report file.
+
+        Every value is read as a string so that the chunks hold exactly what
+        csv.DictReader would have produced for the same rows.
+
+        Returns:
+            (pandas.io.parsers.TextFileReader): Chunks of at most the batch size
+
+        """
+        compression = "gzip" if self._compression == GZIP_COMPRESSED else None
+        return pandas.read_csv(
+            self._report_path,
+            chunksize=self._batch_size,
+            dtype=str,
+            keep_default_na=False,
+            compression=compression,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _get_frame_for_table(frame, table_name):
+        """Extract the columns for a specific table from a DataFrame.
+
+        This is the columnar counterpart of _get_data_for_table.
+
+        Args:
+            frame (DataFrame): A chunk of the report file
+            table_name (str): The DB table fields are required for
+
+        Returns:
+            (DataFrame): The report columns renamed to the DB table's column names
+
+        """
+        column_map = REPORT_COLUMN_MAP[table_name]
+        columns = [column for column in frame.columns if column in column_map]
+        return frame[columns].rename(columns=column_map)
+
+    @staticmethod
+    def _clean_frame(frame, column_types):
+        """Clean whole columns of a DataFrame for insertion into the database.
+
+        This is the columnar counterpart of ReportDBAccessorBase.clean_data.
+        Empty strings become NULL, integer columns are cast and numeric columns
+        that fail to parse become NULL. Valid numeric text is kept as is so the
+        NUMERIC column quantizes it on COPY without a float round trip.
+
+        Args:
+            frame (DataFrame): The table columns of a report chunk
+            column_types (dict): A mapping of column name to Django field type
+
+        Returns:
+            (DataFrame): The cleaned DataFrame
+
+        """
+        frame = frame.mask(frame == "")
+        for column in frame.columns:
+            column_type = column_types.get(column, "")
+            if "IntegerField" in column_type:
+                numeric = pandas.to_numeric(frame[column], errors="coerce")
+                frame[column] = numeric.where(numeric % 1 == 0).astype("Int64")
+            elif column_type in ("DecimalField", "FloatField"):
+                numeric = pandas.to_numeric(frame[column], errors="coerce")
+                frame[column] = frame[column].where(numeric.notna())
+        return frame
+
+    @staticmethod
+    def _get_frame_date_mask(dates, cutoff_date):
+        """Return a boolean Series of the rows on or after the cutoff date.
+
+        This is the columnar counterpart of _should_process_row.
+        """
+        return pandas.to_datetime(dates, utc=True).dt.date >= cutoff_date
+
+    @staticmethod
+    def _get_dimension_id_frame(frame, key_columns, id_column, id_func):
+        """Return the dimension id of each distinct key in a DataFrame.
+
+        Args:
+            frame (DataFrame): A chunk of the report file
+            key_columns (list): The report columns that identify the dimension
+            id_column (str): The name of the id column to create
+            id_func (function): Returns the dimension id for a row dictionary
+
+        Returns:
+            (DataFrame): The key columns and the id column, one row per key
+
+        """
+        distinct = frame.drop_duplicates(subset=key_columns, keep="last")
+        ids = [id_func(row) for row in distinct.to_dict("records")]
+        id_frame = distinct[key_columns].copy()
+        id_frame[id_column] = pandas.to_numeric(pandas.Series(ids, index=distinct.index, dtype=object))
+        id_frame[id_column] = id_frame[id_column].astype("Int64")
+        return id_frame
+
+    def _merge_dimension_ids(self, frame, key_columns, id_column, id_func):
+        """Add a dimension id column to every row of a DataFrame.
+
+        Args:
+            frame (DataFrame): A chunk of the report file
+            key_columns (list): The report columns that identify the dimension
+            id_column (str): The name of the id column to create
+            id_func (function): Returns the dimension id for a row dictionary
+
+        Returns:
+            (DataFrame): The frame with the id column added
+
+        """
+        key_columns = [column for column in key_columns if column in frame.columns]
+        if not key_columns:
+            frame[id_column] = pandas.Series(index=frame.index, dtype="Int64")
+            return frame
+        id_frame = self._get_dimension_id_frame(frame, key_columns, id_column, id_func)
+        return frame.merge(id_frame, on=key_columns, how="left")
+
+    @staticmethod
+    def _save_frame_to_db(frame, table, report_db_accessor):
+        """Copy a DataFrame of table rows straight into the database."""
+        file_obj = io.StringIO()
+        frame.to_csv(file_obj, index=False, header=False)
+        file_obj.seek(0)
+        report_db_accessor.bulk_insert_rows(file_obj, table, tuple(frame.columns))
+
     def _should_process_row(self, row, date_column, is_full_month, is_finalized=None):
         """Determine if we want to process this row.
 
@@ -201,9 +378,18 @@ class ReportProcessorBase:
 
         return True
 
+    def delete_line_items(self):
+        """Delete the stale line items of the manifest's bill before its report files are processed.
+
+        Returns:
+            (Boolean): Whether stale line items were deleted
+
+        """
+        return False
+
     def _delete_line_items(self, db_accessor, is_finalized=None):
         """Delete stale data for the report being processed, if necessary."""
-        if not self._manifest_id:
+        if not self._manifest_id or self.line_items_deleted:
             return False
 
         if is_finalized is None:
@@ -219,6 +405,7 @@ class ReportProcessorBase:
             provider_uuid = manifest.provider_id
 
         date_filter = self.get_date_column_filter()
+        partition_manager = PartitionManager(self._schema)
 
         with db_accessor(self._schema) as accessor:
             bills = accessor.get_cost_entry_bills_query_by_provider(provider_uuid)
@@ -226,6 +413,7 @@ class ReportProcessorBase:
             with schema_context(self._schema):
                 for bill in bills:
                     line_item_query = accessor.get_lineitem_query_for_billid(bill.id)
+                    line_item_table = line_item_query.model._meta.db_table
                     delete_date = bill_date
                     if not is_finalized and not is_full_month:
                         delete_date = self.data_cutoff_date
@@ -241,6 +429,21 @@ class ReportProcessorBase:
                         f" on or after {delete_date}."
                     )
                     LOG.info(log_statement)
+                    if delete_date == bill_date and line_item_table in PARTITIONED_TABLES:
+                        # Reprocessing the whole month: empty the month's partition
+                        # instead of deleting row by row when it only holds this bill.
+                        # Partitions are only created by the create_monthly_partitions
+                        # task, so the rows are deleted one by one when there is none yet.
+                        if partition_manager.truncate_partition(
+                            line_item_table, bill_date, bill_column="cost_entry_bill_id", bill_id=bill.id
+                        ):
+                            # The bill's rows outside its month are not in the partition
+                            column = PARTITIONED_TABLES[line_item_table]
+                            month_range = {
+                                f"{column}__gte": bill_date,
+                                f"{column}__lt": bill_date + relativedelta(months=1),
+                            }
+                            line_item_query = line_item_query.exclude(**month_range)
                     line_item_query.delete()
 
         return True
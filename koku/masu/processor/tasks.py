@@ -23,6 +23,7 @@ from decimal import InvalidOperation
 
 from botocore.exceptions import ClientError
 from celery import chain
+from celery import chord
 from celery.utils.log import get_task_logger
 from dateutil import parser
 from django.conf import settings
@@ -38,6 +39,7 @@ from koku.cache import invalidate_view_cache_for_tenant_and_source_type
 from koku.celery import app
 from masu.config import Config
 from masu.database.cost_model_db_accessor import CostModelDBAccessor
+from masu.database.materialized_view_refresher import MaterializedViewRefresher
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from masu.external.accounts_accessor import AccountsAccessor
@@ -45,6 +47,7 @@ from masu.external.accounts_accessor import AccountsAccessorError
 from masu.external.date_accessor import DateAccessor
 from masu.external.downloader.ocp.ocp_report_downloader import REPORT_TYPES
 from masu.processor._tasks.download import _get_report_files
+from masu.processor._tasks.process import _delete_report_line_items
 from masu.processor._tasks.process import _process_report_file
 from masu.processor._tasks.remove_expired import _remove_expired_data
 from masu.processor.cost_model_cost_updater import CostModelCostUpdater
@@ -108,57 +111,32 @@ def get_report_files(
     for report in reports:
         stmt += " file: " + str(report["file"]) + "\n"
     LOG.info(stmt[:-1])
+
+    if Config.REPORT_PROCESSING_FAN_OUT and len(reports) > 1:
+        if app.conf.result_backend:
+            _fan_out_report_files(self.request.id, schema_name, provider_type, provider_uuid, reports, cache_key)
+            # The chord callback summarizes the reports once every file is processed.
+            return []
+        LOG.warning("Report file fan out needs a Celery result backend. Processing files serially.")
+
     reports_to_summarize = []
     start_date = None
+    manifest_id = None
 
     for report_dict in reports:
-        with transaction.atomic():
-            try:
-                manifest_id = report_dict.get("manifest_id")
-                file_name = os.path.basename(report_dict.get("file"))
-                with ReportStatsDBAccessor(file_name, manifest_id) as stats:
-                    started_date = stats.get_last_started_datetime()
-                    completed_date = stats.get_last_completed_datetime()
-
-                # Skip processing if already in progress.
-                if started_date and not completed_date:
-                    expired_start_date = started_date + datetime.timedelta(
-                        hours=Config.REPORT_PROCESSING_TIMEOUT_HOURS
-                    )
-                    if DateAccessor().today_with_timezone("UTC") < expired_start_date:
-                        LOG.info(
-                            "Skipping processing task for %s since it was started at: %s.",
-                            file_name,
-                            str(started_date),
-                        )
-                        continue
-
-                stmt = (
-                    f"Processing starting:\n"
-                    f" schema_name: {customer_name}\n"
-                    f" provider: {provider_type}\n"
-                    f" provider_uuid: {provider_uuid}\n"
-                    f' file: {report_dict.get("file")}'
-                )
-                LOG.info(stmt)
-                if not start_date:
-                    start_date = report_dict.get("start_date")
-                worker_stats.PROCESS_REPORT_ATTEMPTS_COUNTER.labels(provider_type=provider_type).inc()
-                _process_report_file(schema_name, provider_type, provider_uuid, report_dict)
-                known_manifest_ids = [report.get("manifest_id") for report in reports_to_summarize]
-                if report_dict.get("manifest_id") not in known_manifest_ids:
-                    report_meta = {
-                        "schema_name": schema_name,
-                        "provider_type": provider_type,
-                        "provider_uuid": provider_uuid,
-                        "manifest_id": report_dict.get("manifest_id"),
-                    }
-                    reports_to_summarize.append(report_meta)
-            except (ReportProcessorError, ReportProcessorDBError) as processing_error:
-                worker_stats.PROCESS_REPORT_ERROR_COUNTER.labels(provider_type=provider_type).inc()
-                LOG.error(str(processing_error))
-                WorkerCache().remove_task_from_cache(cache_key)
-                raise processing_error
+        manifest_id = report_dict.get("manifest_id")
+        if not _process_report_with_stats(schema_name, provider_type, provider_uuid, report_dict, cache_key):
+            continue
+        if not start_date:
+            start_date = report_dict.get("start_date")
+        _add_report_to_summarize(
+            reports_to_summarize,
+            schema_name,
+            provider_type,
+            provider_uuid,
+            manifest_id,
+            report_dict.get("usage_dates", []),
+        )
 
     WorkerCache().remove_task_from_cache(cache_key)
     if start_date:
@@ -170,6 +148,255 @@ def get_report_files(
     return reports_to_summarize
 
 
+def _process_report_with_stats(
+    schema_name, provider_type, provider_uuid, report_dict, cache_key, release_on_error=True, line_items_deleted=False
+):
+    """Process a downloaded report file unless another worker is already processing it.
+
+    Args:
+        schema_name   (String) db schema name
+        provider_type (String) provider type
+        provider_uuid (String) provider uuid
+        report_dict   (dict) The downloaded report file
+        cache_key     (String) The WorkerCache key of the provider and month being processed
+        release_on_error (Boolean) Release cache_key if processing fails. Fanned out files leave
+            it to the chord, since other files of the manifest may still be processing.
+        line_items_deleted (Boolean) The stale line items of the manifest were already deleted
+
+    Returns:
+        (Boolean): Whether the file was processed
+
+    """
+    with transaction.atomic():
+        try:
+            manifest_id = report_dict.get("manifest_id")
+            file_name = os.path.basename(report_dict.get("file"))
+            with ReportStatsDBAccessor(file_name, manifest_id) as stats:
+                started_date = stats.get_last_started_datetime()
+                completed_date = stats.get_last_completed_datetime()
+
+            # Skip processing if already in progress.
+            if started_date and not completed_date:
+                expired_start_date = started_date + datetime.timedelta(hours=Config.REPORT_PROCESSING_TIMEOUT_HOURS)
+                if DateAccessor().today_with_timezone("UTC") < expired_start_date:
+                    LOG.info(
+                        "Skipping processing task for %s since it was started at: %s.", file_name, str(started_date)
+                    )
+                    return False
+
+            stmt = (
+                f"Processing starting:\n"
+                f" schema_name: {schema_name}\n"
+                f" provider: {provider_type}\n"
+                f" provider_uuid: {provider_uuid}\n"
+                f' file: {report_dict.get("file")}'
+            )
+            LOG.info(stmt)
+            worker_stats.PROCESS_REPORT_ATTEMPTS_COUNTER.labels(provider_type=provider_type).inc()
+            _process_report_file(
+                schema_name, provider_type, provider_uuid, report_dict, line_items_deleted=line_items_deleted
+            )
+        except (ReportProcessorError, ReportProcessorDBError) as processing_error:
+            worker_stats.PROCESS_REPORT_ERROR_COUNTER.labels(provider_type=provider_type).inc()
+            LOG.error(str(processing_error))
+            if release_on_error:
+                WorkerCache().remove_task_from_cache(cache_key)
+            raise processing_error
+    return True
+
+
+def _add_report_to_summarize(reports_to_summarize, schema_name, provider_type, provider_uuid, manifest_id, dates):
+    """Add the usage days of a processed file to the summary request of its manifest."""
+    known_manifests = {report.get("manifest_id"): report for report in reports_to_summarize}
+    report_meta = known_manifests.get(manifest_id)
+    if report_meta is None:
+        report_meta = {
+            "schema_name": schema_name,
+            "provider_type": provider_type,
+            "provider_uuid": provider_uuid,
+            "manifest_id": manifest_id,
+            "usage_dates": [],
+        }
+        reports_to_summarize.append(report_meta)
+    report_meta["usage_dates"] = sorted(set(report_meta["usage_dates"]).union(dates))
+
+
+def _delete_stale_line_items(schema_name, provider_type, provider_uuid, reports, cache_key):
+    """Delete the stale line items of each manifest of the reports before its files are fanned out.
+
+    The first file of every chain would otherwise find no processed files and
+    delete the manifest's line items while other chains are writing them.
+
+    Args:
+        schema_name   (String) db schema name
+        provider_type (String) provider type
+        provider_uuid (String) provider uuid
+        reports       (list) The downloaded report files
+        cache_key     (String) The WorkerCache key of the provider and month being processed
+
+    Returns:
+        None
+
+    """
+    manifest_reports = {}
+    for report_dict in reports:
+        manifest_reports.setdefault(report_dict.get("manifest_id"), report_dict)
+    try:
+        with transaction.atomic():
+            for report_dict in manifest_reports.values():
+                _delete_report_line_items(schema_name, provider_type, provider_uuid, report_dict)
+    except (ReportProcessorError, ReportProcessorDBError) as processing_error:
+        worker_stats.PROCESS_REPORT_ERROR_COUNTER.labels(provider_type=provider_type).inc()
+        LOG.error(str(processing_error))
+        WorkerCache().remove_task_from_cache(cache_key)
+        raise processing_error
+
+
+def _fan_out_report_files(request_id, schema_name, provider_type, provider_uuid, reports, cache_key):
+    """Process the files of a manifest in parallel Celery tasks.
+
+    The stale line items are deleted once, then the files are dealt into at
+    most REPORT_PROCESSING_TENANT_CONCURRENCY chains. Each chain processes its
+    files one after another, and a chord callback summarizes the manifest once
+    every chain has finished. Each file task also claims one of the customer's
+    processing slots, which caps the files processed at once across all of a
+    customer's providers and months.
+    """
+    _delete_stale_line_items(schema_name, provider_type, provider_uuid, reports, cache_key)
+    concurrency = max(Config.REPORT_PROCESSING_TENANT_CONCURRENCY, 1)
+    lanes = [reports[index::concurrency] for index in range(concurrency) if reports[index::concurrency]]
+    lane_chains = []
+    for first_report, *other_reports in lanes:
+        lane = [process_report_file.s([], schema_name, provider_type, provider_uuid, first_report, cache_key)]
+        for report_dict in other_reports:
+            lane.append(process_report_file.s(schema_name, provider_type, provider_uuid, report_dict, cache_key))
+        lane_chains.append(chain(lane))
+
+    LOG.info("Processing %d report files in %d parallel chains.", len(reports), len(lane_chains))
+    callback = summarize_processed_reports.s(schema_name, provider_type, provider_uuid, cache_key, request_id)
+    # The provider and month stay locked until the callback runs or the chord fails
+    callback.on_error(release_processed_reports.s(cache_key))
+    return chord(lane_chains)(callback)
+
+
+@app.task(
+    name="masu.processor.tasks.process_report_file",
+    queue_name="process",
+    bind=True,
+    max_retries=Config.REPORT_PROCESSING_TENANT_MAX_RETRIES,
+)
+def process_report_file(self, processed_reports, schema_name, provider_type, provider_uuid, report_dict, cache_key):
+    """Process a single report file of a manifest.
+
+    The task is retried later, up to REPORT_PROCESSING_TENANT_MAX_RETRIES times, while all
+    of the customer's REPORT_PROCESSING_TENANT_CONCURRENCY processing slots are taken.
+    A slot expires after REPORT_PROCESSING_TIMEOUT_HOURS if its worker dies while holding it.
+
+    Args:
+        processed_reports (list) The processed files of the previous tasks in the chain
+        schema_name   (String) db schema name
+        provider_type (String) provider type
+        provider_uuid (String) provider uuid
+        report_dict   (dict) The downloaded report file
+        cache_key     (String) The WorkerCache key of the provider and month being processed
+
+    Returns:
+        (list): processed_reports with this file's manifest, start date and usage days appended
+
+    """
+    worker_cache = WorkerCache()
+    slot_key = worker_cache.claim_slot(
+        schema_name,
+        Config.REPORT_PROCESSING_TENANT_CONCURRENCY,
+        timeout=Config.REPORT_PROCESSING_TIMEOUT_HOURS * 3600,
+    )
+    if slot_key is None:
+        LOG.info("Every report processing slot of %s is taken. Retrying later.", schema_name)
+        raise self.retry(countdown=Config.REPORT_PROCESSING_TENANT_RETRY_SECONDS)
+
+    try:
+        # _fan_out_report_files deleted the stale line items before the chains started
+        processed = _process_report_with_stats(
+            schema_name,
+            provider_type,
+            provider_uuid,
+            report_dict,
+            cache_key,
+            release_on_error=False,
+            line_items_deleted=True,
+        )
+    finally:
+        worker_cache.remove_task_from_cache(slot_key)
+    if processed:
+        start_date = report_dict.get("start_date")
+        processed_reports.append(
+            {
+                "manifest_id": report_dict.get("manifest_id"),
+                "start_date": str(start_date) if start_date else None,
+                "usage_dates": report_dict.get("usage_dates", []),
+            }
+        )
+    return processed_reports
+
+
+@app.task(name="masu.processor.tasks.summarize_processed_reports", queue_name="process")
+def summarize_processed_reports(processed_lanes, schema_name, provider_type, provider_uuid, cache_key, request_id):
+    """Summarize a manifest after all of its fanned out files are processed.
+
+    Args:
+        processed_lanes (list) The processed files returned by each chain of process_report_file
+        schema_name   (String) db schema name
+        provider_type (String) provider type
+        provider_uuid (String) provider uuid
+        cache_key     (String) The WorkerCache key of the provider and month being processed
+        request_id    (String) The id of the get_report_files task
+
+    Returns:
+        (list): The reports sent to summarize_reports
+
+    """
+    reports_to_summarize = []
+    start_date = None
+    manifest_id = None
+    for processed_reports in processed_lanes:
+        for report in processed_reports:
+            manifest_id = report.get("manifest_id")
+            if not start_date and report.get("start_date"):
+                start_date = parser.parse(report.get("start_date"))
+            _add_report_to_summarize(
+                reports_to_summarize, schema_name, provider_type, provider_uuid, manifest_id, report["usage_dates"]
+            )
+
+    # The provider and month stay locked until every file has been processed.
+    WorkerCache().remove_task_from_cache(cache_key)
+    if start_date:
+        start_date_str = start_date.strftime("%Y-%m-%d")
+        convert_to_parquet.delay(request_id, schema_name[4:], provider_uuid, provider_type, start_date_str, manifest_id)
+
+    summarize_reports(reports_to_summarize)
+    return reports_to_summarize
+
+
+@app.task(name="masu.processor.tasks.release_processed_reports", queue_name="process")
+def release_processed_reports(request, exc, traceback, cache_key):
+    """Release the provider and month of a fanned out manifest whose files failed to process.
+
+    This is the error callback of the chord, run once a file task has failed.
+
+    Args:
+        request (Context) The request of the failed task
+        exc (Exception) The error raised by the failed task
+        traceback (str) The traceback of the error
+        cache_key (String) The WorkerCache key of the provider and month being processed
+
+    Returns:
+        None
+
+    """
+    LOG.error("Processing the report files of %s failed: %s", cache_key, exc)
+    WorkerCache().remove_task_from_cache(cache_key)
+
+
 @app.task(name="masu.processor.tasks.remove_expired_data", queue_name="remove_expired")
 def remove_expired_data(schema_name, provider, simulate, provider_uuid=None, line_items_only=False):
     """
@@ -210,15 +437,20 @@ def summarize_reports(reports_to_summarize):
 
     """
     for report in reports_to_summarize:
-        # For day-to-day summarization we choose a small window to
-        # cover new data from a window of days.
+        # For day-to-day summarization we only re-summarize the usage
+        # days the processed files wrote line items for, falling back to
+        # a small window of recent days when they were not recorded.
         # This saves us from re-summarizing unchanged data and cuts down
         # on processing time. There are override mechanisms in the
         # Updater classes for when full-month summarization is
         # required.
-        start_date = DateAccessor().today() - datetime.timedelta(days=2)
-        start_date = start_date.strftime("%Y-%m-%d")
-        end_date = DateAccessor().today().strftime("%Y-%m-%d")
+        usage_dates = report.get("usage_dates")
+        if usage_dates:
+            start_date, end_date = min(usage_dates), max(usage_dates)
+        else:
+            start_date = DateAccessor().today() - datetime.timedelta(days=2)
+            start_date = start_date.strftime("%Y-%m-%d")
+            end_date = DateAccessor().today().strftime("%Y-%m-%d")
         LOG.info("report to summarize: %s", str(report))
         update_summary_tables.delay(
             report.get("schema_name"),
@@ -379,12 +611,14 @@ def refresh_materialized_views(schema_name, provider_type, manifest_id=None):
             AZURE_MATERIALIZED_VIEWS + OCP_ON_AZURE_MATERIALIZED_VIEWS + OCP_ON_INFRASTRUCTURE_MATERIALIZED_VIEWS
         )
 
-    with schema_context(schema_name):
-        for view in materialized_views:
-            table_name = view._meta.db_table
-            with connection.cursor() as cursor:
-                cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {table_name}")
-                LOG.info(f"Refreshed {table_name}.")
+    refresher = MaterializedViewRefresher(schema_name, provider_type=provider_type)
+    durations = refresher.refresh([view._meta.db_table for view in materialized_views])
+    if durations:
+        slowest = max(durations, key=durations.get)
+        LOG.info(
+            f"Refreshed {len(durations)} materialized views for {schema_name} in {sum(durations.values()):.2f}s "
+            f"of refresh time. Slowest: {slowest} ({durations[slowest]:.2f}s)."
+        )
 
     invalidate_view_cache_for_tenant_and_source_type(schema_name, provider_type)
 
@@ -653,7 +887,7 @@ def convert_to_parquet(request_id, account, provider_uuid, provider_type, start_
                     parquet_path = f"{s3_parquet_path}/{report_type}"
                     break
         result = convert_csv_to_parquet(
-            request_id, s3_csv_path, parquet_path, local_path, manifest_id, csv_filename, context
+            request_id, s3_csv_path, parquet_path, local_path, manifest_id, csv_filename, context, provider_type
         )
         if not result:
             failed_conversion.append(csv_filename)
@@ -16,87 +16,265 @@
 #
 """Cache of worker tasks currently running."""
 import logging
+from urllib.parse import quote
 
 from django.conf import settings
 from django.core.cache import caches
 
 LOG = logging.getLogger(__name__)
 
+REDIS_CACHE_BACKEND = "django_redis.cache.RedisCache"
+TASK_KEY_PREFIX = "task:"
+
+# Release a task only while it is still held by the given host, and drop it from
+# that host's task set. KEYS: task key, host set key. ARGV: host, task.
+RELEASE_TASK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("SREM", KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class RedisWorkerCacheBackend:
+    """Track running tasks in Redis.
+
+    Each running task is its own key, set only if absent and expiring after the
+    cache timeout, so claiming a task is atomic and a crashed worker's tasks
+    expire on their own. Each host also has a set of the tasks it started, so
+    they can be removed together when the host restarts. Tasks are released
+    by a script that only deletes them while the expected host holds them.
+    """
+
+    def __init__(self, client, timeout):
+        """Set the Redis client and the task timeout in seconds."""
+        self.client = client
+        self.timeout = timeout
+        self._release_task = client.register_script(RELEASE_TASK_SCRIPT)
+
+    @staticmethod
+    def _get_task_key(task_key):
+        """Return the Redis key of a task."""
+        return f"{settings.WORKER_CACHE_KEY}:{TASK_KEY_PREFIX}{task_key}"
+
+    @staticmethod
+    def _get_host_key(host):
+        """Return the Redis key of a host's task set."""
+        return f"{settings.WORKER_CACHE_KEY}:host:{host}"
+
+    def add(self, task_key, host, timeout=None):
+        """Claim a task for a host, returning whether it was not already running.
+
+        The task expires after the given timeout in seconds, or the cache timeout.
+        """
+        if not self.client.set(self._get_task_key(task_key), host, nx=True, ex=timeout or self.timeout):
+            return False
+        pipeline = self.client.pipeline()
+        pipeline.sadd(self._get_host_key(host), task_key)
+        pipeline.expire(self._get_host_key(host), self.timeout)
+        pipeline.execute()
+        return True
+
+    def remove(self, task_key):
+        """Release a task, returning whether it was running."""
+        owner = self.client.get(self._get_task_key(task_key))
+        if owner is None:
+            return False
+        # The task may expire and be claimed by another host after the owner is read
+        owner = owner.decode()
+        keys = [self._get_task_key(task_key), self._get_host_key(owner)]
+        return bool(self._release_task(keys=keys, args=[owner, task_key]))
+
+    def is_running(self, task_key):
+        """Return whether a task is running on any host."""
+        return bool(self.client.exists(self._get_task_key(task_key)))
+
+    def get_host_tasks(self, host):
+        """Return the tasks a host is running."""
+        return [task_key.decode() for task_key in self.client.smembers(self._get_host_key(host))]
+
+    def get_all_tasks(self):
+        """Return the tasks running on every host."""
+        prefix = self._get_task_key("")
+        return [key.decode()[len(prefix):] for key in self.client.scan_iter(match=f"{prefix}*")]
+
+    def invalidate_host(self, host):
+        """Release every task a host is running."""
+        host_key = self._get_host_key(host)
+        pipeline = self.client.pipeline()
+        for task_key in self.get_host_tasks(host):
+            # The task may have been released and claimed by another host since
+            self._release_task(keys=[self._get_task_key(task_key), host_key], args=[host, task_key], client=pipeline)
+        pipeline.delete(host_key)
+        pipeline.execute()
+
+
+class DjangoWorkerCacheBackend:
+    """Track running tasks in a Django cache.
+
+    This is the local fallback for caches other than Redis, such as the
+    in-memory cache used in tests. Each running task is its own cache entry,
+    claimed with ``cache.add``. The per-host task lists used to invalidate a
+    host are updated without locking.
+    """
+
+    def __init__(self, cache):
+        """Set the Django cache to use."""
+        self.cache = cache
+
+    @staticmethod
+    def _get_task_key(task_key):
+        """Return the cache key of a task, quoted to be a valid cache key."""
+        return f"{TASK_KEY_PREFIX}{quote(str(task_key), safe=':')}"
+
+    def _set_host_tasks(self, host, task_keys):
+        """Store the tasks a host is running."""
+        self.cache.set(settings.WORKER_CACHE_KEY, task_keys, version=host)
+        hosts = self.cache.get("keys", set())
+        if host not in hosts:
+            hosts.add(host)
+            self.cache.set("keys", hosts)
+
+    def add(self, task_key, host, timeout=None):
+        """Claim a task for a host, returning whether it was not already running.
+
+        The task expires after the given timeout in seconds, or the cache timeout.
+        """
+        kwargs = {"timeout": timeout} if timeout else {}
+        if not self.cache.add(self._get_task_key(task_key), host, **kwargs):
+            return False
+        self._set_host_tasks(host, self.get_host_tasks(host) + [task_key])
+        return True
+
+    def remove(self, task_key):
+        """Release a task, returning whether it was running."""
+        owner = self.cache.get(self._get_task_key(task_key))
+        if owner is None:
+            return False
+        self.cache.delete(self._get_task_key(task_key))
+        task_keys = self.get_host_tasks(owner)
+        if task_key in task_keys:
+            task_keys.remove(task_key)
+            self._set_host_tasks(owner, task_keys)
+        return True
+
+    def is_running(self, task_key):
+        """Return whether a task is running on any host."""
+        return self.cache.get(self._get_task_key(task_key)) is not None
+
+    def get_host_tasks(self, host):
+        """Return the tasks a host is running."""
+        return self.cache.get(settings.WORKER_CACHE_KEY, default=[], version=host)
+
+    def get_all_tasks(self):
+        """Return the tasks running on every host."""
+        tasks = []
+        for host in self.cache.get("keys", set()):
+            tasks.extend(task_key for task_key in self.get_host_tasks(host) if self.is_running(task_key))
+        return tasks
+
+    def invalidate_host(self, host):
+        """Release every task a host is running."""
+        for task_key in self.get_host_tasks(host):
+            if self.cache.get(self._get_task_key(task_key)) == host:
+                self.cache.delete(self._get_task_key(task_key))
+        self.cache.delete(settings.WORKER_CACHE_KEY, version=host)
+
+
+def get_worker_cache_backend():
+    """Return the task backend for the configured worker cache."""
+    cache = caches["worker"]
+    if settings.CACHES["worker"]["BACKEND"] == REDIS_CACHE_BACKEND:
+        from django_redis import get_redis_connection
+
+        return RedisWorkerCacheBackend(get_redis_connection("worker"), cache.default_timeout)
+    return DjangoWorkerCacheBackend(cache)
+
 
 class WorkerCache:
     """A cache to track celery tasks across container/pod.
 
-    Each worker has a cache_key in the form :{host}:worker. A set containing each
-    cache_key is stored in a separate cache entry called 'keys'. The worker cache_keys
-    stores a list of task_keys for the task the worker is running. The WorkerCache takes
-    all the entries in the 'keys' cache to build the list of currently running tasks.
-
     The task_keys are keyed on the provider uuid and the billing month. This ensures that
     we are only ever running a single task for a provider and billing period at one time.
 
-    Format: ":hostworker:" : "{provider_uuid}:{billing_month}"
+    Format: "{provider_uuid}:{billing_month}"
 
-    Example:
+    Each running task is stored as its own entry holding the host that claimed it. The entry
+    expires after the worker cache timeout, so a crashed worker cannot block a task forever.
+    Checking whether a task is running is a single lookup, and claiming a task is atomic.
+    Each host also keeps the tasks it claimed, so they can be cleared when the host restarts.
 
-        cache_key               |                           value                              |        expires
-        ":1:keys:               | {"koku-worker-1", "koku-worker2"}                            |        datetime
-        ":koku-worker-0:worker" | ["10c0fb01-9d65-4605-bbf1-6089107ec5e5:2020-02-01 00:00:00"] |        datetime
-        ":koku-worker-1:worker" | ["10c0fb01-9d65-4605-bbf1-6089107ec5e5:2020-01-01 00:00:00"] |        datetime
+    Example with the Redis worker cache:
 
-    """
+        key                                                            | value
+        "worker:task:10c0fb01-9d65-4605-bbf1-6089107ec5e5:2020-02-01"  | "koku-worker-0"
+        "worker:host:koku-worker-0"                                    | {"10c0fb01-...:2020-02-01"}
 
-    cache = caches["worker"]
+    Any other Django cache backend, such as the in-memory cache in tests, is used through
+    the Django cache API instead.
 
-    def __init__(self):
-        self.add_worker_keys()
+    """
 
-    @property
-    def worker_cache_keys(self):
-        """Return worker cache keys."""
-        return self.cache.get("keys", set())
+    def __init__(self):
+        """Set the backend for the configured worker cache."""
+        self.backend = get_worker_cache_backend()
 
     @property
     def worker_cache(self):
-        """Return the value of the cache key."""
-        return self.cache.get(settings.WORKER_CACHE_KEY, default=[], version=settings.HOSTNAME)
-
-    def add_worker_keys(self):
-        """Add worker key verison to list of workers."""
-        worker_keys = self.worker_cache_keys
-        if settings.HOSTNAME not in worker_keys:
-            worker_keys.update((settings.HOSTNAME,))
-            self.cache.set("keys", worker_keys)
+        """Return the tasks running on this host."""
+        return self.backend.get_host_tasks(settings.HOSTNAME)
 
     def invalidate_host(self):
         """Invalidate the cache for a particular host."""
-        self.cache.delete(settings.WORKER_CACHE_KEY, version=settings.HOSTNAME)
+        self.backend.invalidate_host(settings.HOSTNAME)
 
     def add_task_to_cache(self, task_key):
-        """Add an entry to the cache for a task."""
-        task_list = self.worker_cache
-        task_list.append(task_key)
-        self.cache.set(settings.WORKER_CACHE_KEY, task_list, version=settings.HOSTNAME)
-        LOG.info(f"Added task key {task_key} to cache.")
+        """Add an entry to the cache for a task.
+
+        Returns:
+            (bool): Whether the task was added, False if it is already running
+
+        """
+        added = self.backend.add(task_key, settings.HOSTNAME)
+        if added:
+            LOG.info(f"Added task key {task_key} to cache.")
+        else:
+            LOG.info(f"Task key {task_key} is already in the cache.")
+        return added
 
     def remove_task_from_cache(self, task_key):
         """Remove an entry from the cache for a task."""
-        task_list = self.worker_cache
-        try:
-            task_list.remove(task_key)
-        except ValueError:
-            pass
-        else:
-            self.cache.set(settings.WORKER_CACHE_KEY, task_list, version=settings.HOSTNAME)
+        if self.backend.remove(task_key):
             LOG.info(f"Removed task key {task_key} from cache.")
 
+    def claim_slot(self, name, slots, timeout=None):
+        """Claim one of a limited number of slots, such as the processing slots of a customer.
+
+        Each slot is a task entry, so it is claimed atomically and expires with a crashed worker.
+        A restarted worker has a new hostname and cannot release the slots it held, so slots
+        should be given a timeout close to how long they are held rather than the cache timeout.
+
+        Args:
+            name (str): The name of the limited resource
+            slots (int): The number of slots of the resource
+            timeout (int): Seconds until an unreleased slot expires, the cache timeout if not set
+
+        Returns:
+            (str): The task key of the claimed slot, None if every slot is taken
+
+        """
+        for slot in range(max(slots, 1)):
+            task_key = f"slot:{name}:{slot}"
+            if self.backend.add(task_key, settings.HOSTNAME, timeout=timeout):
+                return task_key
+        return None
+
     def get_all_running_tasks(self):
         """Combine each host's running tasks into a single list."""
-        tasks = []
-        for key in self.worker_cache_keys:
-            tasks.extend(self.cache.get(settings.WORKER_CACHE_KEY, default=[], version=key))
-        return tasks
+        return self.backend.get_all_tasks()
 
     def task_is_running(self, task_key):
         """Check if a task is in the cache."""
-        task_list = self.get_all_running_tasks()
-        return True if task_key in task_list else False
+        return self.backend.is_running(task_key)
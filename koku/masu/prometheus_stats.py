@@ -17,6 +17,7 @@
 """Prometheus Stats."""
 from prometheus_client import CollectorRegistry
 from prometheus_client import Counter
+from prometheus_client import Histogram
 from prometheus_client import multiprocess
 
 
@@ -60,3 +61,52 @@ KAFKA_CONNECTION_ERRORS_COUNTER = Counter(
 )
 
 CELERY_ERRORS_COUNTER = Counter("celery_errors", "Number of celery errors", registry=WORKER_REGISTRY)
+
+# Buckets in seconds for ingest steps, which take from under a second to an hour
+WORKER_LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, float("inf"))
+
+REPORT_FILE_PROCESSING_LATENCY = Histogram(
+    "report_file_processing_seconds",
+    "Seconds spent processing a report file",
+    ["provider_type"],
+    buckets=WORKER_LATENCY_BUCKETS,
+    registry=WORKER_REGISTRY,
+)
+REPORT_SUMMARY_STEP_LATENCY = Histogram(
+    "report_summary_step_seconds",
+    "Seconds spent in a report summary SQL step",
+    ["provider_type", "step"],
+    buckets=WORKER_LATENCY_BUCKETS,
+    registry=WORKER_REGISTRY,
+)
+MATERIALIZED_VIEW_REFRESH_LATENCY = Histogram(
+    "materialized_view_refresh_seconds",
+    "Seconds spent refreshing a materialized view",
+    ["provider_type", "view"],
+    buckets=WORKER_LATENCY_BUCKETS,
+    registry=WORKER_REGISTRY,
+)
+COST_MODEL_COST_UPDATE_LATENCY = Histogram(
+    "cost_model_cost_update_seconds",
+    "Seconds spent updating cost model costs",
+    ["provider_type"],
+    buckets=WORKER_LATENCY_BUCKETS,
+    registry=WORKER_REGISTRY,
+)
+
+
+def run_summary_step(provider_type, accessor, step, *args, **kwargs):
+    """Run a report summary step and record its latency.
+
+    Args:
+        provider_type (str): The provider type label
+        accessor (ReportDBAccessorBase): The accessor running the step
+        step (str): The name of the accessor method, used as the step label
+        args, kwargs: The arguments passed to the accessor method
+
+    Returns:
+        (Object): The result of the accessor method
+
+    """
+    with REPORT_SUMMARY_STEP_LATENCY.labels(provider_type=provider_type, step=step).time():
+        return getattr(accessor, step)(*args, **kwargs)
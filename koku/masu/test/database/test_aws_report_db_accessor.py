@@ -20,6 +20,7 @@ import decimal
 import random
 import string
 from decimal import Decimal
+from unittest.mock import patch
 
 import django.apps
 from dateutil import relativedelta
@@ -42,8 +43,15 @@ from masu.external.date_accessor import DateAccessor
 from masu.test import MasuTestCase
 from masu.test.database.helpers import map_django_field_type_to_python_type
 from masu.test.database.helpers import ReportObjectCreator
+from reporting.provider.aws.models import AWSCostEntryLineItemDaily
+from reporting.provider.aws.models import AWSCostEntryPricing
 from reporting.provider.aws.models import AWSCostEntryProduct
 from reporting.provider.aws.models import AWSCostEntryReservation
+from reporting.provider.aws.models import AWSTagsDailySummary
+from reporting.provider.aws.models import AWSTagsSummary
+from reporting.provider.ocp_aws.models import OCPAWSCostLineItemDailySummary
+from reporting.provider.ocp_aws.models import OCPAWSTagsDailySummary
+from reporting.provider.ocp_aws.models import OCPAWSTagsSummary
 from reporting_common import REPORT_COLUMN_MAP
 
 
@@ -72,6 +80,15 @@ class ReportSchemaTest(MasuTestCase):
 
         self.assertNotEqual(report_schema.column_types, {})
 
+    def test_report_schema_built_once(self):
+        """Test that accessors share one report schema instead of reading every model."""
+        with patch("masu.database.report_db_accessor_base.django.apps.apps.get_models") as mock_get_models:
+            accessors = [AWSReportDBAccessor(schema=self.schema) for _ in range(10)]
+
+        mock_get_models.assert_not_called()
+        for accessor in accessors:
+            self.assertIs(accessor.report_schema, self.accessor.report_schema)
+
     def test_get_reporting_tables(self):
         """Test that the report schema is populated with a column map."""
         tables = django.apps.apps.get_models()
@@ -289,6 +306,44 @@ class AWSReportDBAccessorTest(MasuTestCase):
                 previous_count = count
                 previous_row_id = row_id
 
+    def test_bulk_insert_on_conflict_do_nothing(self):
+        """Test that a bulk INSERT returns ids for new and existing rows in order."""
+        table_name = AWS_CUR_TABLE_MAP["product"]
+        table = AWSCostEntryProduct
+        with schema_context(self.schema):
+            existing = self.creator.create_columns_for_table(table_name)
+            existing_id = self.accessor.insert_on_conflict_do_nothing(
+                table, dict(existing), conflict_columns=["sku", "product_name", "region"]
+            )
+            new_rows = [self.creator.create_columns_for_table(table_name) for _ in range(3)]
+            query = self.accessor._get_db_obj_query(table_name)
+            initial_count = query.count()
+
+            row_ids = self.accessor.bulk_insert_on_conflict_do_nothing(
+                table, [existing] + new_rows, conflict_columns=["sku", "product_name", "region"]
+            )
+
+            self.assertEqual(query.count(), initial_count + len(new_rows))
+            self.assertEqual(row_ids[0], existing_id)
+            for row_id, row in zip(row_ids[1:], new_rows):
+                self.assertEqual(query.get(id=row_id).sku, row["sku"])
+
+    def test_bulk_insert_on_conflict_do_nothing_no_conflict_columns(self):
+        """Test that a bulk INSERT matches on every column without a unique constraint."""
+        table_name = AWS_CUR_TABLE_MAP["pricing"]
+        table = AWSCostEntryPricing
+        with schema_context(self.schema):
+            rows = [self.creator.create_columns_for_table(table_name) for _ in range(2)]
+            query = self.accessor._get_db_obj_query(table_name)
+            initial_count = query.count()
+
+            row_ids = self.accessor.bulk_insert_on_conflict_do_nothing(table, [dict(row) for row in rows])
+            row_ids_2 = self.accessor.bulk_insert_on_conflict_do_nothing(table, [dict(row) for row in rows])
+
+            self.assertEqual(query.count(), initial_count + len(rows))
+            self.assertEqual(row_ids, row_ids_2)
+            self.assertEqual(self.accessor.bulk_insert_on_conflict_do_nothing(table, []), [])
+
     def test_insert_on_conflict_do_update_with_conflict(self):
         """Test that an INSERT succeeds ignoring the conflicting row."""
         table_name = AWS_CUR_TABLE_MAP["reservation"]
@@ -839,6 +894,52 @@ class AWSReportDBAccessorTest(MasuTestCase):
 
             self.assertEqual(sorted(tag_keys), sorted(expected_tag_keys))
 
+    def test_populate_awstags_summary_table_date_range(self):
+        """Test that re-summarizing a day replaces its tag values and prunes keys no longer seen."""
+        with schema_context(self.schema):
+            line_item = AWSCostEntryLineItemDaily.objects.filter(tags__isnull=False).first()
+            bill_id = line_item.cost_entry_bill_id
+            day = line_item.usage_start
+            summary = AWSTagsSummary.objects.filter(cost_entry_bill_id=bill_id)
+            other_keys = set(
+                AWSTagsDailySummary.objects.filter(cost_entry_bill_id=bill_id)
+                .exclude(usage_start=day)
+                .values_list("key", flat=True)
+            )
+
+            for tag_value in ("old", "new"):
+                AWSCostEntryLineItemDaily.objects.filter(id=line_item.id).update(tags={"stale_key": tag_value})
+                self.accessor.populate_tags_summary_table([bill_id], day, day)
+                self.assertEqual(summary.get(key="stale_key").values, [tag_value])
+
+            AWSCostEntryLineItemDaily.objects.filter(id=line_item.id).update(tags={})
+            self.accessor.populate_tags_summary_table([bill_id], day, day)
+            self.assertFalse(summary.filter(key="stale_key").exists())
+            self.assertTrue(other_keys.issubset(set(summary.values_list("key", flat=True))))
+
+    def test_populate_ocpawstags_summary_table_date_range(self):
+        """Test that re-summarizing a day replaces its OCP on AWS tag values and prunes keys no longer seen."""
+        with schema_context(self.schema):
+            line_item = OCPAWSCostLineItemDailySummary.objects.filter(tags__isnull=False, namespace__len__gt=0).first()
+            bill_id = line_item.cost_entry_bill_id
+            day = line_item.usage_start
+            summary = OCPAWSTagsSummary.objects.filter(cost_entry_bill_id=bill_id)
+            other_keys = set(
+                OCPAWSTagsDailySummary.objects.filter(cost_entry_bill_id=bill_id)
+                .exclude(usage_start=day)
+                .values_list("key", flat=True)
+            )
+
+            for tag_value in ("old", "new"):
+                OCPAWSCostLineItemDailySummary.objects.filter(id=line_item.id).update(tags={"stale_key": tag_value})
+                self.accessor.populate_ocp_on_aws_tags_summary_table([bill_id], day, day)
+                self.assertEqual(summary.get(key="stale_key").values, [tag_value])
+
+            OCPAWSCostLineItemDailySummary.objects.filter(id=line_item.id).update(tags={})
+            self.accessor.populate_ocp_on_aws_tags_summary_table([bill_id], day, day)
+            self.assertFalse(summary.filter(key="stale_key").exists())
+            self.assertTrue(other_keys.issubset(set(summary.values_list("key", flat=True))))
+
     def test_populate_ocp_on_aws_cost_daily_summary(self):
         """Test that the OCP on AWS cost summary table is populated."""
         summary_table_name = AWS_CUR_TABLE_MAP["ocp_on_aws_daily_summary"]
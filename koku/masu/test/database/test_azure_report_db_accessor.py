@@ -31,6 +31,12 @@ from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.test import MasuTestCase
 from masu.test.database.helpers import ReportObjectCreator
 from masu.util.azure.common import get_bills_from_provider
+from reporting.provider.azure.models import AzureCostEntryLineItemDaily
+from reporting.provider.azure.models import AzureTagsDailySummary
+from reporting.provider.azure.models import AzureTagsSummary
+from reporting.provider.azure.openshift.models import OCPAzureCostLineItemDailySummary
+from reporting.provider.azure.openshift.models import OCPAzureTagsDailySummary
+from reporting.provider.azure.openshift.models import OCPAzureTagsSummary
 
 
 class AzureReportDBAccessorTest(MasuTestCase):
@@ -196,6 +202,53 @@ class AzureReportDBAccessorTest(MasuTestCase):
             bills = self.accessor.get_cost_entry_bills_by_date(bill_start)
             self.assertEqual(bills.count(), bill_count)
 
+    def test_populate_azuretags_summary_table_date_range(self):
+        """Test that re-summarizing a day replaces its tag values and prunes keys no longer seen."""
+        with schema_context(self.schema):
+            line_item = AzureCostEntryLineItemDaily.objects.filter(tags__isnull=False).first()
+            bill_id = line_item.cost_entry_bill_id
+            day = line_item.usage_date
+            summary = AzureTagsSummary.objects.filter(cost_entry_bill_id=bill_id)
+            other_keys = set(
+                AzureTagsDailySummary.objects.filter(cost_entry_bill_id=bill_id)
+                .exclude(usage_start=day)
+                .values_list("key", flat=True)
+            )
+
+            for tag_value in ("old", "new"):
+                AzureCostEntryLineItemDaily.objects.filter(id=line_item.id).update(tags={"stale_key": tag_value})
+                self.accessor.populate_tags_summary_table([bill_id], day, day)
+                self.assertEqual(summary.get(key="stale_key").values, [tag_value])
+
+            AzureCostEntryLineItemDaily.objects.filter(id=line_item.id).update(tags={})
+            self.accessor.populate_tags_summary_table([bill_id], day, day)
+            self.assertFalse(summary.filter(key="stale_key").exists())
+            self.assertTrue(other_keys.issubset(set(summary.values_list("key", flat=True))))
+
+    def test_populate_ocpazuretags_summary_table_date_range(self):
+        """Test that re-summarizing a day replaces its OCP on Azure tag values and prunes keys no longer seen."""
+        with schema_context(self.schema):
+            line_items = OCPAzureCostLineItemDailySummary.objects.filter(tags__isnull=False, namespace__len__gt=0)
+            line_item = line_items.first()
+            bill_id = line_item.cost_entry_bill_id
+            day = line_item.usage_start
+            summary = OCPAzureTagsSummary.objects.filter(cost_entry_bill_id=bill_id)
+            other_keys = set(
+                OCPAzureTagsDailySummary.objects.filter(cost_entry_bill_id=bill_id)
+                .exclude(usage_start=day)
+                .values_list("key", flat=True)
+            )
+
+            for tag_value in ("old", "new"):
+                OCPAzureCostLineItemDailySummary.objects.filter(id=line_item.id).update(tags={"stale_key": tag_value})
+                self.accessor.populate_ocp_on_azure_tags_summary_table([bill_id], day, day)
+                self.assertEqual(summary.get(key="stale_key").values, [tag_value])
+
+            OCPAzureCostLineItemDailySummary.objects.filter(id=line_item.id).update(tags={})
+            self.accessor.populate_ocp_on_azure_tags_summary_table([bill_id], day, day)
+            self.assertFalse(summary.filter(key="stale_key").exists())
+            self.assertTrue(other_keys.issubset(set(summary.values_list("key", flat=True))))
+
     def test_populate_markup_cost(self):
         """Test that the daily summary table is populated."""
         summary_table_name = AZURE_REPORT_TABLE_MAP["line_item_daily_summary"]
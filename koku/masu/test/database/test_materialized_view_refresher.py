@@ -0,0 +1,80 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the MaterializedViewRefresher."""
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from masu.database.materialized_view_refresher import MaterializedViewRefresher
+from masu.prometheus_stats import WORKER_REGISTRY
+from masu.test import MasuTestCase
+from reporting.models import AWS_MATERIALIZED_VIEWS
+
+
+class MaterializedViewRefresherTest(MasuTestCase):
+    """Test cases for the MaterializedViewRefresher."""
+
+    def test_get_refresh_levels(self):
+        """Test that views are refreshed after the views they read from."""
+        dependencies = {"a": set(), "b": {"a"}, "c": set(), "d": {"b", "c"}}
+
+        levels = MaterializedViewRefresher.get_refresh_levels(dependencies)
+
+        self.assertEqual(levels, [["a", "c"], ["b"], ["d"]])
+
+    def test_get_dependencies(self):
+        """Test that dependencies are found for every requested view."""
+        view_names = [view._meta.db_table for view in AWS_MATERIALIZED_VIEWS]
+
+        dependencies = MaterializedViewRefresher(self.schema).get_dependencies(view_names)
+
+        self.assertEqual(set(dependencies), set(view_names))
+        for sources in dependencies.values():
+            self.assertTrue(sources.issubset(view_names))
+
+    def test_refresh_in_transaction(self):
+        """Test that views are refreshed on the caller's connection inside a transaction."""
+        view_names = [view._meta.db_table for view in AWS_MATERIALIZED_VIEWS]
+
+        durations = MaterializedViewRefresher(self.schema, parallelism=4).refresh(view_names)
+
+        self.assertEqual(set(durations), set(view_names))
+
+    @patch("masu.database.materialized_view_refresher.connection", Mock(in_atomic_block=False))
+    @patch.object(MaterializedViewRefresher, "_refresh_view", return_value=1.0)
+    @patch.object(MaterializedViewRefresher, "get_dependencies")
+    def test_refresh_in_parallel(self, mock_dependencies, mock_refresh):
+        """Test that every view is refreshed on a worker thread connection."""
+        mock_dependencies.return_value = {"a": set(), "b": {"a"}, "c": set()}
+
+        durations = MaterializedViewRefresher(self.schema, parallelism=2).refresh(["a", "b", "c", "a"])
+
+        self.assertEqual(durations, {"a": 1.0, "b": 1.0, "c": 1.0})
+        mock_dependencies.assert_called_with(["a", "b", "c"])
+        self.assertEqual(mock_refresh.call_count, 3)
+        for call in mock_refresh.call_args_list:
+            self.assertTrue(call[0][1])
+
+    def test_refresh_observes_latency(self):
+        """Test that each view refresh is recorded in the latency histogram."""
+        view_name = AWS_MATERIALIZED_VIEWS[0]._meta.db_table
+        labels = {"provider_type": "AWS", "view": view_name}
+        before = WORKER_REGISTRY.get_sample_value("materialized_view_refresh_seconds_count", labels) or 0
+
+        MaterializedViewRefresher(self.schema, provider_type="AWS").refresh([view_name])
+
+        after = WORKER_REGISTRY.get_sample_value("materialized_view_refresh_seconds_count", labels)
+        self.assertEqual(after, before + 1)
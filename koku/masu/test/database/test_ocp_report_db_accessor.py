@@ -23,6 +23,7 @@ from django.db import connection
 from django.db.models import Max
 from django.db.models import Min
 from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
 from tenant_schemas.utils import schema_context
 
 from api.metrics import constants as metric_constants
@@ -34,6 +35,8 @@ from masu.external.date_accessor import DateAccessor
 from masu.test import MasuTestCase
 from masu.test.database.helpers import ReportObjectCreator
 from masu.util.common import month_date_range_tuple
+from reporting.models import OCPAWSCostLineItemDailySummary
+from reporting.models import OCPAzureCostLineItemDailySummary
 from reporting.models import OCPUsageLineItem
 from reporting.models import OCPUsageLineItemDailySummary
 from reporting.models import OCPUsageReport
@@ -802,6 +805,42 @@ class OCPReportDBAccessorTest(MasuTestCase):
             for monthly_cost_row in monthly_cost_rows:
                 self.assertEquals(monthly_cost_row.supplementary_monthly_cost, cluster_rate)
 
+    def test_upsert_monthly_node_cost_line_item_query_count(self):
+        """Test that the node cost upsert runs the same number of queries for any number of nodes."""
+        cluster_id = self.ocp_provider.authentication.provider_resource_name
+        start_date, end_date = month_date_range_tuple(DateHelper().this_month_start)
+        rate_type = metric_constants.INFRASTRUCTURE_COST_TYPE
+
+        with CaptureQueriesContext(connection) as captured:
+            self.accessor.upsert_monthly_node_cost_line_item(start_date, end_date, cluster_id, "alias", rate_type, 10)
+
+        report_period = self.accessor.get_usage_period_by_dates_and_cluster(start_date, end_date, cluster_id)
+        with schema_context(self.schema):
+            OCPUsageLineItemDailySummary.objects.bulk_create(
+                OCPUsageLineItemDailySummary(
+                    report_period=report_period,
+                    cluster_id=cluster_id,
+                    data_source="Pod",
+                    node=f"extra_node_{i}",
+                    usage_start=start_date,
+                    usage_end=start_date,
+                )
+                for i in range(20)
+            )
+
+        with CaptureQueriesContext(connection) as captured_more_nodes:
+            self.accessor.upsert_monthly_node_cost_line_item(start_date, end_date, cluster_id, "alias", rate_type, 20)
+
+        self.assertEqual(len(captured_more_nodes), len(captured))
+        with schema_context(self.schema):
+            monthly_cost_rows = OCPUsageLineItemDailySummary.objects.filter(
+                cluster_id=cluster_id, usage_start=start_date, monthly_cost_type="Node"
+            )
+            self.assertEqual(monthly_cost_rows.filter(node__startswith="extra_node_").count(), 20)
+            self.assertEqual(monthly_cost_rows.count(), monthly_cost_rows.values("node").distinct().count())
+            for monthly_cost_row in monthly_cost_rows:
+                self.assertEqual(monthly_cost_row.infrastructure_monthly_cost, 20)
+
     def test_remove_monthly_cost(self):
         """Test that the monthly cost row in the summary table is removed."""
         self.cluster_id = self.ocp_provider.authentication.provider_resource_name
@@ -924,3 +963,74 @@ class OCPReportDBAccessorTest(MasuTestCase):
             summary_table_name = OCP_REPORT_TABLE_MAP["line_item_daily_summary"]
             query = self.accessor._get_db_obj_query(summary_table_name)
             self.assertFalse(query.filter(cluster_id=self.cluster_id).exists())
+
+    def _get_ocp_on_all_sources(self):
+        """Return the OCP-on-All source type and UUID pairs of the OCP-on-AWS and OCP-on-Azure summaries."""
+        with schema_context(self.schema):
+            aws_uuids = OCPAWSCostLineItemDailySummary.objects.values_list("source_uuid", flat=True).distinct()
+            azure_uuids = OCPAzureCostLineItemDailySummary.objects.values_list("source_uuid", flat=True).distinct()
+            return [("AWS", uuid) for uuid in aws_uuids if uuid] + [("Azure", uuid) for uuid in azure_uuids if uuid]
+
+    def test_populate_ocp_on_all_daily_summary_matches_union(self):
+        """Test that the OCP-on-All table holds the union of the OCP-on-AWS and OCP-on-Azure summaries."""
+        dh = DateHelper()
+        start_date = dh.last_month_start.date()
+        end_date = dh.today.date()
+        for source_type, source_uuid in self._get_ocp_on_all_sources():
+            self.accessor.populate_ocp_on_all_daily_summary(source_type, source_uuid, start_date, end_date)
+
+        columns = "source_type, cluster_id, node, usage_start, usage_account_id, product_code, unblended_cost"
+        union_sql = """
+            SELECT 'AWS', cluster_id, node::text, usage_start, usage_account_id, product_code, unblended_cost
+            FROM reporting_ocpawscostlineitem_daily_summary
+            WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+            UNION
+            SELECT 'Azure', cluster_id, node::text, usage_start, subscription_guid, service_name, pretax_cost
+            FROM reporting_ocpazurecostlineitem_daily_summary
+            WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+        """
+        with schema_context(self.schema):
+            with connection.cursor() as cursor:
+                cursor.execute(union_sql, {"start": start_date, "end": end_date})
+                expected = set(cursor.fetchall())
+                cursor.execute(
+                    f"""
+                    SELECT DISTINCT {columns} FROM reporting_ocpallcostlineitem_daily_summary
+                    WHERE usage_start >= %(start)s AND usage_start <= %(end)s
+                    """,
+                    {"start": start_date, "end": end_date},
+                )
+                self.assertEqual(set(cursor.fetchall()), expected)
+
+    def test_populate_ocp_on_all_daily_summary_keeps_other_ids(self):
+        """Test that repopulating one source leaves the ids of other sources' rows unchanged."""
+        sources = self._get_ocp_on_all_sources()
+        self.assertGreater(len(sources), 1)
+        source_type, source_uuid = sources[0]
+        dh = DateHelper()
+        for table_name in (
+            OCP_REPORT_TABLE_MAP["ocp_on_all_daily_summary"],
+            OCP_REPORT_TABLE_MAP["ocp_on_all_project_daily_summary"],
+        ):
+            with schema_context(self.schema):
+                query = self.accessor._get_db_obj_query(table_name)
+                other_ids = set(query.exclude(source_uuid=source_uuid).values_list("id", flat=True))
+
+                self.accessor.populate_ocp_on_all_daily_summary(
+                    source_type, source_uuid, dh.last_month_start, dh.today
+                )
+
+                self.assertEqual(set(query.exclude(source_uuid=source_uuid).values_list("id", flat=True)), other_ids)
+                self.assertTrue(query.filter(source_uuid=source_uuid).exists())
+
+    def test_delete_ocp_on_all_summary(self):
+        """Test that a cloud source's OCP-on-All rows are deleted."""
+        source_type, source_uuid = self._get_ocp_on_all_sources()[0]
+        dh = DateHelper()
+        self.accessor.populate_ocp_on_all_daily_summary(source_type, source_uuid, dh.last_month_start, dh.today)
+
+        self.assertGreater(self.accessor.delete_ocp_on_all_summary(source_uuid=source_uuid), 0)
+        self.assertEqual(self.accessor.delete_ocp_on_all_summary(), 0)
+        with schema_context(self.schema):
+            query = self.accessor._get_db_obj_query(OCP_REPORT_TABLE_MAP["ocp_on_all_daily_summary"])
+            self.assertFalse(query.filter(source_uuid=source_uuid).exists())
@@ -0,0 +1,108 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the PartitionManager."""
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from tenant_schemas.utils import schema_context
+
+from api.utils import DateHelper
+from masu.database.partition_manager import PARTITIONED_TABLES
+from masu.database.partition_manager import PartitionManager
+from masu.test import MasuTestCase
+from reporting.provider.aws.models import AWSCostEntryLineItemDaily
+
+
+class PartitionManagerTest(MasuTestCase):
+    """Test cases for the PartitionManager."""
+
+    def setUp(self):
+        """Set up the test."""
+        super().setUp()
+        self.manager = PartitionManager(self.schema)
+        self.table = AWSCostEntryLineItemDaily._meta.db_table
+        self.future_month = datetime.date(2100, 1, 1)
+
+    def test_create_partition(self):
+        """Test that a month's partition is created once."""
+        self.assertTrue(self.manager.create_partition(self.table, self.future_month))
+        self.assertFalse(self.manager.create_partition(self.table, self.future_month + relativedelta(days=3)))
+
+        partitions = self.manager.get_partitions(self.table)
+        self.assertEqual(partitions.get(f"{self.table}_2100_01"), self.future_month)
+
+    def test_create_partition_moves_default_rows(self):
+        """Test that the month's rows move out of the default partition."""
+        month_start = DateHelper().this_month_start.date()
+        month_end = month_start + relativedelta(months=1)
+        with schema_context(self.schema):
+            month_filter = {"usage_start__gte": month_start, "usage_start__lt": month_end}
+            expected = AWSCostEntryLineItemDaily.objects.filter(**month_filter).count()
+
+        self.manager.create_partition(self.table, month_start)
+
+        partition = self.manager.get_partition_name(self.table, month_start)
+        with schema_context(self.schema):
+            self.assertEqual(AWSCostEntryLineItemDaily.objects.filter(**month_filter).count(), expected)
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT count(*) FROM {partition}")
+                self.assertEqual(cursor.fetchone()[0], expected)
+                cursor.execute(
+                    f"SELECT count(*) FROM {self.table}_default WHERE usage_start >= %s AND usage_start < %s",
+                    [month_start, month_end],
+                )
+                self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_create_upcoming_partitions(self):
+        """Test that this and next month's partitions are created for every table."""
+        created = self.manager.create_upcoming_partitions(self.future_month)
+
+        self.assertEqual(len(created), 2 * len(PARTITIONED_TABLES))
+        self.assertEqual(self.manager.create_upcoming_partitions(self.future_month), [])
+
+    def test_truncate_partition(self):
+        """Test that a partition is only truncated when it holds just the bill's rows."""
+        month_start = DateHelper().this_month_start.date()
+        self.assertFalse(self.manager.truncate_partition(self.table, month_start))
+
+        self.manager.create_partition(self.table, month_start)
+        with schema_context(self.schema):
+            bill_ids = set(
+                AWSCostEntryLineItemDaily.objects.filter(usage_start__gte=month_start).values_list(
+                    "cost_entry_bill_id", flat=True
+                )
+            )
+        if len(bill_ids) > 1:
+            self.assertFalse(
+                self.manager.truncate_partition(
+                    self.table, month_start, bill_column="cost_entry_bill_id", bill_id=bill_ids.pop()
+                )
+            )
+
+        self.assertTrue(self.manager.truncate_partition(self.table, month_start))
+        with schema_context(self.schema):
+            self.assertFalse(AWSCostEntryLineItemDaily.objects.filter(usage_start__gte=month_start).exists())
+
+    def test_drop_partitions_before(self):
+        """Test that only partitions ending before the date are dropped."""
+        self.manager.create_upcoming_partitions(self.future_month)
+
+        dropped = self.manager.drop_partitions_before(self.table, datetime.datetime(2100, 2, 1))
+
+        self.assertEqual(dropped, [f"{self.table}_2100_01"])
+        self.assertEqual(list(self.manager.get_partitions(self.table).values()), [datetime.date(2100, 2, 1)])
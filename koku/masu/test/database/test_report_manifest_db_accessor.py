@@ -92,6 +92,19 @@ class ReportManifestDBAccessorTest(IamTestCase):
             self.manifest_accessor.mark_manifest_as_updated(manifest)
             self.assertGreater(manifest.manifest_updated_datetime, now)
 
+    def test_increment_processed_files(self):
+        """Test that the processed file count is incremented from its stored value."""
+        with schema_context(self.schema):
+            manifest = self.manifest_accessor.add(**self.manifest_dict)
+            stale_manifest = self.manifest_accessor.get_manifest_by_id(manifest.id)
+
+            self.manifest_accessor.increment_processed_files(manifest.id)
+            self.manifest_accessor.increment_processed_files(manifest.id)
+            self.manifest_accessor.mark_manifest_as_updated(stale_manifest)
+
+            manifest.refresh_from_db()
+            self.assertEqual(manifest.num_processed_files, self.manifest_dict.get("num_processed_files", 0) + 2)
+
     def test_mark_manifest_as_updated_none_manifest(self):
         """Test that a none manifest doesn't update failure."""
         try:
@@ -15,20 +15,26 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Test the AzureService object."""
+import os
+import tempfile
 from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import Mock
 from unittest.mock import patch
 from unittest.mock import PropertyMock
 
 from adal.adal_error import AdalError
 from azure.common import AzureException
+from azure.core import MatchConditions
 from azure.core.exceptions import HttpResponseError
+from azure.core.exceptions import ResourceModifiedError
 from azure.storage.blob import BlobClient
 from azure.storage.blob import BlobServiceClient
 from azure.storage.blob import ContainerClient
 from dateutil.relativedelta import relativedelta
 from faker import Faker
 
+from masu.config import Config
 from masu.external.downloader.azure.azure_service import AzureCostReportNotFound
 from masu.external.downloader.azure.azure_service import AzureService
 from masu.external.downloader.azure.azure_service import AzureServiceError
@@ -55,6 +61,46 @@ def throw_azure_http_error_403(scope):
     raise error
 
 
+class FakeBlobService:
+    """An in-memory blob service that records list calls and downloads."""
+
+    def __init__(self, container_name, blobs):
+        """Store the blob contents of one container, keyed by blob name."""
+        self.container_name = container_name
+        self.data = blobs
+        self.blobs = {
+            name: SimpleNamespace(name=name, etag=FAKE.uuid4(), size=len(data), last_modified=datetime.now())
+            for name, data in blobs.items()
+        }
+        self.list_calls = []
+        self.downloads = []
+
+    def list_blobs(self, name_starts_with=None):
+        """List the current properties of the blobs under a prefix."""
+        self.list_calls.append((self.container_name, name_starts_with))
+        return [
+            SimpleNamespace(**vars(blob)) for name, blob in self.blobs.items() if name.startswith(name_starts_with)
+        ]
+
+    def get_container_client(self, container_name):
+        """Return the client of the container."""
+        return self
+
+    def get_blob_client(self, container_name, blob_name):
+        """Return the client of a blob."""
+        service = self
+
+        class FakeBlobClient:
+            def download_blob(self, max_concurrency=1, etag=None, match_condition=None):
+                if match_condition == MatchConditions.IfNotModified and etag != service.blobs[blob_name].etag:
+                    raise ResourceModifiedError("The condition specified using HTTP conditional header(s) is not met.")
+                service.downloads.append((blob_name, max_concurrency))
+                data = service.data[blob_name]
+                return Mock(readinto=lambda stream: stream.write(data))
+
+        return FakeBlobClient()
+
+
 class AzureServiceTest(MasuTestCase):
     """Test Cases for the AzureService object."""
 
@@ -110,8 +156,10 @@ class AzureServiceTest(MasuTestCase):
                         get_blob_client=Mock(
                             return_value=Mock(  # .get_blob_client()
                                 spec=BlobClient,
-                                # .download_blob().readall()
-                                download_blob=Mock(return_value=Mock(readall=Mock(return_value=fake_data))),
+                                # .download_blob().readinto()
+                                download_blob=Mock(
+                                    return_value=Mock(readinto=Mock(side_effect=lambda stream: stream.write(fake_data)))
+                                ),
                             )
                         ),
                         get_container_client=Mock(
@@ -312,13 +360,75 @@ class AzureServiceTest(MasuTestCase):
         """Test that cost management exports are downloaded."""
         key = "{}_{}_day_{}".format(self.container_name, "blob", self.current_date_time.day)
 
-        mock_blob = Mock()
+        mock_blob = Mock(size=1024 * 64)
         name_attr = PropertyMock(return_value=key)
         type(mock_blob).name = name_attr  # kludge to set name attribute on Mock
 
         client = self.get_mock_client(blob_list=[mock_blob])
         file_path = client.download_cost_export(key, self.container_name)
         self.assertTrue(file_path.endswith(".csv"))
+        os.remove(file_path)
+
+    def get_fake_client(self, blob_service):
+        """Generate an AzureService instance backed by a fake blob service."""
+        with patch(
+            "masu.external.downloader.azure.azure_service.AzureClientFactory", spec=AzureClientFactory
+        ) as mock_factory:
+            mock_factory.return_value = Mock(
+                spec=AzureClientFactory,
+                cloud_storage_account=Mock(return_value=blob_service),
+                subscription_id=self.subscription_id,
+            )
+            return AzureService(
+                self.tenant_id,
+                self.client_id,
+                self.client_secret,
+                self.resource_group_name,
+                self.storage_account_name,
+                self.subscription_id,
+            )
+
+    @patch.object(Config, "AZURE_DOWNLOAD_MAX_CONCURRENCY", 4)
+    def test_download_cost_export_parallel(self):
+        """Test that a cost export is downloaded with the configured concurrency."""
+        key = f"{self.export_directory}/20200101-20200131/{FAKE.uuid4()}/export.csv"
+        data = os.urandom(1024 * 1024)
+        blob_service = FakeBlobService(self.container_name, {key: data})
+        client = self.get_fake_client(blob_service)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = os.path.join(temp_dir, "export.csv")
+            client.download_cost_export(key, self.container_name, destination=destination)
+
+            with open(destination, "rb") as downloaded:
+                self.assertEqual(downloaded.read(), data)
+        self.assertEqual(blob_service.downloads, [(key, 4)])
+
+    def test_download_cost_export_modified_blob(self):
+        """Test that a blob rewritten after it was listed fails the download."""
+        key = f"{self.export_directory}/export.csv"
+        blob_service = FakeBlobService(self.container_name, {key: b"cost,export"})
+        client = self.get_fake_client(blob_service)
+        client.get_cost_export_for_key(key, self.container_name)
+        blob_service.blobs[key].etag = "changed"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(AzureServiceError):
+                client.download_cost_export(key, self.container_name, destination=f"{temp_dir}/export.csv")
+
+    def test_manifest_prefix_listed_once(self):
+        """Test that the files of a manifest are found and downloaded from one listing."""
+        report_path = f"{self.export_directory}/20200101-20200131"
+        keys = [f"{report_path}/{FAKE.uuid4()}/export_{number}.csv" for number in range(3)]
+        blob_service = FakeBlobService(self.container_name, {key: b"cost,export" for key in keys})
+        client = self.get_fake_client(blob_service)
+
+        client.get_latest_cost_export_for_path(report_path, self.container_name)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for number, key in enumerate(keys):
+                self.assertEqual(client.get_cost_export_for_key(key, self.container_name).name, key)
+                client.download_cost_export(key, self.container_name, destination=f"{temp_dir}/{number}.csv")
+        self.assertEqual(blob_service.list_calls, [(self.container_name, report_path)])
 
     @patch("masu.external.downloader.azure.azure_service.AzureClientFactory", spec=AzureClientFactory)
     def test_get_cost_export_for_key_exception(self, mock_factory):
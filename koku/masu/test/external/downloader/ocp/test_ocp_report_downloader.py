@@ -15,15 +15,17 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Test the Report Downloader."""
+import csv
+import gzip
 import logging
 import os.path
 import shutil
 import tempfile
+import tracemalloc
 from datetime import datetime
 from unittest.mock import Mock
 from unittest.mock import patch
 
-import pandas as pd
 from faker import Faker
 
 from api.models import Provider
@@ -166,27 +168,109 @@ class OCPReportDownloaderTest(MasuTestCase):
             # Re-enable log suppression
             logging.disable(logging.CRITICAL)
 
+    def _write_storage_report(self, file_path, rows, days=31):
+        """Write an OCP storage report whose rows cycle through the days of a month."""
+        with open(file_path, "w", newline="") as report:
+            writer = csv.writer(report)
+            writer.writerow(["interval_start", "persistentvolumeclaim_labels"])
+            for row in range(rows):
+                writer.writerow([f"2020-01-{row % days + 1:02d} 00:00:00 +0000 UTC", f"label:{row}"])
+
     def test_divide_csv_daily(self):
         """Test the divide_csv_daily method."""
 
         with tempfile.TemporaryDirectory() as td:
             filename = "storage_data.csv"
             file_path = f"{td}/{filename}"
-            with patch("masu.external.downloader.ocp.ocp_report_downloader.pd") as mock_pd:
-                with patch(
-                    "masu.external.downloader.ocp.ocp_report_downloader.utils.detect_type",
-                    return_value=("storage_usage", None),
-                ):
-                    mock_report = {
-                        "interval_start": ["2020-01-01 00:00:00 +UTC", "2020-01-02 00:00:00 +UTC"],
-                        "persistentvolumeclaim_labels": ["label1", "label2"],
-                    }
-                    df = pd.DataFrame(data=mock_report)
-                    mock_pd.read_csv.return_value = df
-                    daily_files = divide_csv_daily(file_path, filename)
-                    self.assertNotEqual([], daily_files)
-                    self.assertEqual(len(daily_files), 2)
-                    gen_files = ["storage_usage.2020-01-01.csv", "storage_usage.2020-01-02.csv"]
-                    expected = [{"filename": gen_file, "filepath": f"{td}/{gen_file}"} for gen_file in gen_files]
-                    for expected_item in expected:
-                        self.assertIn(expected_item, daily_files)
+            self._write_storage_report(file_path, 4, days=2)
+            with patch(
+                "masu.external.downloader.ocp.ocp_report_downloader.utils.detect_type",
+                return_value=("storage_usage", None),
+            ):
+                daily_files = divide_csv_daily(file_path, filename)
+                self.assertNotEqual([], daily_files)
+                self.assertEqual(len(daily_files), 2)
+                gen_files = ["storage_usage.2020-01-01.csv.gz", "storage_usage.2020-01-02.csv.gz"]
+                expected = [{"filename": gen_file, "filepath": f"{td}/{gen_file}"} for gen_file in gen_files]
+                self.assertEqual(daily_files, expected)
+                with gzip.open(f"{td}/storage_usage.2020-01-02.csv.gz", "rt", newline="") as day_file:
+                    self.assertEqual(
+                        list(csv.reader(day_file)),
+                        [
+                            ["interval_start", "persistentvolumeclaim_labels"],
+                            ["2020-01-02 00:00:00 +0000 UTC", "label:1"],
+                            ["2020-01-02 00:00:00 +0000 UTC", "label:3"],
+                        ],
+                    )
+
+    def test_divide_csv_daily_on_daily_file(self):
+        """Test that each day of an ordered report is passed on once it is complete, during the pass."""
+        completed = []
+
+        def on_daily_file(daily_file):
+            with gzip.open(daily_file["filepath"], "rt", newline="") as day_file:
+                line_count = len(list(csv.reader(day_file)))
+            day_files = sorted(name for name in os.listdir(os.path.dirname(file_path)) if name.endswith(".gz"))
+            completed.append((daily_file["filename"], line_count, day_files))
+
+        with tempfile.TemporaryDirectory() as td:
+            file_path = f"{td}/storage_data.csv"
+            with open(file_path, "w", newline="") as report:
+                writer = csv.writer(report)
+                writer.writerow(["interval_start", "persistentvolumeclaim_labels"])
+                for row in range(6):
+                    writer.writerow([f"2020-01-{row // 2 + 1:02d} 00:00:00 +0000 UTC", f"label:{row}"])
+            with patch(
+                "masu.external.downloader.ocp.ocp_report_downloader.utils.detect_type",
+                return_value=("storage_usage", None),
+            ):
+                daily_files = divide_csv_daily(file_path, "storage_data.csv", on_daily_file=on_daily_file)
+
+        names = [daily_file["filename"] for daily_file in daily_files]
+        # A day is passed on, complete, as soon as the next day's file is started
+        self.assertEqual(completed, [(names[0], 3, names[:2]), (names[1], 3, names[:3]), (names[2], 3, names[:3])])
+
+    def test_divide_csv_daily_on_daily_file_unordered(self):
+        """Test that a day of an unordered report is passed on again once its reopened file is complete."""
+        completed = []
+        with tempfile.TemporaryDirectory() as td:
+            file_path = f"{td}/storage_data.csv"
+            self._write_storage_report(file_path, 4, days=2)
+            with patch(
+                "masu.external.downloader.ocp.ocp_report_downloader.utils.detect_type",
+                return_value=("storage_usage", None),
+            ):
+                daily_files = divide_csv_daily(file_path, "storage_data.csv", on_daily_file=completed.append)
+            with gzip.open(daily_files[0]["filepath"], "rt", newline="") as day_file:
+                self.assertEqual(
+                    list(csv.reader(day_file)),
+                    [
+                        ["interval_start", "persistentvolumeclaim_labels"],
+                        ["2020-01-01 00:00:00 +0000 UTC", "label:0"],
+                        ["2020-01-01 00:00:00 +0000 UTC", "label:2"],
+                    ],
+                )
+
+        self.assertEqual(completed, [daily_files[0], daily_files[0], daily_files[1]])
+
+    def test_divide_csv_daily_constant_memory(self):
+        """Test that splitting a month of rows does not hold the report in memory."""
+        peaks = []
+        with patch(
+            "masu.external.downloader.ocp.ocp_report_downloader.utils.detect_type",
+            return_value=("storage_usage", None),
+        ):
+            for rows in (31000, 124000):
+                with tempfile.TemporaryDirectory() as td:
+                    file_path = f"{td}/storage_data.csv"
+                    self._write_storage_report(file_path, rows)
+                    tracemalloc.start()
+                    daily_files = divide_csv_daily(file_path, "storage_data.csv")
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                    self.assertEqual(len(daily_files), 31)
+                    with gzip.open(daily_files[-1]["filepath"], "rt") as day_file:
+                        self.assertEqual(sum(1 for _ in day_file), rows // 31 + 1)
+
+        # Four times the rows must not need noticeably more memory.
+        self.assertLess(peaks[1], peaks[0] * 1.5)
@@ -19,9 +19,14 @@ import json
 import logging
 import os
 import shutil
+import tarfile
 import tempfile
+import threading
+import tracemalloc
 import uuid
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
 from unittest.mock import Mock
 from unittest.mock import patch
 
@@ -89,6 +94,24 @@ class MockMessage:
         return self._value
 
 
+class PayloadRequestHandler(BaseHTTPRequestHandler):
+    """Serve a payload of the server's payload_size without holding it in memory."""
+
+    def do_GET(self):
+        """Write the payload in small chunks."""
+        size = self.server.payload_size
+        self.send_response(200)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        chunk = b"\0" * 65536
+        while size > 0:
+            self.wfile.write(chunk[:size])
+            size -= len(chunk)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
 class MockKafkaConsumer:
     def __init__(self, preloaded_messages=None):
         if not preloaded_messages:
@@ -105,6 +128,30 @@ class MockKafkaConsumer:
         self.preloaded_messages.pop()
 
 
+class FakeKafkaConsumer:
+    """In memory consumer recording the offsets it commits."""
+
+    def __init__(self):
+        self.committed = []
+        self.paused = False
+        self._stored = None
+
+    def assignment(self):
+        return [("mocked-topic", 0)]
+
+    def pause(self, partitions):
+        self.paused = True
+
+    def resume(self, partitions):
+        self.paused = False
+
+    def store_offsets(self, msg):
+        self._stored = msg.offset()
+
+    def commit(self):
+        self.committed.append(self._stored)
+
+
 class KafkaMsgHandlerTest(MasuTestCase):
     """Test Cases for the Kafka msg handler."""
 
@@ -175,6 +222,78 @@ class KafkaMsgHandlerTest(MasuTestCase):
             else:
                 mock_process_message.assert_not_called()
 
+    def test_message_pool_commits_in_order(self):
+        """Test that the pool only commits past messages that finished."""
+        finished = {offset: threading.Event() for offset in (1, 2, 3)}
+
+        def process_messages(msg):
+            finished[msg.offset()].wait(10)
+
+        consumer = FakeKafkaConsumer()
+        pool = msg_handler.KafkaMessagePool(consumer, 3)
+        with patch("masu.external.kafka_msg_handler.process_messages", side_effect=process_messages):
+            for offset in (1, 2, 3):
+                pool.submit(MockMessage(offset=offset))
+            finished[2].set()
+            pool.collect(timeout=None)
+            self.assertEqual(consumer.committed, [])
+
+            finished[1].set()
+            pool.collect(timeout=None)
+            self.assertEqual(consumer.committed, [2])
+
+            finished[3].set()
+            pool.close()
+        self.assertEqual(consumer.committed, [2, 3])
+
+    def test_message_pool_retries_before_commit(self):
+        """Test that a message failing with a database error is processed again before it is committed."""
+        consumer = FakeKafkaConsumer()
+        pool = msg_handler.KafkaMessagePool(consumer, 2)
+        with patch("masu.external.kafka_msg_handler.process_messages", side_effect=[OperationalError, None]) as mock:
+            with patch.object(Config, "RETRY_SECONDS", 0):
+                pool.submit(MockMessage(offset=7))
+                pool.close()
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(consumer.committed, [7])
+
+    def test_message_pool_retries_with_backoff(self):
+        """Test that a failing message is retried with a growing delay until the retries run out."""
+        consumer = FakeKafkaConsumer()
+        pool = msg_handler.KafkaMessagePool(consumer, 2)
+        with patch("masu.external.kafka_msg_handler.process_messages", side_effect=OperationalError) as mock:
+            with patch("masu.external.kafka_msg_handler.time.sleep") as mock_sleep:
+                with patch.multiple(Config, RETRY_SECONDS=10, KAFKA_RETRY_MAX_SECONDS=60, KAFKA_MAX_RETRIES=4):
+                    pool.submit(MockMessage(offset=7))
+                    pool.close()
+        self.assertEqual(mock.call_count, 5)
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [10, 20, 40, 60, 60])
+        self.assertEqual(consumer.committed, [7])
+
+    def test_process_kafka_message_payload_error(self):
+        """Test that a payload that can not be downloaded or extracted is committed without a retry."""
+        for error in (msg_handler.KafkaMsgHandlerPayloadError, msg_handler.PayloadTooLargeError):
+            with patch("masu.external.kafka_msg_handler.process_messages", side_effect=error) as mock:
+                with patch("masu.external.kafka_msg_handler.time.sleep") as mock_sleep:
+                    self.assertTrue(msg_handler.process_kafka_message(MockMessage(offset=1)))
+                    mock_sleep.assert_not_called()
+            mock.assert_called_once()
+
+    def test_message_pool_backpressure(self):
+        """Test that the consumer is paused while every worker is busy."""
+        release = threading.Event()
+        consumer = FakeKafkaConsumer()
+        pool = msg_handler.KafkaMessagePool(consumer, 2)
+        with patch("masu.external.kafka_msg_handler.process_messages", side_effect=lambda msg: release.wait(10)):
+            pool.submit(MockMessage(offset=1))
+            self.assertFalse(consumer.paused)
+            pool.submit(MockMessage(offset=2))
+            self.assertTrue(consumer.paused)
+            release.set()
+            pool.close()
+        self.assertFalse(consumer.paused)
+        self.assertEqual(consumer.committed[-1], 2)
+
     @patch("masu.external.kafka_msg_handler.process_messages")
     def test_listen_for_messages_db_error(self, mock_process_message):
         """Test to listen for kafka messages with database errors."""
@@ -503,8 +622,8 @@ class KafkaMsgHandlerTest(MasuTestCase):
                                 shutil.rmtree(fake_dir)
                                 shutil.rmtree(fake_pvc_dir)
 
-    @patch("masu.external.kafka_msg_handler.TarFile.extractall", side_effect=raise_OSError)
-    def test_extract_bad_payload_not_tar(self, mock_extractall):
+    @patch("masu.external.kafka_msg_handler.TarFile.extractfile", side_effect=raise_OSError)
+    def test_extract_bad_payload_not_tar(self, mock_extractfile):
         """Test to verify extracting payload missing report files is not successful."""
         fake_account = {"provider_uuid": uuid.uuid4(), "provider_type": "OCP", "schema_name": "testschema"}
         payload_url = "http://insights-upload.com/quarnantine/file_to_validate"
@@ -546,6 +665,83 @@ class KafkaMsgHandlerTest(MasuTestCase):
                 with self.assertRaises(msg_handler.KafkaMsgHandlerError):
                     msg_handler.extract_payload(payload_url, "test_request_id")
 
+    def test_download_payload_too_large(self):
+        """Test that a payload larger than the limit is not kept."""
+        payload_url = "http://insights-upload.com/quarnantine/file_to_validate"
+        pvc_dir = tempfile.mkdtemp()
+        with requests_mock.mock() as m:
+            m.get(payload_url, content=self.tarball_file)
+            with patch.object(Config, "PVC_DIR", pvc_dir):
+                with patch.object(Config, "KAFKA_PAYLOAD_MAX_SIZE", len(self.tarball_file) - 1):
+                    with self.assertRaises(msg_handler.PayloadTooLargeError):
+                        msg_handler.download_payload("test_request_id", payload_url)
+        self.assertEqual(os.listdir(pvc_dir), [])
+        shutil.rmtree(pvc_dir)
+
+    def test_download_payload_memory_does_not_grow(self):
+        """Test that the payload is streamed to disk instead of held in memory."""
+        pvc_dir = tempfile.mkdtemp()
+        payload_sizes = [4 * 1024 * 1024, 32 * 1024 * 1024]
+        peaks = []
+        for payload_size in payload_sizes:
+            server = HTTPServer(("127.0.0.1", 0), PayloadRequestHandler)
+            server.payload_size = payload_size
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            payload_url = f"http://127.0.0.1:{server.server_port}/payload"
+            try:
+                with patch.object(Config, "PVC_DIR", pvc_dir):
+                    with patch.object(Config, "KAFKA_PAYLOAD_CHUNK_SIZE", 65536):
+                        tracemalloc.start()
+                        temp_dir, temp_file, _ = msg_handler.download_payload("test_request_id", payload_url)
+                        peaks.append(tracemalloc.get_traced_memory()[1])
+                        tracemalloc.stop()
+            finally:
+                server.shutdown()
+                server.server_close()
+            self.assertEqual(os.path.getsize(temp_file), payload_size)
+            shutil.rmtree(temp_dir)
+        shutil.rmtree(pvc_dir)
+
+        self.assertLess(max(peaks), payload_sizes[0])
+
+    def test_extract_payload_report_files(self):
+        """Test that only the report files listed in the manifest are written."""
+        temp_dir = tempfile.mkdtemp()
+        destination_dir = f"{temp_dir}/destination"
+        os.makedirs(destination_dir)
+        tarball_path = f"{temp_dir}/payload.tar.gz"
+        members = {
+            "payload/manifest.json": b"{}",
+            "payload/listed.csv": b"listed",
+            "payload/unlisted.csv": b"unlisted",
+            "payload/../escaped.csv": b"escaped",
+        }
+        with tarfile.open(tarball_path, "w:gz") as payload:
+            for name, content in members.items():
+                member_path = f"{temp_dir}/member"
+                with open(member_path, "wb") as member_file:
+                    member_file.write(content)
+                payload.add(member_path, arcname=name)
+
+        report_files = ["listed.csv", "missing.csv", "../escaped.csv", "/etc/passwd"]
+        extracted = msg_handler.extract_payload_report_files(
+            "test_request_id", tarball_path, "payload/manifest.json", report_files, destination_dir
+        )
+
+        self.assertEqual(extracted, {"listed.csv"})
+        self.assertEqual(os.listdir(destination_dir), ["listed.csv"])
+        with open(f"{destination_dir}/listed.csv", "rb") as listed:
+            self.assertEqual(listed.read(), b"listed")
+        self.assertFalse(os.path.exists(f"{temp_dir}/escaped.csv"))
+        shutil.rmtree(temp_dir)
+
+    def test_is_safe_member_name(self):
+        """Test that absolute and parent directory member names are unsafe."""
+        self.assertTrue(msg_handler.is_safe_member_name("payload/manifest.json"))
+        self.assertFalse(msg_handler.is_safe_member_name("/payload/manifest.json"))
+        self.assertFalse(msg_handler.is_safe_member_name("payload/../../manifest.json"))
+        self.assertFalse(msg_handler.is_safe_member_name(""))
+
     def test_extract_payload_wrong_file_type(self):
         """Test to verify extracting payload is successful."""
         payload_url = "http://insights-upload.com/quarnantine/file_to_validate"
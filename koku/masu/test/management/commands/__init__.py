@@ -0,0 +1 @@
+# noqa
@@ -0,0 +1,151 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the benchmark suite helpers."""
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from masu.management.commands.benchmark_gcp_processor import GCP_COLUMNS
+from masu.management.commands.benchmark_gcp_processor import generate_gcp_report
+from masu.management.commands.benchmark_processor import generate_aws_cur
+from masu.management.commands.benchmark_suite import AZURE_COLUMNS
+from masu.management.commands.benchmark_suite import compare_results
+from masu.management.commands.benchmark_suite import generate_azure_report
+from masu.management.commands.benchmark_suite import generate_ocp_reports
+from masu.management.commands.benchmark_suite import StageTimer
+from masu.util.ocp.common import CPU_MEM_USAGE_COLUMNS
+
+
+class BenchmarkSuiteTest(TestCase):
+    """Test cases for the benchmark suite helpers."""
+
+    def setUp(self):
+        """Create a directory for the generated reports."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.start = datetime(2020, 2, 1)
+
+    def test_stage_timer_run(self):
+        """Test that a stage's time, throughput and peak memory are recorded."""
+        timer = StageTimer()
+        with patch.object(StageTimer, "get_peak_memory", side_effect=[1000, 3000]):
+            result = timer.run("AWS", "process", 10, lambda value: value * 2, 21)
+
+        self.assertEqual(result, 42)
+        self.assertEqual(len(timer.stages), 1)
+        stage = timer.stages[0]
+        self.assertEqual(stage["provider_type"], "AWS")
+        self.assertEqual(stage["stage"], "process")
+        self.assertEqual(stage["rows"], 10)
+        self.assertGreaterEqual(stage["seconds"], 0)
+        self.assertEqual(stage["peak_memory_bytes"], 3000)
+        self.assertEqual(stage["peak_memory_increase_bytes"], 2000)
+
+    def test_stage_timer_get_peak_memory(self):
+        """Test that the peak memory is read without tracing allocations."""
+        self.assertGreater(StageTimer.get_peak_memory(), 0)
+
+    def test_compare_results(self):
+        """Test that stages in both runs are compared and other stages are skipped."""
+        baseline = {
+            "stages": [
+                {"provider_type": "AWS", "stage": "process", "seconds": 10.0, "peak_memory_bytes": 200},
+                {"provider_type": "AWS", "stage": "summary", "seconds": 0, "peak_memory_bytes": 0},
+            ]
+        }
+        current = {
+            "stages": [
+                {"provider_type": "AWS", "stage": "process", "seconds": 5.0, "peak_memory_bytes": 300},
+                {"provider_type": "AWS", "stage": "summary", "seconds": 2.0, "peak_memory_bytes": 100},
+                {"provider_type": "OCP", "stage": "process", "seconds": 1.0, "peak_memory_bytes": 100},
+            ]
+        }
+        comparison = compare_results(baseline, current)
+
+        self.assertEqual(len(comparison), 2)
+        self.assertEqual(comparison[0]["seconds_change"], -0.5)
+        self.assertEqual(comparison[0]["peak_memory_change"], 0.5)
+        self.assertIsNone(comparison[1]["seconds_change"])
+        self.assertIsNone(comparison[1]["peak_memory_change"])
+        self.assertEqual(compare_results({}, current), [])
+
+    def test_generate_azure_report(self):
+        """Test that the Azure export has the requested rows in the billing month."""
+        file_path = os.path.join(self.temp_dir, "azure.csv")
+        size = generate_azure_report(file_path, 50, resources=10, tag_keys=4, tag_values=2, start=self.start)
+
+        self.assertEqual(size, os.path.getsize(file_path))
+        with open(file_path) as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(list(rows[0].keys()), AZURE_COLUMNS)
+        self.assertEqual({row["UsageDateTime"][:7] for row in rows}, {"2020-02"})
+        self.assertEqual(len({row["InstanceId"] for row in rows}), 10)
+        for row in rows:
+            self.assertTrue(set(json.loads(row["Tags"])) <= {f"key_{key}" for key in range(4)})
+
+    def test_generate_ocp_reports(self):
+        """Test that the OCP pod, storage and node label reports are written."""
+        sizes = generate_ocp_reports(self.temp_dir, 100, resources=20, start=self.start)
+
+        self.assertEqual(len(sizes), 3)
+        for path, size in sizes.items():
+            self.assertEqual(size, os.path.getsize(path))
+        pod_path = os.path.join(self.temp_dir, "benchmark_pod_usage.csv")
+        with open(pod_path) as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(list(rows[0].keys()), CPU_MEM_USAGE_COLUMNS)
+        self.assertEqual(len({row["pod"] for row in rows}), 20)
+        with open(os.path.join(self.temp_dir, "benchmark_storage_usage.csv")) as report:
+            # Every tenth pod has a persistent volume claim
+            self.assertEqual(len(list(csv.DictReader(report))), 10)
+
+    def test_generate_aws_cur(self):
+        """Test that the gzipped CUR has the requested rows and tag columns."""
+        file_path = os.path.join(self.temp_dir, "aws.csv.gz")
+        generate_aws_cur(file_path, 30, resources=5, tag_keys=3, tag_values=2, start=self.start)
+
+        with gzip.open(file_path, "rt") as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len(rows), 30)
+        self.assertIn("resourceTags/user:key_2", rows[0])
+        self.assertEqual({row["lineItem/UsageStartDate"][:7] for row in rows}, {"2020-02"})
+
+    def test_generate_gcp_report(self):
+        """Test that the GCP export repeats row keys only when duplicates are requested."""
+        file_path = os.path.join(self.temp_dir, "gcp.csv")
+        generate_gcp_report(file_path, 40, projects=4, line_item_types=5, duplicates=0, start=self.start)
+        with open(file_path) as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(list(rows[0].keys()), GCP_COLUMNS)
+        keys = [(row["Project ID"], row["Line Item"], row["Start Time"]) for row in rows]
+        self.assertEqual(len(set(keys)), len(keys))
+
+        generate_gcp_report(file_path, 40, projects=4, line_item_types=5, duplicates=1, start=self.start)
+        with open(file_path) as report:
+            rows = list(csv.DictReader(report))
+        self.assertEqual(len({(row["Project ID"], row["Line Item"], row["Start Time"]) for row in rows}), 1)
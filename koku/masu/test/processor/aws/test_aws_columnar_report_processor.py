@@ -0,0 +1,158 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the AWSColumnarReportProcessor."""
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+import pandas
+from tenant_schemas.utils import schema_context
+
+from masu.database import AWS_CUR_TABLE_MAP
+from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.external import GZIP_COMPRESSED
+from masu.external import UNCOMPRESSED
+from masu.processor.aws.aws_columnar_report_processor import AWSColumnarReportProcessor
+from masu.processor.aws.aws_report_processor import AWSReportProcessor
+from masu.test import MasuTestCase
+
+
+class AWSColumnarReportProcessorTest(MasuTestCase):
+    """Test Cases for the AWSColumnarReportProcessor object."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test class with required objects."""
+        super().setUpClass()
+        cls.test_report_test_path = "./koku/masu/test/data/test_cur.csv"
+        cls.test_report_gzip_test_path = "./koku/masu/test/data/test_cur.csv.gz"
+
+    def setUp(self):
+        """Set up shared variables."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_report = f"{self.temp_dir}/test_cur.csv"
+        self.test_report_gzip = f"{self.temp_dir}/test_cur.csv.gz"
+        shutil.copy2(self.test_report_test_path, self.test_report)
+        shutil.copy2(self.test_report_gzip_test_path, self.test_report_gzip)
+
+        self.processor = AWSColumnarReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+        )
+        self.accessor = AWSReportDBAccessor(self.schema)
+
+    def tearDown(self):
+        """Return the database to a pre-test state."""
+        super().tearDown()
+        shutil.rmtree(self.temp_dir)
+
+    def _get_line_items(self):
+        """Return the line items in the database without their ids."""
+        with schema_context(self.schema):
+            query = self.accessor._get_db_obj_query(AWS_CUR_TABLE_MAP["line_item"])
+            return sorted(
+                query.values_list(
+                    "cost_entry__interval_start",
+                    "cost_entry_product_id",
+                    "resource_id",
+                    "usage_amount",
+                    "unblended_cost",
+                    "tags",
+                ),
+                key=str,
+            )
+
+    def test_process_matches_row_processor(self):
+        """Test that the columnar path writes the same line items as the row path."""
+        row_processor = AWSReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+        )
+        with schema_context(self.schema):
+            self.accessor._get_db_obj_query(AWS_CUR_TABLE_MAP["line_item"]).delete()
+        row_processor.process()
+        expected = self._get_line_items()
+
+        with schema_context(self.schema):
+            self.accessor._get_db_obj_query(AWS_CUR_TABLE_MAP["line_item"]).delete()
+        shutil.copy2(self.test_report_test_path, self.test_report)
+        self.processor.process()
+
+        self.assertNotEqual(expected, [])
+        self.assertEqual(self._get_line_items(), expected)
+        self.assertFalse(os.path.exists(self.test_report))
+
+    def test_process_gzip(self):
+        """Test the columnar processing of a gzip file."""
+        processor = AWSColumnarReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report_gzip,
+            compression=GZIP_COMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+        )
+        with schema_context(self.schema):
+            query = self.accessor._get_db_obj_query(AWS_CUR_TABLE_MAP["line_item"])
+            initial_count = query.count()
+        processor.process()
+        with schema_context(self.schema):
+            self.assertGreater(query.count(), initial_count)
+
+    def test_process_tags_frame(self):
+        """Test that the tags column matches the per-row tags."""
+        with open(self.test_report, "r") as f:
+            rows = list(csv.DictReader(f))
+        frame = pandas.DataFrame(rows, dtype=str)
+
+        tags = self.processor._process_tags_frame(frame)
+
+        for row, tag_str in zip(rows, tags):
+            self.assertEqual(json.loads(tag_str), json.loads(self.processor._process_tags(row)))
+
+    def test_process_tags_frame_duplicate_keys(self):
+        """Test that columns normalising to the same tag key produce the same tags as the row path."""
+        rows = [
+            {"resourceTags/user:app": "web", "resourceTags/aws:app": "api", "resourceTags/user:env": "prod"},
+            {"resourceTags/user:app": "web", "resourceTags/aws:app": "", "resourceTags/user:env": ""},
+            {"resourceTags/user:app": "", "resourceTags/aws:app": "", "resourceTags/user:env": ""},
+        ]
+        frame = pandas.DataFrame(rows, dtype=str)
+
+        tags = self.processor._process_tags_frame(frame)
+
+        self.assertEqual(list(tags), [self.processor._process_tags(row) for row in rows])
+        self.assertEqual(json.loads(tags[0]), {"app": "api", "env": "prod"})
+
+    def test_clean_frame(self):
+        """Test that whole columns are cleaned like clean_data."""
+        frame = pandas.DataFrame(
+            {"usage_amount": ["1.5", "", "bad"], "resource_id": ["i-1", "", "i-3"]}, dtype=str
+        )
+        column_types = {"usage_amount": "DecimalField", "resource_id": "CharField"}
+
+        cleaned = self.processor._clean_frame(frame, column_types)
+
+        self.assertEqual(cleaned["usage_amount"].iloc[0], "1.5")
+        self.assertTrue(pandas.isna(cleaned["usage_amount"].iloc[1]))
+        self.assertTrue(pandas.isna(cleaned["usage_amount"].iloc[2]))
+        self.assertTrue(pandas.isna(cleaned["resource_id"].iloc[1]))
@@ -16,6 +16,7 @@
 #
 """Test the AWSReportDBCleaner utility object."""
 import datetime
+from unittest.mock import patch
 
 from dateutil import relativedelta
 from tenant_schemas.utils import schema_context
@@ -367,3 +368,17 @@ class AWSReportDBCleanerTest(MasuTestCase):
         cleaner = AWSReportDBCleaner(self.schema)
         with self.assertRaises(AWSReportDBCleanerError):
             cleaner.purge_expired_line_item(False)
+
+    @patch("masu.processor.aws.aws_report_db_cleaner.PartitionManager.drop_partitions_before", return_value=[])
+    def test_purge_expired_report_data_drops_partitions(self, mock_drop):
+        """Test that the expired partitions of every partitioned line item table are dropped."""
+        cutoff_date = datetime.datetime(2018, 1, 1)
+        cleaner = AWSReportDBCleaner(self.schema)
+        cleaner.purge_expired_report_data(expired_date=cutoff_date, simulate=True)
+        mock_drop.assert_not_called()
+
+        cleaner.purge_expired_report_data(expired_date=cutoff_date)
+        dropped_tables = [call.args[0] for call in mock_drop.call_args_list]
+        self.assertEqual(dropped_tables, [AWS_CUR_TABLE_MAP["line_item"], AWS_CUR_TABLE_MAP["line_item_daily"]])
+        for call in mock_drop.call_args_list:
+            self.assertEqual(call.args[1], cutoff_date)
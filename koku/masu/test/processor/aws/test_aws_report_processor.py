@@ -239,6 +239,21 @@ class AWSReportProcessorTest(MasuTestCase):
             processor.process()
             self.assertIn(expected, logger.output)
 
+    def test_process_records_usage_dates(self):
+        """Test that the processor records the usage days it wrote."""
+        processor = AWSReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+        )
+        with open(self.test_report) as f:
+            expected = sorted({row["lineItem/UsageStartDate"][:10] for row in csv.DictReader(f)})
+
+        processor.process()
+
+        self.assertEqual(processor.processed_usage_dates, expected)
+
     def test_process_gzip(self):
         """Test the processing of a gzip compressed file."""
         counts = {}
@@ -857,6 +872,32 @@ class AWSReportProcessorTest(MasuTestCase):
 
         self.assertEqual(product_id, expected_id)
 
+    def test_create_cost_entry_objects_for_batch(self):
+        """Test that a batch resolves its dimension rows in bulk."""
+        with open(self.test_report, "r") as f:
+            rows = [row for row in csv.DictReader(f)]
+
+        with patch.object(
+            self.accessor, "bulk_insert_on_conflict_do_nothing", wraps=self.accessor.bulk_insert_on_conflict_do_nothing
+        ) as mock_bulk_insert:
+            with patch.object(
+                self.accessor, "insert_on_conflict_do_nothing", wraps=self.accessor.insert_on_conflict_do_nothing
+            ) as mock_insert:
+                bill_id = self.processor.create_cost_entry_objects_for_batch(rows, self.accessor)
+
+        self.assertIsNotNone(bill_id)
+        self.assertLessEqual(mock_bulk_insert.call_count, 5)
+        mock_insert.assert_not_called()
+        self.assertEqual(len(self.processor.processed_report.line_items), len(rows))
+        with schema_context(self.schema):
+            bill_ids = set(self.processor.processed_report.bills.values())
+            for line_item in self.processor.processed_report.line_items:
+                self.assertIn(line_item["cost_entry_bill_id"], bill_ids)
+                cost_entry = self.accessor._get_db_obj_query(AWS_CUR_TABLE_MAP["cost_entry"]).get(
+                    id=line_item["cost_entry_id"]
+                )
+                self.assertEqual(cost_entry.bill_id, line_item["cost_entry_bill_id"])
+
     def test_check_for_finalized_bill_bill_is_finalized(self):
         """Verify that a file with invoice_id is marked as finalzed."""
         data = []
@@ -947,6 +988,69 @@ class AWSReportProcessorTest(MasuTestCase):
                 self.assertTrue(result)
                 self.assertLess(line_item_query.count(), before_count)
 
+    @patch("masu.processor.report_processor_base.PartitionManager.truncate_partition", return_value=True)
+    def test_delete_line_items_truncated_partition(self, mock_truncate):
+        """Test that a bill's rows outside its truncated month partition are still deleted."""
+        manifest = CostUsageReportManifest.objects.filter(
+            provider__uuid=self.aws_provider_uuid, billing_period_start_datetime=DateHelper().this_month_start
+        ).first()
+        manifest.num_processed_files = 0
+        manifest.save()
+        bill_date = manifest.billing_period_start_datetime
+        processor = AWSReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+            manifest_id=manifest.id,
+        )
+
+        with schema_context(self.schema):
+            bill = self.accessor.get_cost_entry_bills_by_date(bill_date)[0]
+            line_item_query = self.accessor.get_lineitem_query_for_billid(bill.id)
+            before_count = line_item_query.count()
+            outside_item = line_item_query.first()
+            outside_item.usage_start = bill_date + relativedelta(months=1)
+            outside_item.save()
+
+        with patch.object(processor, "_should_process_full_month", return_value=True):
+            self.assertTrue(processor._delete_line_items(AWSReportDBAccessor))
+        mock_truncate.assert_called()
+
+        with schema_context(self.schema):
+            line_item_query = self.accessor.get_lineitem_query_for_billid(bill.id)
+            self.assertFalse(line_item_query.filter(id=outside_item.id).exists())
+            self.assertEqual(line_item_query.count(), before_count - 1)
+
+    @patch("masu.processor.report_processor_base.PartitionManager.create_partition")
+    @patch("masu.processor.report_processor_base.PartitionManager.get_partitions", return_value={})
+    def test_delete_line_items_without_partition(self, mock_partitions, mock_create):
+        """Test that a month without a partition has its rows deleted and no partition is created."""
+        manifest = CostUsageReportManifest.objects.filter(
+            provider__uuid=self.aws_provider_uuid, billing_period_start_datetime=DateHelper().this_month_start
+        ).first()
+        manifest.num_processed_files = 0
+        manifest.save()
+        bill_date = manifest.billing_period_start_datetime
+        processor = AWSReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+            manifest_id=manifest.id,
+        )
+
+        with schema_context(self.schema):
+            bill = self.accessor.get_cost_entry_bills_by_date(bill_date)[0]
+
+        with patch.object(processor, "_should_process_full_month", return_value=True):
+            self.assertTrue(processor._delete_line_items(AWSReportDBAccessor))
+        mock_partitions.assert_called()
+        mock_create.assert_not_called()
+
+        with schema_context(self.schema):
+            self.assertFalse(self.accessor.get_lineitem_query_for_billid(bill.id).exists())
+
     def test_delete_line_items_not_first_file_in_manifest(self):
         """Test that data is not deleted once a file has been processed."""
         self.manifest.num_processed_files = 1
@@ -967,6 +1071,24 @@ class AWSReportProcessorTest(MasuTestCase):
                 self.assertFalse(result)
                 self.assertNotEqual(line_item_query.count(), 0)
 
+    def test_delete_line_items_already_deleted(self):
+        """Test that a fanned out file does not delete the line items other files of its manifest wrote."""
+        self.manifest.num_processed_files = 0
+        self.manifest.save()
+        processor = AWSReportProcessor(
+            schema_name=self.schema,
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_uuid=self.aws_provider_uuid,
+            manifest_id=self.manifest.id,
+        )
+        processor.line_items_deleted = True
+
+        self.assertFalse(processor.delete_line_items())
+        with schema_context(self.schema):
+            for bill_id in self.accessor.get_cost_entry_bills().values():
+                self.assertNotEqual(self.accessor.get_lineitem_query_for_billid(bill_id).count(), 0)
+
     def test_delete_line_items_no_manifest(self):
         """Test that no data is deleted without a manifest id."""
         processor = AWSReportProcessor(
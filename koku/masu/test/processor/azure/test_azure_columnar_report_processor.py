@@ -0,0 +1,85 @@
+#
+# Copyright 2020 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the AzureColumnarReportProcessor."""
+import os
+import shutil
+import tempfile
+
+from tenant_schemas.utils import schema_context
+
+from masu.database import AZURE_REPORT_TABLE_MAP
+from masu.database.azure_report_db_accessor import AzureReportDBAccessor
+from masu.external import UNCOMPRESSED
+from masu.processor.azure.azure_columnar_report_processor import AzureColumnarReportProcessor
+from masu.processor.azure.azure_report_processor import AzureReportProcessor
+from masu.test import MasuTestCase
+
+
+class AzureColumnarReportProcessorTest(MasuTestCase):
+    """Test Cases for the AzureColumnarReportProcessor object."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test class with required objects."""
+        super().setUpClass()
+        cls.test_report_path = "./koku/masu/test/data/azure/costreport_a243c6f2-199f-4074-9a2c-40e671cf1584.csv"
+
+    def setUp(self):
+        """Set up each test."""
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_report = f"{self.temp_dir}/costreport_a243c6f2-199f-4074-9a2c-40e671cf1584.csv"
+        shutil.copy2(self.test_report_path, self.test_report)
+        self.accessor = AzureReportDBAccessor(self.schema)
+
+    def tearDown(self):
+        """Tear down test case."""
+        super().tearDown()
+        shutil.rmtree(self.temp_dir)
+
+    def _get_line_items(self):
+        """Return the line items in the database without their ids."""
+        with schema_context(self.schema):
+            query = self.accessor._get_db_obj_query(AZURE_REPORT_TABLE_MAP["line_item"])
+            return sorted(
+                query.values_list(
+                    "usage_date", "cost_entry_product_id", "meter_id", "usage_quantity", "pretax_cost", "tags"
+                ),
+                key=str,
+            )
+
+    def test_process_matches_row_processor(self):
+        """Test that the columnar path writes the same line items as the row path."""
+        processor_args = {
+            "schema_name": self.schema,
+            "report_path": self.test_report,
+            "compression": UNCOMPRESSED,
+            "provider_uuid": self.azure_provider_uuid,
+        }
+        with schema_context(self.schema):
+            self.accessor._get_db_obj_query(AZURE_REPORT_TABLE_MAP["line_item"]).delete()
+        AzureReportProcessor(**processor_args).process()
+        expected = self._get_line_items()
+
+        with schema_context(self.schema):
+            self.accessor._get_db_obj_query(AZURE_REPORT_TABLE_MAP["line_item"]).delete()
+        shutil.copy2(self.test_report_path, self.test_report)
+        AzureColumnarReportProcessor(**processor_args).process()
+
+        self.assertNotEqual(expected, [])
+        self.assertEqual(self._get_line_items(), expected)
+        self.assertFalse(os.path.exists(self.test_report))
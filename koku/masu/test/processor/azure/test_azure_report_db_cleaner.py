@@ -276,3 +276,17 @@ class AzureReportDBCleanerTest(MasuTestCase):
         with schema_context(self.schema):
             self.assertEqual(self.accessor._get_db_obj_query(bill_table_name).all().count(), 1)
             self.assertEqual(self.accessor._get_db_obj_query(line_item_table_name).count(), 1)
+
+    @patch("masu.processor.azure.azure_report_db_cleaner.PartitionManager.drop_partitions_before", return_value=[])
+    def test_purge_expired_report_data_drops_partitions(self, mock_drop):
+        """Test that the expired partitions of every partitioned line item table are dropped."""
+        cutoff_date = datetime.datetime(2018, 1, 1)
+        cleaner = AzureReportDBCleaner(self.schema)
+        cleaner.purge_expired_report_data(expired_date=cutoff_date, simulate=True)
+        mock_drop.assert_not_called()
+
+        cleaner.purge_expired_report_data(expired_date=cutoff_date)
+        dropped_tables = [call.args[0] for call in mock_drop.call_args_list]
+        self.assertEqual(dropped_tables, [AZURE_REPORT_TABLE_MAP["line_item"]])
+        for call in mock_drop.call_args_list:
+            self.assertEqual(call.args[1], cutoff_date)
@@ -301,6 +301,23 @@ class AzureReportProcessorTest(MasuTestCase):
 
         self.assertIsNotNone(self.processor.line_item_columns)
 
+    def test_azure_create_cost_entry_objects_for_batch(self):
+        """Test that an Azure batch resolves its bills, products and meters in bulk."""
+        with open(self.test_report, "r", encoding="utf-8-sig") as f:
+            rows = [row for row in csv.DictReader(f)]
+
+        with patch.object(
+            self.accessor, "insert_on_conflict_do_nothing", wraps=self.accessor.insert_on_conflict_do_nothing
+        ) as mock_insert:
+            bill_id = self.processor.create_cost_entry_objects_for_batch(rows, self.accessor)
+
+        self.assertIsNotNone(bill_id)
+        mock_insert.assert_not_called()
+        self.assertEqual(len(self.processor.processed_report.line_items), len(rows))
+        meter_ids = set(self.processor.processed_report.meters.values())
+        for line_item in self.processor.processed_report.line_items:
+            self.assertIn(line_item["meter_id"], meter_ids)
+
     def test_should_process_row_within_cuttoff_date(self):
         """Test that we correctly determine a row should be processed."""
         today = self.date_accessor.today_with_timezone("UTC")
@@ -1,4 +1,5 @@
 """Test GCPReportProcessor."""
+import csv
 import os
 import shutil
 import tempfile
@@ -6,7 +7,7 @@ import uuid
 from datetime import datetime
 from unittest.mock import patch
 
-import numpy as np
+import pandas
 import pytz
 from dateutil import parser
 from faker import Faker
@@ -191,28 +192,59 @@ class GCPReportProcessorTest(MasuTestCase):
             self.assertEquals(num_bills, len(GCPCostEntryBill.objects.all()))
 
     def test_consolidate_line_items(self):
-        """Test that logic for consolidating lines work."""
-        line1 = {
-            "int": fake.pyint(),
-            "float": fake.pyfloat(),
-            "date": datetime.now(),
-            "npint": np.int64(fake.pyint()),
-            "cost_entry_bill_id": fake.pyint(),
-            "project_id": fake.pyint(),
-        }
-        line2 = {
-            "int": fake.pyint(),
-            "float": fake.pyfloat(),
-            "date": datetime.now(),
-            "npint": np.int64(fake.pyint()),
-            "cost_entry_bill_id": fake.pyint(),
-            "project_id": fake.pyint(),
-        }
-        consolidated_line = self.processor._consolidate_line_items(line1, line2)
-
-        self.assertEquals(consolidated_line["int"], line1["int"] + line2["int"])
-        self.assertEquals(consolidated_line["float"], line1["float"] + line2["float"])
-        self.assertEquals(consolidated_line["npint"], line1["npint"] + line2["npint"])
-        self.assertEquals(consolidated_line["date"], line1["date"])
-        self.assertEquals(consolidated_line["cost_entry_bill_id"], line1["cost_entry_bill_id"])
-        self.assertEquals(consolidated_line["project_id"], line1["project_id"])
+        """Test that numeric columns of duplicate line items are added together."""
+        line_items = pandas.DataFrame(
+            {
+                "project_id": [1, 1, 2],
+                "start_time": ["2019-09-16T00:00:00-07:00"] * 3,
+                "line_item_type": ["compute", "compute", "compute"],
+                "consumption": [10, 5, 7],
+                "cost": ["1.25", "0.5", "2.123456789"],
+                "description": ["first", "second", "other"],
+            }
+        )
+        consolidated = self.processor._consolidate_line_items(line_items, ["consumption", "cost"])
+
+        self.assertEqual(len(consolidated), 2)
+        duplicate = consolidated[consolidated["project_id"] == 1].iloc[0]
+        self.assertEqual(duplicate["consumption"], 15)
+        self.assertAlmostEqual(float(duplicate["cost"]), 1.75)
+        self.assertEqual(duplicate["description"], "first")
+        unique = consolidated[consolidated["project_id"] == 2].iloc[0]
+        self.assertEqual(unique["cost"], "2.123456789")
+
+    def test_consolidate_line_items_null_key(self):
+        """Test that line items with a null key column are kept rather than dropped by the grouping."""
+        line_items = pandas.DataFrame(
+            {
+                "project_id": [1, 1, 1, 1],
+                "start_time": ["2019-09-16T00:00:00-07:00"] * 4,
+                "line_item_type": [None, None, "compute", "compute"],
+                "consumption": [10, 5, 7, 3],
+                "cost": ["1.25", "0.5", "2", "1"],
+                "description": ["first", "second", "third", "fourth"],
+            }
+        )
+        consolidated = self.processor._consolidate_line_items(line_items, ["consumption", "cost"])
+
+        self.assertEqual(len(consolidated), 3)
+        self.assertEqual(sorted(consolidated[consolidated["line_item_type"].isna()]["consumption"]), [5, 10])
+        duplicate = consolidated[consolidated["line_item_type"] == "compute"].iloc[0]
+        self.assertEqual(duplicate["consumption"], 10)
+
+    def test_gcp_process_consolidates_duplicates(self):
+        """Test that duplicate rows in a report are saved as one line item."""
+        with open(self.test_report) as report_file:
+            lines = report_file.readlines()
+        with open(self.test_report, "a") as report_file:
+            report_file.write(lines[1])
+
+        self.processor.process()
+        first_row = next(csv.DictReader(lines))
+        with schema_context(self.schema):
+            line_item = GCPCostEntryLineItemDaily.objects.get(
+                project__project_id=first_row["Project ID"],
+                line_item_type=first_row["Line Item"],
+                start_time=parser.parse(first_row["Start Time"]),
+            )
+            self.assertEqual(line_item.consumption, 2 * int(first_row["Measurement1 Total Consumption"]))
@@ -20,6 +20,7 @@ from decimal import Decimal
 from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
 from tenant_schemas.utils import schema_context
 
 from api.utils import DateHelper
@@ -310,6 +311,38 @@ class OCPCostModelCostUpdaterTest(MasuTestCase):
                 self.assertEqual(line_item.supplementary_usage_cost.get("memory"), 0)
                 self.assertNotEqual(line_item.supplementary_usage_cost.get("storage"), 0)
 
+    @patch("masu.processor.ocp.ocp_cost_model_cost_updater.CostModelDBAccessor")
+    def test_update_usage_costs_tiered(self, mock_cost_accessor):
+        """Test that tiered usage rates are charged on the cumulative monthly usage."""
+        start_date = self.dh.this_month_start.date()
+        end_date = self.dh.this_month_end.date()
+        with schema_context(self.schema):
+            line_items = OCPUsageLineItemDailySummary.objects.filter(
+                cluster_id=self.cluster_id, usage_start__gte=start_date, usage_start__lte=end_date
+            )
+            total_usage = line_items.aggregate(usage=Sum("pod_usage_cpu_core_hours"))["usage"]
+        self.assertIsNotNone(total_usage)
+
+        tier_end = str(round(total_usage / 2, 2))
+        tiered_rates = [
+            {"usage": {"usage_start": None, "usage_end": tier_end}, "value": "0.50", "unit": "USD"},
+            {"usage": {"usage_start": tier_end, "usage_end": None}, "value": "0.10", "unit": "USD"},
+        ]
+        cost_accessor = mock_cost_accessor.return_value.__enter__.return_value
+        cost_accessor.infrastructure_rates = {"cpu_core_usage_per_hour": 0.5}
+        cost_accessor.supplementary_rates = {}
+        cost_accessor.tiered_infrastructure_rates = {"cpu_core_usage_per_hour": tiered_rates}
+        cost_accessor.tiered_supplementary_rates = {}
+
+        updater = OCPCostModelCostUpdater(schema=self.schema, provider=self.provider)
+        updater._update_usage_costs(start_date, end_date)
+
+        expected = updater._calculate_variable_charge(total_usage, {"tiered_rates": tiered_rates})
+        with schema_context(self.schema):
+            cpu_cost = sum(Decimal(str(item.infrastructure_usage_cost.get("cpu", 0))) for item in line_items.all())
+        self.assertAlmostEqual(cpu_cost, expected, places=4)
+        self.assertLess(cpu_cost, Decimal("0.5") * total_usage)
+
     @patch("masu.processor.ocp.ocp_cost_model_cost_updater.CostModelDBAccessor")
     def test_update_monthly_cost_infrastructure(self, mock_cost_accessor):
         """Test OCP charge for monthly costs is updated."""
@@ -26,12 +26,14 @@ from dateutil.rrule import DAILY
 from dateutil.rrule import rrule
 from tenant_schemas.utils import schema_context
 
+from api.models import Provider
 from api.utils import DateHelper
 from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.external.date_accessor import DateAccessor
 from masu.processor.ocp.ocp_report_summary_updater import OCPReportSummaryUpdater
+from masu.prometheus_stats import WORKER_REGISTRY
 from masu.test import MasuTestCase
 from masu.test.database.helpers import ReportObjectCreator
 from reporting_common.models import CostUsageReportManifest
@@ -132,6 +134,31 @@ class OCPReportSummaryUpdaterTest(MasuTestCase):
             self.assertIsNotNone(period.summary_data_creation_datetime)
             self.assertIsNotNone(period.summary_data_updated_datetime)
 
+    @patch("masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_storage_line_item_daily_table")
+    @patch("masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_line_item_daily_table")
+    @patch(
+        "masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_node_label_line_item_daily_table"
+    )
+    def test_update_daily_tables_observes_latency(self, mock_node_daily, mock_daily, mock_storage_daily):
+        """Test that each summary step is recorded in the latency histogram."""
+        steps = [
+            "populate_node_label_line_item_daily_table",
+            "populate_line_item_daily_table",
+            "populate_storage_line_item_daily_table",
+        ]
+        before = {}
+        for step in steps:
+            labels = {"provider_type": Provider.PROVIDER_OCP, "step": step}
+            before[step] = WORKER_REGISTRY.get_sample_value("report_summary_step_seconds_count", labels) or 0
+
+        today = self.dh.today.strftime("%Y-%m-%d")
+        self.updater.update_daily_tables(today, today)
+
+        for step in steps:
+            labels = {"provider_type": Provider.PROVIDER_OCP, "step": step}
+            after = WORKER_REGISTRY.get_sample_value("report_summary_step_seconds_count", labels)
+            self.assertEqual(after, before[step] + 1)
+
     @patch(
         "masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_node_label_line_item_daily_table"
     )
@@ -17,11 +17,13 @@
 """Test the CostModelCostUpdater object."""
 from unittest.mock import patch
 
+from api.models import Provider
 from masu.processor.aws.aws_cost_model_cost_updater import AWSCostModelCostUpdater
 from masu.processor.azure.azure_cost_model_cost_updater import AzureCostModelCostUpdater
 from masu.processor.cost_model_cost_updater import CostModelCostUpdater
 from masu.processor.cost_model_cost_updater import CostModelCostUpdaterError
 from masu.processor.ocp.ocp_cost_model_cost_updater import OCPCostModelCostUpdater
+from masu.prometheus_stats import WORKER_REGISTRY
 from masu.test import MasuTestCase
 
 
@@ -60,6 +62,17 @@ class CostModelCostUpdaterTest(MasuTestCase):
         updater.update_cost_model_costs()
         mock_update.assert_called()
 
+    @patch("masu.processor.cost_model_cost_updater.OCPCostModelCostUpdater.update_summary_cost_model_costs")
+    def test_update_observes_latency(self, mock_update):
+        """Test that the cost model update is recorded in the latency histogram."""
+        labels = {"provider_type": Provider.PROVIDER_OCP}
+        before = WORKER_REGISTRY.get_sample_value("cost_model_cost_update_seconds_count", labels) or 0
+
+        CostModelCostUpdater(self.schema, self.ocp_test_provider_uuid).update_cost_model_costs()
+
+        after = WORKER_REGISTRY.get_sample_value("cost_model_cost_update_seconds_count", labels)
+        self.assertEqual(after, before + 1)
+
     @patch("masu.processor.cost_model_cost_updater.OCPCostModelCostUpdater.__init__")
     def test_init_fail(self, mock_updater):
         """Test that an unimplemented provider throws an error."""
@@ -18,7 +18,11 @@
 from unittest.mock import patch
 
 from api.models import Provider
+from masu.config import Config
 from masu.exceptions import MasuProcessingError
+from masu.processor.aws.aws_columnar_report_processor import AWSColumnarReportProcessor
+from masu.processor.aws.aws_report_processor import AWSReportProcessor
+from masu.processor.azure.azure_columnar_report_processor import AzureColumnarReportProcessor
 from masu.processor.report_processor import ReportProcessor
 from masu.processor.report_processor import ReportProcessorError
 from masu.test import MasuTestCase
@@ -51,6 +55,43 @@ class ReportProcessorTest(MasuTestCase):
         )
         self.assertIsNotNone(processor._processor)
 
+    def test_initializer_aws_columnar(self):
+        """Test that the columnar processor is selected by provider type."""
+        with patch.object(Config, "COLUMNAR_PROCESSING_PROVIDERS", [Provider.PROVIDER_AWS]):
+            processor = ReportProcessor(
+                schema_name=self.schema,
+                report_path="/my/report/file",
+                compression="GZIP",
+                provider=Provider.PROVIDER_AWS,
+                provider_uuid=self.aws_provider_uuid,
+                manifest_id=None,
+            )
+            self.assertIsInstance(processor._processor, AWSColumnarReportProcessor)
+
+            processor = ReportProcessor(
+                schema_name=self.schema,
+                report_path="/my/report/file",
+                compression="GZIP",
+                provider=Provider.PROVIDER_AWS_LOCAL,
+                provider_uuid=self.aws_provider_uuid,
+                manifest_id=None,
+            )
+            self.assertNotIsInstance(processor._processor, AWSColumnarReportProcessor)
+            self.assertIsInstance(processor._processor, AWSReportProcessor)
+
+    def test_initializer_azure_columnar(self):
+        """Test that the columnar Azure processor is selected by provider type."""
+        with patch.object(Config, "COLUMNAR_PROCESSING_PROVIDERS", [Provider.PROVIDER_AZURE]):
+            processor = ReportProcessor(
+                schema_name=self.schema,
+                report_path="/my/report/file",
+                compression="GZIP",
+                provider=Provider.PROVIDER_AZURE,
+                provider_uuid=self.azure_provider_uuid,
+                manifest_id=None,
+            )
+        self.assertIsInstance(processor._processor, AzureColumnarReportProcessor)
+
     def test_initializer_azure(self):
         """Test to initializer for Azure."""
         processor = ReportProcessor(
@@ -29,6 +29,7 @@ from unittest.mock import patch
 from uuid import uuid4
 
 import faker
+from celery.exceptions import Retry
 from dateutil import relativedelta
 from django.db.models import Max
 from django.db.models import Min
@@ -55,13 +56,18 @@ from masu.processor.report_processor import ReportProcessorError
 from masu.processor.tasks import autovacuum_tune_schema
 from masu.processor.tasks import convert_to_parquet
 from masu.processor.tasks import get_report_files
+from masu.processor.tasks import process_report_file
 from masu.processor.tasks import refresh_materialized_views
+from masu.processor.tasks import release_processed_reports
 from masu.processor.tasks import remove_expired_data
+from masu.processor.tasks import summarize_processed_reports
 from masu.processor.tasks import summarize_reports
 from masu.processor.tasks import update_all_summary_tables
 from masu.processor.tasks import update_cost_model_costs
 from masu.processor.tasks import update_summary_tables
 from masu.processor.tasks import vacuum_schema
+from masu.processor.worker_cache import WorkerCache
+from masu.prometheus_stats import WORKER_REGISTRY
 from masu.test import MasuTestCase
 from masu.test.database.helpers import ReportObjectCreator
 from masu.test.external.downloader.aws import fake_arn
@@ -252,6 +258,23 @@ class ProcessReportFileTests(MasuTestCase):
         mock_provider_acc.setup_complete.assert_called()
         shutil.rmtree(report_dir)
 
+    @patch("masu.processor._tasks.process.ProviderDBAccessor")
+    @patch("masu.processor._tasks.process.ReportProcessor")
+    @patch("masu.processor._tasks.process.ReportStatsDBAccessor")
+    @patch("masu.processor._tasks.process.ReportManifestDBAccessor")
+    def test_process_file_observes_latency(
+        self, mock_manifest_accessor, mock_stats_accessor, mock_processor, mock_provider_accessor
+    ):
+        """Test that processing a report file is recorded in the latency histogram."""
+        report_dict = {"file": "/tmp/file1.csv", "compression": "gzip", "start_date": str(DateHelper().today)}
+        labels = {"provider_type": Provider.PROVIDER_AWS}
+        before = WORKER_REGISTRY.get_sample_value("report_file_processing_seconds_count", labels) or 0
+
+        _process_report_file(self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, report_dict)
+
+        after = WORKER_REGISTRY.get_sample_value("report_file_processing_seconds_count", labels)
+        self.assertEqual(after, before + 1)
+
     @patch("masu.processor._tasks.process.ProviderDBAccessor")
     @patch("masu.processor._tasks.process.ReportProcessor")
     @patch("masu.processor._tasks.process.ReportStatsDBAccessor")
@@ -353,6 +376,29 @@ class ProcessReportFileTests(MasuTestCase):
         summarize_reports(reports_to_summarize)
         mock_update_summary.delay.assert_called()
 
+    @patch("masu.processor.tasks.update_summary_tables")
+    def test_summarize_reports_processed_usage_dates(self, mock_update_summary):
+        """Test that only the usage days written by processing are summarized."""
+        mock_update_summary.delay = Mock()
+
+        report_meta = {
+            "schema_name": self.schema,
+            "provider_type": Provider.PROVIDER_OCP,
+            "provider_uuid": self.ocp_test_provider_uuid,
+            "manifest_id": 1,
+            "usage_dates": ["2020-03-04", "2020-03-05"],
+        }
+
+        summarize_reports([report_meta])
+        mock_update_summary.delay.assert_called_with(
+            self.schema,
+            Provider.PROVIDER_OCP,
+            self.ocp_test_provider_uuid,
+            start_date="2020-03-04",
+            end_date="2020-03-05",
+            manifest_id=1,
+        )
+
     @patch("masu.processor.tasks._process_report_file")
     @patch("masu.processor.tasks._get_report_files")
     def test_process_report_files_with_transaction_atomic_error(self, mock_files, mock_processor):
@@ -556,6 +602,200 @@ class TestProcessorTasks(MasuTestCase):
         reports = get_report_files(**self.get_report_args)
         self.assertIsNotNone(reports)
 
+    @patch("masu.processor.tasks._delete_report_line_items")
+    @patch("masu.processor.tasks.chord")
+    @patch("masu.processor.tasks._get_report_files")
+    @patch("masu.processor.tasks._process_report_file")
+    def test_get_report_files_fan_out(self, mock_process_file, mock_get_files, mock_chord, mock_delete):
+        """Test that files are dealt into at most the tenant concurrency of chains."""
+        mock_get_files.return_value = [
+            {"file": f"/tmp/{self.fake.word()}_{index}.csv", "compression": "PLAIN", "manifest_id": 1}
+            for index in range(5)
+        ]
+        with patch.object(Config, "REPORT_PROCESSING_FAN_OUT", True):
+            with patch.object(Config, "REPORT_PROCESSING_TENANT_CONCURRENCY", 2):
+                with patch.object(koku_celery.app.conf, "result_backend", "redis://localhost"):
+                    reports = get_report_files(**self.get_report_args)
+
+        self.assertEqual(reports, [])
+        mock_process_file.assert_not_called()
+        lanes = mock_chord.call_args[0][0]
+        self.assertEqual([len(lane.tasks) for lane in lanes], [3, 2])
+        mock_chord.return_value.assert_called_once()
+        callback = mock_chord.return_value.call_args[0][0]
+        self.assertEqual(
+            [errback["task"] for errback in callback.options["link_error"]],
+            ["masu.processor.tasks.release_processed_reports"],
+        )
+
+    @patch("masu.processor.tasks._delete_report_line_items")
+    @patch("masu.processor.tasks.chord")
+    @patch("masu.processor.tasks._get_report_files")
+    @patch("masu.processor.tasks._process_report_file")
+    def test_get_report_files_fan_out_deletes_once(self, mock_process_file, mock_get_files, mock_chord, mock_delete):
+        """Test that stale line items are deleted once before the chains run, and never by a chain."""
+        reports = [
+            {"file": f"/tmp/{self.fake.word()}_{index}.csv", "compression": "PLAIN", "manifest_id": 1}
+            for index in range(4)
+        ]
+        mock_get_files.return_value = reports
+        with patch.object(Config, "REPORT_PROCESSING_FAN_OUT", True):
+            with patch.object(Config, "REPORT_PROCESSING_TENANT_CONCURRENCY", 2):
+                with patch.object(koku_celery.app.conf, "result_backend", "redis://localhost"):
+                    get_report_files(**self.get_report_args)
+        mock_delete.assert_called_once_with(
+            self.schema, Provider.PROVIDER_AWS_LOCAL, self.aws_provider_uuid, reports[0]
+        )
+
+        lanes = mock_chord.call_args[0][0]
+        self.assertEqual(len(lanes), 2)
+        for lane in lanes:
+            lane.apply()
+        self.assertEqual(mock_process_file.call_count, 4)
+        for call in mock_process_file.call_args_list:
+            self.assertTrue(call[1]["line_items_deleted"])
+        mock_delete.assert_called_once()
+
+    @patch("masu.processor.tasks.WorkerCache.remove_task_from_cache")
+    @patch("masu.processor.tasks._delete_report_line_items", side_effect=ReportProcessorError("Mocked Error!"))
+    @patch("masu.processor.tasks.chord")
+    @patch("masu.processor.tasks._get_report_files")
+    def test_get_report_files_fan_out_delete_error(self, mock_get_files, mock_chord, mock_delete, mock_remove):
+        """Test that a failed stale line item delete releases the provider and month without fanning out."""
+        mock_get_files.return_value = [
+            {"file": f"/tmp/{self.fake.word()}_{index}.csv", "compression": "PLAIN", "manifest_id": 1}
+            for index in range(2)
+        ]
+        with patch.object(Config, "REPORT_PROCESSING_FAN_OUT", True):
+            with patch.object(koku_celery.app.conf, "result_backend", "redis://localhost"):
+                with self.assertRaises(ReportProcessorError):
+                    get_report_files(**self.get_report_args)
+        mock_chord.assert_not_called()
+        mock_remove.assert_called_once()
+
+    @patch("masu.processor.tasks.chord")
+    @patch("masu.processor.tasks._get_report_files")
+    @patch("masu.processor.tasks._process_report_file")
+    def test_get_report_files_fan_out_without_result_backend(self, mock_process_file, mock_get_files, mock_chord):
+        """Test that files are processed serially when chords are unavailable."""
+        mock_get_files.return_value = [
+            {"file": f"/tmp/{self.fake.word()}_{index}.csv", "compression": "PLAIN", "manifest_id": 1}
+            for index in range(2)
+        ]
+        with patch.object(Config, "REPORT_PROCESSING_FAN_OUT", True):
+            with patch.object(koku_celery.app.conf, "result_backend", None):
+                get_report_files(**self.get_report_args)
+
+        mock_chord.assert_not_called()
+        self.assertEqual(mock_process_file.call_count, 2)
+
+    @patch("masu.processor.tasks._process_report_file")
+    def test_process_report_file(self, mock_process_file):
+        """Test that a chained file task appends its report meta."""
+        report_dict = {
+            "file": f"/tmp/{self.fake.word()}.csv",
+            "compression": "PLAIN",
+            "manifest_id": 1,
+            "start_date": "2020-06-01 00:00:00",
+            "usage_dates": ["2020-06-02"],
+        }
+        previous = [{"manifest_id": 1, "start_date": None, "usage_dates": ["2020-06-01"]}]
+
+        result = process_report_file(
+            previous, self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, report_dict, "cache_key"
+        )
+
+        mock_process_file.assert_called_once()
+        self.assertEqual(
+            result[-1], {"manifest_id": 1, "start_date": "2020-06-01 00:00:00", "usage_dates": ["2020-06-02"]}
+        )
+
+    @patch("masu.processor.tasks.WorkerCache.remove_task_from_cache")
+    @patch("masu.processor.tasks._process_report_file", side_effect=ReportProcessorError("Mocked Error!"))
+    def test_process_report_file_error_keeps_lock(self, mock_process_file, mock_remove):
+        """Test that a failing fanned out file leaves the provider and month locked for the chord."""
+        report_dict = {"file": f"/tmp/{self.fake.word()}.csv", "compression": "PLAIN", "manifest_id": 1}
+
+        with self.assertRaises(ReportProcessorError):
+            process_report_file([], self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, report_dict, "key")
+        mock_remove.assert_not_called()
+
+    @patch("masu.processor.tasks.WorkerCache.claim_slot", return_value=None)
+    @patch("masu.processor.tasks._process_report_file")
+    def test_process_report_file_no_tenant_slot(self, mock_process_file, mock_claim):
+        """Test that a file task is retried while every processing slot of its customer is taken."""
+        report_dict = {"file": f"/tmp/{self.fake.word()}.csv", "compression": "PLAIN", "manifest_id": 1}
+
+        with patch.object(process_report_file, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                process_report_file(
+                    [], self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, report_dict, "cache_key"
+                )
+        mock_claim.assert_called_once_with(
+            self.schema,
+            Config.REPORT_PROCESSING_TENANT_CONCURRENCY,
+            timeout=Config.REPORT_PROCESSING_TIMEOUT_HOURS * 3600,
+        )
+        mock_retry.assert_called_once_with(countdown=Config.REPORT_PROCESSING_TENANT_RETRY_SECONDS)
+        mock_process_file.assert_not_called()
+
+    def test_process_report_file_retries_bounded(self):
+        """Test that a file task waiting for a processing slot is not retried forever."""
+        self.assertEqual(process_report_file.max_retries, Config.REPORT_PROCESSING_TENANT_MAX_RETRIES)
+        self.assertIsNotNone(process_report_file.max_retries)
+
+    @patch("masu.processor.tasks._process_report_file")
+    def test_process_report_file_releases_tenant_slot(self, mock_process_file):
+        """Test that a file task frees its customer processing slot when it finishes."""
+        report_dict = {"file": f"/tmp/{self.fake.word()}.csv", "compression": "PLAIN", "manifest_id": 1}
+
+        with patch.object(Config, "REPORT_PROCESSING_TENANT_CONCURRENCY", 1):
+            for _ in range(2):
+                process_report_file(
+                    [], self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, report_dict, "cache_key"
+                )
+        self.assertEqual(mock_process_file.call_count, 2)
+        self.assertFalse(WorkerCache().task_is_running(f"slot:{self.schema}:0"))
+
+    @patch("masu.processor.tasks.WorkerCache.remove_task_from_cache")
+    def test_release_processed_reports(self, mock_remove):
+        """Test that the chord error callback releases the provider and month."""
+        release_processed_reports(Mock(), ReportProcessorError("Mocked Error!"), None, "cache_key")
+        mock_remove.assert_called_once_with("cache_key")
+
+    @patch("masu.processor.tasks.WorkerCache.remove_task_from_cache")
+    @patch("masu.processor.tasks.convert_to_parquet")
+    @patch("masu.processor.tasks.summarize_reports")
+    def test_summarize_processed_reports(self, mock_summarize, mock_convert, mock_remove):
+        """Test that the chord callback summarizes the manifest once."""
+        processed_lanes = [
+            [{"manifest_id": 1, "start_date": "2020-06-01 00:00:00", "usage_dates": ["2020-06-03"]}],
+            [
+                {"manifest_id": 1, "start_date": "2020-06-01 00:00:00", "usage_dates": ["2020-06-01"]},
+                {"manifest_id": 1, "start_date": None, "usage_dates": ["2020-06-03", "2020-06-04"]},
+            ],
+        ]
+
+        summarize_processed_reports(
+            processed_lanes, self.schema, Provider.PROVIDER_AWS, self.aws_provider_uuid, "cache_key", "request_id"
+        )
+
+        mock_remove.assert_called_with("cache_key")
+        mock_convert.delay.assert_called_once_with(
+            "request_id", self.schema[4:], self.aws_provider_uuid, Provider.PROVIDER_AWS, "2020-06-01", 1
+        )
+        mock_summarize.assert_called_once_with(
+            [
+                {
+                    "schema_name": self.schema,
+                    "provider_type": Provider.PROVIDER_AWS,
+                    "provider_uuid": self.aws_provider_uuid,
+                    "manifest_id": 1,
+                    "usage_dates": ["2020-06-01", "2020-06-03", "2020-06-04"],
+                }
+            ]
+        )
+
     def test_convert_to_parquet(self):
         """Test the convert_to_parquet task."""
         logging.disable(logging.NOTSET)
@@ -15,17 +15,124 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Test Cache of worker tasks currently running."""
+import fnmatch
 import logging
+import time
+from unittest.mock import patch
 
 from django.core.cache import cache
+from django.core.cache import caches
 from django.test.utils import override_settings
 
+from masu.processor.worker_cache import DjangoWorkerCacheBackend
+from masu.processor.worker_cache import RedisWorkerCacheBackend
+from masu.processor.worker_cache import RELEASE_TASK_SCRIPT
 from masu.processor.worker_cache import WorkerCache
 from masu.test import MasuTestCase
 
 LOG = logging.getLogger(__name__)
 
 
+class FakeRedis:
+    """An in-memory stand-in for the Redis commands the worker cache uses."""
+
+    def __init__(self):
+        """Start with no keys."""
+        self.values = {}
+        self.sets = {}
+        self.scripts = []
+        self.expiries = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        """Set a key, only if absent when nx is set."""
+        if nx and key in self.values:
+            return None
+        self.values[key] = value.encode()
+        self.expiries[key] = ex
+        return True
+
+    def get(self, key):
+        """Return a key's value."""
+        return self.values.get(key)
+
+    def mget(self, keys):
+        """Return the values of several keys."""
+        return [self.values.get(key) for key in keys]
+
+    def exists(self, key):
+        """Return whether a key exists."""
+        return int(key in self.values or key in self.sets)
+
+    def delete(self, *keys):
+        """Delete keys, returning how many existed."""
+        return sum(bool(self.values.pop(key, None) or self.sets.pop(key, None)) for key in keys)
+
+    def expire(self, key, seconds):
+        """Accept an expiry."""
+        return True
+
+    def sadd(self, key, member):
+        """Add a member to a set."""
+        self.sets.setdefault(key, set()).add(str(member).encode())
+
+    def srem(self, key, member):
+        """Remove a member from a set."""
+        self.sets.get(key, set()).discard(str(member).encode())
+
+    def smembers(self, key):
+        """Return the members of a set."""
+        return set(self.sets.get(key, set()))
+
+    def scan_iter(self, match):
+        """Return the string keys matching a pattern."""
+        return [key.encode() for key in list(self.values) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self):
+        """Return a pipeline that runs its commands when executed."""
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        """Return the release script, run in Python."""
+        self.scripts.append(script)
+
+        def release_task(keys, args, client=None):
+            if client is not None and client is not self:
+                client.commands.append(lambda: release_task(keys, args))
+                return client
+            task_key, host_key = keys
+            host, task = args
+            if self.values.get(task_key) != host.encode():
+                return 0
+            self.delete(task_key)
+            self.srem(host_key, task)
+            return 1
+
+        return release_task
+
+
+class FakePipeline:
+    """Queue commands for a FakeRedis client."""
+
+    def __init__(self, client):
+        """Start with no commands."""
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        """Queue a client command."""
+        command = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append(lambda: command(*args, **kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        """Run the queued commands."""
+        return [command() for command in self.commands]
+
+
 class WorkerCacheTest(MasuTestCase):
     """Test class for the worker cache."""
 
@@ -123,3 +230,124 @@ class WorkerCacheTest(MasuTestCase):
             _cache.add_task_to_cache(task)
 
         self.assertFalse(_cache.task_is_running(4))
+
+    def test_add_task_to_cache_already_running(self):
+        """Test that a task running on any host is not claimed again."""
+        task_key = "task_key"
+        _cache = WorkerCache()
+        self.assertTrue(_cache.add_task_to_cache(task_key))
+
+        with override_settings(HOSTNAME="test"):
+            _cache = WorkerCache()
+            self.assertFalse(_cache.add_task_to_cache(task_key))
+            self.assertEqual(_cache.worker_cache, [])
+
+    def test_remove_task_from_cache_other_host(self):
+        """Test that a task is released by a worker on another host."""
+        task_key = "task_key"
+        _cache = WorkerCache()
+        _cache.add_task_to_cache(task_key)
+
+        with override_settings(HOSTNAME="test"):
+            WorkerCache().remove_task_from_cache(task_key)
+
+        self.assertFalse(_cache.task_is_running(task_key))
+        self.assertEqual(_cache.worker_cache, [])
+
+    def test_task_is_running_single_lookup(self):
+        """Test that checking a task does not read every host's tasks."""
+        _cache = WorkerCache()
+        _cache.add_task_to_cache(1)
+
+        with patch.object(DjangoWorkerCacheBackend, "get_host_tasks") as mock_get_host_tasks:
+            self.assertTrue(_cache.task_is_running(1))
+        mock_get_host_tasks.assert_not_called()
+
+    def test_task_expires(self):
+        """Test that a task left by a crashed worker expires after the cache timeout."""
+        _cache = WorkerCache()
+        _cache.add_task_to_cache(1)
+
+        expired = time.time() + caches["worker"].default_timeout + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=expired):
+            self.assertFalse(_cache.task_is_running(1))
+            self.assertTrue(_cache.add_task_to_cache(1))
+
+    def test_claim_slot(self):
+        """Test that at most the given number of slots are claimed until one is released."""
+        _cache = WorkerCache()
+        first_slot = _cache.claim_slot("acct10001", 2)
+        second_slot = _cache.claim_slot("acct10001", 2)
+
+        self.assertNotEqual(first_slot, second_slot)
+        self.assertIsNone(_cache.claim_slot("acct10001", 2))
+        self.assertIsNotNone(_cache.claim_slot("acct10002", 2))
+
+        _cache.remove_task_from_cache(first_slot)
+        self.assertEqual(_cache.claim_slot("acct10001", 2), first_slot)
+
+    def test_claim_slot_timeout(self):
+        """Test that a slot is claimed with its own timeout."""
+        _cache = WorkerCache()
+        with override_settings(HOSTNAME="test"):
+            with patch.object(_cache.backend.cache, "add", return_value=True) as mock_add:
+                _cache.claim_slot("acct10001", 2, timeout=600)
+        mock_add.assert_called_once_with("task:slot:acct10001:0", "test", timeout=600)
+
+
+class RedisWorkerCacheBackendTest(MasuTestCase):
+    """Test class for the Redis worker cache backend."""
+
+    def setUp(self):
+        """Set up a backend on a fake Redis client."""
+        super().setUp()
+        self.client = FakeRedis()
+        self.backend = RedisWorkerCacheBackend(self.client, 60)
+
+    def test_add_and_remove(self):
+        """Test that a task is claimed once and released by the script."""
+        self.assertEqual(self.client.scripts, [RELEASE_TASK_SCRIPT])
+        self.assertTrue(self.backend.add("task_key", "host-a"))
+        self.assertFalse(self.backend.add("task_key", "host-b"))
+        self.assertTrue(self.backend.is_running("task_key"))
+        self.assertEqual(self.backend.get_host_tasks("host-a"), ["task_key"])
+        self.assertEqual(self.backend.get_all_tasks(), ["task_key"])
+
+        self.assertTrue(self.backend.remove("task_key"))
+        self.assertFalse(self.backend.is_running("task_key"))
+        self.assertEqual(self.backend.get_host_tasks("host-a"), [])
+        self.assertFalse(self.backend.remove("task_key"))
+
+    def test_add_timeout(self):
+        """Test that a task expires after its own timeout or the cache timeout."""
+        self.backend.add("task_key", "host-a")
+        self.backend.add("slot_key", "host-a", timeout=5)
+
+        self.assertEqual(self.client.expiries[self.backend._get_task_key("task_key")], 60)
+        self.assertEqual(self.client.expiries[self.backend._get_task_key("slot_key")], 5)
+
+    def test_remove_claimed_by_other_host(self):
+        """Test that a task claimed by another host after its owner was read is not released."""
+        self.backend.add("task_key", "host-a")
+        # The task expires and host-b claims it between reading the owner and releasing it
+        self.client.values.clear()
+        self.backend.add("task_key", "host-b")
+
+        with patch.object(self.client, "get", return_value=b"host-a"):
+            self.assertFalse(self.backend.remove("task_key"))
+        self.assertTrue(self.backend.is_running("task_key"))
+        self.assertEqual(self.backend.get_host_tasks("host-b"), ["task_key"])
+
+    def test_invalidate_host(self):
+        """Test that only the tasks a host still holds are released."""
+        self.backend.add("task_1", "host-a")
+        self.backend.add("task_2", "host-a")
+        self.client.values.pop(self.backend._get_task_key("task_2"))
+        self.backend.add("task_2", "host-b")
+
+        self.backend.invalidate_host("host-a")
+
+        self.assertFalse(self.backend.is_running("task_1"))
+        self.assertTrue(self.backend.is_running("task_2"))
+        self.assertEqual(self.backend.get_host_tasks("host-a"), [])
+        self.assertEqual(self.backend.get_host_tasks("host-b"), ["task_2"])
@@ -15,18 +15,26 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
+import csv
+import gzip
+import os
 import random
+import shutil
+import tempfile
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import Mock
 from unittest.mock import patch
 
 import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
 from botocore.exceptions import ClientError
 from dateutil.relativedelta import relativedelta
 from faker import Faker
 from tenant_schemas.utils import schema_context
 
+from api.models import Provider
 from masu.config import Config
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
@@ -416,9 +424,9 @@ class TestAWSUtils(MasuTestCase):
         with patch("masu.util.aws.common.settings", ENABLE_S3_ARCHIVING=True):
             with patch("masu.util.aws.common.get_s3_resource"):
                 with patch("masu.util.aws.common.Path"):
-                    with patch("masu.util.aws.common.pd"):
-                        with patch("masu.util.aws.common.open") as mock_open:
-                            mock_open.side_effect = ValueError()
+                    with patch("masu.util.aws.common.write_csv_as_parquet"):
+                        with patch("masu.util.aws.common.copy_local_file_to_s3_bucket") as mock_copy:
+                            mock_copy.side_effect = ValueError()
                             result = utils.convert_csv_to_parquet(
                                 "request_id",
                                 "s3_csv_path",
@@ -432,19 +440,89 @@ class TestAWSUtils(MasuTestCase):
         with patch("masu.util.aws.common.settings", ENABLE_S3_ARCHIVING=True):
             with patch("masu.util.aws.common.get_s3_resource"):
                 with patch("masu.util.aws.common.Path"):
-                    with patch("masu.util.aws.common.pd"):
-                        with patch("masu.util.aws.common.open"):
-                            with patch("masu.util.aws.common.BytesIO"):
-                                with patch("masu.util.aws.common.copy_data_to_s3_bucket"):
-                                    result = utils.convert_csv_to_parquet(
-                                        "request_id",
-                                        "s3_csv_path",
-                                        "s3_parquet_path",
-                                        "local_path",
-                                        "manifest_id",
-                                        "csv_filename.csv.gz",
-                                    )
-                                    self.assertTrue(result)
+                    with patch("masu.util.aws.common.write_csv_as_parquet") as mock_write:
+                        with patch("masu.util.aws.common.copy_local_file_to_s3_bucket") as mock_copy:
+                            result = utils.convert_csv_to_parquet(
+                                "request_id",
+                                "s3_csv_path",
+                                "s3_parquet_path",
+                                "local_path",
+                                "manifest_id",
+                                "csv_filename.csv.gz",
+                                provider_type=Provider.PROVIDER_AWS,
+                            )
+                            self.assertTrue(result)
+                            mock_write.assert_called_with(
+                                "local_path/csv_filename.csv.gz",
+                                "local_path/csv_filename.parquet",
+                                Provider.PROVIDER_AWS,
+                            )
+                            mock_copy.assert_called_once()
+
+    def test_write_csv_as_parquet(self):
+        """Test that a report is written in row groups with the provider's column types."""
+        temp_dir = tempfile.mkdtemp()
+        csv_file = os.path.join(temp_dir, "report.csv.gz")
+        parquet_file = os.path.join(temp_dir, "report.parquet")
+        with gzip.open(csv_file, "wt") as report:
+            writer = csv.writer(report)
+            writer.writerow(["lineItem/ResourceId", "lineItem/UnblendedCost", "resourceTags/user:app"])
+            for row in range(5):
+                writer.writerow([f"i-{row}", "" if row == 2 else row * 1.5, "1"])
+
+        try:
+            rows = utils.write_csv_as_parquet(csv_file, parquet_file, Provider.PROVIDER_AWS_LOCAL, row_group_size=2)
+            parquet = pq.ParquetFile(parquet_file)
+            table = parquet.read()
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(rows, 5)
+        self.assertEqual(parquet.num_row_groups, 3)
+        self.assertEqual(table.schema.field("lineItem/UnblendedCost").type, pa.float64())
+        self.assertEqual(table.schema.field("lineItem/ResourceId").type, pa.string())
+        self.assertEqual(table.schema.field("resourceTags/user:app").type, pa.string())
+        self.assertEqual(table.column("lineItem/UnblendedCost").to_pylist(), [0.0, 1.5, None, 4.5, 6.0])
+        self.assertEqual(table.column("resourceTags/user:app").to_pylist(), ["1"] * 5)
+
+    def test_write_csv_as_parquet_cur(self):
+        """Test that a CUR with a unit in product/memory keeps the value as text."""
+        temp_dir = tempfile.mkdtemp()
+        csv_file = os.path.join(temp_dir, "test_cur.csv")
+        parquet_file = os.path.join(temp_dir, "test_cur.parquet")
+        with open("./koku/masu/test/data/test_cur.csv") as report:
+            reader = csv.DictReader(report)
+            cur_rows = list(reader)
+            with open(csv_file, "w") as cur_copy:
+                writer = csv.DictWriter(cur_copy, fieldnames=reader.fieldnames)
+                writer.writeheader()
+                for row in cur_rows:
+                    writer.writerow({**row, "product/memory": "8 GiB"})
+
+        try:
+            rows = utils.write_csv_as_parquet(csv_file, parquet_file, Provider.PROVIDER_AWS, row_group_size=10)
+            table = pq.read_table(parquet_file)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual(rows, len(cur_rows))
+        self.assertEqual(table.num_rows, len(cur_rows))
+        self.assertEqual(table.schema.field("product/memory").type, pa.string())
+        self.assertEqual(table.column("product/memory").to_pylist(), ["8 GiB"] * len(cur_rows))
+        self.assertEqual(
+            table.column("lineItem/UnblendedCost").to_pylist(),
+            [float(row["lineItem/UnblendedCost"]) if row["lineItem/UnblendedCost"] else None for row in cur_rows],
+        )
+
+    def test_get_numeric_report_columns(self):
+        """Test that only decimal and float report columns are numeric."""
+        numeric_columns = utils.get_numeric_report_columns(Provider.PROVIDER_AWS)
+        self.assertIn("lineItem/UnblendedCost", numeric_columns)
+        self.assertIn("lineItem/UsageAmount", numeric_columns)
+        self.assertNotIn("lineItem/UsageStartDate", numeric_columns)
+        self.assertNotIn("pod_usage_cpu_core_seconds", numeric_columns)
+        self.assertNotIn("product/memory", numeric_columns)
+        self.assertEqual(utils.get_numeric_report_columns(None), frozenset())
 
 
 class AwsArnTest(TestCase):
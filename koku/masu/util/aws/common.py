@@ -15,30 +15,49 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """AWS utility functions."""
+import csv
 import datetime
+import gzip
 import logging
 import re
 import shutil
-from io import BytesIO
+from functools import lru_cache
 from pathlib import Path
 
 import boto3
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from dateutil.relativedelta import relativedelta
+from django.apps import apps
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DecimalField
+from django.db.models import FloatField
 from tenant_schemas.utils import schema_context
 
 from api.common import log_json
 from api.models import Provider
+from masu.config import Config
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.util import common as utils
+from reporting_common import REPORT_COLUMN_MAP
 
 LOG = logging.getLogger(__name__)
 CSV_GZIP_EXT = ".csv.gz"
 CSV_EXT = ".csv"
 
+# The reporting tables whose REPORT_COLUMN_MAP entries describe a provider's report columns
+PROVIDER_TABLE_PREFIXES = {
+    Provider.PROVIDER_AWS: "reporting_aws",
+    Provider.PROVIDER_AZURE: "reporting_azure",
+    Provider.PROVIDER_GCP: "reporting_gcp",
+    Provider.PROVIDER_OCP: "reporting_ocp",
+}
+
 
 def get_assume_role_session(arn, session="MasuSession"):
     """
@@ -306,6 +325,32 @@ def copy_data_to_s3_bucket(request_id, path, filename, data, manifest_id=None, c
     return upload
 
 
+def copy_local_file_to_s3_bucket(request_id, path, filename, local_file, manifest_id=None, context={}):
+    """
+    Copies a local file to s3 bucket file in multipart chunks without reading it into memory
+    """
+    if not settings.ENABLE_S3_ARCHIVING:
+        return None
+
+    upload = None
+    upload_key = f"{path}/{filename}"
+    try:
+        s3_resource = get_s3_resource()
+        s3_obj = {"bucket_name": settings.S3_BUCKET_NAME, "key": upload_key}
+        upload = s3_resource.Object(**s3_obj)
+        extra_args = {}
+        if manifest_id:
+            extra_args["Metadata"] = {"ManifestId": str(manifest_id)}
+        transfer_config = TransferConfig(
+            multipart_threshold=Config.S3_MULTIPART_CHUNK_SIZE, multipart_chunksize=Config.S3_MULTIPART_CHUNK_SIZE
+        )
+        upload.upload_file(local_file, ExtraArgs=extra_args, Config=transfer_config)
+    except ClientError as err:
+        msg = f"Unable to copy data to {upload_key} in bucket {settings.S3_BUCKET_NAME}.  Reason: {str(err)}"
+        LOG.info(log_json(request_id, msg, context))
+    return upload
+
+
 def copy_local_report_file_to_s3_bucket(
     request_id, s3_path, full_file_path, local_filename, manifest_id, start_date, context={}
 ):
@@ -313,9 +358,7 @@ def copy_local_report_file_to_s3_bucket(
     Copies local report file to s3 bucket
     """
     if s3_path and settings.ENABLE_S3_ARCHIVING:
-        with open(full_file_path, "rb") as fin:
-            data = BytesIO(fin.read())
-            copy_data_to_s3_bucket(request_id, s3_path, local_filename, data, manifest_id, context)
+        copy_local_file_to_s3_bucket(request_id, s3_path, local_filename, full_file_path, manifest_id, context)
 
 
 def get_file_keys_from_s3_with_manifest_id(request_id, s3_path, manifest_id, context={}):
@@ -374,8 +417,106 @@ def remove_files_not_in_set_from_s3_bucket(request_id, s3_path, manifest_id, con
     return removed
 
 
+# Report columns stored as numbers once the processor splits off their unit, such as "8 GiB"
+UNIT_REPORT_COLUMNS = frozenset(["product/memory"])
+
+
+@lru_cache(maxsize=None)
+def get_numeric_report_columns(provider_type):
+    """
+    Get the report columns of a provider that are stored as decimal or float values.
+
+    Columns whose values carry a unit are not numeric in the report itself.
+
+    Args:
+        provider_type (str): The provider type
+
+    Returns:
+        (frozenset): The report column names found in REPORT_COLUMN_MAP
+
+    """
+    prefix = PROVIDER_TABLE_PREFIXES.get(str(provider_type).replace("-local", ""))
+    if prefix is None:
+        return frozenset()
+
+    models = {model._meta.db_table: model for model in apps.get_app_config("reporting").get_models()}
+    numeric_columns = set()
+    for table_name, column_map in REPORT_COLUMN_MAP.items():
+        model = models.get(table_name)
+        if model is None or not table_name.startswith(prefix):
+            continue
+        for report_column, field_name in column_map.items():
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if isinstance(field, (DecimalField, FloatField)) and report_column not in UNIT_REPORT_COLUMNS:
+                numeric_columns.add(report_column)
+    return frozenset(numeric_columns)
+
+
+def get_parquet_schema(csv_header, provider_type):
+    """
+    Get the Parquet schema of a report.
+
+    Numeric report columns are written as doubles and every other column as
+    a string, so each file of a provider gets the same schema regardless of
+    what its values look like. Numeric column values that are not numbers
+    are written as null.
+
+    Args:
+        csv_header (list): The column names of the report
+        provider_type (str): The provider type
+
+    Returns:
+        (pyarrow.Schema): The schema to write the report with
+
+    """
+    numeric_columns = get_numeric_report_columns(provider_type)
+    return pa.schema(
+        [pa.field(column, pa.float64() if column in numeric_columns else pa.string()) for column in csv_header]
+    )
+
+
+def write_csv_as_parquet(csv_file, parquet_file, provider_type, row_group_size=None):
+    """
+    Write a CSV file to a Parquet file one row group at a time.
+
+    Only a single row group of the report is held in memory.
+
+    Args:
+        csv_file (str): The local CSV or gzipped CSV file
+        parquet_file (str): The local Parquet file to write
+        provider_type (str): The provider type
+        row_group_size (int): The number of rows per row group
+
+    Returns:
+        (int): The number of rows written
+
+    """
+    row_group_size = row_group_size or Config.PARQUET_ROW_GROUP_SIZE
+    compression = "gzip" if csv_file.lower().endswith(CSV_GZIP_EXT) else None
+    opener = gzip.open if compression else open
+    with opener(csv_file, "rt") as report:
+        csv_header = next(csv.reader(report), [])
+
+    schema = get_parquet_schema(csv_header, provider_type)
+    numeric_columns = [field.name for field in schema if field.type == pa.float64()]
+    rows = 0
+    writer = pq.ParquetWriter(parquet_file, schema)
+    try:
+        for data_frame in pd.read_csv(csv_file, compression=compression, dtype=str, chunksize=row_group_size):
+            for column in numeric_columns:
+                data_frame[column] = pd.to_numeric(data_frame[column], errors="coerce")
+            writer.write_table(pa.Table.from_pandas(data_frame, schema=schema, preserve_index=False))
+            rows += len(data_frame)
+    finally:
+        writer.close()
+    return rows
+
+
 def convert_csv_to_parquet(
-    request_id, s3_csv_path, s3_parquet_path, local_path, manifest_id, csv_filename, context={}
+    request_id, s3_csv_path, s3_parquet_path, local_path, manifest_id, csv_filename, context={}, provider_type=None
 ):
     """
     Convert CSV files to parquet on S3.
@@ -391,7 +532,6 @@ def convert_csv_to_parquet(
     msg = f"Running convert_csv_to_parquet on file {csv_filename} in S3 path {s3_csv_path}."
     LOG.info(log_json(request_id, msg, context))
 
-    kwargs = {}
     parquet_file = None
     csv_file = f"{s3_csv_path}/{csv_filename}"
     if csv_filename.lower().endswith(CSV_EXT):
@@ -400,7 +540,6 @@ def convert_csv_to_parquet(
     elif csv_filename.lower().endswith(CSV_GZIP_EXT):
         ext = -1 * len(CSV_GZIP_EXT)
         parquet_file = f"{csv_filename[:ext]}.parquet"
-        kwargs = {"compression": "gzip"}
     else:
         msg = f"File {csv_filename} is not valid CSV. Conversion to parquet skipped."
         LOG.warn(log_json(request_id, msg, context))
@@ -420,8 +559,7 @@ def convert_csv_to_parquet(
 
     output_file = f"{local_path}/{parquet_file}"
     try:
-        data_frame = pd.read_csv(tmpfile, **kwargs)
-        data_frame.to_parquet(output_file)
+        write_csv_as_parquet(tmpfile, output_file, provider_type)
     except Exception as err:
         shutil.rmtree(local_path, ignore_errors=True)
         msg = f"File {csv_filename} could not be written as parquet to temp file {output_file}. Reason: {str(err)}"
@@ -429,11 +567,9 @@ def convert_csv_to_parquet(
         return False
 
     try:
-        with open(output_file, "rb") as fin:
-            data = BytesIO(fin.read())
-            copy_data_to_s3_bucket(
-                request_id, s3_parquet_path, parquet_file, data, manifest_id=manifest_id, context=context
-            )
+        copy_local_file_to_s3_bucket(
+            request_id, s3_parquet_path, parquet_file, output_file, manifest_id=manifest_id, context=context
+        )
     except Exception as err:
         shutil.rmtree(local_path, ignore_errors=True)
         s3_key = f"{s3_parquet_path}/{parquet_file}"
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Default partitions were added in PostgreSQL 11
+MIN_POSTGRES_VERSION = 110000
+
+# Line item tables that are not read by materialized views, with the column
+# they are range partitioned on by month.
+PARTITIONED_TABLES = {
+    "reporting_awscostentrylineitem": "usage_start",
+    "reporting_awscostentrylineitem_daily": "usage_start",
+    "reporting_azurecostentrylineitem_daily": "usage_date",
+    "reporting_ocpusagelineitem_daily": "usage_start",
+    "reporting_ocpstoragelineitem_daily": "usage_start",
+}
+
+# The existing table becomes the default partition of a new partitioned table
+# with the same name, so no rows are copied. Monthly partitions are created by
+# masu.database.partition_manager.PartitionManager.
+PARTITION_SQL = """
+ALTER TABLE {table} RENAME TO {table}_default;
+CREATE TABLE {table} (LIKE {table}_default INCLUDING DEFAULTS) PARTITION BY RANGE ({column});
+DO $$
+BEGIN
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY {table}.id', pg_get_serial_sequence('{table}_default', 'id'));
+END $$;
+ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT;
+"""
+
+UNPARTITION_SQL = """
+ALTER TABLE {table} DETACH PARTITION {table}_default;
+INSERT INTO {table}_default SELECT * FROM {table};
+DO $$
+BEGIN
+    EXECUTE format('ALTER SEQUENCE %s OWNED BY {table}_default.id', pg_get_serial_sequence('{table}', 'id'));
+END $$;
+DROP TABLE {table} CASCADE;
+ALTER TABLE {table}_default RENAME TO {table};
+"""
+
+
+def check_postgres_version(apps, schema_editor):
+    """Fail with a clear message on a PostgreSQL version without default partitions."""
+    if schema_editor.connection.pg_version < MIN_POSTGRES_VERSION:
+        raise RuntimeError(
+            f"Partitioning the line item tables needs PostgreSQL 11 or later, found {schema_editor.connection.pg_version}."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("reporting", "0117_auto_20200617_1452")]
+
+    operations = [migrations.RunPython(check_postgres_version, reverse_code=migrations.RunPython.noop)] + [
+        migrations.RunSQL(
+            PARTITION_SQL.format(table=table, column=column),
+            reverse_sql=UNPARTITION_SQL.format(table=table, column=column),
+        )
+        for table, column in PARTITIONED_TABLES.items()
+    ]
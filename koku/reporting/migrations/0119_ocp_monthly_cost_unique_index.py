@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# Monthly node and cluster cost rows are upserted, so each may only exist once
+# per month, report period, cluster, cost type and node. Duplicates left by
+# earlier concurrent updates are merged into the latest row first: each cost
+# column keeps the latest value set on any of the duplicates, which also keeps
+# an infrastructure and a supplementary cost inserted as separate rows.
+MONTHLY_COST_INDEX_SQL = """
+WITH monthly_cost AS (
+    SELECT id,
+        max(id) OVER (
+            PARTITION BY usage_start, report_period_id, cluster_id, monthly_cost_type, coalesce(node, '')
+        ) AS keep_id,
+        infrastructure_monthly_cost,
+        supplementary_monthly_cost
+    FROM reporting_ocpusagelineitem_daily_summary
+    WHERE monthly_cost_type IS NOT NULL
+),
+merged AS (
+    SELECT keep_id,
+        (array_agg(infrastructure_monthly_cost ORDER BY id DESC)
+            FILTER (WHERE infrastructure_monthly_cost IS NOT NULL))[1] AS infrastructure_monthly_cost,
+        (array_agg(supplementary_monthly_cost ORDER BY id DESC)
+            FILTER (WHERE supplementary_monthly_cost IS NOT NULL))[1] AS supplementary_monthly_cost
+    FROM monthly_cost
+    GROUP BY keep_id
+    HAVING count(*) > 1
+)
+UPDATE reporting_ocpusagelineitem_daily_summary AS summary
+SET infrastructure_monthly_cost = merged.infrastructure_monthly_cost,
+    supplementary_monthly_cost = merged.supplementary_monthly_cost
+FROM merged
+WHERE summary.id = merged.keep_id
+;
+DELETE FROM reporting_ocpusagelineitem_daily_summary AS a
+USING reporting_ocpusagelineitem_daily_summary AS b
+WHERE a.monthly_cost_type IS NOT NULL
+    AND a.monthly_cost_type = b.monthly_cost_type
+    AND a.usage_start = b.usage_start
+    AND a.report_period_id = b.report_period_id
+    AND a.cluster_id = b.cluster_id
+    AND coalesce(a.node, '') = coalesce(b.node, '')
+    AND a.id < b.id
+;
+CREATE UNIQUE INDEX ocp_summary_monthly_cost_idx
+ON reporting_ocpusagelineitem_daily_summary (usage_start, report_period_id, cluster_id, monthly_cost_type, (coalesce(node, '')))
+WHERE monthly_cost_type IS NOT NULL
+;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("reporting", "0118_partition_line_item_tables")]
+
+    operations = [
+        migrations.RunSQL(MONTHLY_COST_INDEX_SQL, reverse_sql="DROP INDEX IF EXISTS ocp_summary_monthly_cost_idx;")
+    ]
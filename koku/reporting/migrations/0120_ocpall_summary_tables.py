@@ -0,0 +1,461 @@
+from django.db import migrations
+from django.db import models
+
+# The OpenShift on All summaries become tables that are maintained by source
+# and date range from the OCP on cloud summary steps, so their ids are stable.
+# The per-service views read the daily summary and are dropped and recreated
+# around the change with their 0117 definitions.
+DROP_VIEWS_SQL = """
+DROP INDEX IF EXISTS ocpall_storage_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_storage_summary;
+
+DROP INDEX IF EXISTS ocpall_network_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_network_summary;
+
+DROP INDEX IF EXISTS ocpall_database_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_database_summary;
+
+DROP INDEX IF EXISTS ocpall_compute_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_compute_summary;
+
+DROP INDEX IF EXISTS ocpall_cost_summary_region;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_cost_summary_by_region;
+
+DROP INDEX IF EXISTS ocpall_cost_summary_service;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_cost_summary_by_service;
+
+DROP INDEX IF EXISTS ocpall_cost_summary_account;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_cost_summary_by_account;
+
+DROP INDEX IF EXISTS ocpall_cost_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpall_cost_summary;
+
+DROP INDEX IF EXISTS ocpall_cost_daily_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpallcostlineitem_daily_summary;
+
+DROP INDEX IF EXISTS ocpall_cost_project_daily_summary;
+DROP MATERIALIZED VIEW IF EXISTS reporting_ocpallcostlineitem_project_daily_summary;
+"""
+
+# The tables start with the rows the views held; ids are assigned once here.
+CREATE_TABLES_SQL = """
+CREATE TABLE reporting_ocpallcostlineitem_daily_summary AS (
+    SELECT lids.*
+    FROM (
+        SELECT 'AWS' as source_type,
+            cluster_id,
+            cluster_alias,
+            namespace,
+            node::text as node,
+            resource_id,
+            usage_start,
+            usage_end,
+            usage_account_id,
+            account_alias_id,
+            product_code,
+            product_family,
+            instance_type,
+            region,
+            availability_zone,
+            tags,
+            usage_amount,
+            unit,
+            unblended_cost,
+            markup_cost,
+            currency_code,
+            shared_projects,
+            project_costs,
+            source_uuid
+        FROM reporting_ocpawscostlineitem_daily_summary
+        WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+
+        UNION
+
+        SELECT 'Azure' as source_type,
+            cluster_id,
+            cluster_alias,
+            namespace,
+            node::text as node,
+            resource_id,
+            usage_start,
+            usage_end,
+            subscription_guid as usage_account_id,
+            NULL::int as account_alias_id,
+            service_name as product_code,
+            NULL as product_family,
+            instance_type,
+            resource_location as region,
+            NULL as availability_zone,
+            tags,
+            usage_quantity as usage_amount,
+            unit_of_measure as unit,
+            pretax_cost as unblended_cost,
+            markup_cost,
+            currency as currency_code,
+            shared_projects,
+            project_costs,
+            source_uuid
+        FROM reporting_ocpazurecostlineitem_daily_summary
+        WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+    ) AS lids
+)
+;
+
+ALTER TABLE reporting_ocpallcostlineitem_daily_summary ADD COLUMN id bigserial PRIMARY KEY;
+
+CREATE INDEX ocpallcstdlysumm_usage on reporting_ocpallcostlineitem_daily_summary (usage_start);
+CREATE INDEX ocpallcstdlysumm_source on reporting_ocpallcostlineitem_daily_summary (source_type, source_uuid, usage_start);
+CREATE INDEX ocpallcstdlysumm_node on reporting_ocpallcostlineitem_daily_summary (node text_pattern_ops);
+CREATE INDEX ocpallcstdlysumm_node_like on reporting_ocpallcostlineitem_daily_summary USING GIN (node gin_trgm_ops);
+CREATE INDEX ocpallcstdlysumm_nsp on reporting_ocpallcostlineitem_daily_summary USING GIN (namespace);
+CREATE INDEX ocpall_product_code_ilike ON reporting_ocpallcostlineitem_daily_summary USING GIN (upper(product_code) gin_trgm_ops);
+CREATE INDEX ocpall_product_family_ilike ON reporting_ocpallcostlineitem_daily_summary USING GIN (upper(product_family) gin_trgm_ops);
+
+CREATE TABLE reporting_ocpallcostlineitem_project_daily_summary AS (
+    SELECT lids.*
+    FROM (
+        SELECT 'AWS' as source_type,
+            cluster_id,
+            max(cluster_alias) as cluster_alias,
+            data_source,
+            namespace::text as namespace,
+            node::text as node,
+            pod_labels,
+            resource_id,
+            usage_start,
+            usage_end,
+            usage_account_id,
+            max(account_alias_id) as account_alias_id,
+            product_code,
+            product_family,
+            instance_type,
+            region,
+            availability_zone,
+            sum(usage_amount) as usage_amount,
+            max(unit) as unit,
+            sum(unblended_cost) as unblended_cost,
+            sum(project_markup_cost) as project_markup_cost,
+            sum(pod_cost) as pod_cost,
+            max(currency_code) as currency_code,
+            max(source_uuid::text)::uuid as source_uuid
+        FROM reporting_ocpawscostlineitem_project_daily_summary
+        WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        GROUP BY source_type,
+            usage_start,
+            usage_end,
+            cluster_id,
+            data_source,
+            namespace,
+            node,
+            usage_account_id,
+            resource_id,
+            product_code,
+            product_family,
+            instance_type,
+            region,
+            availability_zone,
+            pod_labels
+
+        UNION
+
+        SELECT 'Azure' as source_type,
+            cluster_id,
+            max(cluster_alias) as cluster_alias,
+            data_source,
+            namespace::text as namespace,
+            node::text as node,
+            pod_labels,
+            resource_id,
+            usage_start,
+            usage_end,
+            subscription_guid as usage_account_id,
+            NULL::int as account_alias_id,
+            service_name as product_code,
+            NULL as product_family,
+            instance_type,
+            resource_location as region,
+            NULL as availability_zone,
+            sum(usage_quantity) as usage_amount,
+            max(unit_of_measure) as unit,
+            sum(pretax_cost) as unblended_cost,
+            sum(project_markup_cost) as project_markup_cost,
+            sum(pod_cost) as pod_cost,
+            max(currency) as currency_code,
+            max(source_uuid::text)::uuid as source_uuid
+        FROM reporting_ocpazurecostlineitem_project_daily_summary
+        WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        GROUP BY source_type,
+            usage_start,
+            usage_end,
+            cluster_id,
+            data_source,
+            namespace,
+            node,
+            usage_account_id,
+            resource_id,
+            product_code,
+            product_family,
+            instance_type,
+            region,
+            availability_zone,
+            pod_labels
+    ) AS lids
+)
+;
+
+ALTER TABLE reporting_ocpallcostlineitem_project_daily_summary ADD COLUMN id bigserial PRIMARY KEY;
+
+CREATE INDEX ocpallcstprjdlysumm_usage on reporting_ocpallcostlineitem_project_daily_summary (usage_start);
+CREATE INDEX ocpallcstprjdlysumm_source on reporting_ocpallcostlineitem_project_daily_summary (source_type, source_uuid, usage_start);
+CREATE INDEX ocpallcstprjdlysumm_node on reporting_ocpallcostlineitem_project_daily_summary (node text_pattern_ops);
+CREATE INDEX ocpallcstprjdlysumm_nsp on reporting_ocpallcostlineitem_project_daily_summary (namespace text_pattern_ops);
+CREATE INDEX ocpallcstprjdlysumm_node_like on reporting_ocpallcostlineitem_project_daily_summary USING GIN (node gin_trgm_ops);
+CREATE INDEX ocpallcstprjdlysumm_nsp_like on reporting_ocpallcostlineitem_project_daily_summary USING GIN (namespace gin_trgm_ops);
+"""
+
+SUMMARY_VIEWS_SQL = """
+CREATE MATERIALIZED VIEW reporting_ocpall_cost_summary AS(
+    SELECT row_number() OVER(ORDER BY usage_start, cluster_id, source_uuid) as id,
+        usage_start as usage_start,
+        usage_start as usage_end,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        sum(unblended_cost) as unblended_cost,
+        sum(markup_cost) as markup_cost,
+        max(currency_code) as currency_code,
+        source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary
+    -- Get data for this month or last month
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+    GROUP BY usage_start, cluster_id, cluster_alias, source_uuid
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_cost_summary
+ON reporting_ocpall_cost_summary (usage_start, cluster_id, source_uuid)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_cost_summary_by_account AS(
+    SELECT row_number() OVER(ORDER BY usage_start, cluster_id, usage_account_id) as id,
+        usage_start as usage_start,
+        usage_start as usage_end,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        usage_account_id,
+        max(account_alias_id) as account_alias_id,
+        sum(unblended_cost) as unblended_cost,
+        sum(markup_cost) as markup_cost,
+        max(currency_code) as currency_code,
+        max(source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary
+    -- Get data for this month or last month
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+    GROUP BY usage_start, cluster_id, usage_account_id
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_cost_summary_account
+ON reporting_ocpall_cost_summary_by_account (usage_start, cluster_id, usage_account_id)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_cost_summary_by_service AS(
+    SELECT row_number() OVER(ORDER BY usage_start, cluster_id, usage_account_id, product_code, product_family) as id,
+        usage_start as usage_start,
+        usage_start as usage_end,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        usage_account_id,
+        max(account_alias_id) as account_alias_id,
+        product_code,
+        product_family,
+        sum(unblended_cost) as unblended_cost,
+        sum(markup_cost) as markup_cost,
+        max(currency_code) as currency_code,
+        max(source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary
+    -- Get data for this month or last month
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+    GROUP BY usage_start, cluster_id, usage_account_id, product_code, product_family
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_cost_summary_service
+ON reporting_ocpall_cost_summary_by_service (usage_start, cluster_id, usage_account_id, product_code, product_family)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_cost_summary_by_region AS(
+    SELECT row_number() OVER(ORDER BY usage_start, cluster_id, usage_account_id, region, availability_zone) as id,
+        usage_start as usage_start,
+        usage_start as usage_end,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        usage_account_id,
+        max(account_alias_id) as account_alias_id,
+        region,
+        availability_zone,
+        sum(unblended_cost) as unblended_cost,
+        sum(markup_cost) as markup_cost,
+        max(currency_code) as currency_code,
+        max(source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary
+    -- Get data for this month or last month
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+    GROUP BY usage_start, cluster_id, usage_account_id, region, availability_zone
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_cost_summary_region
+ON reporting_ocpall_cost_summary_by_region (usage_start, cluster_id, usage_account_id, region, availability_zone)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_compute_summary AS (
+    SELECT row_number() OVER (ORDER BY usage_start, cluster_id, usage_account_id, product_code) AS id,
+        lids.usage_start,
+        lids.usage_start as usage_end,
+        lids.cluster_id,
+        max(lids.cluster_alias) as cluster_alias,
+        lids.usage_account_id,
+        max(lids.account_alias_id) as account_alias_id,
+        lids.product_code,
+        lids.instance_type,
+        lids.resource_id,
+        sum(lids.usage_amount) as usage_amount,
+        max(lids.unit) as unit,
+        sum(lids.unblended_cost) as unblended_cost,
+        sum(lids.markup_cost) as markup_cost,
+        max(lids.currency_code) as currency_code,
+        max(lids.source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary lids
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        AND instance_type IS NOT NULL
+    GROUP BY lids.usage_start,
+        lids.cluster_id,
+        lids.usage_account_id,
+        lids.product_code,
+        lids.instance_type,
+        lids.resource_id
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_compute_summary
+ON reporting_ocpall_compute_summary (usage_start, cluster_id, usage_account_id, product_code, instance_type, resource_id);
+
+CREATE MATERIALIZED VIEW reporting_ocpall_database_summary AS (
+    SELECT row_number() OVER (ORDER BY usage_start, cluster_id, usage_account_id, product_code) AS id,
+        lids.usage_start,
+        lids.usage_start as usage_end,
+        lids.cluster_id,
+        max(lids.cluster_alias) as cluster_alias,
+        lids.usage_account_id,
+        max(lids.account_alias_id) as account_alias_id,
+        lids.product_code,
+        sum(lids.usage_amount) as usage_amount,
+        max(lids.unit) as unit,
+        sum(lids.unblended_cost) as unblended_cost,
+        sum(lids.markup_cost) as markup_cost,
+        max(lids.currency_code) as currency_code,
+        max(lids.source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary lids
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        AND (
+            product_code IN ('AmazonRDS','AmazonDynamoDB','AmazonElastiCache','AmazonNeptune','AmazonRedshift','AmazonDocumentDB','Cosmos DB','Cache for Redis')
+                OR product_code LIKE '%Database%'
+        )
+    GROUP BY lids.usage_start,
+        lids.cluster_id,
+        lids.usage_account_id,
+        lids.product_code
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_database_summary
+ON reporting_ocpall_database_summary (usage_start, cluster_id, usage_account_id, product_code)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_network_summary AS (
+    SELECT row_number() OVER (ORDER BY usage_start, cluster_id, usage_account_id, product_code) AS id,
+        lids.cluster_id,
+        max(lids.cluster_alias) as cluster_alias,
+        lids.usage_account_id,
+        max(lids.account_alias_id) as account_alias_id,
+        lids.usage_start,
+        lids.usage_start as usage_end,
+        lids.product_code,
+        sum(lids.usage_amount) as usage_amount,
+        max(lids.unit) as unit,
+        sum(lids.unblended_cost) as unblended_cost,
+        sum(lids.markup_cost) as markup_cost,
+        max(lids.currency_code) as currency_code,
+        max(lids.source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary lids
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        AND product_code IN ('AmazonVPC','AmazonCloudFront','AmazonRoute53','AmazonAPIGateway','Virtual Network','VPN','DNS','Traffic Manager','ExpressRoute','Load Balancer','Application Gateway')
+    GROUP BY lids.usage_start,
+        lids.cluster_id,
+        lids.usage_account_id,
+        lids.product_code
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_network_summary
+ON reporting_ocpall_network_summary (usage_start, cluster_id, usage_account_id, product_code)
+;
+
+CREATE MATERIALIZED VIEW reporting_ocpall_storage_summary AS (
+    SELECT row_number() OVER (ORDER BY usage_start, cluster_id, usage_account_id, product_family, product_code) AS id,
+        cluster_id,
+        max(cluster_alias) as cluster_alias,
+        usage_account_id,
+        max(account_alias_id) as account_alias_id,
+        usage_start,
+        usage_start as usage_end,
+        product_family,
+        product_code,
+        sum(usage_amount) as usage_amount,
+        max(unit) as unit,
+        sum(unblended_cost) as unblended_cost,
+        sum(markup_cost) as markup_cost,
+        max(currency_code) as currency_code,
+        max(source_uuid::text)::uuid as source_uuid
+    FROM reporting_ocpallcostlineitem_daily_summary
+    WHERE usage_start >= DATE_TRUNC('month', NOW() - '1 month'::interval)::date
+        AND (product_family LIKE '%Storage%' OR product_code LIKE '%Storage%')
+    GROUP BY usage_start,
+        cluster_id,
+        usage_account_id,
+        product_family,
+        product_code
+)
+WITH DATA
+;
+
+CREATE UNIQUE INDEX ocpall_storage_summary
+ON reporting_ocpall_storage_summary (usage_start, cluster_id, usage_account_id, product_family, product_code)
+;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("reporting", "0119_ocp_monthly_cost_unique_index")]
+
+    operations = [
+        migrations.RunSQL(DROP_VIEWS_SQL + CREATE_TABLES_SQL + SUMMARY_VIEWS_SQL),
+        migrations.AlterField(
+            model_name="ocpallcostlineitemdailysummary",
+            name="id",
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name="ocpallcostlineitemprojectdailysummary",
+            name="id",
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+    ]
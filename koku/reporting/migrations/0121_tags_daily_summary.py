@@ -0,0 +1,176 @@
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+# Tag summaries are rolled up from per-day tag keys and values. The per-day
+# rows of existing data are read from the line items once here.
+POPULATE_TAGS_DAILY_SUMMARY_SQL = """
+INSERT INTO reporting_awstags_daily_summary (usage_start, key, values, cost_entry_bill_id, usage_account_ids)
+SELECT li.usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value),
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.usage_account_id)
+FROM reporting_awscostentrylineitem_daily AS li,
+    jsonb_each_text(li.tags) labels
+WHERE li.cost_entry_bill_id IS NOT NULL
+GROUP BY li.usage_start, labels.key, li.cost_entry_bill_id
+;
+
+INSERT INTO reporting_azuretags_daily_summary (usage_start, key, values, cost_entry_bill_id, subscription_guid)
+SELECT li.usage_date,
+    labels.key,
+    array_agg(DISTINCT labels.value),
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.subscription_guid)
+FROM reporting_azurecostentrylineitem_daily AS li,
+    jsonb_each_text(li.tags) labels
+GROUP BY li.usage_date, labels.key, li.cost_entry_bill_id
+;
+
+INSERT INTO reporting_ocpawstags_daily_summary (
+    usage_start, key, values, cost_entry_bill_id, usage_account_ids, namespace
+)
+SELECT li.usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value),
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.usage_account_id),
+    array_agg(DISTINCT ns.namespace)
+FROM reporting_ocpawscostlineitem_daily_summary AS li,
+    jsonb_each_text(li.tags) labels,
+    unnest(li.namespace) AS ns(namespace)
+WHERE li.cost_entry_bill_id IS NOT NULL
+GROUP BY li.usage_start, labels.key, li.cost_entry_bill_id
+;
+
+INSERT INTO reporting_ocpazuretags_daily_summary (
+    usage_start, key, values, cost_entry_bill_id, subscription_guid, namespace
+)
+SELECT li.usage_start,
+    labels.key,
+    array_agg(DISTINCT labels.value),
+    li.cost_entry_bill_id,
+    array_agg(DISTINCT li.subscription_guid),
+    array_agg(DISTINCT ns.namespace)
+FROM reporting_ocpazurecostlineitem_daily_summary AS li,
+    jsonb_each_text(li.tags) labels,
+    unnest(li.namespace) AS ns(namespace)
+WHERE li.cost_entry_bill_id IS NOT NULL
+GROUP BY li.usage_start, labels.key, li.cost_entry_bill_id
+;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("reporting", "0120_ocpall_summary_tables")]
+
+    operations = [
+        migrations.CreateModel(
+            name="AWSTagsDailySummary",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("usage_start", models.DateField()),
+                ("key", models.CharField(max_length=253)),
+                (
+                    "values",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "usage_account_ids",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), size=None),
+                ),
+                (
+                    "cost_entry_bill",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="reporting.AWSCostEntryBill"),
+                ),
+            ],
+            options={
+                "db_table": "reporting_awstags_daily_summary",
+                "unique_together": {("usage_start", "key", "cost_entry_bill")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AzureTagsDailySummary",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("usage_start", models.DateField()),
+                ("key", models.CharField(max_length=253)),
+                (
+                    "values",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "subscription_guid",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), size=None),
+                ),
+                (
+                    "cost_entry_bill",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="reporting.AzureCostEntryBill"),
+                ),
+            ],
+            options={
+                "db_table": "reporting_azuretags_daily_summary",
+                "unique_together": {("usage_start", "key", "cost_entry_bill")},
+            },
+        ),
+        migrations.CreateModel(
+            name="OCPAWSTagsDailySummary",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("usage_start", models.DateField()),
+                ("key", models.CharField(max_length=253)),
+                (
+                    "values",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "usage_account_ids",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), size=None),
+                ),
+                (
+                    "namespace",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "cost_entry_bill",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="reporting.AWSCostEntryBill"),
+                ),
+            ],
+            options={
+                "db_table": "reporting_ocpawstags_daily_summary",
+                "unique_together": {("usage_start", "key", "cost_entry_bill")},
+            },
+        ),
+        migrations.CreateModel(
+            name="OCPAzureTagsDailySummary",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("usage_start", models.DateField()),
+                ("key", models.CharField(max_length=253)),
+                (
+                    "values",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "subscription_guid",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=50), size=None),
+                ),
+                (
+                    "namespace",
+                    django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=253), size=None),
+                ),
+                (
+                    "cost_entry_bill",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="reporting.AzureCostEntryBill"),
+                ),
+            ],
+            options={
+                "db_table": "reporting_ocpazuretags_daily_summary",
+                "unique_together": {("usage_start", "key", "cost_entry_bill")},
+            },
+        ),
+        migrations.RunSQL(POPULATE_TAGS_DAILY_SUMMARY_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -50,6 +50,7 @@ from reporting.provider.aws.models import AWSStorageSummary
 from reporting.provider.aws.models import AWSStorageSummaryByAccount
 from reporting.provider.aws.models import AWSStorageSummaryByRegion
 from reporting.provider.aws.models import AWSStorageSummaryByService
+from reporting.provider.aws.models import AWSTagsDailySummary
 from reporting.provider.aws.models import AWSTagsSummary
 from reporting.provider.azure.models import AzureComputeSummary
 from reporting.provider.azure.models import AzureCostEntryBill
@@ -64,6 +65,7 @@ from reporting.provider.azure.models import AzureDatabaseSummary
 from reporting.provider.azure.models import AzureMeter
 from reporting.provider.azure.models import AzureNetworkSummary
 from reporting.provider.azure.models import AzureStorageSummary
+from reporting.provider.azure.models import AzureTagsDailySummary
 from reporting.provider.azure.models import AzureTagsSummary
 from reporting.provider.azure.openshift.models import OCPAzureComputeSummary
 from reporting.provider.azure.openshift.models import OCPAzureCostLineItemDailySummary
@@ -75,6 +77,7 @@ from reporting.provider.azure.openshift.models import OCPAzureCostSummaryByServi
 from reporting.provider.azure.openshift.models import OCPAzureDatabaseSummary
 from reporting.provider.azure.openshift.models import OCPAzureNetworkSummary
 from reporting.provider.azure.openshift.models import OCPAzureStorageSummary
+from reporting.provider.azure.openshift.models import OCPAzureTagsDailySummary
 from reporting.provider.azure.openshift.models import OCPAzureTagsSummary
 from reporting.provider.ocp.costs.models import CostSummary
 from reporting.provider.ocp.models import OCPCostSummary
@@ -106,6 +109,7 @@ from reporting.provider.ocp_aws.models import OCPAWSCostSummaryByService
 from reporting.provider.ocp_aws.models import OCPAWSDatabaseSummary
 from reporting.provider.ocp_aws.models import OCPAWSNetworkSummary
 from reporting.provider.ocp_aws.models import OCPAWSStorageSummary
+from reporting.provider.ocp_aws.models import OCPAWSTagsDailySummary
 from reporting.provider.ocp_aws.models import OCPAWSTagsSummary
 
 
@@ -170,7 +174,6 @@ OCP_ON_AZURE_MATERIALIZED_VIEWS = (
 )
 
 OCP_ON_INFRASTRUCTURE_MATERIALIZED_VIEWS = (
-    OCPAllCostLineItemDailySummary,
     OCPAllCostSummary,
     OCPAllCostSummaryByAccount,
     OCPAllCostSummaryByService,
@@ -179,7 +182,6 @@ OCP_ON_INFRASTRUCTURE_MATERIALIZED_VIEWS = (
     OCPAllDatabaseSummary,
     OCPAllNetworkSummary,
     OCPAllStorageSummary,
-    OCPAllCostLineItemProjectDailySummary,
     OCPCostSummary,
     OCPCostSummaryByProject,
     OCPCostSummaryByNode,
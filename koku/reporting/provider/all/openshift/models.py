@@ -22,7 +22,11 @@ from django.db import models
 
 
 class OCPAllCostLineItemDailySummary(models.Model):
-    """A summarized view of OCP on All infrastructure cost."""
+    """A summarized table of OCP on All infrastructure cost.
+
+    Rows are replaced by source and date range when the OCP on AWS
+    and OCP on Azure summaries are updated.
+    """
 
     class Meta:
         """Meta for OCPAllCostLineItemDailySummary."""
@@ -46,7 +50,7 @@ class OCPAllCostLineItemDailySummary(models.Model):
             # Function: (upper(product_family) gin_trgm_ops)
         ]
 
-    id = models.IntegerField(primary_key=True)
+    id = models.BigAutoField(primary_key=True)
 
     # The infrastructure provider type
     source_type = models.TextField()
@@ -412,7 +416,11 @@ class OCPAllStorageSummary(models.Model):
 
 
 class OCPAllCostLineItemProjectDailySummary(models.Model):
-    """A summarized view of OCP on AWS cost by OpenShift project."""
+    """A summarized table of OCP on All infrastructure cost by OpenShift project.
+
+    Rows are replaced by source and date range when the OCP on AWS
+    and OCP on Azure summaries are updated.
+    """
 
     class Meta:
         """Meta for OCPAllCostLineItemProjectDailySummary."""
@@ -430,7 +438,7 @@ class OCPAllCostLineItemProjectDailySummary(models.Model):
             models.Index(fields=["instance_type"], name="ocpall_proj_inst_type_idx"),
         ]
 
-    id = models.IntegerField(primary_key=True)
+    id = models.BigAutoField(primary_key=True)
 
     # The infrastructure provider type
     source_type = models.TextField()
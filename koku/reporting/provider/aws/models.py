@@ -299,6 +299,28 @@ class AWSTagsSummary(models.Model):
     accounts = ArrayField(models.CharField(max_length=63))
 
 
+class AWSTagsDailySummary(models.Model):
+    """The tag keys and values of a bill for one day.
+
+    AWSTagsSummary is rolled up from these rows, so only the days
+    that are summarized again need their line item tags read.
+    """
+
+    class Meta:
+        """Meta for AWSTagsDailySummary."""
+
+        db_table = "reporting_awstags_daily_summary"
+        unique_together = ("usage_start", "key", "cost_entry_bill")
+
+    id = models.BigAutoField(primary_key=True)
+
+    usage_start = models.DateField(null=False)
+    key = models.CharField(max_length=253)
+    values = ArrayField(models.CharField(max_length=253))
+    cost_entry_bill = models.ForeignKey("AWSCostEntryBill", on_delete=models.CASCADE)
+    usage_account_ids = ArrayField(models.CharField(max_length=50))
+
+
 # Materialized Views for UI Reporting
 class AWSCostSummary(models.Model):
     """A MATERIALIZED VIEW specifically for UI API queries.
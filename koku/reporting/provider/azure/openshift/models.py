@@ -194,6 +194,29 @@ class OCPAzureTagsSummary(models.Model):
     namespace = ArrayField(models.CharField(max_length=253, null=False))
 
 
+class OCPAzureTagsDailySummary(models.Model):
+    """The tag keys and values of a bill for one day.
+
+    OCPAzureTagsSummary is rolled up from these rows, so only the days
+    that are summarized again need their line item tags read.
+    """
+
+    class Meta:
+        """Meta for OCPAzureTagsDailySummary."""
+
+        db_table = "reporting_ocpazuretags_daily_summary"
+        unique_together = ("usage_start", "key", "cost_entry_bill")
+
+    id = models.BigAutoField(primary_key=True)
+
+    usage_start = models.DateField(null=False)
+    key = models.CharField(max_length=253)
+    values = ArrayField(models.CharField(max_length=253))
+    cost_entry_bill = models.ForeignKey("AzureCostEntryBill", on_delete=models.CASCADE)
+    subscription_guid = ArrayField(models.CharField(max_length=50))
+    namespace = ArrayField(models.CharField(max_length=253, null=False))
+
+
 # Materialized Views for UI Reporting
 class OCPAzureCostSummary(models.Model):
     """A MATERIALIZED VIEW specifically for UI API queries.
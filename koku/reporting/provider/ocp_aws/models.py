@@ -211,6 +211,29 @@ class OCPAWSTagsSummary(models.Model):
     namespace = ArrayField(models.CharField(max_length=253))
 
 
+class OCPAWSTagsDailySummary(models.Model):
+    """The tag keys and values of a bill for one day.
+
+    OCPAWSTagsSummary is rolled up from these rows, so only the days
+    that are summarized again need their line item tags read.
+    """
+
+    class Meta:
+        """Meta for OCPAWSTagsDailySummary."""
+
+        db_table = "reporting_ocpawstags_daily_summary"
+        unique_together = ("usage_start", "key", "cost_entry_bill")
+
+    id = models.BigAutoField(primary_key=True)
+
+    usage_start = models.DateField(null=False)
+    key = models.CharField(max_length=253)
+    values = ArrayField(models.CharField(max_length=253))
+    cost_entry_bill = models.ForeignKey("AWSCostEntryBill", on_delete=models.CASCADE)
+    usage_account_ids = ArrayField(models.CharField(max_length=50))
+    namespace = ArrayField(models.CharField(max_length=253))
+
+
 # Materialized Views for UI Reporting
 class OCPAWSCostSummary(models.Model):
     """A MATERIALIZED VIEW specifically for UI API queries.